@@ -35,7 +35,6 @@ import logging.config
 import os
 from flask import Flask, got_request_exception
 from flask_restful import Api
-from flask_caching import Cache
 from flask_cors import CORS
 import sys
 import six
@@ -83,8 +82,19 @@ from navitiacommon.models import db
 # NOTE: no db request should be made outside of a request context
 # Therefore, the db app shouldn't be set here in order not to cause idle_in_transaction deadlock
 db.init_app(app)
-cache = Cache(app, config=app.config[str('CACHE_CONFIGURATION')])  # type: Cache
-memory_cache = Cache(app, config=app.config[str('MEMORY_CACHE_CONFIGURATION')])  # type: Cache
+from jormungandr.coalescing_cache import CoalescingCache
+
+cache = CoalescingCache(app, config=app.config[str('CACHE_CONFIGURATION')])  # type: CoalescingCache
+memory_cache = CoalescingCache(
+    app, config=app.config[str('MEMORY_CACHE_CONFIGURATION')]
+)  # type: CoalescingCache
+
+from jormungandr.two_tier_cache import TwoTierCache
+
+# memory_cache's configuration is used for the local tier
+two_tier_cache = TwoTierCache(
+    cache, app.config[str('MEMORY_CACHE_CONFIGURATION')], app.config.get(str('CACHE_INVALIDATION'))
+)  # type: TwoTierCache
 
 if app.config[str('AUTOCOMPLETE_SYSTEMS')] is not None:
     global_autocomplete = {k: utils.create_object(v) for k, v in app.config[str('AUTOCOMPLETE_SYSTEMS')].items()}
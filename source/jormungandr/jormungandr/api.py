@@ -33,10 +33,11 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 import importlib
 from flask_restful.representations import json
-from flask import request, make_response
+from flask import request, make_response, Response, stream_with_context, g
 from jormungandr import rest_api, app
 from jormungandr.index import index
 from jormungandr.modules_loader import ModulesLoader
+from jormungandr.interfaces.v1.serializer.streaming import StreamedSerialization
 import ujson
 import logging
 from jormungandr.new_relic import record_custom_parameter
@@ -48,6 +49,8 @@ import six
 @rest_api.representation("text/jsonp")
 @rest_api.representation("application/jsonp")
 def output_jsonp(data, code, headers=None):
+    if isinstance(data, StreamedSerialization):
+        data = data.data
     resp = json.output_json(data, code, headers)
     callback = request.args.get('callback', False)
     if callback:
@@ -58,7 +61,10 @@ def output_jsonp(data, code, headers=None):
 @rest_api.representation("text/json")
 @rest_api.representation("application/json")
 def output_json(data, code, headers=None):
-    resp = make_response(ujson.dumps(data), code)
+    if isinstance(data, StreamedSerialization):
+        resp = Response(stream_with_context(data.stream()), status=code, mimetype='application/json')
+    else:
+        resp = make_response(ujson.dumps(data), code)
     resp.headers.extend(headers or {})
     return resp
 
@@ -84,6 +90,14 @@ def add_request_id(response, *args, **kwargs):
     return response
 
 
+@app.after_request
+def add_retry_after(response, *args, **kwargs):
+    retry_after = getattr(g, 'retry_after', None)
+    if retry_after and response.status_code == 429:
+        response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
 @app.after_request
 def add_info_newrelic(response, *args, **kwargs):
     try:
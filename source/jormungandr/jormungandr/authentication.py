@@ -38,8 +38,11 @@ from functools import wraps
 from jormungandr.exceptions import RegionNotFound
 import datetime
 import base64
+import functools
 from navitiacommon.models import User, Instance, Key
-from jormungandr import cache, memory_cache, app as current_app
+from jormungandr import two_tier_cache, app as current_app
+from jormungandr.two_tier_cache import AUTHENTICATION
+from jormungandr.authentication_snapshot import authentication_snapshot
 
 
 def authentication_required(func):
@@ -105,33 +108,64 @@ def get_token():
         return auth
 
 
-@memory_cache.memoize(
-    current_app.config[str('MEMORY_CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 30)
-)
-@cache.memoize(current_app.config[str('CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 300))
+def get_snapshot():
+    """
+    the in-process snapshot of the authentication data, None if it's disabled or not loaded yet
+    """
+    if authentication_snapshot is None:
+        return None
+    # an invalidation published by tyr triggers the refresh of the snapshot
+    two_tier_cache.apply_pending_invalidations()
+    return authentication_snapshot.get()
+
+
 def has_access(region, api, abort, user):
     """
     Check the Authorization of the current user for this region and this API.
     If abort is True, the request is aborted with the appropriate HTTP code.
-    Warning: Please this function is cached therefore it should not be
-    dependent of the request context, so keep it as a pure function.
     """
     if current_app.config.get('PUBLIC', False):
         # if jormungandr is on public mode we skip the authentification process
         return True
 
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return cache_has_access(region, api, abort, user)
+
+    if not user:
+        abort_request(user=user)
+    return _check_access(
+        snapshot.get_instance(region), region, abort, user, functools.partial(snapshot.has_access, user), api
+    )
+
+
+@two_tier_cache.memoize(
+    current_app.config[str('MEMORY_CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 30),
+    current_app.config[str('CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 300),
+    namespace=AUTHENTICATION,
+)
+def cache_has_access(region, api, abort, user):
+    """
+    Warning: Please this function is cached therefore it should not be
+    dependent of the request context, so keep it as a pure function.
+    """
     if not user:
         # no user --> no need to continue, we can abort, a user is mandatory even for free region
         abort_request(user=user)
 
-    model_instance = Instance.get_by_name(region)
+    return _check_access(Instance.get_by_name(region), region, abort, user, user.has_access, api)
+
 
+def _check_access(model_instance, region, abort, user, user_has_access, api):
+    """
+    user_has_access(instance_id, api) tells if the user has an authorization for the api on the instance
+    """
     if not model_instance:
         if abort:
             raise RegionNotFound(region)
         return False
 
-    if (model_instance.is_free and user.have_access_to_free_instances) or user.has_access(
+    if (model_instance.is_free and user.have_access_to_free_instances) or user_has_access(
         model_instance.id, api
     ):
         return True
@@ -142,10 +176,11 @@ def has_access(region, api, abort, user):
             return False
 
 
-@memory_cache.memoize(
-    current_app.config[str('MEMORY_CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 30)
+@two_tier_cache.memoize(
+    current_app.config[str('MEMORY_CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 30),
+    current_app.config[str('CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 300),
+    namespace=AUTHENTICATION,
 )
-@cache.memoize(current_app.config[str('CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 300))
 def cache_get_user(token):
     """
     We allow this method to be cached even if it depends on the current time
@@ -154,19 +189,21 @@ def cache_get_user(token):
     return User.get_from_token(token, datetime.datetime.now())
 
 
-@memory_cache.memoize(
-    current_app.config[str('MEMORY_CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 30)
+@two_tier_cache.memoize(
+    current_app.config[str('MEMORY_CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 30),
+    current_app.config[str('CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 300),
+    namespace=AUTHENTICATION,
 )
-@cache.memoize(current_app.config[str('CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 300))
 def cache_get_key(token):
     return Key.get_by_token(token)
 
 
-@memory_cache.memoize(
-    current_app.config[str('MEMORY_CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 30)
+@two_tier_cache.memoize(
+    current_app.config[str('MEMORY_CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 30),
+    current_app.config[str('CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 300),
+    namespace=AUTHENTICATION,
 )
-@cache.memoize(current_app.config[str('CACHE_CONFIGURATION')].get(str('TIMEOUT_AUTHENTICATION'), 300))
-def get_all_available_instances(user):
+def cache_get_all_available_instances(user):
     """
     get the list of instances that a user can use (for the autocomplete apis)
     if Jormungandr has no authentication set (or no database), the user can use all the instances
@@ -189,6 +226,16 @@ def get_all_available_instances(user):
     return user.get_all_available_instances()
 
 
+def get_all_available_instances(user):
+    # without database or authentication there is no snapshot
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return cache_get_all_available_instances(user)
+    if not user or not user.have_access_to_free_instances:
+        abort_request(user=user)
+    return snapshot.get_all_available_instances(user)
+
+
 def get_user(token, abort_if_no_token=True):
     """
     return the current authenticated User or None
@@ -210,7 +257,11 @@ def get_user(token, abort_if_no_token=True):
                 g.user = User(login="unknown_user")
                 g.user.id = 0
         else:
-            g.user = cache_get_user(token)
+            snapshot = get_snapshot()
+            if snapshot is not None:
+                g.user = snapshot.get_user(token, datetime.datetime.now())
+            else:
+                g.user = cache_get_user(token)
 
         return g.user
 
@@ -220,7 +271,8 @@ def get_app_name(token):
     return the app_name for the token
     """
     if token:
-        key = cache_get_key(token)
+        snapshot = get_snapshot()
+        key = snapshot.get_key(token) if snapshot is not None else cache_get_key(token)
         if key:
             return key.app_name
     return None
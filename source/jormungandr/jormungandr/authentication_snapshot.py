@@ -0,0 +1,229 @@
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import defaultdict
+import gevent
+import gevent.event
+import logging
+import threading
+import time
+
+from navitiacommon.models import db, User, Instance, Key, Authorization, Api
+from jormungandr import app, two_tier_cache
+from jormungandr.two_tier_cache import AUTHENTICATION
+
+
+class Snapshot(object):
+    """
+    keys, users, authorizations and instances of the tyr database, indexed for the authentication
+
+    a snapshot is never modified, a new one replaces it
+    """
+
+    def __init__(self, version, keys, users, authorizations, instances):
+        self.version = version
+        self.created_at = time.time()
+        self._keys = {k.token: k for k in keys}
+        self._users = {u.id: u for u in users}
+        # (user_id, instance_id) -> names of the apis
+        self._apis = defaultdict(set)
+        self._instance_ids_by_user = defaultdict(set)
+        for user_id, instance_id, api_name in authorizations:
+            self._apis[(user_id, instance_id)].add(api_name)
+            self._instance_ids_by_user[user_id].add(instance_id)
+        self._instances = {i.name: i for i in instances}
+        self._instances_by_id = {i.id: i for i in instances}
+
+    def get_key(self, token):
+        return self._keys.get(token)
+
+    def get_user(self, token, now):
+        key = self._keys.get(token)
+        # like the query of User.get_from_token, a key is valid until the day before valid_until
+        if key is None or (key.valid_until is not None and key.valid_until <= now.date()):
+            return None
+        return self._users.get(key.user_id)
+
+    def get_instance(self, name):
+        return self._instances.get(name)
+
+    def has_access(self, user, instance_id, api):
+        return user.is_super_user or api in self._apis.get((user.id, instance_id), ())
+
+    def get_all_available_instances(self, user):
+        if user.is_super_user:
+            return list(self._instances.values())
+        instance_ids = self._instance_ids_by_user.get(user.id, ())
+        instances = {self._instances_by_id[i] for i in instance_ids if i in self._instances_by_id}
+        if user.type == 'with_free_instances':
+            instances.update(i for i in self._instances.values() if i.is_free)
+        return list(instances)
+
+    def __repr__(self):
+        return '<Snapshot {}: {} keys, {} users>'.format(self.version, len(self._keys), len(self._users))
+
+
+def load_snapshot(version):
+    """
+    build a snapshot with a few bulk queries, the objects are detached from the session at the end
+    """
+    with app.app_context():
+        keys = db.session.query(Key.token, Key.user_id, Key.app_name, Key.valid_until).all()
+        users = User.query.all()
+        authorizations = (
+            db.session.query(Authorization.user_id, Authorization.instance_id, Api.name)
+            .join(Api, Api.id == Authorization.api_id)
+            .all()
+        )
+        instances = Instance.query_existing().all()
+        return Snapshot(version, keys, users, authorizations, instances)
+
+
+class AuthenticationSnapshot(object):
+    """
+    In-process snapshot of the authentication data, refreshed in background
+
+    With it the authentication of a request is only made of lookups in dicts, the tyr database is queried
+    every 'refresh_interval' seconds (or when tyr publishes an invalidation of the authentication) and not
+    by the requests. The new snapshot replaces the previous one at once, so a request never sees half of one.
+    If the snapshot can't be refreshed for 'max_staleness' seconds, it isn't used anymore and the
+    authentication goes back to the database (through the cache).
+
+    The queries to the database don't yield to gevent, so without gevent's socket patch the snapshot is loaded
+    by a thread.
+    """
+
+    def __init__(self, load=load_snapshot, refresh_interval=60, max_staleness=600):
+        self.load = load
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self._snapshot = None
+        self._version = 0
+        self._worker = None
+        self._stop_event = None
+        self._refresh_requested = gevent.event.Event()
+        self.nb_refreshes = 0
+        self.nb_errors = 0
+
+    def _is_running(self):
+        if isinstance(self._worker, threading.Thread):
+            return self._worker.is_alive()
+        return self._worker is not None and not self._worker.dead
+
+    def start(self):
+        # started lazily to run in the workers and not in the master process
+        if self._is_running():
+            return
+        from gevent import monkey
+
+        if monkey.is_module_patched('socket'):
+            self._worker = gevent.spawn(self._run)
+        else:
+            # the thread waits on a threading.Event, a gevent one can't be set from another thread
+            self._refresh_requested = threading.Event()
+            self._stop_event = threading.Event()
+            self._worker = threading.Thread(
+                target=self._run, args=(self._stop_event,), name='authentication_snapshot'
+            )
+            self._worker.daemon = True
+            self._worker.start()
+
+    def stop(self):
+        if isinstance(self._worker, threading.Thread):
+            # a thread can't be killed, it is woken up to stop
+            self._stop_event.set()
+            self._refresh_requested.set()
+        elif self._worker is not None:
+            self._worker.kill(block=False)
+        self._worker = None
+
+    def request_refresh(self):
+        self._refresh_requested.set()
+
+    def refresh(self):
+        start = time.time()
+        try:
+            snapshot = self.load(self._version + 1)
+        except Exception as e:
+            self.nb_errors += 1
+            logging.getLogger(__name__).warning('impossible to load the authentication snapshot: {}'.format(e))
+            return False
+        self._version = snapshot.version
+        self._snapshot = snapshot
+        self.nb_refreshes += 1
+        logging.getLogger(__name__).debug('{} loaded in {:.3f}s'.format(snapshot, time.time() - start))
+        return True
+
+    def _run(self, stop_event=None):
+        while stop_event is None or not stop_event.is_set():
+            self._refresh_requested.clear()
+            self.refresh()
+            self._refresh_requested.wait(timeout=self.refresh_interval)
+
+    def get(self):
+        """
+        the current snapshot, None if there is none fresh enough
+        """
+        self.start()
+        snapshot = self._snapshot
+        if snapshot is None or time.time() - snapshot.created_at > self.max_staleness:
+            return None
+        return snapshot
+
+    def status(self):
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version if snapshot else None,
+            'age': int(time.time() - snapshot.created_at) if snapshot else None,
+            'refresh_interval': self.refresh_interval,
+            'nb_refreshes': self.nb_refreshes,
+            'nb_errors': self.nb_errors,
+        }
+
+
+def _make_authentication_snapshot():
+    config = app.config.get(str('AUTHENTICATION_SNAPSHOT'), {})
+    if not config.get('enabled', False):
+        return None
+    if app.config.get(str('PUBLIC'), False) or app.config.get(str('DISABLE_DATABASE'), False):
+        # no authentication or no database to load the snapshot from
+        return None
+    refresh_interval = config.get('refresh_interval', 60)
+    snapshot = AuthenticationSnapshot(
+        refresh_interval=refresh_interval, max_staleness=config.get('max_staleness', 10 * refresh_interval)
+    )
+    # the changes published by tyr are taken into account without waiting for the next refresh
+    two_tier_cache.subscribe(AUTHENTICATION, snapshot.request_refresh)
+    return snapshot
+
+
+# None if the snapshot is disabled, the authentication is then done with the database
+authentication_snapshot = _make_authentication_snapshot()
@@ -74,6 +74,12 @@ class AbstractAutocomplete(six.with_metaclass(ABCMeta, object)):
     def geo_status(self, instance):
         pass
 
+    def cache_name(self):
+        """
+        name of the autocomplete in the keys of the autocomplete cache
+        """
+        return self.__class__.__name__
+
     def record_status(self, status, exc=None):
         data = {'type': self.__class__.__name__, 'status': status}
         if exc is not None:
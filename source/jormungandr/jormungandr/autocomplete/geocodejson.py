@@ -38,10 +38,11 @@ from jormungandr.autocomplete.abstract_autocomplete import (
     AutocompleteUnavailable,
     AutocompleteError,
 )
+from jormungandr.autocomplete.result_cache import cached_places
 from jormungandr.utils import get_lon_lat as get_lon_lat_from_id, get_house_number
 import requests
 import pybreaker
-from jormungandr import app
+from jormungandr import app, http_pool
 from jormungandr.exceptions import UnknownObject
 
 
@@ -185,11 +186,10 @@ class GeocodeJson(AbstractAutocomplete):
             fail_max=app.config['CIRCUIT_BREAKER_MAX_BRAGI_FAIL'],
             reset_timeout=app.config['CIRCUIT_BREAKER_BRAGI_TIMEOUT_S'],
         )
-        # create a session to allow connection pooling via keep alive
-        if kwargs.get('disable_keepalive', False):
-            self.session = requests
-        else:
-            self.session = requests.Session()
+        # a session allows connection pooling via keep alive
+        self.session = http_pool.get_session(
+            'autocomplete:{}'.format(self.host), disable_keepalive=kwargs.get('disable_keepalive', False)
+        )
 
     def call_bragi(self, url, method, **kwargs):
         try:
@@ -309,6 +309,7 @@ class GeocodeJson(AbstractAutocomplete):
 
         return params
 
+    @cached_places
     def get(self, request, instances):
         params = self.make_params(request, instances, self.timeout)
 
@@ -329,6 +330,9 @@ class GeocodeJson(AbstractAutocomplete):
     def geo_status(self, instance):
         raise NotImplementedError
 
+    def cache_name(self):
+        return '{}:{}'.format(self.__class__.__name__, self.host)
+
     @staticmethod
     def get_coords(param):
         """
@@ -30,6 +30,7 @@
 # www.navitia.io
 from __future__ import absolute_import, print_function, unicode_literals, division
 from jormungandr.autocomplete.abstract_autocomplete import AbstractAutocomplete, GeoStatusResponse
+from jormungandr.autocomplete.result_cache import cached_places
 from jormungandr.exceptions import InvalidArguments
 from jormungandr.interfaces.v1.decorators import get_serializer
 from jormungandr.interfaces.v1.serializer import api
@@ -41,6 +42,7 @@ from jormungandr.utils import date_to_timestamp
 
 
 class Kraken(AbstractAutocomplete):
+    @cached_places
     @get_serializer(serpy=api.PlacesSerializer)
     def get(self, request, instances):
         if len(instances) != 1:
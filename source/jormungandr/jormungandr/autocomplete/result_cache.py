@@ -0,0 +1,253 @@
+# coding=utf-8
+
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import OrderedDict
+from copy import deepcopy
+import flask
+import functools
+import json
+import re
+import six
+import time
+import unicodedata
+
+from jormungandr import app, new_relic
+
+
+def normalize(text):
+    """
+    >>> normalize('  Gare  de  Léon ') == 'gare de leon'
+    True
+    """
+    text = unicodedata.normalize('NFKD', six.text_type(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.lower().split())
+
+
+def _words(text):
+    return [w for w in re.split(r'\W+', normalize(text), flags=re.UNICODE) if w]
+
+
+def matches(query, name):
+    """
+    all the words of the query have to be the beginning of a word of the name
+
+    >>> matches('gare d', 'Gare de Lyon (Paris)')
+    True
+    >>> matches('gare de m', 'Gare de Lyon (Paris)')
+    False
+    """
+    words = _words(name)
+    return all(any(w.startswith(q) for w in words) for q in _words(query))
+
+
+class _Entry(object):
+    __slots__ = ('response', 'complete', 'created_at')
+
+    def __init__(self, response, complete, created_at):
+        self.response = response
+        # all the places matching the query are in the response (there were less than 'count')
+        self.complete = complete
+        self.created_at = created_at
+
+
+class AutocompleteCache(object):
+    """
+    Cache of the responses of the autocomplete services (the type-ahead of /places sends one call per keystroke)
+
+    The key is made of the autocomplete, the instances (with their publication date so the entries
+    of an instance are invalidated when its data are reloaded), the normalized query, the types, the count,
+    the other parameters changing the response and the 'from' coordinate rounded to a grid of 'grid_size'
+    degrees.
+
+    When there isn't an entry for a query but there is one for a shorter prefix of it and this one is complete
+    (less places than 'count'), the response is built by filtering the places of the prefix.
+
+    The entries are evicted in LRU order when there is more than 'max_size' entries and after 'ttl' seconds.
+    """
+
+    def __init__(self, max_size=10000, ttl=30, grid_size=0.01, prefix_reuse=True, min_prefix_length=3):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.grid_size = grid_size
+        self.prefix_reuse = prefix_reuse
+        self.min_prefix_length = min_prefix_length
+        self._entries = OrderedDict()
+        self.nb_hits = 0
+        self.nb_prefix_hits = 0
+        self.nb_misses = 0
+
+    def _from_cell(self, from_):
+        if not from_:
+            return None
+        try:
+            lon, lat = (float(c) for c in from_.split(';'))
+        except ValueError:
+            return from_
+        return int(round(lon / self.grid_size)), int(round(lat / self.grid_size))
+
+    def make_key(self, name, request, instances):
+        """
+        key of everything but the query, the query is added by get and set to look for its prefixes
+        """
+        disable_geojson = flask.g.get('disable_geojson', False) if flask.has_app_context() else False
+        shape = request.get('shape')
+        return (
+            name,
+            tuple(sorted((i.name, getattr(i, 'publication_date', None)) for i in instances or [])),
+            tuple(sorted(set(request.get('type[]') or []))),
+            tuple(sorted(set(request.get('admin_uri[]') or []))),
+            self._from_cell(request.get('from')),
+            request.get('count'),
+            request.get('depth'),
+            request.get('search_type'),
+            request.get('_main_stop_area_weight_factor'),
+            json.dumps(shape, sort_keys=True) if shape else None,
+            disable_geojson,
+        )
+
+    def _get_entry(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now - entry.created_at > self.ttl:
+            del self._entries[key]
+            return None
+        # move the entry at the end of the LRU
+        self._entries[key] = self._entries.pop(key)
+        return entry
+
+    def _from_prefix(self, key, query, now):
+        for size in range(len(query) - 1, self.min_prefix_length - 1, -1):
+            entry = self._get_entry((key, query[:size]), now)
+            if entry is None or not entry.complete:
+                continue
+            places = [p for p in entry.response.get('places', []) if matches(query, p.get('name', ''))]
+            if not places:
+                # the service may find something else (with typos for example)
+                return None
+            return dict(entry.response, places=places)
+        return None
+
+    def get(self, key, query):
+        """
+        return a copy of the cached response of the query, None if it isn't cached
+        """
+        now = time.time()
+        query = normalize(query)
+        entry = self._get_entry((key, query), now)
+        if entry is not None:
+            self.nb_hits += 1
+            new_relic.record_custom_parameter('autocomplete_cache', 'hit')
+            return deepcopy(entry.response)
+
+        response = self._from_prefix(key, query, now) if self.prefix_reuse else None
+        if response is not None:
+            self.nb_prefix_hits += 1
+            new_relic.record_custom_parameter('autocomplete_cache', 'prefix_hit')
+            # a subset of a complete response is complete too
+            self._store((key, query), response, True)
+            return deepcopy(response)
+
+        self.nb_misses += 1
+        new_relic.record_custom_parameter('autocomplete_cache', 'miss')
+        return None
+
+    def _store(self, key, response, complete):
+        self._entries.pop(key, None)
+        self._entries[key] = _Entry(deepcopy(response), complete, time.time())
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def set(self, key, query, count, response):
+        if not isinstance(response, dict) or 'error' in response:
+            return
+        complete = count is not None and len(response.get('places', [])) < count
+        self._store((key, normalize(query)), response, complete)
+
+    def clear(self):
+        self._entries.clear()
+
+    def status(self):
+        nb_calls = self.nb_hits + self.nb_prefix_hits + self.nb_misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'nb_hits': self.nb_hits,
+            'nb_prefix_hits': self.nb_prefix_hits,
+            'nb_misses': self.nb_misses,
+            'hit_ratio': float(self.nb_hits + self.nb_prefix_hits) / nb_calls if nb_calls else None,
+        }
+
+
+def _make_autocomplete_cache():
+    config = app.config.get(str('AUTOCOMPLETE_CACHE'), {})
+    if not config.get('enabled', False):
+        return None
+    return AutocompleteCache(
+        max_size=config.get('max_size', 10000),
+        ttl=config.get('ttl', 30),
+        grid_size=config.get('grid_size', 0.01),
+        prefix_reuse=config.get('prefix_reuse', True),
+        min_prefix_length=config.get('min_prefix_length', 3),
+    )
+
+
+# responses of the autocomplete services shared between requests, None if deactivated
+autocomplete_cache = _make_autocomplete_cache()
+
+
+def cached_places(f):
+    """
+    cache the responses of the 'get' of an autocomplete
+    """
+
+    @functools.wraps(f)
+    def wrapper(autocomplete, request, instances):
+        if autocomplete_cache is None:
+            return f(autocomplete, request, instances)
+        key = autocomplete_cache.make_key(autocomplete.cache_name(), request, instances)
+        response = autocomplete_cache.get(key, request['q'])
+        if response is not None:
+            if 'context' in response:
+                # the context (current datetime, timezone) is the one of the request
+                from jormungandr.interfaces.v1.serializer.api import ContextSerializer
+
+                response['context'] = ContextSerializer(None, display_none=False).data
+            return response
+        response = f(autocomplete, request, instances)
+        autocomplete_cache.set(key, request['q'], request.get('count'), response)
+        return response
+
+    return wrapper
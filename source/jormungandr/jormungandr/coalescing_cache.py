@@ -0,0 +1,267 @@
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from flask_caching import Cache
+from werkzeug.contrib.cache import NullCache, RedisCache
+from gevent.event import AsyncResult
+import copy
+import flask
+import functools
+import gevent
+import logging
+import time
+import uuid
+
+# release a redis lock only if it's still ours
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+# result of a flight whose leader has been killed
+_no_result = object()
+
+
+class _StampedValue(object):
+    """
+    value stored with the time after which it is stale (used only with stale_while_revalidate)
+    """
+
+    def __init__(self, value, fresh_until):
+        self.value = value
+        self.fresh_until = fresh_until
+
+
+class CoalescingCache(Cache):
+    """
+    Cache whose memoized functions are 'single flight'
+
+    When a key is missing, only one greenlet calls the function, the other callers of the same key wait for
+    it and get a copy of its result (even None, so a failing service isn't called again by each of them),
+    if the call fails they get the same error.
+    With a redis backend, the callers of the other workers are coalesced too thanks to a lock in redis.
+
+    With stale_while_revalidate (in seconds), a value is kept this long after its expiration and
+    the callers get it while one greenlet refreshes it in background.
+
+    The options are read in the configuration of the cache:
+        * CACHE_SINGLE_FLIGHT: activate the coalescing (default False), useless with the null cache
+        * CACHE_SINGLE_FLIGHT_TIMEOUT: max time (in s) a caller waits for the one computing its value
+        * CACHE_REDIS_LOCK: use a redis lock between the workers when the backend is redis (default False)
+        * CACHE_STALE_WHILE_REVALIDATE: time (in s) during which a stale value can be returned (default 0)
+
+    memoize is the one of Flask-Caching 1.4.0 (pinned in requirements.txt), it uses its private helpers.
+    """
+
+    def __init__(self, app=None, with_jinja2_ext=True, config=None):
+        options = config or {}
+        self.single_flight = options.get('CACHE_SINGLE_FLIGHT', False)
+        self.single_flight_timeout = options.get('CACHE_SINGLE_FLIGHT_TIMEOUT', 10)
+        self.redis_lock = options.get('CACHE_REDIS_LOCK', False)
+        self.stale_while_revalidate = options.get('CACHE_STALE_WHILE_REVALIDATE', 0)
+        self._flights = {}
+        super(CoalescingCache, self).__init__(app, with_jinja2_ext, config)
+
+    def memoize(self, timeout=None, make_name=None, unless=None, forced_update=None):
+        if not self.single_flight and not self.stale_while_revalidate:
+            return super(CoalescingCache, self).memoize(timeout, make_name, unless, forced_update)
+
+        def memoize(f):
+            @functools.wraps(f)
+            def decorated_function(*args, **kwargs):
+                if self._bypass_cache(unless, f, *args, **kwargs) or isinstance(self.cache, NullCache):
+                    return f(*args, **kwargs)
+
+                try:
+                    cache_key = decorated_function.make_cache_key(f, *args, **kwargs)
+                    if callable(forced_update) and forced_update() is True:
+                        rv = None
+                    else:
+                        rv = self.cache.get(cache_key)
+                except Exception:
+                    if self.app.debug:
+                        raise
+                    logging.getLogger(__name__).exception('Exception possibly due to cache backend.')
+                    return f(*args, **kwargs)
+
+                def compute():
+                    return self._compute(cache_key, decorated_function.cache_timeout, f, args, kwargs)
+
+                if rv is None:
+                    return self._single_flight(cache_key, compute)
+
+                if not isinstance(rv, _StampedValue):
+                    return rv
+
+                if rv.fresh_until < time.time() and cache_key not in self._flights:
+                    self._revalidate(cache_key, compute)
+                return rv.value
+
+            decorated_function.uncached = f
+            decorated_function.cache_timeout = timeout
+            decorated_function.make_cache_key = self._memoize_make_cache_key(
+                make_name=make_name, timeout=decorated_function, forced_update=forced_update
+            )
+            decorated_function.delete_memoized = lambda: self.delete_memoized(f)
+
+            return decorated_function
+
+        return memoize
+
+    def _get(self, cache_key):
+        rv = self.cache.get(cache_key)
+        return rv.value if isinstance(rv, _StampedValue) else rv
+
+    def _set(self, cache_key, value, timeout):
+        if self.stale_while_revalidate:
+            if timeout is None:
+                timeout = self.cache.default_timeout
+            # a timeout of 0 means that the value never expires
+            fresh_until = time.time() + timeout if timeout else float('inf')
+            value = _StampedValue(value, fresh_until)
+            timeout = timeout + self.stale_while_revalidate if timeout else timeout
+        try:
+            self.cache.set(cache_key, value, timeout=timeout)
+        except Exception:
+            if self.app.debug:
+                raise
+            logging.getLogger(__name__).exception('Exception possibly due to cache backend.')
+
+    def _single_flight(self, cache_key, compute):
+        flight = self._flights.get(cache_key)
+        if flight is not None:
+            # someone is already computing this value, we wait for his result
+            try:
+                rv = flight.get(timeout=self.single_flight_timeout)
+            except gevent.Timeout:
+                return compute()
+            if rv is _no_result:
+                return compute()
+            # like the values read from the cache, the waiters don't share the object of the leader
+            return copy.deepcopy(rv)
+
+        flight = AsyncResult()
+        self._flights[cache_key] = flight
+        try:
+            rv = compute()
+        except Exception as e:
+            # the waiters get the same error instead of calling the service again
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set(rv)
+            return rv
+        finally:
+            del self._flights[cache_key]
+            if not flight.ready():
+                # the leader has been killed, the waiters compute the value themselves
+                flight.set(_no_result)
+
+    def _revalidate(self, cache_key, compute):
+        """
+        refresh a stale value in background, with the request context if there is one
+        """
+        reqctx = flask._request_ctx_stack.top
+        reqctx = reqctx.copy() if reqctx is not None else None
+
+        def worker():
+            try:
+                if reqctx is None:
+                    self._single_flight(cache_key, compute)
+                    return
+                with reqctx:
+                    self._single_flight(cache_key, compute)
+            except Exception:
+                logging.getLogger(__name__).exception('impossible to refresh a stale value of the cache')
+
+        gevent.spawn(worker)
+
+    def _compute(self, cache_key, timeout, f, args, kwargs):
+        lock = self._acquire_redis_lock(cache_key)
+        if lock is False:
+            # another worker is computing this value
+            rv = self._wait_redis_lock(cache_key)
+            if rv is not None:
+                return rv
+        try:
+            value = f(*args, **kwargs)
+            self._set(cache_key, value, timeout)
+            return value
+        finally:
+            if lock:
+                self._release_redis_lock(cache_key, lock)
+
+    def _lock_key(self, cache_key):
+        return '{}single_flight_lock:{}'.format(self.cache.key_prefix, cache_key)
+
+    def _acquire_redis_lock(self, cache_key):
+        """
+        returns the token of the lock if we got it, False if someone else has it
+        and None if there is no lock (not a redis backend or redis not available)
+        """
+        if not self.redis_lock or not isinstance(self.cache, RedisCache):
+            return None
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.cache._client.set(
+                self._lock_key(cache_key), token, nx=True, px=int(self.single_flight_timeout * 1000)
+            )
+        except Exception as e:
+            logging.getLogger(__name__).warning('impossible to get a single flight lock in redis: {}'.format(e))
+            return None
+        return token if acquired else False
+
+    def _wait_redis_lock(self, cache_key, poll_interval=0.05):
+        """
+        wait for the value computed by another worker, returns None if it isn't available in time
+        """
+        lock_key = self._lock_key(cache_key)
+        end = time.time() + self.single_flight_timeout
+        try:
+            while time.time() < end:
+                gevent.sleep(poll_interval)
+                rv = self._get(cache_key)
+                if rv is not None:
+                    return rv
+                if not self.cache._client.exists(lock_key):
+                    # the other worker failed, it's our turn
+                    return self._get(cache_key)
+        except Exception as e:
+            logging.getLogger(__name__).warning('error while waiting for a single flight lock: {}'.format(e))
+        return None
+
+    def _release_redis_lock(self, cache_key, token):
+        try:
+            self.cache._client.eval(_RELEASE_LOCK_SCRIPT, 1, self._lock_key(cache_key), token)
+        except Exception as e:
+            logging.getLogger(__name__).warning('impossible to release a single flight lock: {}'.format(e))
@@ -0,0 +1,271 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Adaptive limits of the number of concurrent calls made by a worker to each downstream service
+(kraken, street network backends, realtime proxies)
+
+The limit follows an AIMD (additive increase, multiplicative decrease) policy, like TCP congestion control:
+ - a successful call with a normal latency increases the limit by 1/limit (so by ~1 per 'round' of calls)
+ - a failure or a latency much higher than the usual one divides the limit by 2 (at most once per usual
+   latency or MIN_DECREASE_INTERVAL, so a burst of errors doesn't collapse the limit)
+
+The usual latency is tracked for each api of the service (a kraken answers a place_uri much faster than a
+journeys), the limit is shared by all of them.
+
+When the limit is reached, the calls wait for a slot and fail if none is released before their timeout.
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import deque
+from contextlib import contextmanager
+import logging
+import time
+
+from gevent.event import Event
+
+from jormungandr import app
+
+
+# min time (in s) between two decreases of a limit
+MIN_DECREASE_INTERVAL = 0.1
+
+
+class ConcurrencyLimitExceeded(RuntimeError):
+    pass
+
+
+class _Latency(object):
+    """
+    smoothed latency of the calls to an api and the lowest one observed (the latency of an idle service)
+    """
+
+    __slots__ = ('avg', 'base')
+
+    def __init__(self, latency):
+        self.avg = self.base = latency
+
+    def add(self, latency, smoothing):
+        self.avg += smoothing * (latency - self.avg)
+        if self.avg < self.base:
+            self.base = self.avg
+        else:
+            # the base latency slowly follows the service if it becomes durably slower
+            self.base += smoothing * smoothing * (self.avg - self.base)
+
+
+class AdaptiveLimiter(object):
+    def __init__(
+        self,
+        name,
+        initial_limit=8,
+        min_limit=1,
+        max_limit=64,
+        backoff_ratio=0.5,
+        latency_tolerance=2.0,
+        smoothing=0.1,
+        max_wait=1.0,
+    ):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._waiters = deque()
+        self._latencies = {}  # api -> _Latency
+        self._last_decrease = 0
+        self.nb_calls = 0
+        self.nb_rejected = 0
+        self.nb_decreases = 0
+
+    def available(self):
+        """
+        number of calls that can be made right now without waiting
+        """
+        return max(max(int(self.limit), self.min_limit) - self.in_flight, 0)
+
+    def _has_slot(self):
+        return self.in_flight < max(int(self.limit), self.min_limit)
+
+    def acquire(self, timeout):
+        """
+        wait for a slot, timeout in seconds, return False if no slot has been released in time
+        """
+        if self._has_slot() and not self._waiters:
+            self.in_flight += 1
+            return True
+
+        deadline = time.time() + timeout
+        waiter = Event()
+        self._waiters.append(waiter)
+        try:
+            while not self._has_slot():
+                remaining = deadline - time.time()
+                if remaining <= 0 or not waiter.wait(remaining):
+                    self.nb_rejected += 1
+                    return False
+                waiter.clear()
+            self.in_flight += 1
+            return True
+        finally:
+            self._waiters.remove(waiter)
+            self._wake_up()
+
+    def _wake_up(self):
+        if self._waiters and self._has_slot():
+            self._waiters[0].set()
+
+    def release(self, latency, success, api=None):
+        self.in_flight -= 1
+        self.nb_calls += 1
+        if success:
+            self._on_success(latency, api)
+        else:
+            self._decrease(self._latencies.get(api))
+        self._wake_up()
+
+    def _on_success(self, latency, api):
+        stats = self._latencies.get(api)
+        if stats is None:
+            stats = self._latencies[api] = _Latency(latency)
+        else:
+            stats.add(latency, self.smoothing)
+
+        if latency > stats.base * self.latency_tolerance:
+            self._decrease(stats)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _decrease(self, stats=None):
+        now = time.time()
+        if now - self._last_decrease < max(stats.base if stats else 0, MIN_DECREASE_INTERVAL):
+            return
+        self._last_decrease = now
+        self.nb_decreases += 1
+        self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+        logging.getLogger(__name__).debug('concurrency limit of %s decreased to %s', self.name, self.limit)
+
+    @contextmanager
+    def slot(self, timeout=None, api=None):
+        """
+        hold a slot during a call, the call is considered failed if an exception is raised
+        or if the 'failed' attribute of the yielded object is set
+
+        timeout in seconds, max_wait by default
+        api is the api of the service called, its latency is compared to the usual one of this api
+        """
+        if not self.acquire(self.max_wait if timeout is None else timeout):
+            raise ConcurrencyLimitExceeded('too many concurrent calls to {}'.format(self.name))
+        call = _Call()
+        start = time.time()
+        try:
+            yield call
+        except BaseException:
+            call.failed = True
+            raise
+        finally:
+            self.release(time.time() - start, success=not call.failed, api=api)
+
+    def status(self):
+        def to_ms(duration):
+            return None if duration is None else int(duration * 1000)
+
+        return {
+            'name': self.name,
+            'limit': int(self.limit),
+            'in_flight': self.in_flight,
+            'waiting': len(self._waiters),
+            'nb_calls': self.nb_calls,
+            'nb_rejected': self.nb_rejected,
+            'nb_decreases': self.nb_decreases,
+            'latencies': [
+                {'api': api, 'avg_latency_ms': to_ms(stats.avg), 'base_latency_ms': to_ms(stats.base)}
+                for api, stats in sorted(self._latencies.items(), key=lambda item: item[0] or '')
+            ],
+        }
+
+
+class _Call(object):
+    __slots__ = ('failed',)
+
+    def __init__(self):
+        self.failed = False
+
+
+class _NoLimit(object):
+    @contextmanager
+    def slot(self, timeout=None, api=None):
+        yield _Call()
+
+
+_no_limit = _NoLimit()
+_limiters = {}
+
+
+def get_limiter(downstream_type, downstream_id):
+    """
+    return the limiter shared by all the calls of the worker to a downstream service
+
+    the limiters are configured in ADAPTIVE_CONCURRENCY, the default parameters can be overridden
+    for a type of downstream ('kraken', 'streetnetwork', 'realtime') in ADAPTIVE_CONCURRENCY[downstream_type]
+    """
+    config = app.config.get(str('ADAPTIVE_CONCURRENCY'), {})
+    if not config.get('enabled', False):
+        return _no_limit
+    name = '{}:{}'.format(downstream_type, downstream_id)
+    limiter = _limiters.get(name)
+    if limiter is None:
+        params = {k: v for k, v in config.items() if k not in ('enabled', 'kraken', 'streetnetwork', 'realtime')}
+        params.update(config.get(downstream_type, {}))
+        limiter = AdaptiveLimiter(name, **params)
+        _limiters[name] = limiter
+    return limiter
+
+
+def status():
+    return [limiter.status() for _, limiter in sorted(_limiters.items())]
+
+
+def get_pool_size(downstream_type, downstream_id, default, min_size=1):
+    """
+    size of the pool of greenlets of a request calling a downstream service
+
+    without adaptive limits it's the fixed 'default', else the request can use all the free slots of the
+    service (at least min_size): the pool is larger when the service is idle and smaller when it's saturated
+    """
+    config = app.config.get(str('ADAPTIVE_CONCURRENCY'), {})
+    if not config.get('enabled', False):
+        return default
+    return max(min_size, get_limiter(downstream_type, downstream_id).available())
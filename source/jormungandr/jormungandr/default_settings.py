@@ -69,6 +69,10 @@ LOGGER = {
 # Bike self-service configuration
 # This should be moved in a central configuration system like ectd, consul, etc...
 BSS_PROVIDER = []
+# period (in s) of the background refresh of all the stations of each bss provider,
+# 0 to call the provider (with a cache) when a station is requested.
+# It can be overridden per provider with the 'prefetch_interval' argument
+BSS_PREFETCH_INTERVAL = int(os.getenv('JORMUNGANDR_BSS_PREFETCH_INTERVAL', 0))
 # Car parking places availability service
 CAR_PARK_PROVIDER = []
 # Equipment details service configuration
@@ -95,7 +99,25 @@ STAT_CIRCUIT_BREAKER_MAX_FAIL = int(os.getenv('JORMUNGANDR_STAT_CIRCUIT_BREAKER_
 # the circuit breaker retries after this timeout (in seconds)
 STAT_CIRCUIT_BREAKER_TIMEOUT_S = int(os.getenv('JORMUNGANDR_STAT_CIRCUIT_BREAKER_TIMEOUT_S', 60))
 
+# the stats are put in a queue of at most 'max_size' stats and published in background by batches
+# of 'batch_size' stats (or after 'flush_interval' seconds), the stats are dropped when the queue is full
+STAT_QUEUE = json.loads(os.getenv('JORMUNGANDR_STAT_QUEUE', '{}')) or {
+    'enabled': False,
+    'max_size': 10000,
+    'batch_size': 100,
+    'flush_interval': 0.5,
+}
+# part of the requests (between 0 and 1) of an endpoint, like {"v1.journeys": 0.1}, whose journeys and
+# sections are stored in the stats, the other endpoints use STAT_JOURNEYS_DEFAULT_SAMPLING
+STAT_JOURNEYS_SAMPLING = json.loads(os.getenv('JORMUNGANDR_STAT_JOURNEYS_SAMPLING', '{}')) or {}
+STAT_JOURNEYS_DEFAULT_SAMPLING = float(os.getenv('JORMUNGANDR_STAT_JOURNEYS_DEFAULT_SAMPLING', 1))
+# path of a file where the stats are written instead of being sent to rabbitmq (for the tests)
+STAT_FILE_SINK = os.getenv('JORMUNGANDR_STAT_FILE_SINK', None)
+
 # Cache configuration, see https://pythonhosted.org/Flask-Caching/ for more information
+# the concurrent calls of a memoized function can be coalesced (off by default), see CoalescingCache for
+# the options
+# (CACHE_SINGLE_FLIGHT, CACHE_SINGLE_FLIGHT_TIMEOUT, CACHE_REDIS_LOCK, CACHE_STALE_WHILE_REVALIDATE)
 default_cache = {
     'CACHE_TYPE': 'null',  # by default cache is not activated
     'TIMEOUT_PTOBJECTS': 600,
@@ -118,6 +140,58 @@ MEMORY_CACHE_CONFIGURATION = (
     json.loads(os.getenv('JORMUNGANDR_MEMORY_CACHE_CONFIGURATION', '{}')) or default_memory_cache
 )
 
+# invalidation of the local tier of the two tier cache (see TwoTierCache) through a redis channel,
+# the invalidations are published by tyr when users, keys or instances are updated.
+# With it the local timeouts (MEMORY_CACHE_CONFIGURATION) can be raised
+CACHE_INVALIDATION = json.loads(os.getenv('JORMUNGANDR_CACHE_INVALIDATION', '{}')) or {
+    'enabled': False,
+    'redis_host': 'localhost',
+    'redis_port': 6379,
+    'redis_db': 0,
+    'redis_password': None,
+    'channel': 'navitia.cache_invalidation',
+}
+
+# In-process snapshot of the keys, users and authorizations of the tyr database (see AuthenticationSnapshot)
+# reloaded every 'refresh_interval' seconds, it isn't used anymore if it can't be reloaded for 'max_staleness'
+# seconds. Ignored in PUBLIC mode or without database
+AUTHENTICATION_SNAPSHOT = json.loads(os.getenv('JORMUNGANDR_AUTHENTICATION_SNAPSHOT', '{}')) or {
+    'enabled': False,
+    'refresh_interval': 60,
+    'max_staleness': 600,
+}
+
+# Sliding window rate limit of the requests by token, a limit is like {"requests": 100, "seconds": 60}
+# the limit of a token is the one in 'tokens', else the one of its billing plan (by name) in 'billing_plans',
+# else 'default' (null for no limit). Beyond it, the requests are rejected with a 429 and a Retry-After.
+# The counters are local to each worker, with 'redis' they are shared every 'sync_interval' seconds
+RATE_LIMIT = json.loads(os.getenv('JORMUNGANDR_RATE_LIMIT', '{}')) or {
+    'enabled': False,
+    'default': None,
+    'billing_plans': {},
+    'tokens': {},
+    'sync_interval': 0.5,
+    'redis': {
+        'enabled': False,
+        'redis_host': 'localhost',
+        'redis_port': 6379,
+        'redis_db': 0,
+        'redis_password': None,
+        'prefix': 'navitia.rate_limit',
+    },
+}
+
+# Cache of the street network matrices used to compute the fallback durations, shared between requests
+# the origin of a matrix is rounded to a grid of 'grid_size' degrees
+# with 'use_shared_cache', the matrices are also stored in the cache defined by CACHE_CONFIGURATION
+FALLBACK_DURATIONS_CACHE = json.loads(os.getenv('JORMUNGANDR_FALLBACK_DURATIONS_CACHE', '{}')) or {
+    'enabled': False,
+    'max_size': 1000,
+    'ttl': 60,
+    'grid_size': 0.001,
+    'use_shared_cache': False,
+}
+
 # List of enabled modules
 MODULES = {
     'v1': {  # API v1 of Navitia
@@ -126,6 +200,18 @@ MODULES = {
     }
 }
 
+# Cache of the responses of the autocomplete services (see AutocompleteCache)
+# the 'from' coordinate is rounded to a grid of 'grid_size' degrees, with 'prefix_reuse' the queries
+# of at least 'min_prefix_length' characters whose response is complete are used for the longer queries
+AUTOCOMPLETE_CACHE = json.loads(os.getenv('JORMUNGANDR_AUTOCOMPLETE_CACHE', '{}')) or {
+    'enabled': False,
+    'max_size': 10000,
+    'ttl': 30,
+    'grid_size': 0.01,
+    'prefix_reuse': True,
+    'min_prefix_length': 3,
+}
+
 # This should be moved in a central configuration system like ectd, consul, etc...
 AUTOCOMPLETE_SYSTEMS = json.loads(os.getenv('JORMUNGANDR_AUTOCOMPLETE_SYSTEMS', '{}')) or None
 
@@ -187,6 +273,48 @@ PATCH_WITH_GEVENT_SOCKET = bool(os.getenv('JORMUNGANDR_PATCH_WITH_GEVENT_SOCKET'
 
 GREENLET_POOL_SIZE = int(os.getenv('JORMUNGANDR_GEVENT_POOL_SIZE', 10))
 
+# log the queue, wall and wait times of each future of the distributed scenario
+# (they are also available in the debug of the journeys and in /v1/_futures_timings)
+LOG_FUTURES_TIMINGS = boolean(os.getenv('JORMUNGANDR_LOG_FUTURES_TIMINGS', False))
+
+# adaptive limit (AIMD) of the concurrent calls of a worker to each kraken, street network backend and
+# realtime proxy. The parameters can be overridden by type of downstream, ex: {"kraken": {"max_limit": 16}}
+# max_wait is the max time (in s) a call waits for a slot (kraken calls wait at most their timeout)
+ADAPTIVE_CONCURRENCY = json.loads(os.getenv('JORMUNGANDR_ADAPTIVE_CONCURRENCY', '{}')) or {
+    'enabled': False,
+    'initial_limit': 8,
+    'min_limit': 1,
+    'max_limit': 64,
+    'backoff_ratio': 0.5,
+    'latency_tolerance': 2.0,
+    'max_wait': 1.0,
+}
+
+# max time (in s) spent by a request waiting for the realtime proxies of departures and stop_schedules,
+# the route points not answered in time keep their base schedule. 0 means no limit
+REALTIME_PROXY_TIME_BUDGET = float(os.getenv('JORMUNGANDR_REALTIME_PROXY_TIME_BUDGET', 0))
+
+# pools of http connections of the connectors to the external services (see http_pool.py)
+HTTP_POOLS = json.loads(os.getenv('JORMUNGANDR_HTTP_POOLS', '{}')) or {
+    'enabled': True,
+    'pool_connections': 10,
+    'pool_maxsize': 10,
+    'pool_block': False,
+    'connectors': {},
+    'hosts': {},
+}
+
+# the availabilities of the bss stations and car parks of a response are fetched in parallel:
+# at most PARKING_PLACES_POOL_SIZE calls at the same time, during at most PARKING_PLACES_TIME_BUDGET
+# seconds (0 means no limit), the pois not answered in time are left without availability
+PARKING_PLACES_POOL_SIZE = int(os.getenv('JORMUNGANDR_PARKING_PLACES_POOL_SIZE', 10))
+PARKING_PLACES_TIME_BUDGET = float(os.getenv('JORMUNGANDR_PARKING_PLACES_TIME_BUDGET', 0))
+
+# the searches of a /places_batch call: at most PLACES_BATCH_MAX_SIZE per call,
+# with at most PLACES_BATCH_POOL_SIZE calls to the autocomplete service at the same time
+PLACES_BATCH_MAX_SIZE = int(os.getenv('JORMUNGANDR_PLACES_BATCH_MAX_SIZE', 100))
+PLACES_BATCH_POOL_SIZE = int(os.getenv('JORMUNGANDR_PLACES_BATCH_POOL_SIZE', 10))
+
 PARSER_MAX_COUNT = int(os.getenv('JORMUNGANDR_PARSER_MAX_COUNT', 1000))
 
 if boolean(os.getenv('JORMUNGANDR_DISABLE_SQLPOOLING', False)):
@@ -196,6 +324,30 @@ if boolean(os.getenv('JORMUNGANDR_DISABLE_SQLPOOLING', False)):
 
 MAX_JOURNEYS_CALLS = int(os.getenv('JORMUNGANDR_MAX_JOURNEYS_CALLS', 20))
 
+# engine used to choose the journeys to keep when there are more than max_nb_journeys
+# 'branch_and_bound' or 'combinatorial' (all combinations of journeys are materialized)
+CULLING_ENGINE = os.getenv('JORMUNGANDR_CULLING_ENGINE', 'branch_and_bound')
+
+# number of possible regions on which the journeys are computed in parallel when a request can be
+# answered by several coverages, the response of the region with the highest priority is kept
+# 1 means the regions are called one after the other
+JOURNEYS_PARALLEL_REGIONS = int(os.getenv('JORMUNGANDR_JOURNEYS_PARALLEL_REGIONS', 1))
+
+# write the json of the resources that support it directly from the serializers, in chunks,
+# instead of building the whole response as a dict first
+STREAMING_SERIALIZATION = boolean(os.getenv('JORMUNGANDR_STREAMING_SERIALIZATION', False))
+
 ZMQ_SOCKET_TTL_SECONDS = int(os.getenv('JORMUNGANDR_ZMQ_SOCKET_TTL_SECONDS', 10))
 ZMQ_SOCKET_REAPER_INTERVAL = int(os.getenv('JORMUNGANDR_ZMQ_SOCKET_REAPER_INTERVAL', 10))
 ZMQ_DEFAULT_SOCKET_TYPE = os.getenv('JORMUNGANDR_ZMQ_DEFAULT_SOCKET_TYPE', 'persistent')
+# max number of sockets opened to each kraken by a worker, 0 means unbounded
+# when all the sockets are used, calls wait for one to be released
+ZMQ_MAX_SOCKETS_PER_INSTANCE = int(os.getenv('JORMUNGANDR_ZMQ_MAX_SOCKETS_PER_INSTANCE', 0))
+
+# the coverages containing a coord are found with a grid of cells of REGION_INDEX_CELL_SIZE degrees,
+# the last REGION_INDEX_CACHE_SIZE cells used are kept in memory
+REGION_INDEX_CELL_SIZE = float(os.getenv('JORMUNGANDR_REGION_INDEX_CELL_SIZE', 0.01))
+REGION_INDEX_CACHE_SIZE = int(os.getenv('JORMUNGANDR_REGION_INDEX_CACHE_SIZE', 10000))
+
+# number of object ids for which we remember if a coverage has them or not (see InstanceManager._all_keys_of_id)
+OBJECT_ID_INDEX_SIZE_PER_COVERAGE = int(os.getenv('JORMUNGANDR_OBJECT_ID_INDEX_SIZE_PER_COVERAGE', 10000))
@@ -29,7 +29,7 @@
 
 from __future__ import absolute_import, print_function, unicode_literals, division
 
-from jormungandr import cache, app, new_relic
+from jormungandr import cache, app, new_relic, http_pool
 from navitiacommon import type_pb2
 from dateutil import parser
 from jormungandr.utils import date_to_timestamp
@@ -50,6 +50,7 @@ class SytralProvider(object):
         self.url = url
         self.timeout = timeout
         self.code_types = code_types
+        self.session = http_pool.get_session('equipments:sytral')
         self.breaker = pybreaker.CircuitBreaker(
             fail_max=kwargs.get('circuit_breaker_max_fail', app.config['CIRCUIT_BREAKER_MAX_SYTRAL_FAIL']),
             reset_timeout=kwargs.get(
@@ -84,7 +85,7 @@ class SytralProvider(object):
         logging.getLogger(__name__).debug('sytralRT RT service , call url : {}'.format(self.url))
         result = None
         try:
-            response = self.breaker.call(requests.get, url=self.url, timeout=self.timeout)
+            response = self.breaker.call(self.session.get, url=self.url, timeout=self.timeout)
             result = response.json()
             self.record_call("OK")
         except pybreaker.CircuitBreakerError as e:
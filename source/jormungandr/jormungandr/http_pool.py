@@ -0,0 +1,132 @@
+#  Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Shared http sessions of the connectors to the external services
+
+Each connector gets a requests.Session, so the connections to its service are kept alive and reused
+instead of paying the tcp (and tls) setup at each call. The sockets are the gevent ones when jormungandr
+patches them (PATCH_WITH_GEVENT_SOCKET).
+
+The pools are configured with HTTP_POOLS:
+    * enabled: if false the connectors use 'requests' directly, without keep alive
+    * pool_connections: number of hosts whose connections are kept by a connector
+    * pool_maxsize: number of connections kept by host
+    * pool_block: wait for a free connection instead of opening a new one when the pool is full
+    * connectors: parameters of a connector (by name) overriding the default ones
+    * hosts: parameters for the urls starting with a prefix, like {"http://valhalla:8002": {"pool_maxsize": 50}}
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from requests.adapters import HTTPAdapter
+from six.moves import http_cookiejar
+from jormungandr import app
+import requests
+import threading
+
+POOL_PARAMETERS = ('pool_connections', 'pool_maxsize', 'pool_block', 'max_retries')
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def _get_config():
+    return app.config.get(str('HTTP_POOLS')) or {}
+
+
+def _make_adapter(parameters):
+    return HTTPAdapter(**{k: v for k, v in parameters.items() if k in POOL_PARAMETERS})
+
+
+def _make_session(name, config):
+    session = requests.Session()
+    # the session is shared by all the calls of the connector, nothing should be kept between them
+    session.cookies.set_policy(http_cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+    parameters = {k: v for k, v in config.items() if k in POOL_PARAMETERS}
+    parameters.update(config.get('connectors', {}).get(name, {}))
+    adapter = _make_adapter(parameters)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # requests uses the adapter with the longest matching prefix
+    for prefix, host_parameters in config.get('hosts', {}).items():
+        session.mount(prefix, _make_adapter(dict(parameters, **host_parameters)))
+    return session
+
+
+def get_session(name, disable_keepalive=False):
+    """
+    the session of a connector, the same name always gives the same session
+
+    without keep alive the 'requests' module is returned, it has the same api as a session
+    """
+    config = _get_config()
+    if disable_keepalive or not config.get('enabled', True):
+        return requests
+    session = _sessions.get(name)
+    if session is None:
+        with _lock:
+            session = _sessions.get(name)
+            if session is None:
+                session = _sessions[name] = _make_session(name, config)
+    return session
+
+
+def _pools_status(adapter):
+    pools = adapter.poolmanager.pools
+    status = {'nb_hosts': 0, 'nb_connections': 0, 'idle_connections': 0, 'nb_requests': 0}
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        status['nb_hosts'] += 1
+        status['nb_connections'] += pool.num_connections
+        status['nb_requests'] += pool.num_requests
+        # the queue of the pool is filled with None for the connections not opened yet
+        status['idle_connections'] += len([c for c in list(pool.pool.queue) if c]) if pool.pool else 0
+    return status
+
+
+def status():
+    """
+    stats of the pools of each connector
+
+    nb_connections is the number of connections opened since the start, compared to nb_requests it shows
+    how much the connections are reused
+    """
+    result = []
+    for name, session in sorted(_sessions.items()):
+        connector = {'name': name, 'nb_hosts': 0, 'nb_connections': 0, 'idle_connections': 0, 'nb_requests': 0}
+        adapters = {id(a): a for a in session.adapters.values()}
+        for adapter in adapters.values():
+            for k, v in _pools_status(adapter).items():
+                connector[k] += v
+        connector['pool_maxsize'] = getattr(session.get_adapter('http://'), '_pool_maxsize', None)
+        result.append(connector)
+    return result
@@ -32,11 +32,11 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 
 try:
-    from typing import Dict, Text, Deque, List, Tuple
+    from typing import Dict, Text, List
 except ImportError:
     pass
-from contextlib import contextmanager
 from threading import Lock
+from contextlib import contextmanager
 from flask_restful import abort
 from zmq import green as zmq
 import copy
@@ -49,7 +49,8 @@ import logging
 from jormungandr.exceptions import DeadSocketException
 from navitiacommon import models
 from importlib import import_module
-from jormungandr import cache, memory_cache, app, global_autocomplete
+from jormungandr import two_tier_cache, app, global_autocomplete
+from jormungandr.two_tier_cache import INSTANCES
 from jormungandr import fallback_modes as fm
 from shapely import wkt, geometry
 from shapely.geos import ReadingError, PredicateError
@@ -61,10 +62,11 @@ from jormungandr.scenarios.ridesharing import ridesharing_service
 import itertools
 import six
 import time
-from collections import deque
 from datetime import datetime, timedelta
 from navitiacommon import default_values
 from jormungandr.equipments import EquipmentProviderManager
+from jormungandr.kraken_transport import KrakenTransport
+from jormungandr.concurrency_limiter import get_limiter, ConcurrencyLimitExceeded
 
 type_to_pttype = {
     "stop_area": request_pb2.PlaceCodeRequest.StopArea,  # type: ignore
@@ -128,9 +130,21 @@ def _make_property_getter(attr_name):
     return property(_getter)
 
 
+@contextmanager
+def _street_network_slot(service, api):
+    """
+    limit the number of concurrent calls to a street network backend
+    """
+    limiter = get_limiter('streetnetwork', getattr(service, 'sn_system_id', type(service).__name__))
+    try:
+        with limiter.slot(api=api) as call:
+            yield call
+    except ConcurrencyLimitExceeded as e:
+        raise TechnicalError(six.text_type(e))
+
+
 class Instance(object):
     name = None  # type: Text
-    _sockets = None  # type: Deque[Tuple[zmq.Socket, float]]
 
     def __init__(
         self,
@@ -145,7 +159,6 @@ class Instance(object):
         instance_equipment_providers,  # type: List[Text]
     ):
         self.geom = None
-        self._sockets = deque()
         self.socket_path = zmq_socket
         self._scenario = None
         self._scenario_name = None
@@ -187,6 +200,9 @@ class Instance(object):
             )
 
         self.zmq_socket_type = zmq_socket_type
+        self.transport = KrakenTransport(
+            context, zmq_socket, name, app.config.get(str('ZMQ_MAX_SOCKETS_PER_INSTANCE'), 0)
+        )
 
         if app.config[str('DISABLE_DATABASE')]:
             self.equipment_provider_manager = EquipmentProviderManager(
@@ -230,8 +246,11 @@ class Instance(object):
     def __repr__(self):
         return 'instance.{}'.format(self.name)
 
-    @memory_cache.memoize(app.config[str('MEMORY_CACHE_CONFIGURATION')].get(str('TIMEOUT_PARAMS'), 30))
-    @cache.memoize(app.config[str('CACHE_CONFIGURATION')].get(str('TIMEOUT_PARAMS'), 300))
+    @two_tier_cache.memoize(
+        app.config[str('MEMORY_CACHE_CONFIGURATION')].get(str('TIMEOUT_PARAMS'), 30),
+        app.config[str('CACHE_CONFIGURATION')].get(str('TIMEOUT_PARAMS'), 300),
+        namespace=INSTANCES,
+    )
     def _get_models(self):
         if app.config['DISABLE_DATABASE']:
             return None
@@ -521,34 +540,7 @@ class Instance(object):
         # type: (int) -> None
         if self.zmq_socket_type != 'transient':
             return
-        logger = logging.getLogger(__name__)
-        now = time.time()
-        while True:
-            try:
-                socket, t = self._sockets.popleft()
-                if now - t > ttl:
-                    logger.debug("closing one socket for %s", self.name)
-                    socket.setsockopt(zmq.LINGER, 0)
-                    socket.close()
-                else:
-                    self._sockets.appendleft((socket, t))
-                    break  # remaining socket are still in "keep alive" state
-            except IndexError:
-                break
-
-    @contextmanager
-    def socket(self, context):
-        socket = None
-        try:
-            socket, _ = self._sockets.pop()
-        except IndexError:  # there is no socket available: lets create one
-            socket = context.socket(zmq.REQ)
-            socket.connect(self.socket_path)
-        try:
-            yield socket
-        finally:
-            if not socket.closed:
-                self._sockets.append((socket, time.time()))
+        self.transport.reap(ttl)
 
     def send_and_receive(self, *args, **kwargs):
         """
@@ -565,27 +557,31 @@ class Instance(object):
         logger = logging.getLogger(__name__)
         deadline = datetime.utcnow() + timedelta(milliseconds=timeout)
         request.deadline = deadline.strftime('%Y%m%dT%H%M%S,%f')
-        with self.socket(self.context) as socket:
-            try:
-                request.request_id = flask.request.id
-            except RuntimeError:
-                # we aren't in a flask context, so there is no request
-
-                if 'flask_request_id' in kwargs:
-                    request.request_id = kwargs['flask_request_id']
-            socket.send(request.SerializeToString())
-            if socket.poll(timeout=timeout) > 0:
-                pb = socket.recv()
-                resp = response_pb2.Response()
-                resp.ParseFromString(pb)
-                self.update_property(resp)  # we update the timezone and geom of the instances at each request
-                return resp
-            else:
-                socket.setsockopt(zmq.LINGER, 0)
-                socket.close()
-                if not quiet:
-                    logger.error('request on %s failed: %s', self.socket_path, six.text_type(request))
-                raise DeadSocketException(self.name, self.socket_path)
+        try:
+            request.request_id = flask.request.id
+        except RuntimeError:
+            # we aren't in a flask context, so there is no request
+
+            if 'flask_request_id' in kwargs:
+                request.request_id = kwargs['flask_request_id']
+        start = time.time()
+        try:
+            with get_limiter('kraken', self.name).slot(
+                timeout / 1000.0, api=type_pb2.API.Name(request.requested_api)
+            ) as call:
+                remaining = max(timeout - (time.time() - start) * 1000, 0)
+                pb = self.transport.call(request, remaining)
+                call.failed = pb is None
+        except ConcurrencyLimitExceeded:
+            pb = None
+        if pb is None:
+            if not quiet:
+                logger.error('request on %s failed: %s', self.socket_path, six.text_type(request))
+            raise DeadSocketException(self.name, self.socket_path)
+        resp = response_pb2.Response()
+        resp.ParseFromString(pb)
+        self.update_property(resp)  # we update the timezone and geom of the instances at each request
+        return resp
 
     def get_id(self, id_):
         """
@@ -709,9 +705,10 @@ class Instance(object):
         service = self.get_street_network(mode, request)
         if not service:
             return None
-        return service.get_street_network_routing_matrix(
-            origins, destinations, mode, max_duration_to_pt, request, **kwargs
-        )
+        with _street_network_slot(service, 'matrix'):
+            return service.get_street_network_routing_matrix(
+                origins, destinations, mode, max_duration_to_pt, request, **kwargs
+            )
 
     def direct_path(
         self, mode, pt_object_origin, pt_object_destination, fallback_extremity, request, direct_path_type
@@ -722,9 +719,10 @@ class Instance(object):
         service = self.get_street_network(mode, request)
         if not service:
             return None
-        return service.direct_path_with_fp(
-            mode, pt_object_origin, pt_object_destination, fallback_extremity, request, direct_path_type
-        )
+        with _street_network_slot(service, 'direct_path'):
+            return service.direct_path_with_fp(
+                mode, pt_object_origin, pt_object_destination, fallback_extremity, request, direct_path_type
+            )
 
     def get_autocomplete(self, requested_autocomplete):
         if not requested_autocomplete:
@@ -32,7 +32,6 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from flask import json
 
-from shapely import geometry
 from zmq import green as zmq
 from navitiacommon import type_pb2, request_pb2
 import glob
@@ -41,6 +40,8 @@ from jormungandr.protobuf_to_dict import protobuf_to_dict
 from jormungandr.exceptions import ApiNotFound, RegionNotFound, DeadSocketException, InvalidArguments
 from jormungandr import authentication, cache, app
 from jormungandr.instance import Instance
+from jormungandr.region_index import RegionIndex
+from jormungandr.object_id_index import ObjectIdIndex
 import gevent
 import os
 
@@ -78,6 +79,16 @@ def choose_best_instance(instances):
     return best
 
 
+def _has_id(instance, object_id):
+    """
+    Does the instance has the id, None if we cannot know (the kraken is dead)
+    """
+    try:
+        return len(instance.get_id(object_id).places) > 0
+    except DeadSocketException:
+        return None
+
+
 class InstanceManager(object):
 
     """
@@ -96,6 +107,14 @@ class InstanceManager(object):
         self.context = zmq.Context()
         self.socket_ttl = app.config.get("ZMQ_SOCKET_TTL_SECONDS", 10)
         self.reaper_interval = app.config.get("ZMQ_SOCKET_REAPER_INTERVAL", 10)
+        self.region_index = RegionIndex(
+            cell_size=app.config.get(str('REGION_INDEX_CELL_SIZE'), 0.01),
+            cache_size=app.config.get(str('REGION_INDEX_CACHE_SIZE'), 10000),
+        )
+        self.object_id_index = ObjectIdIndex(
+            max_size_per_coverage=app.config.get(str('OBJECT_ID_INDEX_SIZE_PER_COVERAGE'), 10000),
+            ttl=app.config[str('CACHE_CONFIGURATION')].get(str('TIMEOUT_PTOBJECTS'), 600),
+        )
         self.init_socket_reaper()
 
     def __repr__(self):
@@ -288,9 +307,17 @@ class InstanceManager(object):
         instances = []
         futures = {}
         for name, instance in self.instances.items():
-            futures[name] = gevent.spawn(instance.has_id, object_id)
+            has_id = self.object_id_index.get(instance, object_id)
+            if has_id is None:
+                # we only ask the krakens for which we don't know yet if they have the id
+                futures[name] = gevent.spawn(_has_id, instance, object_id)
+            elif has_id:
+                instances.append(name)
         for name, future in futures.items():
-            if future.get():
+            has_id = future.get()
+            if has_id is not None:
+                self.object_id_index.set(self.instances[name], object_id, has_id)
+            if has_id:
                 instances.append(name)
 
         if not instances:
@@ -298,8 +325,9 @@ class InstanceManager(object):
         return instances
 
     def _all_keys_of_coord(self, lon, lat):
-        p = geometry.Point(lon, lat)
-        instances = [i.name for i in self.instances.values() if i.has_point(p)]
+        # the geometries are updated with the kraken metadata, the index is rebuilt if needed
+        self.region_index.refresh(self.instances)
+        instances = self.region_index.find(lon, lat)
         logging.getLogger(__name__).debug(
             "all_keys_of_coord(self, {}, {}) returns {}".format(lon, lat, instances)
         )
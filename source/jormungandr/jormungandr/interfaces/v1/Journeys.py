@@ -31,6 +31,9 @@
 
 from __future__ import absolute_import, print_function, unicode_literals, division
 import logging
+import time
+from copy import deepcopy
+import gevent
 from flask import request, g
 from flask_restful import abort
 from jormungandr import i_manager, app, fallback_modes
@@ -42,8 +45,9 @@ from jormungandr.interfaces.v1.make_links import create_external_link, create_in
 from jormungandr.interfaces.v1.errors import ManageError
 from collections import defaultdict
 from navitiacommon import response_pb2, type_pb2
-from jormungandr.utils import date_to_timestamp
+from jormungandr.utils import date_to_timestamp, copy_flask_request_context, copy_context_in_greenlet_stack
 from jormungandr.interfaces.v1.serializer import api
+from jormungandr.interfaces.v1.serializer.streaming import for_each
 from jormungandr.interfaces.v1.decorators import get_serializer
 from navitiacommon import default_values
 from jormungandr.interfaces.v1.journey_common import JourneyCommon, compute_possible_region
@@ -90,6 +94,12 @@ class add_debug_info(object):
             if hasattr(g, 'regions_called'):
                 get_debug()['regions_called'] = g.regions_called
 
+            if hasattr(g, 'duration_by_region'):
+                get_debug()['duration_by_region'] = g.duration_by_region
+
+            if hasattr(g, 'futures_timings'):
+                get_debug()['futures_timings'] = g.futures_timings
+
             return objects
 
         return wrapper
@@ -102,7 +112,8 @@ class add_journey_href(object):
             objects = f(*args, **kwargs)
             if objects[1] != 200 or 'journeys' not in objects[0]:
                 return objects
-            for journey in objects[0]['journeys']:
+
+            def add_href(_, journey):
                 args = dict(request.args)
                 allowed_ids = {
                     o['stop_point']['id']
@@ -150,6 +161,9 @@ class add_journey_href(object):
                         del args['_no_shared_section']
 
                     journey['links'] = [create_external_link('v1.journeys', **args)]
+
+            # the journeys are completed one by one when they are serialized
+            for_each(objects[0], add_href, keys=('journeys',))
             return objects
 
         return wrapper
@@ -174,9 +188,9 @@ class add_fare_links(object):
                     for s in t['links']:
                         ticket_by_section[s['id']].append(t['id'])
 
-            for j in objects[0]['journeys']:
+            def add_links(_, j):
                 if "sections" not in j:
-                    continue
+                    return
                 for s in j['sections']:
 
                     # them we add the link to the different tickets needed
@@ -194,6 +208,7 @@ class add_fare_links(object):
                                     create_internal_link(_type="ticket", rel="tickets", id=rs_ticket_needed)
                                 )
 
+            for_each(objects[0], add_links, keys=('journeys',))
             return objects
 
         return wrapper
@@ -217,9 +232,9 @@ class rig_journey(object):
             if not hasattr(g, 'origin_detail') or not hasattr(g, 'destination_detail'):
                 return objects
 
-            for j in response.get('journeys', []):
+            def rig(_, j):
                 if not 'sections' in j:
-                    continue
+                    return
                 logging.debug(
                     'for journey changing origin: {old_o} to {new_o}'
                     ', destination to {old_d} to {new_d}'.format(
@@ -234,6 +249,7 @@ class rig_journey(object):
                 if g.destination_detail:
                     j['sections'][-1]['to'] = g.destination_detail
 
+            for_each(response, rig, keys=('journeys',))
             return objects
 
         return wrapper
@@ -393,7 +409,7 @@ class Journeys(JourneyCommon):
     @add_fare_links()
     @add_journey_href()
     @rig_journey()
-    @get_serializer(serpy=api.JourneysSerializer)
+    @get_serializer(serpy=api.JourneysSerializer, streaming=True)
     @ManageError()
     def get(self, region=None, lon=None, lat=None, uri=None):
         args = self.parsers['get'].parse_args()
@@ -495,43 +511,10 @@ class Journeys(JourneyCommon):
 
         # Store the different errors
         responses = {}
-        for r in possible_regions:
+        for r, response in self._get_responses_by_region(possible_regions, args, api):
             self.region = r
-
             set_request_timezone(self.region)
 
-            # Store the region in the 'g' object, which is local to a request
-            if args['debug']:
-                # In debug we store all queried region
-                if not hasattr(g, 'regions_called'):
-                    g.regions_called = []
-                g.regions_called.append(r)
-
-            # Save the original datetime for debuging purpose
-            original_datetime = args['original_datetime']
-            if original_datetime:
-                new_datetime = self.convert_to_utc(original_datetime)
-            args['datetime'] = date_to_timestamp(new_datetime)
-
-            scenario_name = i_manager.get_instance_scenario_name(self.region, args.get('_override_scenario'))
-
-            if scenario_name == "new_default" and (
-                "taxi" in args["origin_mode"] or "taxi" in args["destination_mode"]
-            ):
-                abort(400, message="taxi is not available with new_default scenario")
-
-            response = i_manager.dispatch(args, api, instance_name=self.region)
-
-            # If journeys list is empty and error field not exist, we create
-            # the error message field
-            if not response.journeys and not response.HasField(str('error')):
-                logging.getLogger(__name__).debug(
-                    "impossible to find journeys for the region {}," " insert error field in response ".format(r)
-                )
-                response.error.id = response_pb2.Error.no_solution
-                response.error.message = "no solution found for this journey"
-                response.response_type = response_pb2.NO_SOLUTION
-
             if response.HasField(str('error')) and len(possible_regions) != 1:
 
                 if args['debug']:
@@ -578,5 +561,88 @@ class Journeys(JourneyCommon):
 
         return resp
 
+    def _compute_journeys_on_region(self, region, args, api):
+        set_request_timezone(region)
+
+        # Save the original datetime for debuging purpose
+        original_datetime = args['original_datetime']
+        if original_datetime:
+            new_datetime = self.convert_to_utc(original_datetime)
+        args['datetime'] = date_to_timestamp(new_datetime)
+
+        scenario_name = i_manager.get_instance_scenario_name(region, args.get('_override_scenario'))
+
+        if scenario_name == "new_default" and (
+            "taxi" in args["origin_mode"] or "taxi" in args["destination_mode"]
+        ):
+            abort(400, message="taxi is not available with new_default scenario")
+
+        response = i_manager.dispatch(args, api, instance_name=region)
+
+        # If journeys list is empty and error field not exist, we create
+        # the error message field
+        if not response.journeys and not response.HasField(str('error')):
+            logging.getLogger(__name__).debug(
+                "impossible to find journeys for the region {}, insert error field in response ".format(region)
+            )
+            response.error.id = response_pb2.Error.no_solution
+            response.error.message = "no solution found for this journey"
+            response.response_type = response_pb2.NO_SOLUTION
+        return response
+
+    def _register_region_call(self, region, duration, args):
+        if args['debug']:
+            # In debug we store all queried region
+            if not hasattr(g, 'regions_called'):
+                g.regions_called = []
+            g.regions_called.append(region)
+            if not hasattr(g, 'duration_by_region'):
+                g.duration_by_region = {}
+            g.duration_by_region[region] = int(duration * 1000)
+
+    def _get_responses_by_region(self, regions, args, api):
+        """
+        generate the (region, response) of the regions, in the order of the regions
+
+        With JOURNEYS_PARALLEL_REGIONS > 1, the first regions are computed in parallel, the responses
+        are still given in the order of the regions and the computations still running are killed
+        as soon as the caller has found its response
+        """
+        nb_parallel = app.config.get(str('JOURNEYS_PARALLEL_REGIONS'), 1)
+        if nb_parallel > 1 and len(regions) > 1:
+            for r, response in self._get_responses_in_parallel(regions[:nb_parallel], args, api):
+                yield r, response
+            regions = regions[nb_parallel:]
+
+        for r in regions:
+            start = time.time()
+            response = self._compute_journeys_on_region(r, args, api)
+            self._register_region_call(r, time.time() - start, args)
+            yield r, response
+
+    def _get_responses_in_parallel(self, regions, args, api):
+        reqctx = copy_flask_request_context()
+        # each greenlet has its own flask 'g', we give it the values of the request
+        # and we get back the values set during the computation (timezone, origin_detail...)
+        g_values = dict(g.__dict__)
+
+        def worker(region, region_args):
+            with copy_context_in_greenlet_stack(reqctx):
+                g.__dict__.update(g_values)
+                start = time.time()
+                response = self._compute_journeys_on_region(region, region_args, api)
+                return response, dict(g.__dict__), time.time() - start
+
+        # the scenarios update the arguments, each region needs its own copy
+        futures = [(r, gevent.spawn(worker, r, deepcopy(args))) for r in regions]
+        try:
+            for r, future in futures:
+                response, region_g_values, duration = future.get()
+                g.__dict__.update(region_g_values)
+                self._register_region_call(r, duration, args)
+                yield r, response
+        finally:
+            gevent.killall([f for _, f in futures if not f.ready()], block=False)
+
     def options(self, **kwargs):
         return self.api_description(**kwargs)
@@ -35,13 +35,17 @@ from flask.globals import g
 
 from jormungandr.authentication import get_all_available_instances
 from jormungandr.interfaces.v1.decorators import get_serializer
-from jormungandr.interfaces.v1.serializer.api import PlacesSerializer, PlacesNearbySerializer
-from jormungandr import i_manager, timezone, global_autocomplete, authentication
+from jormungandr.interfaces.v1.serializer.api import (
+    PlacesSerializer,
+    PlacesNearbySerializer,
+    PlacesBatchSerializer,
+)
+from jormungandr import i_manager, timezone, global_autocomplete, authentication, app, utils
 from jormungandr.interfaces.v1.ResourceUri import ResourceUri
 from jormungandr.interfaces.parsers import default_count_arg_type
 from copy import deepcopy
 from jormungandr.interfaces.v1.transform_id import transform_id
-from jormungandr.exceptions import TechnicalError, InvalidArguments
+from jormungandr.exceptions import TechnicalError, InvalidArguments, format_error
 from datetime import datetime
 from jormungandr.parking_space_availability.parking_places_manager import ManageParkingPlaces
 import ujson as json
@@ -57,6 +61,11 @@ from navitiacommon.parser_args_type import (
     DepthArgument,
 )
 from jormungandr.interfaces.common import add_poi_infos_types, handle_poi_infos
+from werkzeug.exceptions import HTTPException
+from collections import OrderedDict
+import gevent
+import gevent.pool
+import logging
 import six
 
 
@@ -72,10 +81,25 @@ class geojson_argument(CustomSchemaType):
         return TypeSchema(type=str)  # TODO a better description of the geojson
 
 
+def _apply_user_defaults(args, user):
+    """
+    the shape and the coordinate of the user are used when they are not given
+    """
+    if args['shape'] is None and user and user.shape:
+        args['shape'] = json.loads(user.shape)
+
+    if user and user.default_coord:
+        if args['from'] is None:
+            args['from'] = CoordFormat()(user.default_coord)
+    else:
+        if args['from'] == '':
+            raise InvalidArguments("if 'from' is provided it cannot be null")
+
+
 class Places(ResourceUri):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, output_type_serializer=PlacesSerializer, *args, **kwargs):
         ResourceUri.__init__(
-            self, authentication=False, output_type_serializer=PlacesSerializer, *args, **kwargs
+            self, authentication=False, output_type_serializer=output_type_serializer, *args, **kwargs
         )
         self.parsers["get"].add_argument("q", type=six.text_type, required=True, help="The data to search")
         self.parsers["get"].add_argument(
@@ -144,16 +168,7 @@ class Places(ResourceUri):
             g.disable_geojson = True
 
         user = authentication.get_user(token=authentication.get_token(), abort_if_no_token=False)
-
-        if args['shape'] is None and user and user.shape:
-            args['shape'] = json.loads(user.shape)
-
-        if user and user.default_coord:
-            if args['from'] is None:
-                args['from'] = CoordFormat()(user.default_coord)
-        else:
-            if args['from'] == '':
-                raise InvalidArguments("if 'from' is provided it cannot be null")
+        _apply_user_defaults(args, user)
 
         # If a region or coords are asked, we do the search according
         # to the region, else, we do a word wide search
@@ -237,6 +252,119 @@ class PlaceUri(ResourceUri):
         return self.api_description(**kwargs)
 
 
+def _item_args(args, key, value):
+    # the scenarios can update the arguments, each search needs its own copy
+    item_args = deepcopy(args)
+    item_args[key] = value
+    return item_args
+
+
+class PlacesBatch(Places):
+    """
+    several searches (q[]) or several objects (uri[]) in one call
+
+    The searches are done in parallel (at most PLACES_BATCH_POOL_SIZE at the same time), the identical
+    ones only once, and the results are given in the order of the queries.
+    The authentication, the quota and the stats are done once for the whole batch.
+    As the list can be long, the parameters can also be posted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        Places.__init__(self, output_type_serializer=PlacesBatchSerializer, *args, **kwargs)
+        self.parsers["get"].remove_argument("q")
+        self.parsers["get"].add_argument("q[]", type=six.text_type, action="append", help="The data to search")
+        self.parsers["get"].add_argument(
+            "uri[]", type=six.text_type, action="append", help="The uris of the places to get"
+        )
+        # POST is an alias for GET, we need to have the same decorators
+        self.method_decorators['post'] = self.method_decorators['get']
+
+    def get(self, region=None, lon=None, lat=None):
+        args = self.parsers["get"].parse_args()
+        self._register_interpreted_parameters(args)
+        queries = args['q[]'] or []
+        uris = args['uri[]'] or []
+        if bool(queries) == bool(uris):
+            abort(400, message="one of q[] or uri[] must be given")
+        max_size = app.config.get(str('PLACES_BATCH_MAX_SIZE'), 100)
+        if len(queries) + len(uris) > max_size:
+            abort(400, message="at most {} places can be searched at once".format(max_size))
+        if any(len(q) == 0 for q in queries):
+            abort(400, message="Search word absent")
+
+        if args['disable_geojson']:
+            g.disable_geojson = True
+
+        user = authentication.get_user(token=authentication.get_token(), abort_if_no_token=False)
+        _apply_user_defaults(args, user)
+
+        if any([region, lon, lat]):
+            self.region = i_manager.get_region(region, lon, lat)
+            timezone.set_request_timezone(self.region)
+
+            def search(query):
+                return i_manager.dispatch(_item_args(args, 'q', query), "places", instance_name=self.region)
+
+            def get_by_uri(uri):
+                uri_args = _item_args(args, 'uri', transform_id(uri))
+                return i_manager.dispatch(uri_args, "place_uri", instance_name=self.region)
+
+        else:
+            available_instances = get_all_available_instances(user)
+            autocomplete = global_autocomplete.get('bragi')
+            if not autocomplete:
+                raise TechnicalError('world wide autocompletion service not available')
+
+            def search(query):
+                return autocomplete.get(_item_args(args, 'q', query), instances=available_instances)
+
+            def get_by_uri(uri):
+                return autocomplete.get_by_uri(transform_id(uri), instances=available_instances)
+
+        if queries:
+            responses = self._call_all(search, queries)
+            results = [dict(responses[q], query=q) for q in queries]
+        else:
+            responses = self._call_all(get_by_uri, uris)
+            results = [dict(responses[uri], uri=uri) for uri in uris]
+        return {'results': results}, 200
+
+    def post(self, region=None, lon=None, lat=None):
+        return self.get(region=region, lon=lon, lat=lat)
+
+    def _call_all(self, func, items):
+        """
+        call func once per distinct item, the errors are given for the item instead of failing the batch
+        """
+        reqctx = utils.copy_flask_request_context()
+        # each greenlet has its own flask 'g', we give it the values of the request
+        g_values = dict(g.__dict__)
+
+        def worker(item):
+            with utils.copy_context_in_greenlet_stack(reqctx):
+                g.__dict__.update(g_values)
+                try:
+                    return func(item)
+                except HTTPException as e:
+                    return getattr(e, 'data', None) or format_error('unknown_object', e.description)
+                except Exception as e:
+                    logging.getLogger(__name__).exception('error in a batch of places')
+                    return format_error('technical_error', six.text_type(e))
+
+        pool = gevent.pool.Pool(app.config.get(str('PLACES_BATCH_POOL_SIZE'), 10))
+        futures = OrderedDict()
+        for item in items:
+            if item not in futures:
+                futures[item] = pool.spawn(worker, item)
+        try:
+            return {item: future.get() for item, future in futures.items()}
+        finally:
+            pool.kill()
+
+    def options(self, **kwargs):
+        return self.api_description(**kwargs)
+
+
 places_types = {
     'stop_areas',
     'stop_points',
@@ -34,10 +34,11 @@ from jormungandr.interfaces.v1.converters_collection_type import resource_type_t
 from jormungandr.interfaces.v1.StatedResource import StatedResource
 from jormungandr.interfaces.v1.make_links import add_id_links, clean_links, add_pagination_links
 from functools import wraps
-from collections import deque
+from collections import deque, OrderedDict
 from flask import url_for
 from flask_restful.utils import unpack
 from jormungandr.authentication import authentication_required
+from jormungandr.interfaces.v1.serializer.streaming import for_each, later
 from six.moves import map
 
 
@@ -123,65 +124,7 @@ class add_computed_resources(object):
                 data, code, header = unpack(response)
             else:
                 data = response
-            if 'links' not in data:
-                return response
-            collection = None
-            kwargs["_external"] = True
-            templated = True
-            for key in data:
-                if key == 'disruptions' and collection is not None:
-                    # disruption is a special case since it can be present in all responses
-                    continue
-                if key in collections_to_resource_type:
-                    collection = key
-                if key in resource_type_to_collection:
-                    collection = resource_type_to_collection[key]
-            if collection is None:
-                return response
-            kwargs["uri"] = collection + '/'
-            if "id" in kwargs:
-                kwargs["uri"] += kwargs["id"]
-                del kwargs["id"]
-                templated = False
-            else:
-                kwargs["uri"] += '{' + collection + ".id}"
-            if (
-                collection in ['stop_areas', 'stop_points', 'lines', 'routes', 'addresses']
-                and "region" in kwargs
-            ):
-                for api in ['route_schedules', 'stop_schedules', 'arrivals', 'departures', "places_nearby"]:
-                    data['links'].append(
-                        {"href": url_for("v1." + api, **kwargs), "rel": api, "type": api, "templated": templated}
-                    )
-            if collection in ['stop_areas', 'stop_points', 'addresses']:
-                data['links'].append(
-                    {
-                        "href": url_for("v1.journeys", **kwargs),
-                        "rel": "journeys",
-                        "type": "journey",
-                        "templated": templated,
-                    }
-                )
-            # for lines we add the link to the calendars
-            if 'region' in kwargs:
-                if collection == 'lines':
-                    data['links'].append(
-                        {
-                            "href": url_for("v1.calendars", **kwargs),
-                            "rel": "calendars",
-                            "type": "calendar",
-                            "templated": templated,
-                        }
-                    )
-                if collection in ['stop_areas', 'lines', 'networks']:
-                    data['links'].append(
-                        {
-                            "href": url_for("v1.traffic_reports", **kwargs),
-                            "rel": "disruptions",
-                            "type": "disruption",
-                            "templated": templated,
-                        }
-                    )
+            later(data, lambda d: self.add_links(d, kwargs), keys=('links',))
             if isinstance(response, tuple):
                 return data, code, header
             else:
@@ -189,6 +132,64 @@ class add_computed_resources(object):
 
         return wrapper
 
+    def add_links(self, data, kwargs):
+        if 'links' not in data:
+            return
+        collection = None
+        kwargs["_external"] = True
+        templated = True
+        for key in data:
+            if key == 'disruptions' and collection is not None:
+                # disruption is a special case since it can be present in all responses
+                continue
+            if key in collections_to_resource_type:
+                collection = key
+            if key in resource_type_to_collection:
+                collection = resource_type_to_collection[key]
+        if collection is None:
+            return
+        kwargs["uri"] = collection + '/'
+        if "id" in kwargs:
+            kwargs["uri"] += kwargs["id"]
+            del kwargs["id"]
+            templated = False
+        else:
+            kwargs["uri"] += '{' + collection + ".id}"
+        if collection in ['stop_areas', 'stop_points', 'lines', 'routes', 'addresses'] and "region" in kwargs:
+            for api in ['route_schedules', 'stop_schedules', 'arrivals', 'departures', "places_nearby"]:
+                data['links'].append(
+                    {"href": url_for("v1." + api, **kwargs), "rel": api, "type": api, "templated": templated}
+                )
+        if collection in ['stop_areas', 'stop_points', 'addresses']:
+            data['links'].append(
+                {
+                    "href": url_for("v1.journeys", **kwargs),
+                    "rel": "journeys",
+                    "type": "journey",
+                    "templated": templated,
+                }
+            )
+        # for lines we add the link to the calendars
+        if 'region' in kwargs:
+            if collection == 'lines':
+                data['links'].append(
+                    {
+                        "href": url_for("v1.calendars", **kwargs),
+                        "rel": "calendars",
+                        "type": "calendar",
+                        "templated": templated,
+                    }
+                )
+            if collection in ['stop_areas', 'lines', 'networks']:
+                data['links'].append(
+                    {
+                        "href": url_for("v1.traffic_reports", **kwargs),
+                        "rel": "disruptions",
+                        "type": "disruption",
+                        "templated": templated,
+                    }
+                )
+
 
 class complete_links(object):
     # This list should not change
@@ -203,26 +204,37 @@ class complete_links(object):
         type_ = "Add" if elem['except_type'] == 0 else "Remove"
         return {"id": elem['id'], "date": elem['date'], "type": type_}
 
-    def get_links(self, data):
-        queue = deque()
-        result = {"notes": [], "exceptions": []}
-        queue.extend(list(data.values()))
+    def get_links(self, value):
+        """
+        notes and exceptions of a value of the response, their links only keep the expected items
+        """
+        links = []
+        queue = deque([value])
         while queue:
             elem = queue.pop()
             if isinstance(elem, (list, tuple)):
                 queue.extend(elem)
             elif hasattr(elem, 'keys'):
                 collect = elem.get('type')
-                if collect in result:
-                    link = self.make_and_get_link(elem, collect)
-                    if link.get('id') not in [l.get('id') for l in result[collect]]:
-                        result[collect].append(link)
+                if collect in ("notes", "exceptions"):
+                    links.append((collect, self.make_and_get_link(elem, collect)))
                     # Delete all items from link not in expected_keys
                     del_keys = set(elem.keys()).difference(self.EXPECTED_ITEMS)
                     if len(del_keys):
                         list(map(elem.pop, del_keys))
                 else:
                     queue.extend(list(elem.values()))
+        return links
+
+    @staticmethod
+    def merge_links(links_by_key):
+        result = {"notes": [], "exceptions": []}
+        # from the last value, as if the whole response was walked at once
+        for links_by_value in reversed(list(links_by_key.values())):
+            for links in reversed(links_by_value):
+                for collect, link in links:
+                    if link.get('id') not in [l.get('id') for l in result[collect]]:
+                        result[collect].append(link)
         return result
 
     def __call__(self, f):
@@ -236,7 +248,9 @@ class complete_links(object):
 
             if self.resource.region:
                 # Add notes and exceptions
-                data.update(self.get_links(data))
+                links_by_key = OrderedDict((key, []) for key in data)
+                for_each(data, lambda key, value: links_by_key[key].append(self.get_links(value)))
+                later(data, lambda d: d.update(self.merge_links(links_by_key)), keys=('notes', 'exceptions'))
             if isinstance(objects, tuple):
                 return data, code, header
             else:
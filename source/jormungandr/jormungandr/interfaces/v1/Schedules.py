@@ -37,6 +37,7 @@ from jormungandr import timezone
 from jormungandr.interfaces.v1.ResourceUri import ResourceUri, complete_links
 from jormungandr.interfaces.v1.decorators import get_obj_serializer
 from jormungandr.interfaces.v1.serializer import api, pt
+from jormungandr.interfaces.v1.serializer.streaming import for_each, later
 from datetime import datetime, timedelta
 from jormungandr.interfaces.argument import ArgumentDoc
 from jormungandr.interfaces.parsers import default_count_arg_type
@@ -59,7 +60,7 @@ import six
 
 
 class Schedules(ResourceUri, ResourceUtc):
-    def __init__(self, endpoint, *args, **kwargs):
+    def __init__(self, endpoint, streaming=False, *args, **kwargs):
         ResourceUri.__init__(self, *args, **kwargs)
         ResourceUtc.__init__(self)
         self.endpoint = endpoint
@@ -155,7 +156,7 @@ class Schedules(ResourceUri, ResourceUtc):
         )
 
         self.get_decorators.insert(0, ManageError())
-        self.get_decorators.insert(1, get_obj_serializer(self))
+        self.get_decorators.insert(1, get_obj_serializer(self, streaming=streaming))
         self.get_decorators.append(complete_links(self))
 
     def options(self, **kwargs):
@@ -262,52 +263,60 @@ class add_passages_links:
             api = "departures" if "departures" in response else "arrivals" if "arrivals" in response else None
             if not api:
                 return response, status, other
-            passages = response[api]
-
-            max_dt = "19000101T000000"
-            min_dt = "29991231T235959"
             time_field = "arrival_date_time" if api == "arrivals" else "departure_date_time"
-            for passage_ in passages:
-                dt = passage_["stop_date_time"][time_field]
-                if min_dt > dt:
-                    min_dt = dt
-                if max_dt < dt:
-                    max_dt = dt
-            if "links" not in response:
-                response["links"] = []
-            kwargs_links = dict(deepcopy(request.args))
-            if "region" in kwargs:
-                kwargs_links["region"] = kwargs["region"]
-            if "uri" in kwargs:
-                kwargs_links["uri"] = kwargs["uri"]
-            if 'from_datetime' in kwargs_links:
-                kwargs_links.pop('from_datetime')
-            delta = timedelta(seconds=1)
-            dt = datetime.strptime(min_dt, "%Y%m%dT%H%M%S")
-            if g.stat_interpreted_parameters.get('data_freshness') != 'realtime':
-                kwargs_links["_type"] = api
-                kwargs_links["templated"] = False
-                kwargs_links["rel"] = "prev"
-                kwargs_links['until_datetime'] = (dt - delta).strftime("%Y%m%dT%H%M%S")
-                response["links"].append(create_external_link("v1." + api, **kwargs_links))
-                kwargs_links.pop('until_datetime')
-                kwargs_links['from_datetime'] = (datetime.strptime(max_dt, "%Y%m%dT%H%M%S") + delta).strftime(
-                    "%Y%m%dT%H%M%S"
-                )
-                kwargs_links["rel"] = "next"
-                response["links"].append(create_external_link("v1." + api, **kwargs_links))
+            datetimes = []
+            for_each(
+                response, lambda _, passage_: datetimes.append(passage_["stop_date_time"][time_field]), (api,)
+            )
+            later(response, lambda r: self.add_links(r, api, datetimes, kwargs), keys=('links',))
             return response, status, other
 
         return wrapper
 
+    def add_links(self, response, api, datetimes, kwargs):
+        max_dt = "19000101T000000"
+        min_dt = "29991231T235959"
+        for dt in datetimes:
+            if min_dt > dt:
+                min_dt = dt
+            if max_dt < dt:
+                max_dt = dt
+        if "links" not in response:
+            response["links"] = []
+        kwargs_links = dict(deepcopy(request.args))
+        if "region" in kwargs:
+            kwargs_links["region"] = kwargs["region"]
+        if "uri" in kwargs:
+            kwargs_links["uri"] = kwargs["uri"]
+        if 'from_datetime' in kwargs_links:
+            kwargs_links.pop('from_datetime')
+        delta = timedelta(seconds=1)
+        dt = datetime.strptime(min_dt, "%Y%m%dT%H%M%S")
+        if g.stat_interpreted_parameters.get('data_freshness') != 'realtime':
+            kwargs_links["_type"] = api
+            kwargs_links["templated"] = False
+            kwargs_links["rel"] = "prev"
+            kwargs_links['until_datetime'] = (dt - delta).strftime("%Y%m%dT%H%M%S")
+            response["links"].append(create_external_link("v1." + api, **kwargs_links))
+            kwargs_links.pop('until_datetime')
+            kwargs_links['from_datetime'] = (datetime.strptime(max_dt, "%Y%m%dT%H%M%S") + delta).strftime(
+                "%Y%m%dT%H%M%S"
+            )
+            kwargs_links["rel"] = "next"
+            response["links"].append(create_external_link("v1." + api, **kwargs_links))
+
 
 class NextDepartures(Schedules):
     def __init__(self):
-        super(NextDepartures, self).__init__("next_departures", output_type_serializer=api.DeparturesSerializer)
+        super(NextDepartures, self).__init__(
+            "next_departures", output_type_serializer=api.DeparturesSerializer, streaming=True
+        )
         self.get_decorators.append(add_passages_links())
 
 
 class NextArrivals(Schedules):
     def __init__(self):
-        super(NextArrivals, self).__init__("next_arrivals", output_type_serializer=api.ArrivalsSerializer)
+        super(NextArrivals, self).__init__(
+            "next_arrivals", output_type_serializer=api.ArrivalsSerializer, streaming=True
+        )
         self.get_decorators.append(add_passages_links())
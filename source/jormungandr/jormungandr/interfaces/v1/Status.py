@@ -40,7 +40,7 @@ class Status(StatedResource):
     def __init__(self, *args, **kwargs):
         super(Status, self).__init__(self, *args, **kwargs)
 
-    @get_serializer(serpy=StatusSerializer)
+    @get_serializer(serpy=StatusSerializer, streaming=True)
     def get(self, region=None, lon=None, lat=None):
         region_str = i_manager.get_region(region, lon, lat)
         response = protobuf_to_dict(
@@ -40,6 +40,8 @@ __all__ = [
     'JSONSchema',
 ]
 
+from jormungandr import concurrency_limiter
+
 
 def add_common_status(response, instance):
     response['status']["is_open_data"] = instance.is_open_data
@@ -57,3 +59,5 @@ def add_common_status(response, instance):
         response['status']['ridesharing_services'].append(rs.status())
 
     response['status']['autocomplete'] = instance.autocomplete.status()
+    response['status']['kraken_transport'] = instance.transport.status()
+    response['status']['concurrency_limiters'] = concurrency_limiter.status()
@@ -29,9 +29,9 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 from jormungandr.interfaces.v1.serializer import serialize_with
 
 
-def get_serializer(serpy):
-    return serialize_with(serpy)
+def get_serializer(serpy, streaming=False):
+    return serialize_with(serpy, streaming=streaming)
 
 
-def get_obj_serializer(obj):
-    return get_serializer(serpy=obj.output_type_serializer)
+def get_obj_serializer(obj, streaming=False):
+    return get_serializer(serpy=obj.output_type_serializer, streaming=streaming)
@@ -113,50 +113,10 @@ class add_pagination_links(object):
                 data, code, header = unpack(objects)
             else:
                 data = objects
-            pagination = data.get('pagination', None)
-            endpoint = request.endpoint
-            kwargs.update(request.args)
-            if pagination and endpoint and "region" in kwargs:
-                if (
-                    "start_page" in pagination
-                    and "items_on_page" in pagination
-                    and "items_per_page" in pagination
-                    and "total_result" in pagination
-                ):
-                    if "links" not in data:
-                        data["links"] = []
-                    start_page = int(pagination["start_page"])
-                    items_per_page = int(pagination["items_per_page"])
-                    items_on_page = int(pagination["items_on_page"])
-                    total_result = int(pagination["total_result"])
-                    kwargs["_external"] = True
-
-                    if start_page > 0:
-                        kwargs["start_page"] = start_page - 1
-                        data["links"].append(
-                            {"href": url_for(endpoint, **kwargs), "type": "previous", "templated": False}
-                        )
-                    nb_next_page = items_per_page * start_page
-                    nb_next_page += items_on_page
-                    if total_result > nb_next_page:
-                        kwargs["start_page"] = start_page + 1
-                        data["links"].append(
-                            {"href": url_for(endpoint, **kwargs), "type": "next", "templated": False}
-                        )
-                        if items_per_page == 0 or total_result == 0:
-                            kwargs["start_page"] = 0
-                        else:
-                            nb_last_page = total_result - 1
-                            nb_last_page = int(nb_last_page / items_per_page)
-                            kwargs["start_page"] = nb_last_page
-                            data["links"].append(
-                                {"href": url_for(endpoint, **kwargs), "type": "last", "templated": False}
-                            )
-
-                        del kwargs["start_page"]
-                    data["links"].append(
-                        {"href": url_for(endpoint, **kwargs), "type": "first", "templated": False}
-                    )
+            # imported here since the serializers import this module
+            from jormungandr.interfaces.v1.serializer.streaming import later
+
+            later(data, lambda d: self.add_links(d, kwargs), keys=('links',))
             if isinstance(objects, tuple):
                 return data, code, header
             else:
@@ -164,6 +124,50 @@ class add_pagination_links(object):
 
         return wrapper
 
+    def add_links(self, data, kwargs):
+        pagination = data.get('pagination', None)
+        endpoint = request.endpoint
+        kwargs.update(request.args)
+        if pagination and endpoint and "region" in kwargs:
+            if (
+                "start_page" in pagination
+                and "items_on_page" in pagination
+                and "items_per_page" in pagination
+                and "total_result" in pagination
+            ):
+                if "links" not in data:
+                    data["links"] = []
+                start_page = int(pagination["start_page"])
+                items_per_page = int(pagination["items_per_page"])
+                items_on_page = int(pagination["items_on_page"])
+                total_result = int(pagination["total_result"])
+                kwargs["_external"] = True
+
+                if start_page > 0:
+                    kwargs["start_page"] = start_page - 1
+                    data["links"].append(
+                        {"href": url_for(endpoint, **kwargs), "type": "previous", "templated": False}
+                    )
+                nb_next_page = items_per_page * start_page
+                nb_next_page += items_on_page
+                if total_result > nb_next_page:
+                    kwargs["start_page"] = start_page + 1
+                    data["links"].append(
+                        {"href": url_for(endpoint, **kwargs), "type": "next", "templated": False}
+                    )
+                    if items_per_page == 0 or total_result == 0:
+                        kwargs["start_page"] = 0
+                    else:
+                        nb_last_page = total_result - 1
+                        nb_last_page = int(nb_last_page / items_per_page)
+                        kwargs["start_page"] = nb_last_page
+                        data["links"].append(
+                            {"href": url_for(endpoint, **kwargs), "type": "last", "templated": False}
+                        )
+
+                    del kwargs["start_page"]
+                data["links"].append({"href": url_for(endpoint, **kwargs), "type": "first", "templated": False})
+
 
 class add_coverage_link(generate_links):
     def __init__(self):
@@ -263,7 +267,12 @@ class add_id_links(generate_links):
                 data, code, header = unpack(objects)
             else:
                 data = objects
-            self.get_objets(data)
+            # imported here since the serializers import this module
+            from jormungandr.interfaces.v1.serializer.streaming import for_each, later
+
+            if "id" in data and "type" in data:
+                self.data.add(data["type"])
+            for_each(data, lambda key, value: self.get_objets(value, key))
             data = self.prepare_objetcs(objects, True)
             kwargs = self.prepare_kwargs(kwargs, data)
 
@@ -274,19 +283,8 @@ class add_id_links(generate_links):
             uri_id = None
             if "id" in kwargs and "collection" in kwargs and kwargs["collection"] in data:
                 uri_id = kwargs["id"]
-            for obj in self.data:
-                kwargs["collection"] = resource_type_to_collection.get(obj, obj)
-                if kwargs["collection"] in collections_to_resource_type:
-                    if not uri_id:
-                        kwargs["id"] = "{" + obj + ".id}"
-
-                    endpoint = "v1." + kwargs["collection"] + ".id"
-                    collection = kwargs["collection"]
-                    to_pass = {k: v for k, v in kwargs.items() if k != "collection"}
-                    to_pass["_type"] = obj
-                    to_pass["templated"] = True
-                    to_pass["rel"] = collection
-                    data["links"].append(create_external_link(url=endpoint, **to_pass))
+            # the objects are known once all the response has been walked
+            later(data, lambda d: self.add_links(d, kwargs, uri_id), keys=('links',))
             if isinstance(objects, tuple):
                 return data, code, header
             else:
@@ -294,6 +292,21 @@ class add_id_links(generate_links):
 
         return wrapper
 
+    def add_links(self, data, kwargs, uri_id):
+        for obj in self.data:
+            kwargs["collection"] = resource_type_to_collection.get(obj, obj)
+            if kwargs["collection"] in collections_to_resource_type:
+                if not uri_id:
+                    kwargs["id"] = "{" + obj + ".id}"
+
+                endpoint = "v1." + kwargs["collection"] + ".id"
+                collection = kwargs["collection"]
+                to_pass = {k: v for k, v in kwargs.items() if k != "collection"}
+                to_pass["_type"] = obj
+                to_pass["templated"] = True
+                to_pass["rel"] = collection
+                data["links"].append(create_external_link(url=endpoint, **to_pass))
+
     def get_objets(self, data, collection_name=None):
         if hasattr(data, 'keys'):
             if "id" in data and "type" in data:
@@ -308,6 +321,12 @@ class add_id_links(generate_links):
 
 
 class clean_links(object):
+    @staticmethod
+    def clean(data):
+        if "links" in data:
+            for link in data['links']:
+                link['href'] = link['href'].replace("%7B", "{").replace("%7D", "}").replace("%3B", ";")
+
     def __call__(self, f):
         @wraps(f)
         def wrapper(*args, **kwargs):
@@ -318,9 +337,11 @@ class clean_links(object):
                     return data, code, header
             else:
                 data = response
-            if (isinstance(data, dict) or isinstance(data, OrderedDict)) and "links" in data:
-                for link in data['links']:
-                    link['href'] = link['href'].replace("%7B", "{").replace("%7D", "}").replace("%3B", ";")
+            # imported here since the serializers import this module
+            from jormungandr.interfaces.v1.serializer.streaming import StreamedSerialization, later
+
+            if isinstance(data, (dict, OrderedDict, StreamedSerialization)):
+                later(data, self.clean, keys=('links',))
             if isinstance(response, tuple):
                 return data, code, header
             else:
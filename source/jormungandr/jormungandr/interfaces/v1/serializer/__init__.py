@@ -28,15 +28,28 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from functools import wraps
 from flask_restful.utils import unpack
+from jormungandr import app
 
 from .api import LinesSerializer
 from .api import DisruptionsSerializer
+from .streaming import StreamedSerialization
 
 
 class serialize_with(object):
-    def __init__(self, serializer, many=False):
+    def __init__(self, serializer, many=False, streaming=False):
+        """
+        streaming: the json is written directly from the serializer when the response is sent,
+        the decorators post-processing the response go through streaming.for_each and streaming.later
+        """
         self.serializer = serializer
         self.many = many
+        self.streaming = streaming
+
+    def serialize(self, data):
+        serializer = self.serializer(data, many=self.many)
+        if self.streaming and app.config.get(str('STREAMING_SERIALIZATION'), False):
+            return StreamedSerialization(serializer)
+        return serializer.data
 
     def __call__(self, f):
         @wraps(f)
@@ -44,8 +57,8 @@ class serialize_with(object):
             resp = f(*args, **kwargs)
             if isinstance(resp, tuple):
                 data, code, headers = unpack(resp)
-                return self.serializer(data, many=self.many).data, code, headers
+                return self.serialize(data), code, headers
             else:
-                return self.serializer(resp, many=self.many).data
+                return self.serialize(resp)
 
         return wrapper
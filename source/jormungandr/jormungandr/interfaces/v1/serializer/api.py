@@ -217,6 +217,15 @@ class PlacesSerializer(serpy.Serializer):
         return ContextSerializer(obj, display_none=False).data
 
 
+class PlacesBatchResultSerializer(PlacesSerializer):
+    query = Field(schema_type=str, display_none=False, description='The searched text')
+    uri = Field(schema_type=str, display_none=False, description='The searched uri')
+
+
+class PlacesBatchSerializer(serpy.Serializer):
+    results = PlacesBatchResultSerializer(many=True)
+
+
 class PtObjectsSerializer(serpy.Serializer):
     error = ErrorSerializer(display_none=False)
     feed_publishers = FeedPublisherSerializer(many=True, display_none=True)
@@ -422,6 +431,13 @@ class TechnicalStatusSerializer(NullableDictSerializer):
     context = MethodField(schema_type=ContextSerializer(), display_none=False)
     warnings = base.BetaEndpointsSerializer()
     redis = status.RedisStatusSerializer(display_none=False)
+    local_cache = status.LocalCacheSerializer(display_none=False)
+    http_pools = status.HttpPoolSerializer(many=True, display_none=False)
+    autocomplete_cache = status.AutocompleteCacheSerializer(display_none=False)
+    stat_queue = status.StatQueueSerializer(display_none=False)
+    authentication_snapshot = status.AuthenticationSnapshotSerializer(display_none=False)
+    rate_limit = status.RateLimitSerializer(display_none=False)
+    fallback_durations_cache = status.FallbackDurationsCacheSerializer(display_none=False)
 
     def get_context(self, obj):
         return ContextSerializer(obj, is_utc=True, display_none=False).data
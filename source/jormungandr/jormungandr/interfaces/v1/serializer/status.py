@@ -124,6 +124,35 @@ class RidesharingServicesSerializer(OutsideServiceCommon):
     pass
 
 
+class KrakenTransportSerializer(serpy.DictSerializer):
+    connections = Field(schema_type=int, display_none=True)
+    idle_connections = Field(schema_type=int, display_none=True)
+    max_connections = Field(schema_type=int, display_none=True)
+    in_flight = Field(schema_type=int, display_none=True)
+    queue_depth = Field(schema_type=int, display_none=True)
+    nb_calls = Field(schema_type=int, display_none=True)
+    nb_timeouts = Field(schema_type=int, display_none=True)
+    avg_latency_ms = Field(schema_type=int, display_none=True)
+    max_latency_ms = Field(schema_type=int, display_none=True)
+
+
+class ApiLatencySerializer(serpy.DictSerializer):
+    api = Field(schema_type=str, display_none=True)
+    avg_latency_ms = Field(schema_type=int, display_none=True)
+    base_latency_ms = Field(schema_type=int, display_none=True)
+
+
+class ConcurrencyLimiterSerializer(serpy.DictSerializer):
+    name = Field(schema_type=str, display_none=True)
+    limit = Field(schema_type=int, display_none=True)
+    in_flight = Field(schema_type=int, display_none=True)
+    waiting = Field(schema_type=int, display_none=True)
+    nb_calls = Field(schema_type=int, display_none=True)
+    nb_rejected = Field(schema_type=int, display_none=True)
+    nb_decreases = Field(schema_type=int, display_none=True)
+    latencies = ApiLatencySerializer(many=True, display_none=True)
+
+
 class CoverageErrorSerializer(NullableDictSerializer):
     code = Field(schema_type=str)
     value = Field(schema_type=str)
@@ -138,6 +167,8 @@ class CommonStatusSerializer(NullableDictSerializer):
     is_open_service = Field(schema_type=bool, display_none=False)
     is_connected_to_rabbitmq = Field(schema_type=bool, display_none=False)
     autocomplete = AutocompleteSerializer(display_none=False)
+    kraken_transport = KrakenTransportSerializer(display_none=False)
+    concurrency_limiters = ConcurrencyLimiterSerializer(many=True, display_none=False)
     end_production_date = Field(schema_type=str, display_none=False)
     realtime_proxies = StringListField(display_none=True)
     last_load_at = Field(schema_type=str, display_none=False)
@@ -171,9 +202,80 @@ class StatusSerializer(CommonStatusSerializer):
         return obj.get('rt_contributors', [])
 
 
+class StationsPrefetchSerializer(serpy.DictSerializer):
+    interval = Field(schema_type=int, display_none=True)
+    nb_stations = Field(schema_type=int, display_none=True)
+    age = Field(schema_type=int, display_none=True)
+    nb_refreshes = Field(schema_type=int, display_none=True)
+    nb_errors = Field(schema_type=int, display_none=True)
+
+
 class BssProviderSerializer(serpy.DictSerializer):
     network = Field(schema_type=str, display_none=True)
     operators = jsonschema.Field(schema_type=str, display_none=True, many=True)
+    prefetch = StationsPrefetchSerializer(display_none=False)
+
+
+class LocalCacheSerializer(serpy.DictSerializer):
+    local_enabled = Field(schema_type=bool, display_none=True)
+    local_size = Field(schema_type=int, display_none=True)
+    local_max_size = Field(schema_type=int, display_none=True)
+    local_hits = Field(schema_type=int, display_none=True)
+    local_misses = Field(schema_type=int, display_none=True)
+    invalidation_enabled = Field(schema_type=bool, display_none=True)
+
+
+class AutocompleteCacheSerializer(serpy.DictSerializer):
+    size = Field(schema_type=int, display_none=True)
+    max_size = Field(schema_type=int, display_none=True)
+    ttl = Field(schema_type=int, display_none=True)
+    nb_hits = Field(schema_type=int, display_none=True)
+    nb_prefix_hits = Field(schema_type=int, display_none=True)
+    nb_misses = Field(schema_type=int, display_none=True)
+    hit_ratio = Field(schema_type=float, display_none=True)
+
+
+class StatQueueSerializer(serpy.DictSerializer):
+    size = Field(schema_type=int, display_none=True)
+    max_size = Field(schema_type=int, display_none=True)
+    nb_published = Field(schema_type=int, display_none=True)
+    nb_dropped = Field(schema_type=int, display_none=True)
+    nb_failed = Field(schema_type=int, display_none=True)
+    nb_batches = Field(schema_type=int, display_none=True)
+
+
+class AuthenticationSnapshotSerializer(serpy.DictSerializer):
+    version = Field(schema_type=int, display_none=True)
+    age = Field(schema_type=int, display_none=True)
+    refresh_interval = Field(schema_type=int, display_none=True)
+    nb_refreshes = Field(schema_type=int, display_none=True)
+    nb_errors = Field(schema_type=int, display_none=True)
+
+
+class RateLimitSerializer(serpy.DictSerializer):
+    nb_keys = Field(schema_type=int, display_none=True)
+    nb_allowed = Field(schema_type=int, display_none=True)
+    nb_rejected = Field(schema_type=int, display_none=True)
+    nb_sync_errors = Field(schema_type=int, display_none=True)
+    redis_enabled = Field(schema_type=bool, display_none=True)
+
+
+class FallbackDurationsCacheSerializer(serpy.DictSerializer):
+    size = Field(schema_type=int, display_none=True)
+    max_size = Field(schema_type=int, display_none=True)
+    ttl = Field(schema_type=int, display_none=True)
+    grid_size = Field(schema_type=float, display_none=True)
+    nb_hits = Field(schema_type=int, display_none=True)
+    nb_misses = Field(schema_type=int, display_none=True)
+
+
+class HttpPoolSerializer(serpy.DictSerializer):
+    name = Field(schema_type=str, display_none=True)
+    pool_maxsize = Field(schema_type=int, display_none=True)
+    nb_hosts = Field(schema_type=int, display_none=True)
+    nb_connections = Field(schema_type=int, display_none=True)
+    idle_connections = Field(schema_type=int, display_none=True)
+    nb_requests = Field(schema_type=int, display_none=True)
 
 
 class RedisStatusSerializer(serpy.DictSerializer):
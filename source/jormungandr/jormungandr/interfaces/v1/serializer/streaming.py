@@ -0,0 +1,487 @@
+#  Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Streaming JSON output for serpy serializers.
+
+The classic path builds the whole response as nested dicts (serializer.data) and then encodes it
+with ujson. For big responses (journeys, departures, schedules...) this means the full tree
+of dicts is alive at the same time as the encoded string.
+
+Here the nested serializers are walked directly on the protobuf: only the scalar fields of the
+current object are computed by serpy (so the field semantics, display_none, required... are
+exactly the ones of the dict path), nested serializers are written piece by piece and the
+output is yielded in chunks, one element of the top level lists at a time.
+
+The decorators post-processing the response work on it with for_each and later: for_each is
+called on each element of the top level lists when it's serialized, later once all of them have
+been, so a decorator can still change an element or add links computed from all the elements.
+The other accesses to the response serialize the values they need, as a dict would have them.
+
+The top level values changed by later (like 'links' or 'feed_publishers') are written after the
+others, so the streamed json is the json of the dict once parsed but these keys can be at another
+position in the text.
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import OrderedDict
+import serpy
+import six
+import sys
+import ujson
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# index of the items in the tuples of serpy's Serializer._compiled_fields
+_NAME, _GETTER, _TO_VALUE, _CALL, _REQUIRED, _PASS_SELF = range(6)
+
+# cache of the streaming plan of each serializer class
+_plans = {}
+
+
+def _is_streamable(field):
+    """
+    a nested field can be streamed only if it's a plain serpy.Serializer,
+    a custom to_value means the serializer post-process its own output
+    """
+    if not isinstance(field, serpy.Serializer):
+        return False
+    to_value = six.get_unbound_function(type(field).to_value)
+    return to_value is six.get_unbound_function(serpy.Serializer.to_value)
+
+
+def _get_plan(serializer):
+    """
+    split the compiled fields of a serializer between the fields directly computed by serpy
+    and the nested serializers that we write ourself
+    """
+    cls = type(serializer)
+    plan = _plans.get(cls)
+    if plan is not None:
+        return plan
+
+    fields_by_label = {field.label or name: field for name, field in cls._field_map.items()}
+    direct_fields = []
+    nested_fields = []
+    for compiled in cls._compiled_fields:
+        field = fields_by_label.get(compiled[_NAME])
+        if not compiled[_PASS_SELF] and _is_streamable(field):
+            nested_fields.append((compiled, field))
+        else:
+            direct_fields.append(compiled)
+
+    plan = (tuple(direct_fields), tuple(nested_fields))
+    _plans[cls] = plan
+    return plan
+
+
+class _Pending(object):
+    """
+    a nested serializer and the object it serializes, not written yet
+    """
+
+    __slots__ = ('field', 'instance')
+
+    def __init__(self, field, instance):
+        self.field = field
+        self.instance = instance
+
+    def to_value(self):
+        return self.field.to_value(self.instance)
+
+
+def _get_values(serializer, instance):
+    """
+    return the values of an object in the order of serpy: the values computed by serpy
+    and the nested serializers to write (as _Pending)
+    """
+    direct_fields, nested_fields = _get_plan(serializer)
+    computed = serializer._serialize(instance, direct_fields) if direct_fields else {}
+
+    pending = {}
+    for compiled, field in nested_fields:
+        try:
+            result = compiled[_GETTER](instance)
+        except (KeyError, AttributeError):
+            if compiled[_REQUIRED]:
+                raise
+            continue
+        if result is None or compiled[_CALL]:
+            # corner cases are left to serpy so we keep the exact same output
+            computed.update(serializer._serialize(instance, (compiled,)))
+            continue
+        pending[compiled[_NAME]] = _Pending(field, result)
+
+    values = OrderedDict()
+    for compiled in type(serializer)._compiled_fields:
+        name = compiled[_NAME]
+        if name in computed:
+            values[name] = computed[name]
+        elif name in pending:
+            values[name] = pending[name]
+    return values
+
+
+def _write_key(parts, first, key):
+    if not first:
+        parts.append(',')
+    parts.append(ujson.dumps(key))
+    parts.append(':')
+
+
+def _write_object(serializer, instance, parts):
+    parts.append('{')
+    first = True
+    for key, value in _get_values(serializer, instance).items():
+        _write_key(parts, first, key)
+        if isinstance(value, _Pending):
+            _write_value(value.field, value.instance, parts)
+        else:
+            parts.append(ujson.dumps(value))
+        first = False
+    parts.append('}')
+
+
+def _write_value(serializer, instance, parts):
+    if not serializer.many:
+        _write_object(serializer, instance, parts)
+        return
+    parts.append('[')
+    for i, item in enumerate(instance):
+        if i:
+            parts.append(',')
+        _write_object(serializer, item, parts)
+    parts.append(']')
+
+
+class _Chunks(object):
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self.parts = []
+
+    def pop(self, force=False):
+        if not self.parts:
+            return None
+        if not force and sum(len(p) for p in self.parts) < self.chunk_size:
+            return None
+        chunk = ''.join(self.parts)
+        self.parts = []
+        return chunk
+
+
+def _stream_list(serializer, instances, chunks):
+    chunks.parts.append('[')
+    for i, item in enumerate(instances):
+        if i:
+            chunks.parts.append(',')
+        _write_object(serializer, item, chunks.parts)
+        chunk = chunks.pop()
+        if chunk:
+            yield chunk
+    chunks.parts.append(']')
+
+
+def _apply(func, key, value):
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            func(key, item)
+    else:
+        func(key, value)
+
+
+class _Streamed(object):
+    """
+    a top level value already sent to the client
+    """
+
+
+_streamed = _Streamed()
+
+
+class StreamedSerialization(object):
+    """
+    The result of a serializer whose json is streamed to the client
+
+    The serialization is done only when the response is written. Until then it can be used
+    like the dict of the response: each top level value is serialized when it's needed and
+    'data' gives the whole dict.
+    """
+
+    def __init__(self, serializer):
+        self.serializer = serializer
+        self._values = None
+        self._walkers = []
+        self._finalizers = []
+        self._late_keys = []
+        self._is_finalizing = False
+        self._is_materialized = False
+
+    def _get_values(self):
+        if self._values is None:
+            self._values = _get_values(self.serializer, self.serializer.instance)
+        return self._values
+
+    def _walk(self, key, value):
+        for keys, func in self._walkers:
+            if keys is None or key in keys:
+                _apply(func, key, value)
+
+    def _materialize(self, key):
+        value = self._get_values()[key]
+        if value is _streamed:
+            raise RuntimeError('{} has already been written'.format(key))
+        if isinstance(value, _Pending):
+            value = value.to_value()
+            self._values[key] = value
+            self._walk(key, value)
+        return value
+
+    def _run_finalizers(self):
+        self._is_finalizing = True
+        try:
+            while self._finalizers:
+                self._finalizers.pop(0)(self)
+        finally:
+            self._is_finalizing = False
+
+    def _materialize_all(self):
+        for key in list(self._get_values().keys()):
+            self._materialize(key)
+        self._run_finalizers()
+        self._is_materialized = True
+
+    def _access(self, key):
+        # the values completed once all the others have been serialized can't be used before
+        if self._finalizers and not self._is_finalizing and key in self._late_keys:
+            self._materialize_all()
+
+    @property
+    def data(self):
+        if self.serializer.many:
+            return self.serializer.data
+        if not self._is_materialized:
+            self._materialize_all()
+        return self._values
+
+    @property
+    def is_materialized(self):
+        if self.serializer.many:
+            return self.serializer._data is not None
+        return self._is_materialized
+
+    def for_each(self, func, keys=None):
+        """
+        call func(key, value) on each element of the top level lists (and on the other top level values),
+        only for the given keys if any
+
+        the values already serialized are processed now, the others when they are
+        """
+        self._walkers.append((keys, func))
+        for key, value in list(self._get_values().items()):
+            if not isinstance(value, _Pending) and (keys is None or key in keys):
+                _apply(func, key, value)
+
+    def later(self, func, keys):
+        """
+        call func(self) once all the top level values have been serialized,
+        func can only change the top level values 'keys'
+        """
+        if self._is_materialized:
+            func(self)
+            return
+        self._finalizers.append(func)
+        self._late_keys.extend(k for k in keys if k not in self._late_keys)
+
+    def __getitem__(self, key):
+        self._access(key)
+        return self._materialize(key)
+
+    def __setitem__(self, key, value):
+        self._access(key)
+        self._get_values()[key] = value
+
+    def __delitem__(self, key):
+        self._access(key)
+        del self._get_values()[key]
+
+    def __contains__(self, key):
+        self._access(key)
+        return key in self._get_values()
+
+    def __iter__(self):
+        return iter(list(self._get_values().keys()))
+
+    def __len__(self):
+        return len(self._get_values())
+
+    def __sizeof__(self):
+        # the size of the top level dict of the response, like sys.getsizeof on it
+        return sys.getsizeof(self._get_values())
+
+    def keys(self):
+        return list(self._get_values().keys())
+
+    def values(self):
+        return list(self.data.values())
+
+    def items(self):
+        return list(self.data.items())
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def update(self, other):
+        for key, value in other.items():
+            self[key] = value
+
+    def stream(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        if self.is_materialized:
+            return iter([ujson.dumps(self.data)])
+        if self.serializer.many:
+            return self._stream_many(chunk_size)
+        return self._stream_object(chunk_size)
+
+    def _stream_many(self, chunk_size):
+        chunks = _Chunks(chunk_size)
+        for chunk in _stream_list(self.serializer, self.serializer.instance, chunks):
+            yield chunk
+        chunk = chunks.pop(force=True)
+        if chunk:
+            yield chunk
+
+    def _stream_object(self, chunk_size):
+        chunks = _Chunks(chunk_size)
+        values = self._get_values()
+        written = set()
+        chunks.parts.append('{')
+        for key in list(values.keys()):
+            if key in self._late_keys:
+                continue
+            _write_key(chunks.parts, not written, key)
+            for chunk in self._stream_value(key, chunks):
+                yield chunk
+            written.add(key)
+
+        # the values completed from all the others are written last
+        self._run_finalizers()
+        for key in list(values.keys()):
+            if key in written:
+                continue
+            _write_key(chunks.parts, not written, key)
+            chunks.parts.append(ujson.dumps(self._materialize(key)))
+            written.add(key)
+        chunks.parts.append('}')
+        chunk = chunks.pop(force=True)
+        if chunk:
+            yield chunk
+
+    def _stream_value(self, key, chunks):
+        value = self._values[key]
+        if not isinstance(value, _Pending):
+            chunks.parts.append(ujson.dumps(value))
+            return
+        field = value.field
+        walked = any(keys is None or key in keys for keys, _ in self._walkers)
+        if not field.many:
+            if walked:
+                chunks.parts.append(ujson.dumps(self._materialize(key)))
+            else:
+                _write_object(field, value.instance, chunks.parts)
+        elif not walked:
+            for chunk in _stream_list(field, value.instance, chunks):
+                yield chunk
+        else:
+            # each element is built as a dict so the decorators can see it, and written right away
+            chunks.parts.append('[')
+            for i, item in enumerate(value.instance):
+                if i:
+                    chunks.parts.append(',')
+                element = field._serialize(item, field._compiled_fields)
+                self._walk(key, element)
+                chunks.parts.append(ujson.dumps(element))
+                chunk = chunks.pop()
+                if chunk:
+                    yield chunk
+            chunks.parts.append(']')
+        self._values[key] = _streamed
+
+
+def stream(serializer, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    generator of the json chunks of serializer.data
+
+    the chunks are flushed between the elements of the top level lists (the response itself
+    or the lists of the response object) so only the element being written is kept in memory
+    """
+    return StreamedSerialization(serializer).stream(chunk_size)
+
+
+def to_json(serializer):
+    """
+    >>> class Foo(serpy.Serializer):
+    ...     a = serpy.IntField()
+    >>> class Bar(serpy.Serializer):
+    ...     foos = Foo(many=True)
+    ...     name = serpy.StrField()
+    >>> class Obj(object):
+    ...     def __init__(self, **kwargs):
+    ...         self.__dict__.update(kwargs)
+    >>> bar = Obj(name='bob', foos=[Obj(a=1), Obj(a=2)])
+    >>> to_json(Bar(bar)) == ujson.dumps(Bar(bar).data)
+    True
+    """
+    return ''.join(stream(serializer))
+
+
+def for_each(response, func, keys=None):
+    """
+    call func(key, value) on each element of the top level lists of a response (and on its other
+    top level values), only for the given keys if any
+
+    on a streamed response, the values not serialized yet are processed when they are
+    """
+    if isinstance(response, StreamedSerialization):
+        response.for_each(func, keys)
+        return
+    for key, value in list(response.items()):
+        if keys is None or key in keys:
+            _apply(func, key, value)
+
+
+def later(response, func, keys):
+    """
+    call func(response) once for_each has processed all the values of the response
+
+    func can only change the top level values 'keys' of the response, on a streamed response they
+    are written after the others. On a dict func is called right away
+    """
+    if isinstance(response, StreamedSerialization):
+        response.later(func, keys)
+    else:
+        func(response)
@@ -29,10 +29,13 @@
 
 from __future__ import absolute_import, print_function, unicode_literals, division
 import pytest
-from jormungandr import i_manager
+import gevent
+from flask import g
+from jormungandr import i_manager, app
 from jormungandr.exceptions import RegionNotFound
 from jormungandr.interfaces.v1.journey_common import compute_regions, sort_regions
-from navitiacommon import models
+from jormungandr.interfaces.v1.Journeys import Journeys
+from navitiacommon import models, response_pb2
 
 
 class MockInstance:
@@ -210,3 +213,36 @@ class TestMultiCoverage:
         assert regions[2].name == self.regions['netherlands'].name
         assert regions[3].name == self.regions['france'].name
         assert regions[4].name == self.regions['equador'].name
+
+
+def get_responses_by_region_in_parallel_test(mocker):
+    """
+    the regions are computed in parallel but the responses are given in the order of the regions,
+    the computation still running when the caller stops are killed
+    """
+    durations = {'slow_first': 0.05, 'fast_second': 0, 'never_used': 1}
+    finished = []
+
+    def compute(region, args, api):
+        gevent.sleep(durations[region])
+        finished.append(region)
+        resp = response_pb2.Response()
+        resp.journeys.add()
+        return resp
+
+    journeys = Journeys()
+    mocker.patch.object(journeys, '_compute_journeys_on_region', side_effect=compute)
+    mocker.patch.dict(app.config, {'JOURNEYS_PARALLEL_REGIONS': 3})
+    with app.test_request_context('/'):
+        responses = journeys._get_responses_by_region(
+            ['slow_first', 'fast_second', 'never_used'], {'debug': True}, 'journeys'
+        )
+        region, _ = next(responses)
+        assert region == 'slow_first'
+        assert finished == ['fast_second', 'slow_first']
+        responses.close()
+
+        gevent.sleep(0)
+        assert finished == ['fast_second', 'slow_first']
+        assert g.regions_called == ['slow_first']
+        assert g.duration_by_region['slow_first'] >= 50
@@ -0,0 +1,370 @@
+# encoding: utf-8
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import OrderedDict
+import json
+import mock
+import pytz
+import ujson
+from flask import g, request
+from jormungandr import app, i_manager
+from jormungandr.interfaces.v1.make_links import add_id_links, add_pagination_links, clean_links
+from jormungandr.interfaces.v1.ResourceUri import add_computed_resources, complete_links
+from jormungandr.interfaces.v1.Schedules import add_passages_links
+from jormungandr.interfaces.v1.serializer import api, serialize_with
+from jormungandr.interfaces.v1.serializer.streaming import StreamedSerialization, to_json
+from jormungandr.parking_space_availability.bss.bss_provider_manager import BssProviderManager
+from jormungandr.parking_space_availability.parking_places_manager import ManageParkingPlaces
+from jormungandr.stat_manager import StatManager, manage_stat_caller
+from navitiacommon import response_pb2, stat_pb2, type_pb2
+
+# the context of the response is computed from '_current_datetime', so both serializations give the same
+REQUEST = '/?_current_datetime=20200101T120000'
+JOURNEYS_REQUEST = '/v1/coverage/test/journeys?from=poi:station_1&to=address:C&_current_datetime=20200101T120000'
+DEPARTURES_REQUEST = '/v1/coverage/test/stop_points/stop_point:A/departures?_current_datetime=20200101T120000'
+
+BSS_CONFIG = [{'class': 'jormungandr.parking_space_availability.bss.tests.BssMockProvider'}]
+
+
+def fill_stop_point(place, uri, name, lon, lat):
+    place.uri = uri
+    place.name = name
+    place.embedded_type = type_pb2.STOP_POINT
+    place.stop_point.uri = uri
+    place.stop_point.name = name
+    place.stop_point.coord.lon = lon
+    place.stop_point.coord.lat = lat
+    admin = place.stop_point.administrative_regions.add()
+    admin.uri = 'admin:fr:75056'
+    admin.name = 'Paris'
+    admin.level = 8
+    admin.insee = '75056'
+
+
+def fill_bss_station(place):
+    place.uri = 'station_1'
+    place.name = 'station 1'
+    place.embedded_type = type_pb2.POI
+    place.poi.uri = 'station_1'
+    place.poi.name = 'station 1'
+    place.poi.poi_type.uri = 'poi_type:amenity:bicycle_rental'
+    place.poi.poi_type.name = 'station vls'
+    place.poi.coord.lon = 2.36
+    place.poi.coord.lat = 48.85
+
+
+def fill_address(place):
+    place.uri = 'address:C'
+    place.name = 'rue C'
+    place.embedded_type = type_pb2.ADDRESS
+    place.address.uri = 'address:C'
+    place.address.name = 'rue C'
+    place.address.coord.lon = 2.38
+    place.address.coord.lat = 48.86
+
+
+def make_journeys_response():
+    """
+    journeys from a bss station to an address through a public transport section
+    """
+    resp = response_pb2.Response()
+    feed_publisher = resp.feed_publishers.add()
+    feed_publisher.id = 'builder'
+    feed_publisher.name = 'the builder'
+    for i in range(3):
+        journey = resp.journeys.add()
+        journey.duration = 1200 + i
+        journey.nb_transfers = 0
+        journey.requested_date_time = 1577880000
+        journey.departure_date_time = 1577880000 + i * 60
+        journey.arrival_date_time = 1577881200 + i * 60
+        journey.type = 'best' if i == 0 else 'rapid'
+        journey.tags.append('walking')
+
+        section = journey.sections.add()
+        section.type = response_pb2.STREET_NETWORK
+        section.street_network.mode = response_pb2.Walking
+        section.duration = 300
+        section.begin_date_time = journey.departure_date_time
+        section.end_date_time = journey.departure_date_time + 300
+        fill_bss_station(section.origin)
+        fill_stop_point(section.destination, 'stop_point:A', 'A', 2.37, 48.85)
+
+        section = journey.sections.add()
+        section.type = response_pb2.PUBLIC_TRANSPORT
+        section.duration = 600
+        section.begin_date_time = journey.departure_date_time + 300
+        section.end_date_time = journey.departure_date_time + 900
+        section.pt_display_informations.uris.line = 'line:1'
+        section.pt_display_informations.uris.vehicle_journey = 'vj:{}'.format(i)
+        section.pt_display_informations.direction = 'B'
+        fill_stop_point(section.origin, 'stop_point:A', 'A', 2.37, 48.85)
+        fill_stop_point(section.destination, 'stop_point:B', 'B', 2.38, 48.86)
+
+        section = journey.sections.add()
+        section.type = response_pb2.STREET_NETWORK
+        section.street_network.mode = response_pb2.Walking
+        section.duration = 300 + i
+        section.begin_date_time = journey.departure_date_time + 900
+        section.end_date_time = journey.arrival_date_time
+        fill_stop_point(section.origin, 'stop_point:B', 'B', 2.38, 48.86)
+        fill_address(section.destination)
+    return resp
+
+
+def make_departures_response():
+    resp = response_pb2.Response()
+    for i in range(3):
+        passage = resp.next_departures.add()
+        passage.stop_date_time.departure_date_time = 1577880000 + i * 60
+        passage.stop_date_time.arrival_date_time = 1577880000 + i * 60
+        passage.stop_date_time.data_freshness = type_pb2.REALTIME
+        passage.route.uri = 'route:{}'.format(i)
+        passage.route.name = 'route {}'.format(i)
+        passage.stop_point.uri = 'stop_point:A'
+        passage.stop_point.name = 'A'
+        passage.pt_display_informations.direction = 'B'
+        passage.pt_display_informations.uris.line = 'line:1'
+        passage.pt_display_informations.uris.vehicle_journey = 'vj:{}'.format(i)
+    resp.pagination.totalResult = 30
+    resp.pagination.startPage = 0
+    resp.pagination.itemsPerPage = 3
+    resp.pagination.itemsOnPage = 3
+    return resp
+
+
+def check_streamed_as_dict(serializer_cls, resp):
+    with app.test_request_context(REQUEST):
+        # same values and same key order as the dict path
+        assert to_json(serializer_cls(resp)) == ujson.dumps(serializer_cls(resp).data)
+        assert ''.join(StreamedSerialization(serializer_cls(resp)).stream(chunk_size=1)) == ujson.dumps(
+            serializer_cls(resp).data
+        )
+
+
+def journeys_streamed_as_dict_test():
+    check_streamed_as_dict(api.JourneysSerializer, make_journeys_response())
+
+
+def departures_streamed_as_dict_test():
+    check_streamed_as_dict(api.DeparturesSerializer, make_departures_response())
+
+
+def display_none_streamed_as_dict_test():
+    """
+    the empty fields are written only when the serializer displays them, as with the dict path
+    """
+    resp = response_pb2.Response()
+    check_streamed_as_dict(api.JourneysSerializer, resp)
+    check_streamed_as_dict(api.DeparturesSerializer, resp)
+    with app.test_request_context(REQUEST):
+        streamed = ujson.loads(to_json(api.DeparturesSerializer(resp)))
+        assert streamed['departures'] == []
+        assert 'error' not in ujson.loads(to_json(api.JourneysSerializer(resp)))
+
+
+class FakeParser(object):
+    def parse_args(self):
+        return {'add_poi_infos': ['bss_stands']}
+
+
+class FakeResource(object):
+    region = 'test'
+
+    def __init__(self):
+        self.parsers = {'get': FakeParser()}
+
+
+class FakeInstance(object):
+    bss_provider = True
+    car_park_provider = False
+
+
+def journeys_decorators(resource, stat_manager):
+    return [
+        ManageParkingPlaces(resource, 'journeys'),
+        manage_stat_caller(stat_manager),
+        add_id_links(),
+        add_computed_resources(resource),
+        add_pagination_links(),
+        clean_links(),
+        complete_links(resource),
+    ]
+
+
+def departures_decorators(resource, stat_manager):
+    return [
+        manage_stat_caller(stat_manager),
+        add_id_links(),
+        add_computed_resources(resource),
+        add_pagination_links(),
+        clean_links(),
+        complete_links(resource),
+        add_passages_links(),
+    ]
+
+
+def links_decorators(resource, stat_manager):
+    return [add_id_links(), clean_links()]
+
+
+class Serialization(object):
+    """
+    a response serialized and post-processed by the decorators of its api, with or without streaming
+    """
+
+    def __init__(self, url, serializer_cls, resp, make_decorators, streaming, read_before_writing=None):
+        self.stats = []
+        self.provider_calls = []
+        stat_manager = StatManager()
+        stat_manager.save_stat = True
+        stat_manager.publish_request = lambda api, pbf: self.stats.append(pbf)
+        bss_provider_manager = BssProviderManager(BSS_CONFIG)
+        provider = bss_provider_manager.get_providers()[0]
+        get_informations = provider.get_informations
+        provider.get_informations = lambda poi: self.provider_calls.append(poi['id']) or get_informations(poi)
+
+        with mock.patch.dict(app.config, {str('STREAMING_SERIALIZATION'): streaming}), mock.patch.dict(
+            i_manager.instances, {'test': FakeInstance()}
+        ), mock.patch(
+            'jormungandr.parking_space_availability.parking_places_manager.bss_provider_manager',
+            bss_provider_manager,
+        ), app.test_request_context(
+            url
+        ):
+            g.timezone = pytz.timezone('Europe/Paris')
+            get = serialize_with(serializer_cls, streaming=True)(lambda **kwargs: (resp, 200, {}))
+            for decorator in make_decorators(FakeResource(), stat_manager):
+                get = decorator(get)
+            self.data, _, _ = get(**request.view_args)
+            self.is_streamed = isinstance(self.data, StreamedSerialization)
+            if read_before_writing:
+                read_before_writing(self.data)
+            self.is_materialized_before_writing = self.is_streamed and self.data.is_materialized
+            self.nb_stats_before_writing = len(self.stats)
+            if self.is_streamed:
+                self.chunks = list(self.data.stream(chunk_size=1))
+            else:
+                self.chunks = [ujson.dumps(self.data)]
+
+    def json(self):
+        return json.loads(''.join(self.chunks), object_pairs_hook=OrderedDict)
+
+    def stat(self):
+        assert len(self.stats) == 1
+        stat = stat_pb2.StatRequest()
+        stat.ParseFromString(self.stats[0])
+        return stat
+
+
+def check_streamed_with_decorators(url, serializer_cls, resp, make_decorators, late_keys):
+    """
+    the real decorators give the same response when it's streamed, only the top level keys they complete
+    once all the others are known (late_keys) are written last
+    """
+    expected = Serialization(url, serializer_cls, resp, make_decorators, streaming=False)
+    streamed = Serialization(url, serializer_cls, resp, make_decorators, streaming=True)
+    assert not expected.is_streamed
+    assert streamed.is_streamed
+
+    # nothing has been built as a dict before the response is written, it's written element by element
+    assert not streamed.is_materialized_before_writing
+    assert len(streamed.chunks) > len(resp.journeys) + len(resp.next_departures)
+
+    expected_json = expected.json()
+    streamed_json = streamed.json()
+    assert set(streamed_json) == set(expected_json)
+    for key, value in expected_json.items():
+        # the nested objects have the same keys in the same order
+        assert streamed_json[key] == value
+    late = [key for key in expected_json if key in late_keys]
+    assert list(streamed_json) == [key for key in expected_json if key not in late_keys] + late
+    return expected, streamed
+
+
+def journeys_streamed_with_decorators_test():
+    expected, streamed = check_streamed_with_decorators(
+        JOURNEYS_REQUEST,
+        api.JourneysSerializer,
+        make_journeys_response(),
+        journeys_decorators,
+        ('feed_publishers', 'links', 'notes', 'exceptions'),
+    )
+    journeys = streamed.json()['journeys']
+    assert len(journeys) == 3
+    for journey in journeys:
+        assert journey['sections'][0]['from']['poi']['stands']['available_bikes'] == 9
+    assert [f['name'] for f in streamed.json()['feed_publishers']] == ['the builder', 'mock provider']
+    assert streamed.json()['links']
+
+    # the station is asked once for all the journeys
+    assert streamed.provider_calls == expected.provider_calls == ['station_1']
+
+    # the stat is published once all the journeys have been written, with the same journeys
+    assert expected.nb_stats_before_writing == 1
+    assert streamed.nb_stats_before_writing == 0
+    expected_stat = expected.stat()
+    streamed_stat = streamed.stat()
+    assert len(streamed_stat.journeys) == 3
+    assert streamed_stat.journeys == expected_stat.journeys
+    assert streamed_stat.journey_request == expected_stat.journey_request
+    assert streamed_stat.journey_request.departure_insee == '75056'
+
+
+def departures_streamed_with_decorators_test():
+    expected, streamed = check_streamed_with_decorators(
+        DEPARTURES_REQUEST,
+        api.DeparturesSerializer,
+        make_departures_response(),
+        departures_decorators,
+        ('links', 'notes', 'exceptions'),
+    )
+    assert len(streamed.json()['departures']) == 3
+    assert {l['type'] for l in streamed.json()['links']} >= {'next', 'first', 'last'}
+    assert streamed.stat().info_response.object_count == expected.stat().info_response.object_count == 3
+
+
+def streamed_accessed_as_dict_test():
+    """
+    a late key read before the streaming gets the completed value, the response is then written as a dict
+    """
+    resp = make_journeys_response()
+    expected = Serialization(JOURNEYS_REQUEST, api.JourneysSerializer, resp, links_decorators, streaming=False)
+    streamed = Serialization(
+        JOURNEYS_REQUEST,
+        api.JourneysSerializer,
+        resp,
+        links_decorators,
+        streaming=True,
+        read_before_writing=lambda data: data['links'],
+    )
+    assert streamed.is_materialized_before_writing
+    assert streamed.chunks == expected.chunks
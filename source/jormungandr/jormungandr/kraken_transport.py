@@ -0,0 +1,193 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+
+try:
+    from typing import Deque, Dict, Tuple, Text
+except ImportError:
+    pass
+from collections import deque
+from contextlib import contextmanager
+from zmq import green as zmq
+from gevent.lock import BoundedSemaphore
+import itertools
+import logging
+import time
+
+
+class KrakenTransport(object):
+    """
+    Transport used to send requests to a kraken
+
+    The connections are DEALER sockets shared by all the greenlets of the worker: a call borrows a connection,
+    sends its request and waits for the response on it before giving it back.
+    The kraken's load balancer only echoes the client envelope, there is no correlation frame in the response,
+    so a connection carries only one request at a time. The in-flight calls are tracked by their request_id.
+
+    The number of connections to a kraken is bounded by max_connections (0 means unbounded), calls in excess
+    wait for a connection to be released. Their waiting time counts in their timeout.
+    """
+
+    def __init__(self, context, socket_path, name, max_connections=0):
+        # type: (zmq.Context, Text, Text, int) -> None
+        self.context = context
+        self.socket_path = socket_path
+        self.name = name
+        self.max_connections = max_connections
+        self._idle_connections = deque()  # type: Deque[Tuple[zmq.Socket, float]]
+        self._slots = BoundedSemaphore(max_connections) if max_connections > 0 else None
+        self._in_flight = {}  # type: Dict[int, Tuple[Text, float]]
+        self._call_ids = itertools.count()
+        self.nb_connections = 0
+        self.nb_waiting = 0
+        self.nb_calls = 0
+        self.nb_timeouts = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def _open_connection(self):
+        socket = self.context.socket(zmq.DEALER)
+        socket.connect(self.socket_path)
+        self.nb_connections += 1
+        return socket
+
+    def _close_connection(self, socket):
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.close()
+        self.nb_connections -= 1
+
+    def _acquire_slot(self, timeout):
+        """
+        wait for a connection slot, return False if none has been released before the timeout (in ms)
+        """
+        if self._slots is None:
+            return True
+        self.nb_waiting += 1
+        try:
+            return self._slots.acquire(timeout=timeout / 1000.0)
+        finally:
+            self.nb_waiting -= 1
+
+    def _release_slot(self):
+        if self._slots is not None:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        try:
+            socket, _ = self._idle_connections.pop()
+        except IndexError:  # there is no connection available: lets create one
+            socket = self._open_connection()
+        try:
+            yield socket
+        finally:
+            if not socket.closed:
+                self._idle_connections.append((socket, time.time()))
+
+    def call(self, request, timeout):
+        """
+        send a request to the kraken and return the raw response
+
+        return None if no response has been received before the timeout (in ms)
+        """
+        start = time.time()
+        if not self._acquire_slot(timeout):
+            self.nb_timeouts += 1
+            return None
+        call_id = next(self._call_ids)
+        self._in_flight[call_id] = (request.request_id, start)
+        try:
+            remaining = max(timeout - (time.time() - start) * 1000, 0)
+            with self.connection() as socket:
+                try:
+                    # we build the envelope of a REQ socket so the kraken's ROUTER sees the same frames
+                    socket.send_multipart([b'', request.SerializeToString()])
+                    if socket.poll(timeout=remaining) > 0:
+                        frames = socket.recv_multipart()
+                        self._record_latency(time.time() - start)
+                        return frames[-1]
+                except BaseException:
+                    # the call has been interrupted (the greenlet has been killed for example),
+                    # the response may still come later on this connection, it can't be reused
+                    self._close_connection(socket)
+                    raise
+                # the response may still come later on this connection, it can't be reused
+                self._close_connection(socket)
+                self.nb_timeouts += 1
+                return None
+        finally:
+            del self._in_flight[call_id]
+            self._release_slot()
+
+    def _record_latency(self, duration):
+        self.nb_calls += 1
+        self.total_latency += duration
+        self.max_latency = max(self.max_latency, duration)
+
+    def in_flight_requests(self):
+        """
+        return the request_id of the calls currently waiting for a response
+        """
+        return [request_id for request_id, _ in self._in_flight.values()]
+
+    def reap(self, ttl):
+        # type: (int) -> None
+        """
+        close the connections that have been idle for more than ttl seconds
+        """
+        logger = logging.getLogger(__name__)
+        now = time.time()
+        while True:
+            try:
+                socket, t = self._idle_connections.popleft()
+                if now - t > ttl:
+                    logger.debug("closing one socket for %s", self.name)
+                    self._close_connection(socket)
+                else:
+                    self._idle_connections.appendleft((socket, t))
+                    break  # remaining socket are still in "keep alive" state
+            except IndexError:
+                break
+
+    def status(self):
+        return {
+            'connections': self.nb_connections,
+            'idle_connections': len(self._idle_connections),
+            'max_connections': self.max_connections,
+            'in_flight': len(self._in_flight),
+            'queue_depth': self.nb_waiting,
+            'nb_calls': self.nb_calls,
+            'nb_timeouts': self.nb_timeouts,
+            'avg_latency_ms': int(self.total_latency * 1000 / self.nb_calls) if self.nb_calls else 0,
+            'max_latency_ms': int(self.max_latency * 1000),
+        }
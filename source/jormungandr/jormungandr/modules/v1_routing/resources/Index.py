@@ -35,13 +35,18 @@ from jormungandr._version import __version__
 from jormungandr.exceptions import DeadSocketException
 from jormungandr.module_resource import ModuleResource
 from navitiacommon import type_pb2, request_pb2
-from jormungandr import i_manager, cache
+from jormungandr import i_manager, cache, two_tier_cache, http_pool, stat_manager
 from jormungandr.protobuf_to_dict import protobuf_to_dict
 from jormungandr import bss_provider_manager
+from jormungandr.autocomplete.result_cache import autocomplete_cache
+from jormungandr.authentication_snapshot import authentication_snapshot
+from jormungandr.rate_limit import rate_limiter
 from jormungandr.interfaces.v1.decorators import get_serializer
 from jormungandr.interfaces.v1.serializer.api import TechnicalStatusSerializer
 from jormungandr.interfaces.v1.serializer.status import CommonStatusSerializer
 from jormungandr.interfaces.v1 import add_common_status
+from jormungandr.scenarios.helper_classes.helper_timings import phase_histograms
+from jormungandr.scenarios.helper_classes.fallback_durations import fallback_durations_cache
 
 
 class Index(ModuleResource):
@@ -76,7 +81,7 @@ class TechnicalStatus(ModuleResource):
     return status for all instances
     """
 
-    @get_serializer(serpy=TechnicalStatusSerializer)
+    @get_serializer(serpy=TechnicalStatusSerializer, streaming=True)
     def get(self):
         response = {
             "jormungandr_version": __version__,
@@ -109,4 +114,27 @@ class TechnicalStatus(ModuleResource):
         if callable(cache_status_op):
             response['redis'] = cache_status_op()
 
+        response['local_cache'] = two_tier_cache.status()
+        response['http_pools'] = http_pool.status()
+        if autocomplete_cache is not None:
+            response['autocomplete_cache'] = autocomplete_cache.status()
+        if stat_manager.queue is not None:
+            response['stat_queue'] = stat_manager.queue.status()
+        if authentication_snapshot is not None:
+            response['authentication_snapshot'] = authentication_snapshot.status()
+        if rate_limiter is not None:
+            response['rate_limit'] = rate_limiter.status()
+        if fallback_durations_cache is not None:
+            response['fallback_durations_cache'] = fallback_durations_cache.status()
+
         return response
+
+
+class FuturesTimings(ModuleResource):
+    """
+    Histograms of the queue, wall and wait times of the futures of the distributed scenario
+    by phase and mode, since the start of the worker
+    """
+
+    def get(self):
+        return {'futures_timings': phase_histograms.to_dict()}, 200
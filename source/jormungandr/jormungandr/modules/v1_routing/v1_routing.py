@@ -121,6 +121,7 @@ class V1Routing(AModule):
         self.add_resource(Index.Index, '/', '', endpoint='index')
         self.module_resources_manager.register_resource(Index.TechnicalStatus())
         self.add_resource(Index.TechnicalStatus, '/status', endpoint='technical_status')
+        self.add_resource(Index.FuturesTimings, '/_futures_timings', endpoint='futures_timings')
         lon_lat = '<lon:lon>;<lat:lat>/'
         coverage = '/coverage/'
         region = coverage + '<region:region>/'
@@ -164,6 +165,15 @@ class V1Routing(AModule):
             )
 
         self.add_resource(Places.Places, region + 'places', coord + 'places', '/places', endpoint='places')
+
+        self.add_resource(
+            Places.PlacesBatch,
+            region + 'places_batch',
+            coord + 'places_batch',
+            '/places_batch',
+            endpoint='places_batch',
+        )
+
         self.add_resource(
             Ptobjects.Ptobjects, region + 'pt_objects', coord + 'pt_objects', endpoint='pt_objects'
         )
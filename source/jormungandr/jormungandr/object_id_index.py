@@ -0,0 +1,95 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import OrderedDict
+import time
+
+
+class _CoverageIds(object):
+    __slots__ = ('publication_date', 'ids')
+
+    def __init__(self, publication_date):
+        self.publication_date = publication_date
+        # object_id -> (has_id, timestamp)
+        self.ids = OrderedDict()
+
+
+class ObjectIdIndex(object):
+    """
+    Remember, for each coverage, the ids that it has and the ids that it doesn't have
+
+    Used to find the coverages of an object id without asking every kraken each time:
+    only the coverages for which the id is unknown are called.
+
+    Unlike the memoize of InstanceManager._all_keys_of_id that is cleared for all the coverages as
+    soon as one of them is reloaded, the ids of a coverage are forgotten only when its own
+    publication_date changes.
+    """
+
+    def __init__(self, max_size_per_coverage=10000, ttl=600):
+        self.max_size_per_coverage = max_size_per_coverage
+        self.ttl = ttl
+        self._coverages = {}
+
+    def _get_coverage_ids(self, instance):
+        publication_date = getattr(instance, 'publication_date', None)
+        coverage_ids = self._coverages.get(instance.name)
+        if coverage_ids is None or coverage_ids.publication_date != publication_date:
+            # new data have been loaded in kraken, what we knew is outdated
+            coverage_ids = _CoverageIds(publication_date)
+            self._coverages[instance.name] = coverage_ids
+        return coverage_ids
+
+    def get(self, instance, object_id):
+        """
+        :return: True if the coverage has the id, False if it doesn't and None if we don't know
+        """
+        coverage_ids = self._get_coverage_ids(instance)
+        entry = coverage_ids.ids.pop(object_id, None)
+        if entry is None:
+            return None
+        has_id, timestamp = entry
+        if self.ttl and timestamp + self.ttl < time.time():
+            return None
+        # most recently used ids are at the end
+        coverage_ids.ids[object_id] = entry
+        return has_id
+
+    def set(self, instance, object_id, has_id):
+        ids = self._get_coverage_ids(instance).ids
+        ids.pop(object_id, None)
+        ids[object_id] = (has_id, time.time())
+        if len(ids) > self.max_size_per_coverage:
+            ids.popitem(last=False)
+
+    def clear(self):
+        self._coverages.clear()
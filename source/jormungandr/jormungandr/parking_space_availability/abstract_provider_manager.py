@@ -28,9 +28,14 @@
 # www.navitia.io
 from __future__ import absolute_import, print_function, unicode_literals, division
 from abc import abstractmethod, ABCMeta
+from collections import OrderedDict
 import six
 from importlib import import_module
 import logging
+import flask
+import gevent
+import gevent.pool
+from jormungandr import utils, app, new_relic
 
 
 def get_from_to_pois_of_journeys(journeys):
@@ -42,17 +47,111 @@ def get_from_to_pois_of_journeys(journeys):
 
 
 class AbstractProviderManager(six.with_metaclass(ABCMeta, object)):
+    # type of the pois handled by the manager
+    poi_type_id = None
+    # field of the poi in which the informations of the provider are added
+    informations_field = None
+
     def __init__(self):
         self.log = logging.getLogger(__name__)
 
-    @abstractmethod
-    def _handle_poi(self, item):
-        pass
-
     @abstractmethod
     def _get_providers(self):
         pass
 
+    def _handle_poi(self, item):
+        providers = self._handle_pois([item])
+        return next(iter(providers), None)
+
+    def _handle_pois(self, pois, known=None):
+        """
+        add the realtime informations of the providers to the pois
+
+        a poi present several times (like the same car park in all the journeys) is asked only once,
+        the providers are called in parallel (at most PARKING_PLACES_POOL_SIZE at the same time) and
+        the pois not answered within PARKING_PLACES_TIME_BUDGET are left without informations.
+
+        known is a dict poi id -> (provider, informations) shared by several calls: the pois in it are
+        not asked again and it's completed with the new ones (None for the pois not answered in time)
+
+        returns the providers used
+        """
+        to_fetch = OrderedDict()  # poi id -> (provider, [pois])
+        providers = set()
+        for poi in pois:
+            if poi.get('poi_type', {}).get('id') != self.poi_type_id:
+                continue
+            key = poi.get('id') or id(poi)
+            if known is not None and key in known:
+                provider, informations = known[key]
+                providers.add(provider)
+                if informations is not None:
+                    poi[self.informations_field] = informations
+                continue
+            if key in to_fetch:
+                to_fetch[key][1].append(poi)
+                continue
+            provider = self._find_provider(poi)
+            if provider:
+                to_fetch[key] = (provider, [poi])
+        if not to_fetch:
+            return providers
+
+        result = self._get_informations(to_fetch)
+        for key, (provider, same_pois) in to_fetch.items():
+            informations = result.get(key)
+            if known is not None:
+                known[key] = (provider, informations)
+            if key not in result:
+                continue
+            for poi in same_pois:
+                poi[self.informations_field] = informations
+        return providers | {provider for provider, _ in to_fetch.values()}
+
+    def _get_informations(self, to_fetch):
+        """
+        returns a dict poi id -> informations of its provider, only for the pois answered in time
+        """
+        pool = gevent.pool.Pool(app.config.get(str('PARKING_PLACES_POOL_SIZE'), 10))
+        # the providers may need the request (for the cache for example)
+        reqctx = utils.copy_flask_request_context() if flask.has_request_context() else None
+
+        def worker(key, provider, poi):
+            try:
+                if reqctx is None:
+                    return key, provider.get_informations(poi)
+                with utils.copy_context_in_greenlet_stack(reqctx):
+                    return key, provider.get_informations(poi)
+            except Exception:
+                self.log.exception('impossible to get the informations of {} from {}'.format(key, provider))
+                return key, None
+
+        result = {}
+        time_budget = app.config.get(str('PARKING_PLACES_TIME_BUDGET')) or None
+        try:
+            with gevent.Timeout(time_budget, False):
+                futures = [
+                    pool.spawn(worker, key, provider, same_pois[0])
+                    for key, (provider, same_pois) in to_fetch.items()
+                ]
+                for future in gevent.iwait(futures):
+                    key, informations = future.get()
+                    result[key] = informations
+        finally:
+            pool.kill()
+
+        nb_timed_out = len([key for key in to_fetch if key not in result])
+        if nb_timed_out:
+            self.log.warning(
+                'parking places time budget of {}s reached, {} pois without informations'.format(
+                    time_budget, nb_timed_out
+                )
+            )
+            new_relic.record_custom_event(
+                'parking_places_timeout', {'poi_type': self.poi_type_id, 'nb_pois': nb_timed_out}
+            )
+        return result
+
     def handle(self, response, attribute):
         if attribute == 'journeys':
             return self.handle_journeys(response[attribute])
@@ -60,25 +159,28 @@ class AbstractProviderManager(six.with_metaclass(ABCMeta, object)):
             return self.handle_places(response[attribute])
         return None
 
-    def handle_places(self, places):
-        providers = set()
+    def handle_element(self, element, attribute, known):
+        """
+        handle only one element of the list 'attribute' of the response,
+        the pois already in known (see _handle_pois) are not asked again
+        """
+        if attribute == 'journeys':
+            return self.handle_journeys([element], known)
+        elif attribute in ('places', 'places_nearby', 'pois'):
+            return self.handle_places([element], known)
+        return None
+
+    def handle_places(self, places, known=None):
+        pois = []
         for place in places or []:
-            provider = None
             if 'poi_type' in place:
-                provider = self._handle_poi(place)
+                pois.append(place)
             elif 'embedded_type' in place and place['embedded_type'] == 'poi':
-                provider = self._handle_poi(place['poi'])
-            if provider:
-                providers.add(provider)
-        return providers
+                pois.append(place['poi'])
+        return self._handle_pois(pois, known)
 
-    def handle_journeys(self, journeys):
-        providers = set()
-        for poi in get_from_to_pois_of_journeys(journeys):
-            provider = self._handle_poi(poi)
-            if provider:
-                providers.add(provider)
-        return providers
+    def handle_journeys(self, journeys, known=None):
+        return self._handle_pois(get_from_to_pois_of_journeys(journeys), known)
 
     def _find_provider(self, poi):
         for provider in self._get_providers():
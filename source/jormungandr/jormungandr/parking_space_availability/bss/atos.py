@@ -30,6 +30,7 @@
 
 from __future__ import absolute_import, print_function, unicode_literals, division
 from contextlib import contextmanager
+import copy
 import logging
 import pybreaker
 import zeep
@@ -63,6 +64,7 @@ class AtosProvider(CommonBssProvider):
             fail_max=kwargs.get('fail_max', 5), reset_timeout=kwargs.get('reset_timeout', 120)
         )
         self._feed_publisher = FeedPublisher(**feed_publisher) if feed_publisher else None
+        self._init_prefetcher(lambda: self.breaker.call(self._get_all_stands.uncached, self), **kwargs)
 
     def __repr__(self):
         return self.WS_URL + str(self.id_ao)
@@ -77,12 +79,14 @@ class AtosProvider(CommonBssProvider):
     def _get_informations(self, poi):
         logging.debug('building stands')
         try:
-            all_stands = self.breaker.call(self._get_all_stands)
+            all_stands = self._get_stations(lambda: self.breaker.call(self._get_all_stands))
             ref = poi.get('properties', {}).get('ref')
             if not ref:
                 return Stands(0, 0, StandsStatus.unavailable)
             stands = all_stands.get(ref.lstrip('0'))
             if stands:
+                # the stands can be shared with the other requests
+                stands = copy.copy(stands)
                 if stands.status != 'open':
                     stands.available_bikes = 0
                     stands.available_places = 0
@@ -117,7 +121,12 @@ class AtosProvider(CommonBssProvider):
             transport.session.close()
 
     def status(self):
-        return {'network': self.network, 'operators': self.operators, 'id_ao': self.id_ao}
+        return {
+            'network': self.network,
+            'operators': self.operators,
+            'id_ao': self.id_ao,
+            'prefetch': self.prefetch_status(),
+        }
 
     def feed_publisher(self):
         return self._feed_publisher
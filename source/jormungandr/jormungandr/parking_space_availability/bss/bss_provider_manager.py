@@ -33,8 +33,14 @@ import datetime
 
 POI_TYPE_ID = 'poi_type:amenity:bicycle_rental'
 
+# the poi -> provider map is reset when it grows above this size
+MAX_POI_PROVIDERS = 100000
+
 
 class BssProviderManager(AbstractProviderManager):
+    poi_type_id = POI_TYPE_ID
+    informations_field = 'stands'
+
     def __init__(self, bss_providers_configuration, providers_getter=None, update_interval=60):
         super(BssProviderManager, self).__init__()
         self._bss_providers_legacy = []
@@ -43,6 +49,8 @@ class BssProviderManager(AbstractProviderManager):
         self._last_update = datetime.datetime(1970, 1, 1)
         self._update_interval = update_interval
         self._providers_getter = providers_getter
+        # provider (or None) of each poi id, reset when the providers change
+        self._poi_providers = {}
         for configuration in bss_providers_configuration:
             arguments = configuration.get('args', {})
             self._bss_providers_legacy.append(self._init_class(configuration['class'], arguments))
@@ -65,6 +73,10 @@ class BssProviderManager(AbstractProviderManager):
             logger.exception('failure to retrieve bss configuration')
         if not providers:
             logger.debug('all providers have be disabled')
+            if self._bss_providers:
+                self._poi_providers = {}
+            for old_provider in self._bss_providers.values():
+                self._stop_prefetch(old_provider)
             self._bss_providers = {}
             self._bss_providers_last_update = {}
             return
@@ -79,6 +91,8 @@ class BssProviderManager(AbstractProviderManager):
                 self.update_provider(provider)
         # remove deleted providers
         for to_delete in set(self._bss_providers.keys()) - {p.id for p in providers}:
+            self._stop_prefetch(self._bss_providers[to_delete])
+            self._poi_providers = {}
             del self._bss_providers[to_delete]
             del self._bss_providers_last_update[to_delete]
             logger.info('deleting bss provider %s', to_delete)
@@ -91,18 +105,37 @@ class BssProviderManager(AbstractProviderManager):
             provider.full_args(),
         )
         try:
+            old_provider = self._bss_providers.get(provider.id)
             self._bss_providers[provider.id] = self._init_class(provider.klass, provider.full_args())
             self._bss_providers_last_update[provider.id] = provider.last_update()
+            self._poi_providers = {}
+            if old_provider:
+                self._stop_prefetch(old_provider)
         except Exception:
             logger.exception('impossible to initialize bss provider')
 
-    def _handle_poi(self, item):
-        if 'poi_type' in item and item['poi_type']['id'] == POI_TYPE_ID:
-            provider = self._find_provider(item)
-            if provider:
-                item['stands'] = provider.get_informations(item)
-                return provider
-        return None
+    @staticmethod
+    def _stop_prefetch(provider):
+        stop_prefetch = getattr(provider, 'stop_prefetch', None)
+        if callable(stop_prefetch):
+            stop_prefetch()
+
+    def _find_provider(self, poi):
+        """
+        the providers only depend on the properties of the poi, so the provider of a poi is searched once
+        """
+        poi_id = poi.get('id')
+        providers = self._get_providers()  # update the providers first, it can reset the map
+        if poi_id is None:
+            return super(BssProviderManager, self)._find_provider(poi)
+        if poi_id in self._poi_providers:
+            return self._poi_providers[poi_id]
+
+        provider = next((p for p in providers if p.support_poi(poi)), None)
+        if len(self._poi_providers) >= MAX_POI_PROVIDERS:
+            self._poi_providers = {}
+        self._poi_providers[poi_id] = provider
+        return provider
 
     # TODO use public version everywhere
     def _get_providers(self):
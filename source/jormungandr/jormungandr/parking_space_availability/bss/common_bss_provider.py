@@ -26,21 +26,141 @@
 # IRC #navitia on freenode
 # https://groups.google.com/d/forum/navitia
 # www.navitia.io
-from jormungandr import new_relic
+from jormungandr import new_relic, app
 from jormungandr.parking_space_availability import AbstractParkingPlacesProvider
 from abc import abstractmethod
 from jormungandr.parking_space_availability.bss.stands import Stands, StandsStatus
+import gevent
+import logging
+import threading
+import time
 
 
 class BssProxyError(RuntimeError):
     pass
 
 
+class StationsPrefetcher(object):
+    """
+    Refresh periodically in background all the stations of a provider
+
+    The requests only read the last fetched stations, they never wait for the provider:
+    if the stations are too old (or not fetched yet), they are unavailable
+
+    The calls to the provider are blocking without gevent's socket patch, the loop then runs in a thread
+    """
+
+    def __init__(self, name, fetch, interval, max_staleness=None):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.max_staleness = max_staleness or 3 * interval
+        self._stations = None
+        self._last_update = None
+        self._worker = None
+        self._stop_event = None
+        self.nb_refreshes = 0
+        self.nb_errors = 0
+
+    def _is_running(self):
+        if isinstance(self._worker, threading.Thread):
+            return self._worker.is_alive()
+        return self._worker is not None and not self._worker.dead
+
+    def start(self):
+        # started lazily to run in the workers and not in the master process
+        if self._is_running():
+            return
+        from gevent import monkey
+
+        if monkey.is_module_patched('socket'):
+            self._worker = gevent.spawn(self._run, gevent.sleep)
+        else:
+            self._stop_event = threading.Event()
+            self._worker = threading.Thread(
+                target=self._run, args=(self._stop_event.wait,), name='bss_prefetch_{}'.format(self.name)
+            )
+            self._worker.daemon = True
+            self._worker.start()
+
+    def stop(self):
+        if isinstance(self._worker, threading.Thread):
+            # a thread can't be killed, it stops at the end of its sleep
+            self._stop_event.set()
+        elif self._worker is not None:
+            self._worker.kill(block=False)
+        self._worker = None
+
+    def refresh(self):
+        try:
+            stations = self.fetch()
+        except Exception as e:
+            self.nb_errors += 1
+            logging.getLogger(__name__).warning(
+                'impossible to prefetch the stations of {}: {}'.format(self.name, e)
+            )
+            return False
+        self._stations = stations or {}
+        self._last_update = time.time()
+        self.nb_refreshes += 1
+        return True
+
+    def _run(self, sleep):
+        while True:
+            self.refresh()
+            # the Event.wait of the threads returns True once the prefetcher is stopped
+            if sleep(self.interval):
+                return
+
+    def get(self):
+        self.start()
+        if self._last_update is None or time.time() - self._last_update > self.max_staleness:
+            raise BssProxyError('no fresh prefetched stations')
+        return self._stations
+
+    def status(self):
+        return {
+            'interval': self.interval,
+            'nb_stations': len(self._stations or {}),
+            'age': int(time.time() - self._last_update) if self._last_update else None,
+            'nb_refreshes': self.nb_refreshes,
+            'nb_errors': self.nb_errors,
+        }
+
+
 class CommonBssProvider(AbstractParkingPlacesProvider):
+    prefetcher = None
+
     @abstractmethod
     def _get_informations(self, poi):
         pass
 
+    def _init_prefetcher(self, fetch, **kwargs):
+        """
+        with a prefetch_interval (in s) all the stations are fetched by a background loop,
+        fetch is the call returning all the stations indexed by their ref, without cache
+        """
+        interval = kwargs.get('prefetch_interval', app.config.get(str('BSS_PREFETCH_INTERVAL'), 0))
+        if interval:
+            self.prefetcher = StationsPrefetcher(
+                repr(self), fetch, interval, kwargs.get('prefetch_max_staleness')
+            )
+
+    def _get_stations(self, call):
+        """
+        the prefetched stations if the prefetch is activated, the result of call otherwise
+        """
+        if self.prefetcher:
+            return self.prefetcher.get()
+        return call()
+
+    def prefetch_status(self):
+        return self.prefetcher.status() if self.prefetcher else None
+
+    def stop_prefetch(self):
+        if self.prefetcher:
+            self.prefetcher.stop()
+
     def get_informations(self, poi):
         try:
             stand = self._get_informations(poi)
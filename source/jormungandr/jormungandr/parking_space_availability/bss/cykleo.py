@@ -29,7 +29,7 @@
 # https://groups.google.com/d/forum/navitia
 # www.navitia.io
 from __future__ import absolute_import, print_function, unicode_literals, division
-from jormungandr import cache, app
+from jormungandr import cache, app, http_pool
 import pybreaker
 import logging
 import json
@@ -92,6 +92,7 @@ class CykleoProvider(CommonBssProvider):
         self.password = password
         self.operators = [o.lower() for o in operators]
         self.timeout = timeout
+        self.session = http_pool.get_session('bss:{}'.format(self.network))
         self.breaker = pybreaker.CircuitBreaker(
             fail_max=kwargs.get('circuit_breaker_max_fail', app.config['CIRCUIT_BREAKER_MAX_CYKLEO_FAIL']),
             reset_timeout=kwargs.get(
@@ -99,6 +100,7 @@ class CykleoProvider(CommonBssProvider):
             ),
         )
         self._feed_publisher = FeedPublisher(**feed_publisher) if feed_publisher else None
+        self._init_prefetcher(lambda: self._call_webservice.uncached(self), **kwargs)
 
     def service_caller(self, method, url, headers, data=None, params=None):
         try:
@@ -132,7 +134,7 @@ class CykleoProvider(CommonBssProvider):
             data.update({"serviceId": self.service_id})
 
         response = self.service_caller(
-            method=requests.post, url='{}/bo/auth'.format(self.url), headers=headers, data=json.dumps(data)
+            method=self.session.post, url='{}/bo/auth'.format(self.url), headers=headers, data=json.dumps(data)
         )
         if not response:
             return None
@@ -149,7 +151,7 @@ class CykleoProvider(CommonBssProvider):
         headers = {'Authorization': 'Bearer {}'.format(access_token)}
         params = None if self.organization_id is None else {'organization_id': self.organization_id}
         data = self.service_caller(
-            method=requests.get,
+            method=self.session.get,
             url='{}/bo/stations/availability'.format(self.url),
             headers=headers,
             params=params,
@@ -169,7 +171,7 @@ class CykleoProvider(CommonBssProvider):
         )
 
     def status(self):
-        return {'network': self.network, 'operators': self.operators}
+        return {'network': self.network, 'operators': self.operators, 'prefetch': self.prefetch_status()}
 
     def feed_publisher(self):
         return self._feed_publisher
@@ -181,7 +183,7 @@ class CykleoProvider(CommonBssProvider):
         ref = poi.get('properties', {}).get('ref')
         if ref is not None:
             ref = ref.lstrip('0')
-        data = self._call_webservice()
+        data = self._get_stations(self._call_webservice)
 
         # Possible status values of the station: IN_SERVICE, IN_MAINTENANCE, OUT_OF_SERVICE, DISCONNECTED
         # and DECOMMISSIONED
@@ -32,7 +32,7 @@ import logging
 import pybreaker
 import requests as requests
 
-from jormungandr import cache, app
+from jormungandr import cache, app, http_pool
 from jormungandr.parking_space_availability.bss.common_bss_provider import CommonBssProvider, BssProxyError
 from jormungandr.parking_space_availability.bss.stands import Stands, StandsStatus
 from jormungandr.ptref import FeedPublisher
@@ -64,12 +64,14 @@ class JcdecauxProvider(CommonBssProvider):
         self.api_key = api_key
         self.operators = [o.lower() for o in operators]
         self.timeout = timeout
+        self.session = http_pool.get_session('bss:{}'.format(self.network))
         fail_max = kwargs.get('circuit_breaker_max_fail', app.config['CIRCUIT_BREAKER_MAX_JCDECAUX_FAIL'])
         reset_timeout = kwargs.get(
             'circuit_breaker_reset_timeout', app.config['CIRCUIT_BREAKER_JCDECAUX_TIMEOUT_S']
         )
         self.breaker = pybreaker.CircuitBreaker(fail_max=fail_max, reset_timeout=reset_timeout)
         self._feed_publisher = FeedPublisher(**feed_publisher) if feed_publisher else None
+        self._init_prefetcher(lambda: self._call_webservice.uncached(self), **kwargs)
 
     def support_poi(self, poi):
         properties = poi.get('properties', {})
@@ -82,7 +84,7 @@ class JcdecauxProvider(CommonBssProvider):
     def _call_webservice(self):
         try:
             data = self.breaker.call(
-                requests.get, self.WS_URL_TEMPLATE.format(self.contract, self.api_key), timeout=self.timeout
+                self.session.get, self.WS_URL_TEMPLATE.format(self.contract, self.api_key), timeout=self.timeout
             )
             stands = {}
             for s in data.json():
@@ -101,7 +103,7 @@ class JcdecauxProvider(CommonBssProvider):
     def _get_informations(self, poi):
         # Possible status values of the station: OPEN and CLOSED
         ref = poi.get('properties', {}).get('ref')
-        data = self._call_webservice()
+        data = self._get_stations(self._call_webservice)
         if data and 'status' in data.get(ref, {}):
             if data[ref]['status'] == 'OPEN':
                 return Stands(
@@ -114,7 +116,12 @@ class JcdecauxProvider(CommonBssProvider):
         return Stands(0, 0, StandsStatus.unavailable)
 
     def status(self):
-        return {'network': self.network, 'operators': self.operators, 'contract': self.contract}
+        return {
+            'network': self.network,
+            'operators': self.operators,
+            'contract': self.contract,
+            'prefetch': self.prefetch_status(),
+        }
 
     def feed_publisher(self):
         return self._feed_publisher
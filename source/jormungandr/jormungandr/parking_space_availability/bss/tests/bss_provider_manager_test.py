@@ -30,7 +30,10 @@
 
 from __future__ import absolute_import, print_function, unicode_literals, division
 import pytest
+import gevent
+from jormungandr import app
 from jormungandr.parking_space_availability.bss.bss_provider_manager import BssProviderManager
+from jormungandr.parking_space_availability.bss.stands import Stands, StandsStatus
 from navitiacommon.models import BssProvider
 
 CONFIG = [{'class': 'jormungandr.parking_space_availability.bss.tests.BssMockProvider'}]
@@ -268,3 +271,99 @@ def realtime_pois_handle_from_db_test():
     assert stands.available_bikes == 9
     assert stands.total_stands == 14
     assert stands.status == 'open'
+
+
+def bss_provider_manager_poi_providers_map_test():
+    """
+    the provider of a poi is searched once, until the providers change
+    """
+    poi = {'poi_type': {'name': 'station vls', 'id': 'poi_type:amenity:bicycle_rental'}, 'id': 'station_1'}
+    manager = BssProviderManager([], provider_getter_ok, -1)
+    provider = manager._find_provider(poi)
+    assert provider
+    assert manager._poi_providers == {'station_1': provider}
+
+    provider.support_poi = lambda poi: False
+    assert manager._find_provider(poi) is provider
+
+    # the pois without provider are also kept
+    other_poi = {'poi_type': {'id': 'poi_type:amenity:bicycle_rental'}, 'id': 'station_2'}
+    assert manager._find_provider(other_poi) is None
+    assert 'station_2' in manager._poi_providers
+
+    manager._providers_getter = provider_getter_empty
+    assert manager._find_provider(poi) is None
+
+
+def bss_poi(poi_id):
+    return {'embedded_type': 'poi', 'poi': {'id': poi_id, 'poi_type': {'id': 'poi_type:amenity:bicycle_rental'}}}
+
+
+def realtime_journeys_pois_asked_once_test():
+    """
+    the same station in several journeys is asked only once to the provider
+    """
+    journeys = [{'sections': [{'from': bss_poi('station_1'), 'to': bss_poi('station_1')}]} for _ in range(3)]
+    manager = BssProviderManager(CONFIG)
+    provider = manager.get_providers()[0]
+    calls = []
+
+    def get_informations(poi):
+        calls.append(poi['id'])
+        return Stands(5, 9, StandsStatus.open)
+
+    provider.get_informations = get_informations
+    providers = manager.handle_journeys(journeys)
+    assert providers == {provider}
+    assert calls == ['station_1']
+    for section in (s for j in journeys for s in j['sections']):
+        assert section['from']['poi']['stands'] == Stands(5, 9, StandsStatus.open)
+        assert section['to']['poi']['stands'] == Stands(5, 9, StandsStatus.open)
+
+
+def realtime_journeys_handled_by_element_test():
+    """
+    the journeys of a streamed response are handled one by one, a station already asked isn't asked again
+    """
+    journeys = [{'sections': [{'from': bss_poi('station_1'), 'to': bss_poi('station_1')}]} for _ in range(3)]
+    manager = BssProviderManager(CONFIG)
+    provider = manager.get_providers()[0]
+    calls = []
+
+    def get_informations(poi):
+        calls.append(poi['id'])
+        return Stands(5, 9, StandsStatus.open)
+
+    provider.get_informations = get_informations
+    known = {}
+    for journey in journeys:
+        assert manager.handle_element(journey, 'journeys', known) == {provider}
+        assert journey['sections'][0]['from']['poi']['stands'] == Stands(5, 9, StandsStatus.open)
+    assert calls == ['station_1']
+
+
+def realtime_places_time_budget_test():
+    """
+    the pois not answered in time are left without stands, the others are decorated
+    """
+
+    class Provider(object):
+        def support_poi(self, poi):
+            return True
+
+        def get_informations(self, poi):
+            if poi['id'] == 'slow':
+                gevent.sleep(1)
+            return Stands(5, 9, StandsStatus.open)
+
+    places = [bss_poi('slow'), bss_poi('fast')]
+    manager = BssProviderManager([])
+    manager._bss_providers_legacy = [Provider()]
+    budget = app.config.get(str('PARKING_PLACES_TIME_BUDGET'))
+    app.config[str('PARKING_PLACES_TIME_BUDGET')] = 0.1
+    try:
+        manager.handle_places(places)
+    finally:
+        app.config[str('PARKING_PLACES_TIME_BUDGET')] = budget
+    assert 'stands' not in places[0]['poi']
+    assert places[1]['poi']['stands'] == Stands(5, 9, StandsStatus.open)
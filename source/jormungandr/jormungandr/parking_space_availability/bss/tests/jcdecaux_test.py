@@ -32,6 +32,7 @@ from jormungandr.parking_space_availability.bss.jcdecaux import JcdecauxProvider
 from jormungandr.parking_space_availability.bss.stands import Stands, StandsStatus
 from mock import MagicMock
 import requests_mock
+import threading
 
 poi = {
     'properties': {'network': u"Vélib'", 'operator': 'JCDecaux', 'ref': '2'},
@@ -102,3 +103,54 @@ def test_call_mocked_request():
         m.get('https://api.jcdecaux.com/vls/v1/stations/', json=webservice_response)
         assert provider.get_informations(poi) == Stands(4, 8, StandsStatus.open)
         assert m.called
+
+
+def parking_space_availability_jcdecaux_prefetch_test():
+    """
+    with the prefetch the requests only read the stations fetched in background
+    """
+    webservice_response = [{'number': 2, 'available_bike_stands': 4, 'available_bikes': 8, 'status': 'OPEN'}]
+    provider = JcdecauxProvider(u"vélib'", 'Paris', 'api_key', {'jcdecaux'}, prefetch_interval=60)
+    provider.prefetcher.start = lambda: None  # the refreshes are done by hand
+    with requests_mock.Mocker() as m:
+        m.get('https://api.jcdecaux.com/vls/v1/stations/', json=webservice_response)
+        # nothing fetched yet, the request does not wait for the provider
+        assert provider.get_informations(poi) == Stands(0, 0, StandsStatus.unavailable)
+        assert not m.called
+
+        assert provider.prefetcher.refresh()
+        assert m.call_count == 1
+        assert provider.get_informations(poi) == Stands(4, 8, StandsStatus.open)
+        assert provider.get_informations(poi) == Stands(4, 8, StandsStatus.open)
+        assert m.call_count == 1
+
+        # the last stations are kept on error, until they are too old
+        m.get('https://api.jcdecaux.com/vls/v1/stations/', status_code=500)
+        assert not provider.prefetcher.refresh()
+        assert provider.get_informations(poi) == Stands(4, 8, StandsStatus.open)
+        provider.prefetcher._last_update -= provider.prefetcher.max_staleness + 1
+        assert provider.get_informations(poi) == Stands(0, 0, StandsStatus.unavailable)
+
+
+def parking_space_availability_jcdecaux_prefetch_thread_test(mocker):
+    """
+    without gevent's socket patch the stations are prefetched by a thread
+    """
+    mocker.patch('gevent.monkey.is_module_patched', return_value=False)
+    provider = JcdecauxProvider(u"vélib'", 'Paris', 'api_key', {'jcdecaux'}, prefetch_interval=60)
+    fetched = threading.Event()
+
+    def fetch():
+        fetched.set()
+        return {}
+
+    provider.prefetcher.fetch = fetch
+    provider.prefetcher.start()
+    worker = provider.prefetcher._worker
+    assert isinstance(worker, threading.Thread)
+    assert fetched.wait(1)
+
+    provider.stop_prefetch()
+    worker.join(1)
+    assert not worker.is_alive()
+    assert provider.status()['prefetch']['nb_refreshes'] == 1
@@ -34,6 +34,9 @@ POI_TYPE_ID = 'poi_type:amenity:parking'
 
 
 class CarParkingProviderManager(AbstractProviderManager):
+    poi_type_id = POI_TYPE_ID
+    informations_field = 'car_park'
+
     def __init__(self, car_park_providers_configurations):
         super(CarParkingProviderManager, self).__init__()
         self.car_park_providers = []
@@ -41,13 +44,5 @@ class CarParkingProviderManager(AbstractProviderManager):
             arguments = configuration.get('args', {})
             self.car_park_providers.append(self._init_class(configuration['class'], arguments))
 
-    def _handle_poi(self, item):
-        if 'poi_type' in item and item['poi_type']['id'] == POI_TYPE_ID:
-            provider = self._find_provider(item)
-            if provider:
-                item['car_park'] = provider.get_informations(item)
-                return provider
-        return None
-
     def _get_providers(self):
         return self.car_park_providers
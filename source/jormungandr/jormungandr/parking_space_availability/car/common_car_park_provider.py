@@ -34,7 +34,7 @@ import logging
 import pybreaker
 import requests as requests
 
-from jormungandr import cache, app, new_relic
+from jormungandr import cache, app, new_relic, http_pool
 from jormungandr.parking_space_availability import AbstractParkingPlacesProvider
 from jormungandr.ptref import FeedPublisher
 
@@ -48,6 +48,7 @@ class CommonCarParkProvider(AbstractParkingPlacesProvider):
         self.operators = [o.lower() for o in operators]
         self.timeout = timeout
         self.dataset = dataset
+        self.session = http_pool.get_session('car_park:{}'.format(dataset))
         self._feed_publisher = FeedPublisher(**feed_publisher) if feed_publisher else None
         self.fail_max = kwargs.get(
             'circuit_breaker_max_fail', app.config.get(str('CIRCUIT_BREAKER_MAX_CAR_PARK_FAIL'), 5)
@@ -85,7 +86,7 @@ class CommonCarParkProvider(AbstractParkingPlacesProvider):
                 headers = {'Authorization': 'apiKey {}'.format(self.api_key)}
             else:
                 headers = None
-            data = self.breaker.call(requests.get, url=request_url, headers=headers, timeout=self.timeout)
+            data = self.breaker.call(self.session.get, url=request_url, headers=headers, timeout=self.timeout)
             json_data = data.json()
             self.record_call("OK")
             return json_data
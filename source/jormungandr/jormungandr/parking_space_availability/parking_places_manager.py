@@ -29,6 +29,7 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from flask_restful.utils import unpack
 from jormungandr import i_manager, bss_provider_manager, car_park_provider_manager
+from jormungandr.interfaces.v1.serializer.streaming import StreamedSerialization, for_each, later
 from functools import wraps
 import logging
 
@@ -52,6 +53,30 @@ def _handle(response, provider_manager, attr, logger, err_msg):
         logger.exception(err_msg)
 
 
+def _handle_streamed(response, provider_manager, attr, logger, err_msg):
+    """
+    the elements of a streamed response are completed one by one, just before being written,
+    the pois already asked for the previous elements are not asked again
+    """
+    known = {}
+    providers = set()
+
+    def handle_element(_, element):
+        try:
+            providers.update(provider_manager.handle_element(element, attr, known) or [])
+        except:
+            logger.exception(err_msg)
+
+    def add_feed_publisher(r):
+        try:
+            _add_feed_publisher(r, providers)
+        except:
+            logger.exception(err_msg)
+
+    for_each(response, handle_element, keys=(attr,))
+    later(response, add_feed_publisher, keys=('feed_publishers',))
+
+
 class ManageParkingPlaces(object):
     def __init__(self, resource, attribute):
         """
@@ -74,8 +99,9 @@ class ManageParkingPlaces(object):
                 show_bss_stands = 'bss_stands' in resource_args.get('add_poi_infos')
                 show_car_park = 'car_park' in resource_args.get('add_poi_infos')
 
+                handle = _handle_streamed if isinstance(response, StreamedSerialization) else _handle
                 if show_bss_stands and instance and instance.bss_provider:
-                    _handle(
+                    handle(
                         response,
                         bss_provider_manager,
                         self.attribute,
@@ -84,7 +110,7 @@ class ManageParkingPlaces(object):
                     )
 
                 if show_car_park and instance and instance.car_park_provider:
-                    _handle(
+                    handle(
                         response,
                         car_park_provider_manager,
                         self.attribute,
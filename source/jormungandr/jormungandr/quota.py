@@ -32,6 +32,8 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 from functools import wraps
 from jormungandr import authentication, new_relic
+from jormungandr.rate_limit import rate_limiter
+from flask import g
 import flask_restful
 from datetime import datetime
 
@@ -43,13 +45,21 @@ def quota_control(func):
 
     @wraps(func)
     def wrapper(*args, **kwargs):
-        user = authentication.get_user(token=authentication.get_token())
+        token = authentication.get_token()
+        user = authentication.get_user(token=token)
         if user is not None and user.is_blocked(datetime.utcnow()):
             new_relic.ignore()
             flask_restful.abort(
                 429,
                 message="Quota limit reached, please contact your provider if you want to upgrade your current billing plan",
             )
+        if rate_limiter is not None:
+            retry_after = rate_limiter.check_request(token, user)
+            if retry_after:
+                new_relic.ignore()
+                # the header is added to the error response by add_retry_after
+                g.retry_after = retry_after
+                flask_restful.abort(429, message="Rate limit exceeded, retry in {} seconds".format(retry_after))
 
         return func(*args, **kwargs)
 
@@ -0,0 +1,294 @@
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import gevent
+import logging
+import threading
+import time
+
+from jormungandr import app
+
+
+class _Counter(object):
+    """
+    requests of a key in the current and the previous windows
+
+    'current' and 'previous' are the counts of all the workers at the last synchronization,
+    'pending' the requests of this worker not yet sent to redis
+    """
+
+    __slots__ = ('window', 'current', 'previous', 'pending', 'last_used')
+
+    def __init__(self, window):
+        self.window = window
+        self.current = 0
+        self.previous = 0
+        self.pending = 0
+        self.last_used = 0
+
+    def roll(self, window):
+        """
+        move to a new window, returns the requests of the old one that haven't been synchronized
+        """
+        late = (self.window, self.pending) if self.pending else None
+        self.previous = self.current + self.pending if window == self.window + 1 else 0
+        self.window = window
+        self.current = 0
+        self.pending = 0
+        return late
+
+
+def retry_after(requests, seconds, previous, current, elapsed):
+    """
+    number of seconds before the estimated count of the sliding window is below the limit
+    (if no request is made in the meantime)
+
+    >>> retry_after(10, 60, previous=0, current=10, elapsed=30)
+    31
+    >>> retry_after(10, 60, previous=20, current=5, elapsed=0)
+    46
+    """
+    if current < requests:
+        # the weight of the previous window decreases enough during the current window
+        delay = seconds * (1 - (requests - current) / previous) - elapsed
+    else:
+        # in the next window, only the requests of the current window count
+        delay = seconds - elapsed + seconds * (1 - requests / current)
+    return max(int(delay) + 1, 1)
+
+
+class RateLimiter(object):
+    """
+    Sliding window rate limiter of the requests, by key (the token)
+
+    The count of a window of 'seconds' is estimated with the count of the current fixed window and the
+    count of the previous one, weighted by how much it still overlaps the sliding window.
+
+    The requests are counted locally so a check is only a few operations in memory. With redis, the
+    counters of all the workers are synchronized every 'sync_interval' seconds in background with
+    one pipeline (INCRBY of the local requests and GET of the previous windows), so a key can exceed
+    its limit by the requests made in between. If redis isn't available, each worker limits alone.
+    The redis client is blocking without gevent's socket patch, the synchronization is then done by a thread
+    and the counters are shared under a lock.
+    """
+
+    def __init__(self, limits=None, billing_plans=None, default=None, redis_config=None, sync_interval=0.5):
+        self.limits = limits or {}
+        self.billing_plans = billing_plans or {}
+        self.default = default
+        self.redis_config = redis_config or {}
+        self.sync_interval = sync_interval
+        self._counters = {}  # (key, seconds) -> _Counter
+        self._late = []  # requests of the old windows to synchronize
+        self._worker = None
+        self._stop_event = None
+        self._lock = threading.Lock()
+        self.nb_allowed = 0
+        self.nb_rejected = 0
+        self.nb_sync_errors = 0
+
+    def get_limit(self, token, user=None):
+        """
+        the limit of a token: {"requests": 100, "seconds": 60}, the one of the token if there is one,
+        else the one of the billing plan of the user, else the default one (None means no limit)
+        """
+        limit = self.limits.get(token)
+        if limit is None and user is not None:
+            billing_plan = getattr(user, 'billing_plan', None)
+            if billing_plan is not None:
+                limit = self.billing_plans.get(billing_plan.name)
+        return limit if limit is not None else self.default
+
+    def check_request(self, token, user=None):
+        """
+        count a request of the token if it's allowed
+        returns 0 if it is, else the number of seconds after which the client can retry
+        """
+        if not token or user is None:
+            # without a valid token the request will be rejected by the authentication
+            return 0
+        limit = self.get_limit(token, user)
+        if not limit:
+            return 0
+        return self.check(token, limit['requests'], limit['seconds'])
+
+    def check(self, key, requests, seconds, now=None):
+        if self.redis_config.get('enabled'):
+            self.start()
+        now = now or time.time()
+        window = int(now // seconds)
+        with self._lock:
+            counter = self._counters.get((key, seconds))
+            if counter is None:
+                counter = self._counters[(key, seconds)] = _Counter(window)
+            elif counter.window != window:
+                late = counter.roll(window)
+                if late:
+                    self._late.append((key, seconds) + late)
+            counter.last_used = now
+
+            elapsed = now - window * seconds
+            current = counter.current + counter.pending
+            if counter.previous * (1 - elapsed / seconds) + current < requests:
+                counter.pending += 1
+                self.nb_allowed += 1
+                return 0
+            self.nb_rejected += 1
+            previous = counter.previous
+        return retry_after(requests, seconds, previous, current, elapsed)
+
+    def _redis_key(self, key, seconds, window):
+        return '{}:{}:{}:{}'.format(self.redis_config.get('prefix', 'navitia.rate_limit'), key, seconds, window)
+
+    def _redis(self):
+        import redis
+
+        return redis.StrictRedis(
+            host=self.redis_config.get('redis_host', 'localhost'),
+            port=self.redis_config.get('redis_port', 6379),
+            db=self.redis_config.get('redis_db', 0),
+            password=self.redis_config.get('redis_password'),
+            socket_timeout=self.redis_config.get('timeout', 0.5),
+        )
+
+    def sync(self, client, now=None):
+        """
+        send the local requests to redis and get the counts of all the workers
+        """
+        now = now or time.time()
+        with self._lock:
+            late, self._late = self._late, []
+            counters = []
+            for (key, seconds), counter in list(self._counters.items()):
+                if now - counter.last_used > 2 * seconds:
+                    # not used for a while, the windows are over
+                    del self._counters[(key, seconds)]
+                    continue
+                counters.append((key, seconds, counter, counter.window, counter.pending))
+                # the requests being sent are counted in 'current', the new ones will be in 'pending'
+                counter.current += counter.pending
+                counter.pending = 0
+        if not counters and not late:
+            return
+
+        pipe = client.pipeline(transaction=False)
+        for key, seconds, window, pending in late:
+            pipe.incrby(self._redis_key(key, seconds, window), pending)
+            pipe.expire(self._redis_key(key, seconds, window), 2 * seconds)
+        for key, seconds, _, window, pending in counters:
+            pipe.incrby(self._redis_key(key, seconds, window), pending)
+            pipe.expire(self._redis_key(key, seconds, window), 2 * seconds)
+            pipe.get(self._redis_key(key, seconds, window - 1))
+        try:
+            results = pipe.execute()
+        except Exception:
+            # the requests will be sent with the next synchronization
+            with self._lock:
+                self._late.extend(late)
+                for key, seconds, counter, window, pending in counters:
+                    if counter.window == window:
+                        counter.current -= pending
+                        counter.pending += pending
+                    elif pending:
+                        self._late.append((key, seconds, window, pending))
+            raise
+        results = results[2 * len(late) :]
+
+        with self._lock:
+            for i, (_, _, counter, window, _) in enumerate(counters):
+                current, _, previous = results[3 * i : 3 * i + 3]
+                if counter.window == window:
+                    counter.current = int(current)
+                    counter.previous = int(previous or 0)
+
+    def _run(self, sleep):
+        client = self._redis()
+        while True:
+            # the Event.wait of the threads returns True once the rate limiter is stopped
+            if sleep(self.sync_interval):
+                return
+            try:
+                self.sync(client)
+            except Exception as e:
+                self.nb_sync_errors += 1
+                logging.getLogger(__name__).warning('impossible to synchronize the rate limits: {}'.format(e))
+
+    def _is_running(self):
+        if isinstance(self._worker, threading.Thread):
+            return self._worker.is_alive()
+        return self._worker is not None and not self._worker.dead
+
+    def start(self):
+        # started lazily to run in the workers and not in the master process
+        if self._is_running():
+            return
+        from gevent import monkey
+
+        if monkey.is_module_patched('socket'):
+            self._worker = gevent.spawn(self._run, gevent.sleep)
+        else:
+            self._stop_event = threading.Event()
+            self._worker = threading.Thread(target=self._run, args=(self._stop_event.wait,), name='rate_limit')
+            self._worker.daemon = True
+            self._worker.start()
+
+    def stop(self):
+        if isinstance(self._worker, threading.Thread):
+            # a thread can't be killed, it stops at the end of its sleep
+            self._stop_event.set()
+        elif self._worker is not None:
+            self._worker.kill(block=False)
+        self._worker = None
+
+    def status(self):
+        return {
+            'nb_keys': len(self._counters),
+            'nb_allowed': self.nb_allowed,
+            'nb_rejected': self.nb_rejected,
+            'nb_sync_errors': self.nb_sync_errors,
+            'redis_enabled': bool(self.redis_config.get('enabled')),
+        }
+
+
+def _make_rate_limiter():
+    config = app.config.get(str('RATE_LIMIT'), {})
+    if not config.get('enabled', False):
+        return None
+    return RateLimiter(
+        limits=config.get('tokens'),
+        billing_plans=config.get('billing_plans'),
+        default=config.get('default'),
+        redis_config=config.get('redis'),
+        sync_interval=config.get('sync_interval', 0.5),
+    )
+
+
+rate_limiter = _make_rate_limiter()
@@ -32,9 +32,10 @@ from __future__ import absolute_import, print_function, division
 from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy, RealtimeProxyError
 from flask import logging
 import pybreaker
+import functools
 import pytz
 import requests as requests
-from jormungandr import cache, app
+from jormungandr import cache, app, http_pool
 from jormungandr.schedule import RealTimePassage
 from datetime import datetime
 
@@ -67,12 +68,14 @@ class Cleverage(RealtimeProxy):
         destination_id_tag=None,
         instance=None,
         timeout=10,
+        polling=None,
         **kwargs
     ):
         self.service_url = service_url if (service_url[-1] == u'/') else (service_url + '/')
         self.service_args = service_args
         self.timeout = timeout  # timeout in seconds
         self.rt_system_id = id
+        self.session = http_pool.get_session('realtime:{}'.format(id))
         self.object_id_tag = object_id_tag if object_id_tag else id
         self.destination_id_tag = destination_id_tag
         self.instance = instance
@@ -81,6 +84,7 @@ class Cleverage(RealtimeProxy):
             reset_timeout=app.config['CIRCUIT_BREAKER_CLEVERAGE_TIMEOUT_S'],
         )
         self.timezone = pytz.timezone(timezone)
+        self.poller = self._make_poller(functools.partial(self._fetch_stop_schedules, use_cache=False), polling)
 
     def __repr__(self):
         """
@@ -98,7 +102,11 @@ class Cleverage(RealtimeProxy):
         """
         logging.getLogger(__name__).debug('Cleverage RT service , call url : {}'.format(url))
         try:
-            return self.breaker.call(requests.get, url, timeout=self.timeout, headers=self.service_args)
+            return self._call_upstream(
+                self.breaker.call, self.session.get, url, timeout=self.timeout, headers=self.service_args
+            )
+        except RealtimeProxyError:
+            raise
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error(
                 'Cleverage RT service dead, using base ' 'schedule (error: {}'.format(e)
@@ -162,13 +170,16 @@ class Cleverage(RealtimeProxy):
         else:
             return None
 
-    def _get_next_passage_for_route_point(
-        self, route_point, count=None, from_dt=None, current_dt=None, duration=None
-    ):
+    def _get_stop_schedules(self, route_point):
+        if self.poller:
+            return self.poller.get(route_point)
+        return self._fetch_stop_schedules(route_point)
+
+    def _fetch_stop_schedules(self, route_point, use_cache=True):
         url = self._make_url(route_point)
         if not url:
             return None
-        r = self._call_cleverage(url)
+        r = self._call_cleverage(url) if use_cache else self._call_cleverage.uncached(self, url)
         if not r:
             return None
 
@@ -179,7 +190,27 @@ class Cleverage(RealtimeProxy):
             )
             raise RealtimeProxyError('non 200 response')
 
-        return self._get_passages(route_point, r.json())
+        return r.json()
+
+    def _get_next_passage_for_route_point(
+        self, route_point, count=None, from_dt=None, current_dt=None, duration=None
+    ):
+        resp = self._get_stop_schedules(route_point)
+        if resp is None:
+            return None
+        return self._get_passages(route_point, resp)
+
+    def _get_batch_key(self, route_point):
+        """
+        cleverage gives the schedules of all the lines of a stop
+        """
+        return route_point.fetch_stop_id(self.object_id_tag) or route_point
+
+    def _get_next_passages_for_route_points(self, route_points, count, from_dt, current_dt, duration):
+        resp = self._get_stop_schedules(route_points[0])
+        if resp is None:
+            return {}
+        return {rp: self._get_passages(rp, resp) for rp in route_points}
 
     def status(self):
         return {
@@ -190,4 +221,5 @@ class Cleverage(RealtimeProxy):
                 'fail_counter': self.breaker.fail_counter,
                 'reset_timeout': self.breaker.reset_timeout,
             },
+            'polling': self.poller.status() if self.poller else None,
         }
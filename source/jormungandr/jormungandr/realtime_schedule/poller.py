@@ -0,0 +1,196 @@
+#  Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+from multiprocessing.pool import ThreadPool
+import gevent
+import gevent.pool
+import logging
+import threading
+import time
+
+# the parameters of a poller that can be set in the configuration of a proxy
+POLLING_PARAMETERS = ('period', 'max_staleness', 'idle_timeout', 'pool_size')
+
+
+class _Entry(object):
+    __slots__ = ('route_point', 'response', 'updated_at', 'last_access')
+
+    def __init__(self, route_point, response, now):
+        self.route_point = route_point
+        self.response = response
+        self.updated_at = now
+        self.last_access = now
+
+
+class RealtimePoller(object):
+    """
+    Local store of the responses of a realtime proxy, refreshed in background
+
+    The store is keyed by what the proxy needs to call the external service (generally the code of the stop).
+    The first time a key is requested its response is fetched on demand, then the key is refreshed every
+    'period' seconds until it hasn't been requested for 'idle_timeout' seconds.
+    A response older than 'max_staleness' is not used (if the external service is down for instance),
+    it is fetched again on demand.
+
+    The calls to the external service are blocking without gevent's socket patch, the refreshes are then done
+    by a thread, with a pool of threads.
+    """
+
+    def __init__(self, name, fetch, get_key, period=10, max_staleness=60, idle_timeout=600, pool_size=5):
+        """
+        :param fetch: function route_point -> response of the external service, it can raise
+        :param get_key: function route_point -> key of the response in the store
+        """
+        self.name = name
+        self._fetch = fetch
+        self._get_key = get_key
+        self.period = period
+        self.max_staleness = max_staleness
+        self.idle_timeout = idle_timeout
+        self.pool_size = pool_size
+        self._entries = {}
+        self._worker = None
+        self._stop_event = None
+        self.nb_hits = 0
+        self.nb_misses = 0
+        self.nb_errors = 0
+        self.last_refresh = None
+
+    def get(self, route_point):
+        key = self._get_key(route_point)
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.last_access = now
+            if now - entry.updated_at <= self.max_staleness:
+                self.nb_hits += 1
+                return entry.response
+
+        self.nb_misses += 1
+        response = self._fetch(route_point)
+        if entry is not None:
+            entry.response = response
+            entry.updated_at = time.time()
+        else:
+            self._entries[key] = _Entry(route_point, response, time.time())
+        self._start()
+        return response
+
+    @staticmethod
+    def _is_socket_patched():
+        from gevent import monkey
+
+        return monkey.is_module_patched('socket')
+
+    def _is_running(self):
+        if isinstance(self._worker, threading.Thread):
+            return self._worker.is_alive()
+        return self._worker is not None and not self._worker.dead
+
+    def _start(self):
+        if self._is_running():
+            return
+        if self._is_socket_patched():
+            self._worker = gevent.spawn(self._run, gevent.sleep)
+        else:
+            self._stop_event = threading.Event()
+            self._worker = threading.Thread(
+                target=self._run, args=(self._stop_event.wait,), name='realtime_poller_{}'.format(self.name)
+            )
+            self._worker.daemon = True
+            self._worker.start()
+
+    def stop(self):
+        if isinstance(self._worker, threading.Thread):
+            # a thread can't be killed, it stops at the end of its sleep
+            self._stop_event.set()
+        elif self._worker is not None:
+            self._worker.kill()
+        self._worker = None
+
+    def _run(self, sleep):
+        while self._entries:
+            # the Event.wait of the threads returns True once the poller is stopped
+            if sleep(self.period):
+                return
+            try:
+                self.refresh()
+            except Exception:
+                logging.getLogger(__name__).exception('error while polling {}'.format(self.name))
+
+    def _refresh_entry(self, entry):
+        try:
+            entry.response = self._fetch(entry.route_point)
+            entry.updated_at = time.time()
+        except Exception as e:
+            self.nb_errors += 1
+            logging.getLogger(__name__).warning(
+                'impossible to refresh {} for {}: {}'.format(self.name, entry.route_point, e)
+            )
+
+    def refresh(self):
+        """
+        refresh all the responses of the store and forget the ones not requested since idle_timeout
+        """
+        now = time.time()
+        for key, entry in list(self._entries.items()):
+            if now - entry.last_access > self.idle_timeout:
+                del self._entries[key]
+
+        entries = list(self._entries.values())
+        if self._is_socket_patched():
+            pool = gevent.pool.Pool(self.pool_size)
+            for entry in entries:
+                pool.spawn(self._refresh_entry, entry)
+            pool.join()
+        elif entries:
+            pool = ThreadPool(min(self.pool_size, len(entries)))
+            try:
+                pool.map(self._refresh_entry, entries)
+            finally:
+                pool.close()
+                pool.join()
+        self.last_refresh = time.time()
+
+    def status(self):
+        now = time.time()
+        staleness = [now - e.updated_at for e in self._entries.values()]
+        return {
+            'period': self.period,
+            'max_staleness': self.max_staleness,
+            'nb_keys': len(self._entries),
+            'running': self._is_running(),
+            'last_refresh_age': now - self.last_refresh if self.last_refresh else None,
+            'max_staleness_observed': max(staleness) if staleness else None,
+            'avg_staleness': sum(staleness) / len(staleness) if staleness else None,
+            'nb_stale_keys': sum(1 for s in staleness if s > self.max_staleness),
+            'nb_hits': self.nb_hits,
+            'nb_misses': self.nb_misses,
+            'nb_errors': self.nb_errors,
+        }
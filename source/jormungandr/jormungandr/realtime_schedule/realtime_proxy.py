@@ -30,11 +30,14 @@
 # www.navitia.io
 from __future__ import absolute_import, print_function, unicode_literals, division
 from abc import abstractmethod, ABCMeta
+from collections import OrderedDict
 from copy import deepcopy
 from jormungandr.schedule import RoutePoint
 from jormungandr.utils import timestamp_to_datetime, record_external_failure
 from jormungandr.utils import date_to_timestamp, pb_del_if
 from jormungandr import new_relic
+from jormungandr.concurrency_limiter import get_limiter, ConcurrencyLimitExceeded
+from jormungandr.realtime_schedule.poller import RealtimePoller, POLLING_PARAMETERS
 from navitiacommon import type_pb2
 import datetime
 import hashlib
@@ -92,6 +95,9 @@ class RealtimeProxy(six.with_metaclass(ABCMeta, object)):
     abstract class managing calls to external service providing real-time next passages
     """
 
+    # RealtimePoller of the proxies running in polling mode
+    poller = None
+
     @abstractmethod
     def _get_next_passage_for_route_point(self, route_point, count, from_dt, current_dt, duration):
         """
@@ -99,6 +105,19 @@ class RealtimeProxy(six.with_metaclass(ABCMeta, object)):
         """
         pass
 
+    def _call_upstream(self, func, *args, **kwargs):
+        """
+        make the actual call to the external service, limiting the number of concurrent calls to it
+
+        only the calls really made must be done here (and not the answers from the cache), their latency
+        is what the limit adapts to
+        """
+        try:
+            with get_limiter('realtime', self.rt_system_id).slot():
+                return func(*args, **kwargs)
+        except ConcurrencyLimitExceeded as e:
+            raise RealtimeProxyError(six.text_type(e))
+
     def _filter_passages(self, passages, count, from_dt, duration, timezone=None):
         """
         after getting the next passages from the proxy, we might want to filter some
@@ -146,6 +165,80 @@ class RealtimeProxy(six.with_metaclass(ABCMeta, object)):
             self.record_call('failure', reason=str(e))
             return None
 
+    def _get_batch_key(self, route_point):
+        """
+        route points with the same batch key are answered by a single call to the external service
+
+        by default each route point needs its own call, the proxies answering for a whole stop
+        return the external code of the stop
+        """
+        return route_point
+
+    def _get_next_passages_for_route_points(self, route_points, count, from_dt, current_dt, duration):
+        """
+        get the next passages of route points sharing the same batch key
+
+        returns a dict route_point -> next passages, by default there is one call per route point
+        """
+        return {
+            rp: self._get_next_passage_for_route_point(rp, count, from_dt, current_dt, duration)
+            for rp in route_points
+        }
+
+    def _make_poller(self, fetch, polling):
+        """
+        build the poller refreshing the responses of the external service in background
+
+        polling is the configuration of the proxy's polling mode, ex: {"period": 10, "max_staleness": 60},
+        if it's not set the external service is called on demand
+        """
+        if not polling:
+            return None
+        unknown = set(polling) - set(POLLING_PARAMETERS)
+        if unknown:
+            logging.getLogger(__name__).warning(
+                'unknown polling parameters {} for {}, they are ignored'.format(
+                    sorted(unknown), self.rt_system_id
+                )
+            )
+        polling = {k: v for k, v in polling.items() if k in POLLING_PARAMETERS}
+        return RealtimePoller(unicode(self.rt_system_id), fetch, self._get_batch_key, **polling)
+
+    def batch_route_points(self, route_points):
+        """
+        group the route points that can be requested with one call to the external service
+        """
+        batches = OrderedDict()
+        for route_point in route_points:
+            batches.setdefault(self._get_batch_key(route_point), []).append(route_point)
+        return list(batches.values())
+
+    def next_passages_for_route_points(
+        self, route_points, count=None, from_dt=None, current_dt=None, duration=86400, timezone=None
+    ):
+        """
+        Batched version of next_passage_for_route_point
+
+        returns a dict route_point -> next realtime passages
+        the passages of a route point are None if the proxy failed for it (the base schedule is kept)
+        """
+        result = {}
+        for batch in self.batch_route_points(route_points):
+            try:
+                next_passages = self._get_next_passages_for_route_points(
+                    batch, count, from_dt, current_dt, duration
+                )
+                self.record_call('ok')
+            except RealtimeProxyError as e:
+                self.record_call('failure', reason=str(e))
+                next_passages = {}
+
+            for route_point in batch:
+                result[route_point] = self._filter_passages(
+                    next_passages.get(route_point), count, from_dt, duration, timezone
+                )
+        return result
+
     # Method used to filter schedules from kraken before merging. By default remove all schedules.
     # Overload this to keep some and mix kraken and proxy datas.
     def _filter_base_stop_schedule(self, date_time):
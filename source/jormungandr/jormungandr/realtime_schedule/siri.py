@@ -33,7 +33,7 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 from flask import logging
 import pybreaker
 import requests as requests
-from jormungandr import cache, app
+from jormungandr import cache, app, http_pool
 from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy, RealtimeProxyError, floor_datetime
 from jormungandr.schedule import RealTimePassage
 import xml.etree.ElementTree as et
@@ -134,6 +134,7 @@ class Siri(RealtimeProxy):
         self.requestor_ref = requestor_ref  # login for siri
         self.timeout = timeout  # timeout in seconds
         self.rt_system_id = id
+        self.session = http_pool.get_session('realtime:{}'.format(id))
         self.object_id_tag = object_id_tag if object_id_tag else id
         self.destination_id_tag = destination_id_tag
         self.instance = instance
@@ -250,14 +251,17 @@ class Siri(RealtimeProxy):
 
         logging.getLogger(__name__).debug('siri RT service, post at {}: {}'.format(self.service_url, request))
         try:
-            return self.breaker.call(
-                requests.post,
+            return self._call_upstream(
+                self.breaker.call,
+                self.session.post,
                 url=self.service_url,
                 headers=headers,
                 data=encoded_request,
                 verify=False,
                 timeout=self.timeout,
             )
+        except RealtimeProxyError:
+            raise
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error(
                 'siri RT service dead, using base ' 'schedule (error: {}'.format(e)
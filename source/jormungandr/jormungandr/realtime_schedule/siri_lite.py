@@ -32,9 +32,10 @@ from __future__ import absolute_import, print_function, division
 from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy, RealtimeProxyError
 import logging
 import pybreaker
+import functools
 import pytz
 import requests as requests
-from jormungandr import cache, app
+from jormungandr import cache, app, http_pool
 from jormungandr.schedule import RealTimePassage
 from datetime import datetime
 
@@ -44,10 +45,11 @@ class SiriLite(RealtimeProxy):
     class managing calls to a siri lite external service providing real-time next passages
     """
 
-    def __init__(self, id, service_url, object_id_tag=None, instance=None, timeout=10, **kwargs):
+    def __init__(self, id, service_url, object_id_tag=None, instance=None, timeout=10, polling=None, **kwargs):
         self.service_url = service_url
         self.timeout = timeout  # timeout in seconds
         self.rt_system_id = id
+        self.session = http_pool.get_session('realtime:{}'.format(id))
         self.object_id_tag = object_id_tag if object_id_tag else id
         self.breaker = pybreaker.CircuitBreaker(
             fail_max=app.config.get('CIRCUIT_BREAKER_MAX_SIRILITE_FAIL', 5),
@@ -55,6 +57,7 @@ class SiriLite(RealtimeProxy):
         )
         self.instance = instance
         self.log = logging.LoggerAdapter(logging.getLogger(__name__), extra={'rt_proxy': id})
+        self.poller = self._make_poller(functools.partial(self._fetch_stop_monitoring, use_cache=False), polling)
 
     def __repr__(self):
         """
@@ -69,7 +72,9 @@ class SiriLite(RealtimeProxy):
     def _call(self, url):
         self.log.debug('sirilite RT service, call url: {}'.format(url))
         try:
-            return self.breaker.call(requests.get, url, timeout=self.timeout)
+            return self._call_upstream(self.breaker.call, self.session.get, url, timeout=self.timeout)
+        except RealtimeProxyError:
+            raise
         except pybreaker.CircuitBreakerError as e:
             self.log.error('sirilite RT service dead, using base schedule (error: {}'.format(e))
             raise RealtimeProxyError('circuit breaker open')
@@ -185,19 +190,47 @@ class SiriLite(RealtimeProxy):
 
         return next_passages
 
-    def _get_next_passage_for_route_point(
-        self, route_point, count=None, from_dt=None, current_dt=None, duration=None
-    ):
+    def _get_stop_monitoring(self, route_point):
+        if self.poller:
+            return self.poller.get(route_point)
+        return self._fetch_stop_monitoring(route_point)
+
+    def _fetch_stop_monitoring(self, route_point, use_cache=True):
         url = self._make_url(route_point)
         if not url:
             return None
-        r = self._call(url)
+        r = self._call(url) if use_cache else self._call.uncached(self, url)
 
         if r.status_code != 200:
             self.log.error('sirilite RT service unavailable, impossible to query : {}'.format(r.url))
             raise RealtimeProxyError('non 200 response')
 
-        return self._get_passages(route_point, r.json())
+        return r.json()
+
+    def _get_next_passage_for_route_point(
+        self, route_point, count=None, from_dt=None, current_dt=None, duration=None
+    ):
+        resp = self._get_stop_monitoring(route_point)
+        if resp is None:
+            return None
+        return self._get_passages(route_point, resp)
+
+    def _get_batch_key(self, route_point):
+        """
+        the stop monitoring gives the visits of all the lines of a stop
+        """
+        return route_point.fetch_stop_id(self.object_id_tag) or route_point
+
+    def _get_next_passages_for_route_points(self, route_points, count, from_dt, current_dt, duration):
+        # the route points without a line code can't be matched in the response, they have no realtime
+        # as when they are requested one by one, the stop is requested for the first one with an url
+        route_points = [rp for rp in route_points if self._make_url(rp)]
+        if not route_points:
+            return {}
+        resp = self._get_stop_monitoring(route_points[0])
+        if resp is None:
+            return {}
+        return {rp: self._get_passages(rp, resp) for rp in route_points}
 
     def status(self):
         return {
@@ -208,6 +241,7 @@ class SiriLite(RealtimeProxy):
                 'fail_counter': self.breaker.fail_counter,
                 'reset_timeout': self.breaker.reset_timeout,
             },
+            'polling': self.poller.status() if self.poller else None,
         }
 
     def get_matching_routes(self, line, start, destination):
@@ -38,7 +38,7 @@ import pytz
 from flask import logging
 import pybreaker
 import requests as requests
-from jormungandr import cache, app
+from jormungandr import cache, app, http_pool
 from datetime import datetime
 from navitiacommon.ratelimit import RateLimiter, FakeRateLimiter
 from navitiacommon import type_pb2
@@ -104,6 +104,7 @@ class Synthese(RealtimeProxy):
         self.service_url = service_url
         self.timeout = timeout  # timeout in seconds
         self.rt_system_id = id
+        self.session = http_pool.get_session('realtime:{}'.format(id))
         self.object_id_tag = object_id_tag if object_id_tag else id
         self.destination_id_tag = destination_id_tag
         self.instance = instance
@@ -141,7 +142,9 @@ class Synthese(RealtimeProxy):
         try:
             if not self.rate_limiter.acquire(self.rt_system_id, block=False):
                 raise RealtimeProxyError('maximum rate reached')
-            return self.breaker.call(requests.get, url, timeout=self.timeout)
+            return self._call_upstream(self.breaker.call, self.session.get, url, timeout=self.timeout)
+        except RealtimeProxyError:
+            raise
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error(
                 'Synthese RT service dead, using base ' 'schedule (error: {}'.format(e)
@@ -159,9 +162,7 @@ class Synthese(RealtimeProxy):
             logging.getLogger(__name__).exception('Synthese RT error, using base schedule')
             raise RealtimeProxyError(str(e))
 
-    def _get_next_passage_for_route_point(
-        self, route_point, count=None, from_dt=None, current_dt=None, duration=None
-    ):
+    def _get_stop_passages(self, route_point, count=None, from_dt=None):
         url = self._make_url(route_point, count, from_dt)
         if not url:
             return None
@@ -176,13 +177,30 @@ class Synthese(RealtimeProxy):
                 'Synthese RT service unavailable, impossible to query : {}'.format(r.url)
             )
             raise RealtimeProxyError('non 200 response')
-            return None
 
         logging.getLogger(__name__).debug("synthese response: {}".format(r.text))
-        passages = self._get_synthese_passages(r.content)
+        return self._get_synthese_passages(r.content)
 
+    def _get_next_passage_for_route_point(
+        self, route_point, count=None, from_dt=None, current_dt=None, duration=None
+    ):
+        passages = self._get_stop_passages(route_point, count, from_dt)
+        if passages is None:
+            return None
         return self._find_route_point_passages(route_point, passages)
 
+    def _get_batch_key(self, route_point):
+        """
+        synthese is queried by stop point and gives the passages of all its routes
+        """
+        return route_point.fetch_stop_id(self.object_id_tag) or route_point
+
+    def _get_next_passages_for_route_points(self, route_points, count, from_dt, current_dt, duration):
+        passages = self._get_stop_passages(route_points[0], count, from_dt)
+        if passages is None:
+            return {}
+        return {rp: self._find_route_point_passages(rp, passages) for rp in route_points}
+
     def _make_url(self, route_point, count=None, from_dt=None):
         """
         The url returns something like a departure on a stop point
@@ -32,9 +32,10 @@ from __future__ import absolute_import, print_function, division
 from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy, RealtimeProxyError
 from flask import logging
 import pybreaker
+import functools
 import pytz
 import requests as requests
-from jormungandr import cache, app
+from jormungandr import cache, app, http_pool
 from jormungandr.schedule import RealTimePassage
 import aniso8601
 
@@ -59,11 +60,13 @@ class Sytral(RealtimeProxy):
         destination_id_tag="source",
         instance=None,
         timeout=2,
+        polling=None,
         **kwargs
     ):
         self.service_url = service_url
         self.timeout = timeout  # timeout in seconds
         self.rt_system_id = id
+        self.session = http_pool.get_session('realtime:{}'.format(id))
         self.object_id_tag = object_id_tag
         self.destination_id_tag = destination_id_tag
         self.instance = instance
@@ -71,6 +74,7 @@ class Sytral(RealtimeProxy):
             fail_max=app.config.get('CIRCUIT_BREAKER_MAX_SYTRAL_FAIL', 5),
             reset_timeout=app.config.get('CIRCUIT_BREAKER_SYTRAL_TIMEOUT_S', 60),
         )
+        self.poller = self._make_poller(functools.partial(self._fetch_stop_departures, use_cache=False), polling)
 
     def __repr__(self):
         """
@@ -91,7 +95,9 @@ class Sytral(RealtimeProxy):
             extra={'rt_system_id': unicode(self.rt_system_id)},
         )
         try:
-            return self.breaker.call(requests.get, url, timeout=self.timeout)
+            return self._call_upstream(self.breaker.call, self.session.get, url, timeout=self.timeout)
+        except RealtimeProxyError:
+            raise
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error(
                 'systralRT service dead, using base ' 'schedule (error: {}'.format(e),
@@ -156,13 +162,16 @@ class Sytral(RealtimeProxy):
 
         return next_passages
 
-    def _get_next_passage_for_route_point(
-        self, route_point, count=None, from_dt=None, current_dt=None, duration=None
-    ):
+    def _get_stop_departures(self, route_point):
+        if self.poller:
+            return self.poller.get(route_point)
+        return self._fetch_stop_departures(route_point)
+
+    def _fetch_stop_departures(self, route_point, use_cache=True):
         url = self._make_url(route_point)
         if not url:
             return None
-        r = self._call(url)
+        r = self._call(url) if use_cache else self._call.uncached(self, url)
 
         if r.status_code != requests.codes.ok:
             logging.getLogger(__name__).error(
@@ -171,7 +180,27 @@ class Sytral(RealtimeProxy):
             )
             raise RealtimeProxyError('non 200 response')
 
-        return self._get_passages(route_point, r.json())
+        return r.json()
+
+    def _get_next_passage_for_route_point(
+        self, route_point, count=None, from_dt=None, current_dt=None, duration=None
+    ):
+        resp = self._get_stop_departures(route_point)
+        if resp is None:
+            return None
+        return self._get_passages(route_point, resp)
+
+    def _get_batch_key(self, route_point):
+        """
+        sytralRT gives the departures of all the lines of a stop
+        """
+        return route_point.fetch_stop_id(self.object_id_tag) or route_point
+
+    def _get_next_passages_for_route_points(self, route_points, count, from_dt, current_dt, duration):
+        resp = self._get_stop_departures(route_points[0])
+        if resp is None:
+            return {}
+        return {rp: self._get_passages(rp, resp) for rp in route_points}
 
     def status(self):
         return {
@@ -182,4 +211,5 @@ class Sytral(RealtimeProxy):
                 'fail_counter': self.breaker.fail_counter,
                 'reset_timeout': self.breaker.reset_timeout,
             },
+            'polling': self.poller.status() if self.poller else None,
         }
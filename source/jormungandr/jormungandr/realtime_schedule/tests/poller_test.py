@@ -0,0 +1,155 @@
+#  Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr.realtime_schedule.poller import RealtimePoller
+import gevent
+import pytest
+import threading
+
+
+class FakeService(object):
+    def __init__(self):
+        self.calls = []
+        self.version = 0
+        self.fail = False
+
+    def fetch(self, stop):
+        self.calls.append(stop)
+        if self.fail:
+            raise RuntimeError('service down')
+        return '{}-{}'.format(stop, self.version)
+
+
+def get_key(stop):
+    return stop
+
+
+@pytest.fixture
+def service():
+    return FakeService()
+
+
+def first_get_is_fetched_on_demand_test(service):
+    poller = RealtimePoller('test', service.fetch, get_key, period=60)
+    try:
+        assert poller.get('stop1') == 'stop1-0'
+        assert poller.get('stop1') == 'stop1-0'
+        assert service.calls == ['stop1']
+        assert poller.nb_misses == 1
+        assert poller.nb_hits == 1
+    finally:
+        poller.stop()
+
+
+def refresh_test(service):
+    poller = RealtimePoller('test', service.fetch, get_key, period=60)
+    try:
+        poller.get('stop1')
+        poller.get('stop2')
+        service.version = 1
+        poller.refresh()
+        assert poller.get('stop1') == 'stop1-1'
+        assert poller.get('stop2') == 'stop2-1'
+        assert sorted(service.calls) == ['stop1', 'stop1', 'stop2', 'stop2']
+    finally:
+        poller.stop()
+
+
+def refresh_in_background_test(service):
+    poller = RealtimePoller('test', service.fetch, get_key, period=0.01)
+    try:
+        poller.get('stop1')
+        service.version = 1
+        gevent.sleep(0.05)
+        assert poller.get('stop1') == 'stop1-1'
+        assert poller.status()['running']
+    finally:
+        poller.stop()
+
+
+def failed_refresh_keeps_the_last_response_test(service):
+    poller = RealtimePoller('test', service.fetch, get_key, period=60)
+    try:
+        poller.get('stop1')
+        service.fail = True
+        poller.refresh()
+        assert poller.get('stop1') == 'stop1-0'
+        assert poller.nb_errors == 1
+    finally:
+        poller.stop()
+
+
+def stale_response_is_fetched_again_test(service):
+    poller = RealtimePoller('test', service.fetch, get_key, period=60, max_staleness=0)
+    try:
+        poller.get('stop1')
+        service.version = 1
+        gevent.sleep(0.01)
+        assert poller.get('stop1') == 'stop1-1'
+        service.fail = True
+        gevent.sleep(0.01)
+        with pytest.raises(RuntimeError):
+            poller.get('stop1')
+        assert poller.status()['nb_stale_keys'] == 1
+    finally:
+        poller.stop()
+
+
+def idle_keys_are_forgotten_test(service):
+    poller = RealtimePoller('test', service.fetch, get_key, period=60, idle_timeout=0)
+    try:
+        poller.get('stop1')
+        gevent.sleep(0.01)
+        poller.refresh()
+        assert poller.status()['nb_keys'] == 0
+        assert service.calls == ['stop1']
+    finally:
+        poller.stop()
+
+
+def refresh_in_a_thread_test(service, mocker):
+    """
+    without gevent's socket patch the refreshes are done by a thread
+    """
+    mocker.patch('gevent.monkey.is_module_patched', return_value=False)
+    poller = RealtimePoller('test', service.fetch, get_key, period=0.01)
+    try:
+        poller.get('stop1')
+        poller.get('stop2')
+        worker = poller._worker
+        assert isinstance(worker, threading.Thread)
+        service.version = 1
+        gevent.sleep(0.1)
+        assert poller.get('stop1') == 'stop1-1'
+        assert poller.get('stop2') == 'stop2-1'
+        assert poller.status()['running']
+    finally:
+        poller.stop()
+    worker.join(1)
+    assert not worker.is_alive()
@@ -162,3 +162,28 @@ def test_route_point_get_code():
     c.value = "foo3"
     c.type = "source"
     assert RoutePoint._get_all_codes(r, "source") == ["foo", "foo3"]
+
+
+def next_passages_for_route_points_default_test():
+    """
+    by default each route point is requested on its own and filtered like with next_passage_for_route_point
+    """
+    proxy = CustomProxy([passage("10:00"), passage("11:00"), passage("12:00")])
+    route_points = ['rp1', 'rp2']
+
+    assert proxy.batch_route_points(route_points) == [['rp1'], ['rp2']]
+
+    r = proxy.next_passages_for_route_points(route_points, count=2)
+    assert set(r.keys()) == {'rp1', 'rp2'}
+    assert list(map(get_dt, r['rp1'])) == [dt("10:00"), dt("11:00")]
+
+
+def make_poller_ignores_unknown_parameters_test():
+    """
+    a typo in the polling configuration must not prevent the proxy from being built
+    """
+    proxy = CustomProxy([])
+    poller = proxy._make_poller(lambda rp: None, {'period': 5, 'max_stalenes': 30})
+    assert poller.period == 5
+    assert poller.max_staleness == 60
+    assert proxy._make_poller(lambda rp: None, None) is None
@@ -215,7 +215,7 @@ def next_passage_for_route_point_test(mock_good_response):
 
     route_point = MockRoutePoint(line_code='05', stop_id='42')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('requests.Session.get', mock_requests.get):
         passages = sytral.next_passage_for_route_point(route_point)
 
         assert len(passages) == 2
@@ -237,7 +237,7 @@ def next_passage_for_empty_response_test(mock_empty_response):
 
     route_point = MockRoutePoint(line_code='05', stop_id='42')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('requests.Session.get', mock_requests.get):
         passages = sytral.next_passage_for_route_point(route_point)
 
         assert passages is None
@@ -254,7 +254,7 @@ def next_passage_for_no_departures_response_test(mock_no_departure_response):
 
     route_point = MockRoutePoint(line_code='05', stop_id='42')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('requests.Session.get', mock_requests.get):
         passages = sytral.next_passage_for_route_point(route_point)
 
         assert passages == []
@@ -271,7 +271,7 @@ def next_passage_for_missing_line_response_test(mock_missing_line_response):
 
     route_point = MockRoutePoint(line_code='05', stop_id='42')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('requests.Session.get', mock_requests.get):
         passages = sytral.next_passage_for_route_point(route_point)
 
         assert passages == []
@@ -288,7 +288,7 @@ def next_passage_with_theoric_time_response_test(mock_theoric_response):
 
     route_point = MockRoutePoint(line_code='05', stop_id='42')
 
-    with mock.patch('requests.get', mock_requests.get):
+    with mock.patch('requests.Session.get', mock_requests.get):
         passages = sytral.next_passage_for_route_point(route_point)
 
         assert len(passages) == 2
@@ -305,3 +305,74 @@ def status_test():
     )
     status = sytral.status()
     assert status['id'] == u"tata-é$~#@\"*!'`§èû"
+
+
+def next_passages_for_route_points_test(mock_good_response, mock_no_departure_response):
+    """
+    the route points of the same stop must be answered with only one call to sytralRT
+    """
+    sytral = Sytral(id='tata', service_url='http://bob.com/')
+
+    mock_requests = MockRequests(
+        {
+            'http://bob.com/?stop_id=42': (mock_good_response, 200),
+            'http://bob.com/?stop_id=43': (mock_no_departure_response, 200),
+        }
+    )
+    rp_05 = MockRoutePoint(line_code='05', stop_id='42')
+    rp_04 = MockRoutePoint(line_code='04', stop_id='42')
+    rp_other_stop = MockRoutePoint(line_code='05', stop_id='43')
+
+    assert len(sytral.batch_route_points([rp_05, rp_04, rp_other_stop])) == 2
+
+    with mock.patch('requests.Session.get', side_effect=mock_requests.get) as mock_get:
+        passages = sytral.next_passages_for_route_points([rp_05, rp_04, rp_other_stop])
+
+        assert mock_get.call_count == 2
+        assert [p.datetime for p in passages[rp_05]] == [
+            datetime.datetime(2016, 4, 11, 12, 37, 15, tzinfo=pytz.UTC),
+            datetime.datetime(2016, 4, 11, 12, 45, 35, tzinfo=pytz.UTC),
+        ]
+        assert [p.datetime for p in passages[rp_04]] == [
+            datetime.datetime(2016, 4, 11, 12, 38, 15, tzinfo=pytz.UTC),
+            datetime.datetime(2016, 4, 11, 12, 49, 35, tzinfo=pytz.UTC),
+        ]
+        assert passages[rp_other_stop] == []
+
+
+def next_passages_for_route_points_failure_test(mock_empty_response):
+    """
+    if the call fails, all the route points of the stop keep their base schedule
+    """
+    sytral = Sytral(id='tata', service_url='http://bob.com/')
+
+    mock_requests = MockRequests({'http://bob.com/?stop_id=42': (mock_empty_response, 500)})
+    rp_05 = MockRoutePoint(line_code='05', stop_id='42')
+    rp_04 = MockRoutePoint(line_code='04', stop_id='42')
+
+    with mock.patch('requests.Session.get', mock_requests.get):
+        passages = sytral.next_passages_for_route_points([rp_05, rp_04])
+
+        assert passages == {rp_05: None, rp_04: None}
+
+
+def next_passage_with_polling_test(mock_good_response):
+    """
+    in polling mode the departures of a stop are read from the poller's store after the first call
+    """
+    sytral = Sytral(id='tata', service_url='http://bob.com/', polling={'period': 60})
+
+    mock_requests = MockRequests({'http://bob.com/?stop_id=42': (mock_good_response, 200)})
+    route_point = MockRoutePoint(line_code='05', stop_id='42')
+
+    try:
+        with mock.patch('requests.Session.get', side_effect=mock_requests.get) as mock_get:
+            assert len(sytral.next_passage_for_route_point(route_point)) == 2
+            assert len(sytral.next_passage_for_route_point(route_point)) == 2
+            assert mock_get.call_count == 1
+
+            status = sytral.status()['polling']
+            assert status['nb_keys'] == 1
+            assert status['nb_hits'] == 1
+    finally:
+        sytral.poller.stop()
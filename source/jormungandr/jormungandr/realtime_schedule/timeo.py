@@ -33,7 +33,7 @@ from flask import logging
 import pybreaker
 import pytz
 import requests as requests
-from jormungandr import cache, app
+from jormungandr import cache, app, http_pool
 from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy, RealtimeProxyError, floor_datetime
 from jormungandr.schedule import RealTimePassage
 from datetime import datetime, time
@@ -77,6 +77,7 @@ class Timeo(RealtimeProxy):
         self.service_args = service_args
         self.timeout = timeout  # timeout in seconds
         self.rt_system_id = id
+        self.session = http_pool.get_session('realtime:{}'.format(id))
         self.object_id_tag = object_id_tag if object_id_tag else id
         self.destination_id_tag = destination_id_tag
         self.instance = instance
@@ -130,7 +131,9 @@ class Timeo(RealtimeProxy):
         try:
             if not self.rate_limiter.acquire(self.rt_system_id, block=False):
                 return None
-            return self.breaker.call(requests.get, url, timeout=self.timeout)
+            return self._call_upstream(self.breaker.call, self.session.get, url, timeout=self.timeout)
+        except RealtimeProxyError:
+            raise
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error(
                 'Timeo RT service dead, using base schedule (error: {}'.format(e),
@@ -162,9 +165,7 @@ class Timeo(RealtimeProxy):
         req_dt = self._timestamp_to_date(request_dt)
         return now.date() < req_dt.date()
 
-    def _get_next_passage_for_route_point(
-        self, route_point, count=None, from_dt=None, current_dt=None, duration=None
-    ):
+    def _get_timeo_response(self, route_point, count=None, from_dt=None, current_dt=None):
         if self._is_tomorrow(from_dt, current_dt):
             logging.getLogger(__name__).info(
                 'Timeo RT service , Can not call Timeo for tomorrow.',
@@ -189,7 +190,32 @@ class Timeo(RealtimeProxy):
             )
             raise RealtimeProxyError('non 200 response')
 
-        return self._get_passages(r.json(), current_dt, route_point.fetch_line_uri())
+        return r.json()
+
+    def _get_next_passage_for_route_point(
+        self, route_point, count=None, from_dt=None, current_dt=None, duration=None
+    ):
+        resp = self._get_timeo_response(route_point, count, from_dt, current_dt)
+        if resp is None:
+            return None
+        return self._get_passages(resp, current_dt, route_point.fetch_line_uri())
+
+    def _get_batch_key(self, route_point):
+        """
+        timeo is queried by stop, line and way: the route points with the same codes share the same call
+        """
+        codes = (
+            route_point.fetch_stop_id(self.object_id_tag),
+            route_point.fetch_line_id(self.object_id_tag),
+            route_point.fetch_route_id(self.object_id_tag),
+        )
+        return codes if all(codes) else route_point
+
+    def _get_next_passages_for_route_points(self, route_points, count, from_dt, current_dt, duration):
+        resp = self._get_timeo_response(route_points[0], count, from_dt, current_dt)
+        if resp is None:
+            return {}
+        return {rp: self._get_passages(resp, current_dt, rp.fetch_line_uri()) for rp in route_points}
 
     def _get_passages(self, timeo_resp, current_dt, line_uri=None):
         logging.getLogger(__name__).debug(
@@ -0,0 +1,132 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import OrderedDict
+import logging
+import math
+
+from shapely import geometry
+from shapely.geos import PredicateError
+from shapely.prepared import prep
+
+
+class RegionIndex(object):
+    """
+    Find the coverages containing a coord without testing every coverage shape
+
+    The plane is cut in cells of cell_size degrees. For a cell, we keep the coverages whose shape
+    intersects it and whether the cell is fully inside the shape. Points in a cell fully inside a
+    shape don't need any geometric test, the others are tested against a prepared geometry.
+    The cells are computed lazily and the last cache_size cells are kept in a LRU.
+
+    The index is rebuilt when the geometry of an instance changes (see refresh)
+    """
+
+    def __init__(self, cell_size=0.01, cache_size=10000):
+        self.cell_size = cell_size
+        self.cache_size = cache_size
+        self._geoms = {}
+        self._entries = []
+        self._cells = OrderedDict()
+
+    def refresh(self, instances):
+        """
+        rebuild the index if the geometries of the instances have changed
+
+        it's only a comparison of references, the geom is replaced by update_property when kraken
+        publishes new data
+        """
+        geoms = {name: instance.geom for name, instance in instances.items() if getattr(instance, 'geom', None)}
+        if len(geoms) == len(self._geoms) and all(self._geoms.get(n) is g for n, g in geoms.items()):
+            return False
+
+        logging.getLogger(__name__).debug('rebuilding the region index for %s coverages', len(geoms))
+        self._geoms = geoms
+        # we keep the order of the instances to return the coverages in the same order as a linear scan
+        self._entries = [(name, geoms[name].bounds, prep(geoms[name])) for name in instances if name in geoms]
+        self._cells.clear()
+        return True
+
+    def _cell_of(self, lon, lat):
+        return int(math.floor(lon / self.cell_size)), int(math.floor(lat / self.cell_size))
+
+    def _build_cell(self, cell):
+        """
+        return the list of (coverage, geometry) intersecting the cell,
+        geometry is None if the cell is fully inside the coverage
+        """
+        x, y = cell
+        minx, miny = x * self.cell_size, y * self.cell_size
+        maxx, maxy = minx + self.cell_size, miny + self.cell_size
+        cell_box = geometry.box(minx, miny, maxx, maxy)
+        res = []
+        for name, bounds, prepared in self._entries:
+            if bounds[0] > maxx or bounds[2] < minx or bounds[1] > maxy or bounds[3] < miny:
+                continue
+            try:
+                if prepared.contains_properly(cell_box):
+                    res.append((name, None))
+                elif prepared.intersects(cell_box):
+                    res.append((name, prepared))
+            except PredicateError:
+                logging.getLogger(__name__).exception("region index: cannot classify cell for %s", name)
+                # an invalid shape, the point will be tested against it directly
+                res.append((name, self._geoms[name]))
+        return res
+
+    def _get_cell(self, lon, lat):
+        key = self._cell_of(lon, lat)
+        cell = self._cells.pop(key, None)
+        if cell is None:
+            cell = self._build_cell(key)
+        self._cells[key] = cell
+        if len(self._cells) > self.cache_size:
+            self._cells.popitem(last=False)
+        return cell
+
+    def find(self, lon, lat):
+        """
+        return the names of the coverages containing the coord
+        """
+        cell = self._get_cell(lon, lat)
+        if all(geom is None for _, geom in cell):
+            return [name for name, _ in cell]
+
+        point = geometry.Point(lon, lat)
+        res = []
+        for name, geom in cell:
+            try:
+                if geom is None or geom.contains(point):
+                    res.append(name)
+            except PredicateError:
+                logging.getLogger(__name__).exception("has_coord failed")
+        return res
@@ -34,6 +34,8 @@ try:
 except ImportError:
     pass
 import logging
+from jormungandr import app
+from jormungandr.concurrency_limiter import get_pool_size
 from jormungandr.scenarios import new_default
 from jormungandr.utils import PeriodExtremity
 from jormungandr.street_network.street_network import StreetNetworkPathType
@@ -46,6 +48,15 @@ from jormungandr.scenarios.utils import fill_uris, switch_back_to_ridesharing
 from jormungandr.new_relic import record_custom_parameter
 
 
+def _futures_pool_size(instance):
+    """
+    the pool can grow with the free slots of the kraken but the futures wait for each other,
+    so it's never smaller than the configured size (the calls themselves wait for a slot of the limiter)
+    """
+    size = app.config.get(str('GREENLET_POOL_SIZE'), 8)
+    return get_pool_size('kraken', instance.name, size, min_size=size)
+
+
 class PartialResponseContext(object):
     requested_orig = None
     requested_dest = None
@@ -283,7 +294,7 @@ class Scenario(new_default.Scenario):
         Note that the cleaning process depends on the implementation of futures.
         """
         try:
-            with FutureManager() as future_manager:
+            with FutureManager(_futures_pool_size(instance)) as future_manager:
                 return self._scenario._compute_all(future_manager, request, instance, krakens_call, context)
         except PtException as e:
             logger.exception('')
@@ -294,7 +305,7 @@ class Scenario(new_default.Scenario):
 
     def finalise_journeys(self, request, responses, context, instance, is_debug):
         try:
-            with FutureManager() as future_manager:
+            with FutureManager(_futures_pool_size(instance)) as future_manager:
                 self._scenario.finalise_journeys(future_manager, request, responses, context, instance, is_debug)
 
                 from jormungandr.scenarios import journey_filter
@@ -35,12 +35,30 @@ from collections import namedtuple
 from math import sqrt
 from .helper_utils import get_max_fallback_duration
 from jormungandr.street_network.street_network import StreetNetworkPathType
-from jormungandr import new_relic, utils
+from jormungandr import new_relic, utils, app, cache
+from jormungandr.exceptions import InvalidArguments, UnableToParse
+from .fallback_durations_cache import FallbackDurationsCache
 import logging
 
 DurationElement = namedtuple('DurationElement', ['duration', 'status'])
 
 
+def _make_fallback_durations_cache():
+    config = app.config.get(str('FALLBACK_DURATIONS_CACHE'), {})
+    if not config.get('enabled', False):
+        return None
+    return FallbackDurationsCache(
+        max_size=config.get('max_size', 1000),
+        ttl=config.get('ttl', 60),
+        grid_size=config.get('grid_size', 0.001),
+        shared_cache=cache if config.get('use_shared_cache', False) else None,
+    )
+
+
+# street network matrices shared between requests, None if deactivated
+fallback_durations_cache = _make_fallback_durations_cache()
+
+
 class FallbackDurations:
     """
     A "fallback durations" is a dict of 'stop_points uri' vs 'access duration' calculated from a given departure place
@@ -117,6 +135,53 @@ class FallbackDurations:
             logging.getLogger(__name__).error("Exception':{}".format(str(e)))
             return None
 
+    def _get_cache_key(self, streetnetwork_service, center_isochrone):
+        if fallback_durations_cache is None:
+            return None
+        try:
+            coord = utils.get_pt_object_coord(center_isochrone)
+        except (InvalidArguments, UnableToParse):
+            return None
+        return fallback_durations_cache.make_key(
+            self._instance,
+            streetnetwork_service.sn_system_id,
+            self._mode,
+            self._speed_switcher.get(self._mode),
+            self._max_duration_to_pt,
+            self._direct_path_type,
+            coord,
+        )
+
+    def _get_durations_by_uri(self, streetnetwork_service, center_isochrone, origins, destinations, places):
+        """
+        :return: a dict of 'stop_points uri' vs (duration, routing_status) for all the places,
+                 the duration of an unreached place is -1
+        """
+        cache_key = self._get_cache_key(streetnetwork_service, center_isochrone)
+        if cache_key is not None:
+            cached = fallback_durations_cache.get(self._instance, cache_key, (p.uri for p in places))
+            if cached is not None:
+                return cached
+
+        sn_routing_matrix = self._get_street_network_routing_matrix(streetnetwork_service, origins, destinations)
+        if (
+            not sn_routing_matrix
+            or not len(sn_routing_matrix.rows)
+            or not len(sn_routing_matrix.rows[0].routing_response)
+        ):
+            return None
+
+        durations_by_uri = {}
+        for pos, r in enumerate(sn_routing_matrix.rows[0].routing_response):
+            if r.routing_status != response_pb2.unreached:
+                durations_by_uri[places[pos].uri] = (self._get_duration(r, places[pos]), r.routing_status)
+            else:
+                durations_by_uri[places[pos].uri] = (-1, r.routing_status)
+
+        if cache_key is not None:
+            fallback_durations_cache.set(self._instance, cache_key, durations_by_uri)
+        return durations_by_uri
+
     def _do_request(self):
         logger = logging.getLogger(__name__)
         logger.debug("requesting fallback durations from %s by %s", self._requested_place_obj.uri, self._mode)
@@ -171,21 +236,18 @@ class FallbackDurations:
             destinations = [center_isochrone]
 
         streetnetwork_service = self._instance.get_street_network(self._mode, self._request)
-        sn_routing_matrix = self._get_street_network_routing_matrix(streetnetwork_service, origins, destinations)
+        durations_by_uri = self._get_durations_by_uri(
+            streetnetwork_service, center_isochrone, origins, destinations, places_isochrone
+        )
 
-        if (
-            not sn_routing_matrix
-            or not len(sn_routing_matrix.rows)
-            or not len(sn_routing_matrix.rows[0].routing_response)
-        ):
+        if not durations_by_uri:
             logger.debug("no fallback durations found from %s by %s", self._requested_place_obj.uri, self._mode)
             return result
 
-        for pos, r in enumerate(sn_routing_matrix.rows[0].routing_response):
-            if r.routing_status != response_pb2.unreached:
-                duration = self._get_duration(r, places_isochrone[pos])
-                if duration < self._max_duration_to_pt:
-                    result.update({places_isochrone[pos].uri: DurationElement(duration, r.routing_status)})
+        for place in places_isochrone:
+            duration, status = durations_by_uri.get(place.uri, (-1, response_pb2.unreached))
+            if status != response_pb2.unreached and duration < self._max_duration_to_pt:
+                result.update({place.uri: DurationElement(duration, status)})
 
         # We update the fallback duration matrix if the requested origin/destination is also
         # present in the fallback duration matrix, which means from stop_point_1 to itself, it takes 0 second
@@ -0,0 +1,200 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from array import array
+from collections import OrderedDict
+import bisect
+import logging
+import time
+
+
+class _MatrixEntry(object):
+    """
+    Durations of a street network matrix from one place to a set of stop_points
+
+    The stop_points are sorted in 'uris', 'durations' and 'status' are compact arrays indexed like 'uris'.
+    An unreached stop_point has a duration of -1.
+    """
+
+    __slots__ = ('uris', 'durations', 'status', 'publication_date', 'created_at')
+
+    def __init__(self, durations_by_uri, publication_date, created_at):
+        self.uris = tuple(sorted(durations_by_uri))
+        self.durations = array(str('i'), (durations_by_uri[uri][0] for uri in self.uris))
+        self.status = array(str('b'), (durations_by_uri[uri][1] for uri in self.uris))
+        self.publication_date = publication_date
+        self.created_at = created_at
+
+    def get(self, uris):
+        """
+        return a dict of uri -> (duration, status) for the given uris, None if some are not in the entry
+        """
+        res = {}
+        for uri in uris:
+            pos = bisect.bisect_left(self.uris, uri)
+            if pos == len(self.uris) or self.uris[pos] != uri:
+                return None
+            res[uri] = (self.durations[pos], self.status[pos])
+        return res
+
+    def __getstate__(self):
+        # with __slots__ and without these methods, the entry can't be pickled with the protocol 0
+        # used by werkzeug's RedisCache on py2
+        return (self.uris, self.durations.tolist(), self.status.tolist(), self.publication_date, self.created_at)
+
+    def __setstate__(self, state):
+        self.uris, durations, status, self.publication_date, self.created_at = state
+        self.durations = array(str('i'), durations)
+        self.status = array(str('b'), status)
+
+
+class FallbackDurationsCache(object):
+    """
+    Cache of the street network matrices computed by the fallback durations
+
+    Matrices are cached across requests, the key is made of the instance, the street network service, the mode,
+    the speed, the max duration, the direction of the fallback and the coordinate of the requested place
+    rounded to a grid of 'grid_size' degrees, so close origins share their matrix.
+
+    The entries are evicted in LRU order when there is more than 'max_size' entries and after 'ttl' seconds.
+    A shared cache (the redis cache of jormungandr) can be used as a second tier.
+    All entries of an instance are invalidated when its publication_date changes.
+    """
+
+    def __init__(self, max_size=1000, ttl=60, grid_size=0.001, shared_cache=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.grid_size = grid_size
+        self.shared_cache = shared_cache
+        self._entries = OrderedDict()
+        self._publication_dates = {}
+        self.nb_hits = 0
+        self.nb_misses = 0
+
+    def make_key(self, instance, sn_system_id, mode, speed, max_duration, direct_path_type, coord):
+        return 'fallback_matrix:{}:{}:{}:{}:{}:{}:{}:{}'.format(
+            instance.name,
+            sn_system_id,
+            mode,
+            speed,
+            max_duration,
+            direct_path_type,
+            int(round(coord.lon / self.grid_size)),
+            int(round(coord.lat / self.grid_size)),
+        )
+
+    def _check_publication_date(self, instance):
+        """
+        drop all the entries of the instance if its data have been reloaded
+        """
+        if self._publication_dates.get(instance.name) == instance.publication_date:
+            return
+        self._publication_dates[instance.name] = instance.publication_date
+        prefix = 'fallback_matrix:{}:'.format(instance.name)
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+    def _get_shared(self, key):
+        if self.shared_cache is None:
+            return None
+        try:
+            return self.shared_cache.get(key)
+        except:
+            # each cache backend has it's own exceptions, the shared cache is only an optimization
+            logging.getLogger(__name__).exception('impossible to get the fallback matrix from the cache')
+            return None
+
+    def _set_shared(self, key, entry):
+        if self.shared_cache is None:
+            return
+        try:
+            self.shared_cache.set(key, entry, timeout=self.ttl)
+        except:
+            logging.getLogger(__name__).exception('impossible to store the fallback matrix in the cache')
+
+    def get(self, instance, key, uris):
+        """
+        return a dict of uri -> (duration, status) for all the uris or None if the matrix isn't cached
+        """
+        self._check_publication_date(instance)
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and now - entry.created_at > self.ttl:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            entry = self._get_shared(key)
+            if entry is not None and entry.publication_date != instance.publication_date:
+                entry = None
+            if entry is not None:
+                self._store_local(key, entry)
+        else:
+            self._touch(key)
+
+        res = entry.get(uris) if entry is not None else None
+        if res is None:
+            self.nb_misses += 1
+        else:
+            self.nb_hits += 1
+        return res
+
+    def _touch(self, key):
+        # move the entry at the end of the LRU
+        self._entries[key] = self._entries.pop(key)
+
+    def _store_local(self, key, entry):
+        self._entries[key] = entry
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def set(self, instance, key, durations_by_uri):
+        """
+        store the durations of a matrix, durations_by_uri is a dict of uri -> (duration, status)
+        """
+        self._check_publication_date(instance)
+        entry = _MatrixEntry(durations_by_uri, instance.publication_date, time.time())
+        self._store_local(key, entry)
+        self._set_shared(key, entry)
+
+    def clear(self):
+        self._entries.clear()
+
+    def status(self):
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'grid_size': self.grid_size,
+            'nb_hits': self.nb_hits,
+            'nb_misses': self.nb_misses,
+        }
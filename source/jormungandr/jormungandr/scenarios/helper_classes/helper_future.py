@@ -27,10 +27,18 @@
 # https://groups.google.com/d/forum/navitia
 # www.navitia.io
 from __future__ import absolute_import
+import time
 import gevent
 import gevent.pool
+import flask
 from jormungandr import app
 from contextlib import contextmanager
+from jormungandr.scenarios.helper_classes.helper_timings import (
+    FutureTiming,
+    get_phase,
+    phase_histograms,
+    log_timings,
+)
 
 # Using abc.ABCMeta in a way it is compatible both with Python 2.7 and Python 3.x
 # http://stackoverflow.com/a/38668373/1614576
@@ -68,25 +76,42 @@ class _AbstractPoolManager(ABC):  # type: ignore
 
 class _GeventFuture(_AbstractFuture):
     def __init__(self, pool, fun, *args, **kwargs):
-        self._future = pool.spawn(fun, *args, **kwargs)
+        self.timing = FutureTiming(*get_phase(fun))
+        self._future = pool.spawn(self._timed_call, fun, *args, **kwargs)
+
+    def _timed_call(self, fun, *args, **kwargs):
+        self.timing.start()
+        try:
+            return fun(*args, **kwargs)
+        finally:
+            self.timing.finish()
 
     def get_future(self):
         return self._future
 
     def wait_and_get(self):
-        return self._future.get()
+        if self._future.ready():
+            return self._future.get()
+        start = time.time()
+        try:
+            return self._future.get()
+        finally:
+            self.timing.wait_time += time.time() - start
 
 
 class _GeventPoolManager(_AbstractPoolManager):
-    def __init__(self):
-        self._pool = gevent.pool.Pool(app.config.get('GREENLET_POOL_SIZE', 8))
+    def __init__(self, pool_size=None):
+        self._pool = gevent.pool.Pool(pool_size or app.config.get('GREENLET_POOL_SIZE', 8))
         self.is_within_context = False
+        self.timings = []
 
     def create_future(self, fun, *args, **kwargs):
         assert (
             self.is_within_context
         ), "You are trying to create a Greenlet outside of it's context. Your FutureManager is already out of scope"
-        return _GeventFuture(self._pool, fun, *args, **kwargs)
+        future = _GeventFuture(self._pool, fun, *args, **kwargs)
+        self.timings.append(future.timing)
+        return future
 
     def clean_futures(self):
         """
@@ -97,11 +122,23 @@ class _GeventPoolManager(_AbstractPoolManager):
         """
         self._pool.join()
         self.is_within_context = False
+        self.report_timings()
+
+    def report_timings(self):
+        for timing in self.timings:
+            phase_histograms.add(timing)
+        if app.config.get(str('LOG_FUTURES_TIMINGS'), False):
+            log_timings(self.timings)
+        # in debug the timings are displayed in the response
+        if flask.has_request_context() and getattr(flask.g, 'debug', False):
+            if not hasattr(flask.g, 'futures_timings'):
+                flask.g.futures_timings = []
+            flask.g.futures_timings.extend(t.to_dict() for t in self.timings)
 
 
 @contextmanager
-def FutureManager():
-    m = _GeventPoolManager()
+def FutureManager(pool_size=None):
+    m = _GeventPoolManager(pool_size)
     m.is_within_context = True
     try:
         yield m
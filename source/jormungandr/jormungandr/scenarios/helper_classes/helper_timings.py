@@ -0,0 +1,177 @@
+#  Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+"""
+Timings of the futures of the distributed scenario
+
+Each future created by a FutureManager has a FutureTiming:
+ - queue time: from the creation of the future to the start of its greenlet (waiting for a slot in the pool)
+ - wall time: from the start to the end of the greenlet
+ - wait time: time spent by the callers blocked on wait_and_get
+
+The phase of a future is the class of the helper that created it (FallbackDurations, PtJourney...) and its
+mode when it has one.
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import defaultdict
+import bisect
+import logging
+import time
+
+# upper bounds (in ms) of the buckets of the histograms, the last bucket is unbounded
+HISTOGRAM_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def get_phase(fun):
+    """
+    return the phase and the mode of the helper owning the function
+
+    >>> class StreetNetworkPath(object):
+    ...     _mode = 'bike'
+    ...     def _do_request(self):
+    ...         pass
+    >>> get_phase(StreetNetworkPath()._do_request) == ('StreetNetworkPath', 'bike')
+    True
+    >>> class PtJourney(object):
+    ...     _dep_mode = 'walking'
+    ...     _arr_mode = 'bss'
+    ...     def _do_request(self):
+    ...         pass
+    >>> get_phase(PtJourney()._do_request) == ('PtJourney', 'walking-bss')
+    True
+    >>> def do_request():
+    ...     pass
+    >>> get_phase(do_request) == ('do_request', None)
+    True
+    """
+    owner = getattr(fun, '__self__', None)
+    if owner is None or not hasattr(fun, '__func__'):
+        return getattr(fun, '__name__', 'unknown'), None
+    mode = getattr(owner, '_mode', None)
+    if mode is None and hasattr(owner, '_dep_mode'):
+        mode = '{}-{}'.format(owner._dep_mode, getattr(owner, '_arr_mode', None))
+    return type(owner).__name__, mode
+
+
+class FutureTiming(object):
+    __slots__ = ('phase', 'mode', 'created_at', 'started_at', 'finished_at', 'wait_time')
+
+    def __init__(self, phase, mode):
+        self.phase = phase
+        self.mode = mode
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.wait_time = 0
+
+    def start(self):
+        self.started_at = time.time()
+
+    def finish(self):
+        self.finished_at = time.time()
+
+    @property
+    def queue_time(self):
+        if self.started_at is None:
+            return None
+        return self.started_at - self.created_at
+
+    @property
+    def wall_time(self):
+        if self.finished_at is None or self.started_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def to_dict(self):
+        def to_ms(duration):
+            return None if duration is None else int(duration * 1000)
+
+        return {
+            'phase': self.phase,
+            'mode': self.mode,
+            'queue_time': to_ms(self.queue_time),
+            'wall_time': to_ms(self.wall_time),
+            'wait_time': to_ms(self.wait_time),
+        }
+
+
+class _Histogram(object):
+    __slots__ = ('counts', 'total')
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        self.total = 0
+
+    def add(self, duration):
+        ms = duration * 1000
+        self.counts[bisect.bisect_left(HISTOGRAM_BUCKETS, ms)] += 1
+        self.total += ms
+
+    def to_dict(self):
+        nb = sum(self.counts)
+        buckets = ['<={}'.format(b) for b in HISTOGRAM_BUCKETS] + ['>{}'.format(HISTOGRAM_BUCKETS[-1])]
+        return {'count': nb, 'avg': self.total / nb if nb else None, 'buckets': dict(zip(buckets, self.counts))}
+
+
+class PhaseHistograms(object):
+    """
+    histograms of the queue, wall and wait times of the futures by phase and mode, for the whole process
+    """
+
+    METRICS = ('queue_time', 'wall_time', 'wait_time')
+
+    def __init__(self):
+        self._histograms = defaultdict(_Histogram)
+
+    def add(self, timing):
+        for metric in self.METRICS:
+            duration = getattr(timing, metric)
+            if duration is not None:
+                self._histograms[(timing.phase, timing.mode, metric)].add(duration)
+
+    def clear(self):
+        self._histograms.clear()
+
+    def to_dict(self):
+        res = defaultdict(lambda: defaultdict(dict))
+        for (phase, mode, metric), histogram in self._histograms.items():
+            res[phase][mode or 'all'][metric] = histogram.to_dict()
+        return {phase: dict(by_mode) for phase, by_mode in res.items()}
+
+
+phase_histograms = PhaseHistograms()
+
+
+def log_timings(timings):
+    logger = logging.getLogger(__name__)
+    for timing in timings:
+        logger.info(
+            'future %(phase)s (%(mode)s): queue %(queue_time)sms, wall %(wall_time)sms, wait %(wait_time)sms',
+            timing.to_dict(),
+        )
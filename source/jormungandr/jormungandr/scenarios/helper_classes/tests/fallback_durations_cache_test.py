@@ -0,0 +1,136 @@
+# Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+
+from jormungandr.scenarios.helper_classes.fallback_durations_cache import FallbackDurationsCache
+from collections import namedtuple
+from six.moves import cPickle as pickle
+
+FakeInstance = namedtuple('FakeInstance', ['name', 'publication_date'])
+Coord = namedtuple('Coord', ['lon', 'lat'])
+
+# values of response_pb2.RoutingStatus
+reached = 1
+unreached = 2
+
+
+class FakeSharedCache(object):
+    """
+    pickle the values like werkzeug's RedisCache (protocol 0 on py2)
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        value = self.values.get(key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, timeout):
+        self.values[key] = pickle.dumps(value, 0)
+
+
+def make_key(cache, instance, lon=2.37, lat=48.84, mode='walking'):
+    return cache.make_key(instance, 'kraken', mode, 1.12, 1800, 0, Coord(lon, lat))
+
+
+def quantized_key_test():
+    cache = FallbackDurationsCache(grid_size=0.001)
+    instance = FakeInstance('fr', 1)
+    assert make_key(cache, instance, 2.37001, 48.84001) == make_key(cache, instance, 2.37, 48.84)
+    assert make_key(cache, instance, 2.372, 48.84) != make_key(cache, instance, 2.37, 48.84)
+    assert make_key(cache, instance, mode='bike') != make_key(cache, instance)
+
+
+def get_subset_test():
+    cache = FallbackDurationsCache()
+    instance = FakeInstance('fr', 1)
+    key = make_key(cache, instance)
+    assert cache.get(instance, key, ['sp1']) is None
+
+    cache.set(instance, key, {'sp1': (60, reached), 'sp2': (-1, unreached), 'sp3': (120, reached)})
+    assert cache.get(instance, key, ['sp1', 'sp2']) == {'sp1': (60, reached), 'sp2': (-1, unreached)}
+    # sp4 hasn't been computed, the matrix has to be requested
+    assert cache.get(instance, key, ['sp1', 'sp4']) is None
+    assert cache.status()['nb_hits'] == 1
+    assert cache.status()['nb_misses'] == 2
+
+
+def lru_eviction_test():
+    cache = FallbackDurationsCache(max_size=2)
+    instance = FakeInstance('fr', 1)
+    keys = [make_key(cache, instance, lon=2 + i) for i in range(3)]
+    cache.set(instance, keys[0], {'sp1': (60, reached)})
+    cache.set(instance, keys[1], {'sp1': (60, reached)})
+    # keys[0] is used, keys[1] is the least recently used
+    assert cache.get(instance, keys[0], ['sp1'])
+    cache.set(instance, keys[2], {'sp1': (60, reached)})
+
+    assert cache.get(instance, keys[0], ['sp1'])
+    assert cache.get(instance, keys[1], ['sp1']) is None
+    assert cache.get(instance, keys[2], ['sp1'])
+
+
+def ttl_eviction_test():
+    cache = FallbackDurationsCache(ttl=-1)
+    instance = FakeInstance('fr', 1)
+    key = make_key(cache, instance)
+    cache.set(instance, key, {'sp1': (60, reached)})
+    assert cache.get(instance, key, ['sp1']) is None
+    assert cache.status()['size'] == 0
+
+
+def publication_date_invalidation_test():
+    shared_cache = FakeSharedCache()
+    cache = FallbackDurationsCache(shared_cache=shared_cache)
+    instance = FakeInstance('fr', 1)
+    other_instance = FakeInstance('be', 1)
+    key = make_key(cache, instance)
+    other_key = make_key(cache, other_instance)
+    cache.set(instance, key, {'sp1': (60, reached)})
+    cache.set(other_instance, other_key, {'sp1': (60, reached)})
+
+    reloaded_instance = FakeInstance('fr', 2)
+    # the entry of the shared cache is also outdated
+    assert cache.get(reloaded_instance, key, ['sp1']) is None
+    assert cache.get(other_instance, other_key, ['sp1'])
+
+
+def shared_cache_test():
+    shared_cache = FakeSharedCache()
+    instance = FakeInstance('fr', 1)
+    cache = FallbackDurationsCache(shared_cache=shared_cache)
+    key = make_key(cache, instance)
+    cache.set(instance, key, {'sp1': (60, reached)})
+
+    # another worker gets the matrix from the shared cache
+    other_cache = FallbackDurationsCache(shared_cache=shared_cache)
+    assert other_cache.get(instance, key, ['sp1']) == {'sp1': (60, reached)}
+    assert other_cache.status()['size'] == 1
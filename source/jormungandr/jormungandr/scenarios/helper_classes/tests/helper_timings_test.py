@@ -0,0 +1,80 @@
+#  Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals, division
+import gevent
+from flask import g
+
+from jormungandr import app
+from jormungandr.scenarios.helper_classes.helper_future import FutureManager
+from jormungandr.scenarios.helper_classes.helper_timings import PhaseHistograms, FutureTiming
+
+
+class FallbackDurations(object):
+    def __init__(self, mode, duration):
+        self._mode = mode
+        self.duration = duration
+
+    def _do_request(self):
+        gevent.sleep(self.duration)
+        return self._mode
+
+
+def future_manager_timings_test():
+    with app.test_request_context('/'):
+        g.debug = True
+        with FutureManager() as future_manager:
+            walking = future_manager.create_future(FallbackDurations('walking', 0.02)._do_request)
+            bike = future_manager.create_future(FallbackDurations('bike', 0)._do_request)
+            assert walking.wait_and_get() == 'walking'
+            assert bike.wait_and_get() == 'bike'
+
+        timings = {t['mode']: t for t in g.futures_timings}
+        assert set(timings) == {'walking', 'bike'}
+        assert all(t['phase'] == 'FallbackDurations' for t in timings.values())
+        assert timings['walking']['wall_time'] >= 20
+        # the caller has been blocked waiting for the walking future, not for the bike one
+        assert timings['walking']['wait_time'] >= 15
+        assert timings['bike']['wait_time'] == 0
+
+
+def phase_histograms_test():
+    histograms = PhaseHistograms()
+    for duration in (0.0005, 0.003, 0.003, 3):
+        timing = FutureTiming('PtJourney', 'walking-walking')
+        timing.started_at = timing.created_at
+        timing.finished_at = timing.started_at + duration
+        histograms.add(timing)
+
+    res = histograms.to_dict()
+    wall_time = res['PtJourney']['walking-walking']['wall_time']
+    assert wall_time['count'] == 4
+    assert wall_time['buckets']['<=1'] == 1
+    assert wall_time['buckets']['<=5'] == 2
+    assert wall_time['buckets']['<=5000'] == 1
+    assert res['PtJourney']['walking-walking']['queue_time']['buckets']['<=1'] == 4
@@ -588,6 +588,77 @@ def filter_detailed_journeys(responses, request):
     [f_wrapped(j) for j in journeys]
 
 
+class _SimilarityCriteria(object):
+    """
+    Values of a journey used by _get_worst_similar, read once from the protobuf
+    """
+
+    __slots__ = (
+        'arrival_date_time',
+        'departure_date_time',
+        'duration',
+        'fallback_duration',
+        'nb_connections',
+        'min_waiting',
+        'first_section',
+        'last_section',
+    )
+
+    def __init__(self, journey):
+        def get_mode_rank(section):
+            mode_rank = {response_pb2.Car: 0, response_pb2.Bike: 1, response_pb2.Walking: 2}
+            return mode_rank.get(section.street_network.mode)
+
+        def is_fallback(section):
+            return section.type == response_pb2.CROW_FLY or section.type != response_pb2.STREET_NETWORK
+
+        def section_criteria(section):
+            if section is None:
+                return False, None, None
+            return is_fallback(section), section.street_network.mode, get_mode_rank(section)
+
+        self.arrival_date_time = journey.arrival_date_time
+        self.departure_date_time = journey.departure_date_time
+        self.duration = journey.duration
+        self.fallback_duration = fallback_duration(journey)
+        self.nb_connections = get_nb_connections(journey)
+        self.min_waiting = get_min_waiting(journey)
+        self.first_section = section_criteria(journey.sections[0] if journey.sections else None)
+        self.last_section = section_criteria(journey.sections[-1] if journey.sections else None)
+
+
+def _get_worst_similar_by_criteria(j1, c1, j2, c2, clockwise):
+    """
+    Same as _get_worst_similar with the criteria of the journeys already computed
+    """
+    if clockwise:
+        if c1.arrival_date_time != c2.arrival_date_time:
+            return j1 if c1.arrival_date_time > c2.arrival_date_time else j2
+    else:
+        if c1.departure_date_time != c2.departure_date_time:
+            return j1 if c1.departure_date_time < c2.departure_date_time else j2
+
+    if c1.duration != c2.duration:
+        return j1 if c1.duration > c2.duration else j2
+
+    if c1.fallback_duration != c2.fallback_duration:
+        return j1 if c1.fallback_duration > c2.fallback_duration else j2
+
+    if c1.nb_connections != c2.nb_connections:
+        return j1 if c1.nb_connections > c2.nb_connections else j2
+
+    if c1.min_waiting != c2.min_waiting:
+        return j1 if c1.min_waiting < c2.min_waiting else j2
+
+    for s1, s2 in ((c1.first_section, c2.first_section), (c1.last_section, c2.last_section)):
+        is_fallback_1, mode_1, rank_1 = s1
+        is_fallback_2, mode_2, rank_2 = s2
+        if is_fallback_1 and is_fallback_2 and mode_1 != mode_2:
+            return j1 if rank_1 > rank_2 else j2
+
+    return j2
+
+
 def _get_worst_similar(j1, j2, request):
     """
     Decide which is the worst journey between 2 similar journeys.
@@ -602,43 +673,42 @@ def _get_worst_similar(j1, j2, request):
             it's better to know that you can do it by bike for 'bike_in_pt' tag
             (and traveler presumes he can do it walking too, as the practical case is 0s fallback)
     """
-    if request.get('clockwise', True):
-        if j1.arrival_date_time != j2.arrival_date_time:
-            return j1 if j1.arrival_date_time > j2.arrival_date_time else j2
-    else:
-        if j1.departure_date_time != j2.departure_date_time:
-            return j1 if j1.departure_date_time < j2.departure_date_time else j2
-
-    if j1.duration != j2.duration:
-        return j1 if j1.duration > j2.duration else j2
-
-    if fallback_duration(j1) != fallback_duration(j2):
-        return j1 if fallback_duration(j1) > fallback_duration(j2) else j2
+    return _get_worst_similar_by_criteria(
+        j1, _SimilarityCriteria(j1), j2, _SimilarityCriteria(j2), request.get('clockwise', True)
+    )
 
-    if get_nb_connections(j1) != get_nb_connections(j2):
-        return j1 if get_nb_connections(j1) > get_nb_connections(j2) else j2
 
-    if get_min_waiting(j1) != get_min_waiting(j2):
-        return j1 if get_min_waiting(j1) < get_min_waiting(j2) else j2
+class _JourneysSignatures(object):
+    """
+    Encode once the journeys compared 2 by 2 in _filter_similar_journeys
 
-    def get_mode_rank(section):
-        mode_rank = {response_pb2.Car: 0, response_pb2.Bike: 1, response_pb2.Walking: 2}
-        return mode_rank.get(section.street_network.mode)
+    Each distinct sequence of values given by the similar journey generator is given an integer id, the
+    signature: 2 journeys are similar if they have the same signature.
+    The signature and the criteria of a journey are computed the first time it is met, the following
+    comparisons don't read the protobuf anymore.
+    """
 
-    def is_fallback(section):
-        return section.type == response_pb2.CROW_FLY or section.type != response_pb2.STREET_NETWORK
+    def __init__(self, similar_journey_generator):
+        self._similar_journey_generator = similar_journey_generator
+        self._signature_ids = {}
+        # id(journey) -> (journey, signature, criteria)
+        # the journey is kept so its id can't be reused by another object
+        self._journeys = {}
 
-    s1 = j1.sections[0]
-    s2 = j2.sections[0]
-    if is_fallback(s1) and is_fallback(s2) and s1.street_network.mode != s2.street_network.mode:
-        return j1 if get_mode_rank(s1) > get_mode_rank(s2) else j2
+    def _get(self, journey):
+        encoded = self._journeys.get(id(journey))
+        if encoded is None:
+            values = tuple(self._similar_journey_generator(journey))
+            signature = self._signature_ids.setdefault(values, len(self._signature_ids))
+            encoded = (journey, signature, _SimilarityCriteria(journey))
+            self._journeys[id(journey)] = encoded
+        return encoded
 
-    s1 = j1.sections[-1]
-    s2 = j2.sections[-1]
-    if is_fallback(s1) and is_fallback(s2) and s1.street_network.mode != s2.street_network.mode:
-        return j1 if get_mode_rank(s1) > get_mode_rank(s2) else j2
+    def signature(self, journey):
+        return self._get(journey)[1]
 
-    return j2
+    def criteria(self, journey):
+        return self._get(journey)[2]
 
 
 def filter_similar_vj_journeys(journey_pairs_pool, request):
@@ -662,12 +732,16 @@ def _filter_similar_journeys(journey_pairs_pool, request, similar_journey_genera
 
     logger = logging.getLogger(__name__)
     is_debug = request.get('debug', False)
+    clockwise = request.get('clockwise', True)
+    signatures = _JourneysSignatures(similar_journey_generator)
     for j1, j2 in journey_pairs_pool:
         if to_be_deleted(j1) or to_be_deleted(j2):
             continue
-        if compare(j1, j2, similar_journey_generator):
+        if signatures.signature(j1) == signatures.signature(j2):
             # After comparison, if the 2 journeys are similar, the worst one must be eliminated
-            worst = _get_worst_similar(j1, j2, request)
+            worst = _get_worst_similar_by_criteria(
+                j1, signatures.criteria(j1), j2, signatures.criteria(j2), clockwise
+            )
             logger.debug(
                 "the journeys {}, {} are similar, we delete {}".format(
                     j1.internal_id, j2.internal_id, worst.internal_id
@@ -31,6 +31,7 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 
 from copy import deepcopy
 import itertools
+import functools
 import logging
 from flask_restful import abort
 from flask import g
@@ -75,6 +76,7 @@ from jormungandr.scenarios.simple import get_pb_data_freshness
 import gevent, gevent.pool
 import flask
 from jormungandr import app
+from jormungandr.concurrency_limiter import get_pool_size
 from jormungandr.autocomplete.geocodejson import GeocodeJson
 from jormungandr import global_autocomplete
 from jormungandr.new_relic import record_custom_parameter
@@ -442,6 +444,221 @@ def _get_sorted_solutions_indexes(selected_sections_matrix, nb_journeys_to_find,
     return best_indexes, selection_matrix
 
 
+def _build_sections_bitsets(sections_set, candidates_pool):
+    """
+    Same as _build_selected_sections_matrix but every journey is encoded as an integer whose bit i is set
+    if the journey uses the section i
+    """
+    sections_2_index_dict = {value: index for index, value in enumerate(sections_set)}
+    bitsets = []
+    for j in candidates_pool:
+        bitset = 0
+        for s in j.sections:
+            ind = sections_2_index_dict.get(_get_section_id(s))
+            if ind is not None:
+                bitset |= 1 << ind
+        bitsets.append(bitset)
+    return bitsets
+
+
+def _popcount(bitset):
+    return bin(bitset).count('1')
+
+
+def _smallest_sums_table(values):
+    """
+    table[i][k] is the sum of the k smallest values among values[:i]
+
+    >>> _smallest_sums_table([3, 1, 2])
+    [[0], [0, 3], [0, 1, 4], [0, 1, 3, 6]]
+    """
+    table = [[0]]
+    for i in range(1, len(values) + 1):
+        sums = [0]
+        for v in sorted(values[:i]):
+            sums.append(sums[-1] + v)
+        table.append(sums)
+    return table
+
+
+def _get_best_combination(sections_bitsets, nb_journeys_to_find, idx_of_jrny_must_keep, pseudo_durations):
+    """
+    Find the combination of nb_journeys_to_find journeys that contains all the must-keep journeys and that:
+     - covers as many sections as possible (integrity)
+     - then has as few sections as possible
+     - then has the smallest sum of pseudo durations
+
+    It gives the same answer as _get_sorted_solutions_indexes followed by the pseudo duration sort,
+    ties being broken the same way (first combination in the order of gen_all_combin), but the combinations
+    are explored with a branch and bound instead of being all materialized.
+
+    The combinations are built by choosing the journeys from the greatest index to the smallest one, which
+    enumerates them in the order of gen_all_combin (colexicographic order).
+    A branch is cut when, even by taking the best remaining journeys, it cannot be better than the best
+    combination found so far.
+
+    :return: the indexes of the chosen journeys
+    """
+    nb_journeys = len(sections_bitsets)
+    nb_sections_set = _popcount(functools.reduce(lambda a, b: a | b, sections_bitsets, 0))
+    nb_sections = [_popcount(b) for b in sections_bitsets]
+
+    # sections covered by the journeys [0, i)
+    prefix_bitsets = [0]
+    for b in sections_bitsets:
+        prefix_bitsets.append(prefix_bitsets[-1] | b)
+    # number of must-keep journeys in [0, i)
+    must_keep = set(idx_of_jrny_must_keep)
+    prefix_must_keep = [0]
+    for i in range(nb_journeys):
+        prefix_must_keep.append(prefix_must_keep[-1] + (i in must_keep))
+
+    min_nb_sections = _smallest_sums_table(nb_sections)
+    min_pseudo_durations = _smallest_sums_table(pseudo_durations)
+
+    def _score(combination):
+        bitset = functools.reduce(lambda a, i: a | sections_bitsets[i], combination, 0)
+        return (
+            nb_sections_set - _popcount(bitset),
+            sum(nb_sections[i] for i in combination),
+            sum(pseudo_durations[i] for i in combination),
+        )
+
+    # a greedy combination gives a first bound to cut the branches early
+    # it's only a bound: among the combinations with the best score, the first one enumerated is chosen
+    greedy = list(idx_of_jrny_must_keep)
+    while len(greedy) < min(nb_journeys_to_find, nb_journeys):
+        greedy.append(
+            min((i for i in range(nb_journeys) if i not in greedy), key=lambda i: _score(greedy + [i]))
+        )
+    best = {'score': _score(greedy), 'combination': None}
+
+    def _max_new_sections(bitset, hi, k):
+        """
+        upper bound of the number of sections not in bitset that k journeys among [0, hi) can add
+        """
+        missing = ~bitset
+        if k == 0 or not prefix_bitsets[hi] & missing:
+            return 0
+        gains = sorted((_popcount(sections_bitsets[j] & missing) for j in range(hi)), reverse=True)
+        return min(_popcount(prefix_bitsets[hi] & missing), sum(gains[:k]))
+
+    def _explore(k, hi, bitset, sum_sections, sum_pseudo_durations, chosen):
+        """
+        choose k journeys among [0, hi)
+        """
+        if k == 0:
+            score = (nb_sections_set - _popcount(bitset), sum_sections, sum_pseudo_durations)
+            if score < best['score'] or (score == best['score'] and best['combination'] is None):
+                best['score'] = score
+                best['combination'] = list(chosen)
+            return
+        for i in range(k - 1, hi):
+            # the must-keep journeys in [0, i) must fit in the k-1 remaining choices
+            if prefix_must_keep[i] > k - 1:
+                break
+            # the journeys in (i, hi) are skipped, none of them must be kept
+            if prefix_must_keep[hi] - prefix_must_keep[i + 1] > 0:
+                continue
+            new_bitset = bitset | sections_bitsets[i]
+            new_sum_sections = sum_sections + nb_sections[i]
+            new_sum_pseudo_durations = sum_pseudo_durations + pseudo_durations[i]
+            lower_bound = (
+                nb_sections_set - _popcount(new_bitset) - _max_new_sections(new_bitset, i, k - 1),
+                new_sum_sections + min_nb_sections[i][k - 1],
+                new_sum_pseudo_durations + min_pseudo_durations[i][k - 1],
+            )
+            # once a combination is found, only a strictly better one can replace it
+            if lower_bound > best['score'] or (best['combination'] is not None and lower_bound >= best['score']):
+                continue
+            chosen.append(i)
+            _explore(k - 1, i, new_bitset, new_sum_sections, new_sum_pseudo_durations, chosen)
+            chosen.pop()
+
+    _explore(min(nb_journeys_to_find, nb_journeys), nb_journeys, 0, 0, 0, [])
+
+    logger = logging.getLogger(__name__)
+    logger.debug("Best Itegrity: {0}".format(best['score'][0]))
+    logger.debug("Best Nb sections: {0}".format(best['score'][1]))
+    return sorted(best['combination'])
+
+
+def _select_journeys_by_combinations(
+    candidates_pool, sections_set, max_nb_journeys, idx_of_jrnys_must_keep, request
+):
+    """
+    culling engine materializing all the combinations of journeys
+
+    :return: the indexes of the journeys to keep
+    """
+    logger = logging.getLogger(__name__)
+    """
+    Ex:
+    Journey_2 : Line 14 -> Line 6 -> Bus 165
+    Journey_3 : Line 14 -> Line 8 -> Bus 165
+
+    The candidate pool will be like [Journey_2, Journey_3]
+    The sections set will be like set([Line 14, Line 6, Line 8, Bus 165])
+
+    selected_sections_matrix:
+    [[1,1,0,1] -> journey_2
+     [1,0,1,1] -> journey_3
+    ]
+    """
+    selected_sections_matrix = _build_selected_sections_matrix(sections_set, candidates_pool)
+
+    best_indexes, selection_matrix = _get_sorted_solutions_indexes(
+        selected_sections_matrix, max_nb_journeys, idx_of_jrnys_must_keep
+    )
+
+    logger.debug("Nb best solutions: {0}".format(best_indexes.shape[0]))
+
+    the_best_index = best_indexes[0]
+
+    logger.debug("Trying to find the best of best")
+    """
+    Let's find the best of best :)
+    """
+    # If there're several solutions which have the same score of integrity and nb_sections
+    if best_indexes.shape[0] != 1:
+        requested_dt = request['datetime']
+        is_clockwise = request.get('clockwise', True)
+
+        def combinations_sorter(v):
+            # Hoping to find We sort the solution by the sum of journeys' pseudo duration
+            return np.sum(
+                (
+                    get_pseudo_duration(jrny, requested_dt, is_clockwise)
+                    for jrny in np.array(candidates_pool)[np.where(selection_matrix[v, :])]
+                )
+            )
+
+        the_best_index = min(best_indexes, key=combinations_sorter)
+
+    return np.where(selection_matrix[the_best_index, :])[0]
+
+
+def _select_journeys_by_branch_and_bound(
+    candidates_pool, sections_set, max_nb_journeys, idx_of_jrnys_must_keep, request
+):
+    """
+    culling engine exploring the combinations of journeys with a branch and bound
+
+    :return: the indexes of the journeys to keep
+    """
+    requested_dt = request['datetime']
+    is_clockwise = request.get('clockwise', True)
+    pseudo_durations = [get_pseudo_duration(jrny, requested_dt, is_clockwise) for jrny in candidates_pool]
+    sections_bitsets = _build_sections_bitsets(sections_set, candidates_pool)
+    return _get_best_combination(sections_bitsets, max_nb_journeys, idx_of_jrnys_must_keep, pseudo_durations)
+
+
+CULLING_ENGINES = {
+    'combinatorial': _select_journeys_by_combinations,
+    'branch_and_bound': _select_journeys_by_branch_and_bound,
+}
+
+
 def culling_journeys(resp, request):
     """
     Remove some journeys if there are too many of them to have max_nb_journeys journeys.
@@ -577,52 +794,15 @@ def culling_journeys(resp, request):
 
     logger.debug('Trying to find {0} journeys from {1}'.format(max_nb_journeys, candidates_pool.shape[0]))
 
-    """
-    Ex:
-    Journey_2 : Line 14 -> Line 6 -> Bus 165
-    Journey_3 : Line 14 -> Line 8 -> Bus 165
-
-    The candidate pool will be like [Journey_2, Journey_3]
-    The sections set will be like set([Line 14, Line 6, Line 8, Bus 165])
-
-    selected_sections_matrix:
-    [[1,1,0,1] -> journey_2
-     [1,0,1,1] -> journey_3
-    ]
-    """
-    selected_sections_matrix = _build_selected_sections_matrix(sections_set, candidates_pool)
-
-    best_indexes, selection_matrix = _get_sorted_solutions_indexes(
-        selected_sections_matrix, max_nb_journeys, idx_of_jrnys_must_keep
+    select_journeys = CULLING_ENGINES[app.config.get(str('CULLING_ENGINE'), 'branch_and_bound')]
+    selected_indexes = set(
+        select_journeys(candidates_pool, sections_set, max_nb_journeys, idx_of_jrnys_must_keep, request)
     )
 
-    logger.debug("Nb best solutions: {0}".format(best_indexes.shape[0]))
-
-    the_best_index = best_indexes[0]
-
-    logger.debug("Trying to find the best of best")
-    """
-    Let's find the best of best :)
-    """
-    # If there're several solutions which have the same score of integrity and nb_sections
-    if best_indexes.shape[0] != 1:
-        requested_dt = request['datetime']
-        is_clockwise = request.get('clockwise', True)
-
-        def combinations_sorter(v):
-            # Hoping to find We sort the solution by the sum of journeys' pseudo duration
-            return np.sum(
-                (
-                    get_pseudo_duration(jrny, requested_dt, is_clockwise)
-                    for jrny in np.array(candidates_pool)[np.where(selection_matrix[v, :])]
-                )
-            )
-
-        the_best_index = min(best_indexes, key=combinations_sorter)
-
     logger.debug('Removing non selected journeys')
-    for jrny in candidates_pool[np.where(selection_matrix[the_best_index, :] == 0)]:
-        journey_filter.mark_as_dead(jrny, is_debug, 'Filtered by max_nb_journeys')
+    for idx, jrny in enumerate(candidates_pool):
+        if idx not in selected_indexes:
+            journey_filter.mark_as_dead(jrny, is_debug, 'Filtered by max_nb_journeys')
 
     journey_filter.delete_journeys((resp,), request)
 
@@ -1043,7 +1223,8 @@ class Scenario(simple.Scenario):
                     instance.send_and_receive(request, flask_request_id=flask_request_id),
                 )
 
-        pool = gevent.pool.Pool(app.config.get('GREENLET_POOL_SIZE', 3))
+        # without adaptive limits the pool has a fixed size, else it uses the free slots of the kraken
+        pool = gevent.pool.Pool(get_pool_size('kraken', instance.name, app.config.get('GREENLET_POOL_SIZE', 3)))
         for dep_mode, arr_mode in krakens_call:
             pb_request = create_pb_request(request_type, request, dep_mode, arr_mode)
             # we spawn a new greenlet, it won't have access to our thread local request object so we pass the request_id
@@ -36,7 +36,7 @@ import pytz
 import requests as requests
 
 from jormungandr import utils
-from jormungandr import app
+from jormungandr import app, http_pool
 import jormungandr.scenarios.ridesharing.ridesharing_journey as rsj
 from jormungandr.scenarios.ridesharing.ridesharing_service import (
     AbstractRidesharingService,
@@ -76,6 +76,7 @@ class InstantSystem(AbstractRidesharingService):
         self.rating_scale_max = rating_scale_max
         self.system_id = 'Instant System'
         self.timeout = timeout
+        self.session = http_pool.get_session('ridesharing:instant_system:{}'.format(network))
         self.feed_publisher = None if feed_publisher is None else RsFeedPublisher(**feed_publisher)
         self.crowfly_radius = crowfly_radius
         self.timeframe_duration = timeframe_duration
@@ -111,7 +112,7 @@ class InstantSystem(AbstractRidesharingService):
         headers = {'Authorization': 'apiKey {}'.format(self.api_key)}
         try:
             return self.breaker.call(
-                requests.get, url=self.service_url, headers=headers, params=params, timeout=self.timeout
+                self.session.get, url=self.service_url, headers=headers, params=params, timeout=self.timeout
             )
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error(
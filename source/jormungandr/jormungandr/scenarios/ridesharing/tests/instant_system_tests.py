@@ -228,7 +228,7 @@ def get_ridesharing_service_test():
 
 
 def instant_system_test():
-    with mock.patch('requests.get', mock_get):
+    with mock.patch('requests.Session.get', mock_get):
 
         instant_system = InstantSystem(
             DummyInstance(),
@@ -0,0 +1,104 @@
+# Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Benchmark of the engines used to cull the journeys (see new_default.culling_journeys)
+
+Synthetic pools of journeys made of 1 to 4 public transport sections are culled by every engine, the
+combinatorial engine is skipped when the number of combinations is too big to be materialized.
+
+Usage: python -m jormungandr.scenarios.tests.culling_benchmark [--pool-sizes 10 20 40 60] [--max-nb-journeys 6]
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+import argparse
+import random
+import timeit
+import navitiacommon.response_pb2 as response_pb2
+from jormungandr.scenarios import new_default
+from jormungandr.scenarios.utils import nCr
+
+REQUESTED_DATETIME = 1444903200
+# beyond this number of combinations the combinatorial engine takes gigabytes of memory
+MAX_COMBINATIONS = 5 * 10 ** 6
+
+
+def build_pool(nb_journeys, nb_lines, nb_must_keep, seed):
+    rand = random.Random(seed)
+    response = response_pb2.Response()
+    for i in range(nb_journeys):
+        journey = response.journeys.add()
+        journey.arrival_date_time = REQUESTED_DATETIME + rand.randint(10, 120) * 60
+        if i < nb_must_keep:
+            journey.type = new_default.JOURNEY_TYPES_TO_RETAIN[i % len(new_default.JOURNEY_TYPES_TO_RETAIN)]
+        for _ in range(rand.randint(1, 4)):
+            section = journey.sections.add()
+            section.type = response_pb2.PUBLIC_TRANSPORT
+            section.uris.line = 'line:{}'.format(rand.randint(0, nb_lines - 1))
+    return new_default._build_candidate_pool_and_sections_set(response.journeys)
+
+
+def run(pool_sizes, max_nb_journeys, nb_repeat):
+    request = {'datetime': REQUESTED_DATETIME, 'clockwise': True}
+    print(
+        '{:>6} {:>14} {:>20} {:>20}'.format(
+            'pool', 'combinations', 'combinatorial (ms)', 'branch_and_bound (ms)'
+        )
+    )
+    for pool_size in pool_sizes:
+        candidates_pool, sections_set, must_keep = build_pool(pool_size, pool_size // 2, 2, seed=pool_size)
+        nb_combinations = nCr(pool_size, max_nb_journeys)
+        timings = {}
+        results = {}
+        for name, engine in sorted(new_default.CULLING_ENGINES.items()):
+            if name == 'combinatorial' and nb_combinations > MAX_COMBINATIONS:
+                continue
+
+            def cull():
+                results[name] = list(engine(candidates_pool, sections_set, max_nb_journeys, must_keep, request))
+
+            timings[name] = min(timeit.repeat(cull, number=1, repeat=nb_repeat)) * 1000
+        if len(results) == 2:
+            assert results['combinatorial'] == results['branch_and_bound'], 'the engines disagree'
+        print(
+            '{:>6} {:>14} {:>20} {:>20}'.format(
+                pool_size,
+                nb_combinations,
+                '{:.1f}'.format(timings['combinatorial']) if 'combinatorial' in timings else 'skipped',
+                '{:.1f}'.format(timings['branch_and_bound']),
+            )
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='benchmark of the journeys culling engines')
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=[10, 20, 30, 40, 50, 60])
+    parser.add_argument('--max-nb-journeys', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.pool_sizes, args.max_nb_journeys, args.repeat)
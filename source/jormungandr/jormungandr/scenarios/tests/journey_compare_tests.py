@@ -599,6 +599,53 @@ def test_similar_journeys_crowfly_rs():
     assert not jf.compare(journey1, journey2, jf.similar_journeys_vj_generator)
 
 
+def test_journeys_signatures():
+    """
+    similar journeys share the same signature, the protobuf is read only once per journey
+    """
+    journey1 = response_pb2.Journey()
+    journey1.sections.add()
+    journey1.sections[-1].type = response_pb2.CROW_FLY
+    journey1.sections[-1].street_network.mode = response_pb2.Walking
+    journey2 = deepcopy(journey1)
+    journey3 = response_pb2.Journey()
+    journey3.sections.add()
+    journey3.sections[-1].type = response_pb2.CROW_FLY
+    journey3.sections[-1].street_network.mode = response_pb2.Ridesharing
+
+    calls = []
+
+    def generator(journey):
+        calls.append(journey)
+        return jf.similar_journeys_vj_generator(journey)
+
+    signatures = jf._JourneysSignatures(generator)
+    assert signatures.signature(journey1) == signatures.signature(journey2)
+    assert signatures.signature(journey1) != signatures.signature(journey3)
+    assert signatures.signature(journey3) != signatures.signature(journey2)
+    assert len(calls) == 3
+
+
+def test_get_worst_similar_by_criteria():
+    journey1 = response_pb2.Journey()
+    journey1.arrival_date_time = str_to_time_stamp('20151005T081900')
+    journey1.duration = 600
+    s = journey1.sections.add()
+    s.type = response_pb2.CROW_FLY
+    s.street_network.mode = response_pb2.Walking
+    journey2 = deepcopy(journey1)
+    journey2.sections[0].street_network.mode = response_pb2.Bike
+
+    # all else being equal, bike is more constrained than walking
+    assert jf._get_worst_similar(journey1, journey2, {}) is journey1
+
+    journey2.duration = 700
+    assert jf._get_worst_similar(journey1, journey2, {}) is journey2
+
+    journey1.arrival_date_time = str_to_time_stamp('20151005T082000')
+    assert jf._get_worst_similar(journey1, journey2, {}) is journey1
+
+
 def test_departure_sort():
     """
     we want to sort by departure hour, then by duration
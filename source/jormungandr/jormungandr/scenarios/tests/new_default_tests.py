@@ -199,6 +199,36 @@ def get_sorted_solutions_indexes_test():
     assert all(selection_matrix[best_indexes[0]] == [0, 0, 1, 1, 0, 1, 0, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0])
 
 
+def get_best_combination_test():
+    """
+    the branch and bound finds the same combination as the exhaustive search
+    """
+    mocked_pb_response = build_mocked_response()
+    candidates_pool, sections_set, idx_jrny_must_keep = new_default._build_candidate_pool_and_sections_set(
+        mocked_pb_response.journeys
+    )
+    mocked_request = {'datetime': 1444903200}
+    for nb_journeys_to_find in range(len(idx_jrny_must_keep) + 1, len(candidates_pool)):
+        by_combinations = new_default._select_journeys_by_combinations(
+            candidates_pool, sections_set, nb_journeys_to_find, idx_jrny_must_keep, mocked_request
+        )
+        by_branch_and_bound = new_default._select_journeys_by_branch_and_bound(
+            candidates_pool, sections_set, nb_journeys_to_find, idx_jrny_must_keep, mocked_request
+        )
+        assert list(by_combinations) == list(by_branch_and_bound)
+
+
+def get_best_combination_with_bitsets_test():
+    # journey 0 and 2 cover all the sections, journey 1 and 3 too but with more sections
+    sections_bitsets = [0b0011, 0b0111, 0b1100, 0b1110]
+    assert new_default._get_best_combination(sections_bitsets, 2, [], [0, 0, 0, 0]) == [0, 2]
+    # journey 3 must be kept
+    assert new_default._get_best_combination(sections_bitsets, 2, [3], [0, 0, 0, 0]) == [0, 3]
+    # same score, the smallest pseudo duration wins
+    sections_bitsets = [0b01, 0b10, 0b01]
+    assert new_default._get_best_combination(sections_bitsets, 2, [], [10, 0, 5]) == [1, 2]
+
+
 def culling_jounreys_1_test():
     """
     Test when max_nb_journeys is bigger than journey's length in response,
@@ -32,7 +32,8 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 
 import logging
-from jormungandr import utils
+from collections import OrderedDict
+from jormungandr import utils, app
 
 from navitiacommon import type_pb2, request_pb2, response_pb2
 from copy import deepcopy
@@ -187,13 +188,14 @@ class MixedSchedule(object):
             return None
         return rt_system
 
-    def _get_next_realtime_passages(self, rt_system, route_point, request):
-        log = logging.getLogger(__name__)
-        next_rt_passages = None
-
+    def _get_next_realtime_passages_for_route_points(self, rt_system, route_points, request):
+        """
+        returns a dict route_point -> next realtime passages, a missing route point means that the base
+        schedule is kept
+        """
         try:
-            next_rt_passages = rt_system.next_passage_for_route_point(
-                route_point,
+            return rt_system.next_passages_for_route_points(
+                route_points,
                 request['items_per_schedule'],
                 request['from_datetime'],
                 request['_current_datetime'],
@@ -201,18 +203,75 @@ class MixedSchedule(object):
                 request['timezone'],
             )
         except Exception as e:
-            log.exception(
+            logging.getLogger(__name__).exception(
                 'failure while requesting next passages to external RT system {}'.format(rt_system.rt_system_id)
             )
             new_relic.record_custom_event(
                 'realtime_internal_failure', {'rt_system_id': unicode(rt_system.rt_system_id), 'message': str(e)}
             )
+        return {}
 
-        if next_rt_passages is None:
-            log.debug('no next passages, using base schedule')
-            return None
+    def _get_realtime_passages(self, route_points, request):
+        """
+        get the next realtime passages of the route points handled by a realtime proxy
+
+        the calls are made in parallel (at most realtime_pool_size at the same time), one call for each
+        batch of route points of a proxy. If REALTIME_PROXY_TIME_BUDGET is reached, the remaining calls
+        are cancelled and their route points keep the base schedule.
+
+        returns a dict route_point -> (rt_proxy, next realtime passages or None)
+        """
+        route_points_by_proxy = OrderedDict()
+        for route_point in route_points:
+            rt_proxy = self._get_realtime_proxy(route_point)
+            if rt_proxy:
+                route_points_by_proxy.setdefault(rt_proxy.rt_system_id, (rt_proxy, []))[1].append(route_point)
+        if not route_points_by_proxy:
+            return {}
+
+        pool = gevent.pool.Pool(self.instance.realtime_pool_size)
+        # Copy the current request context to be used in greenlet
+        reqctx = utils.copy_flask_request_context()
+
+        def worker(rt_proxy, batch):
+            # Use the copied request context in greenlet
+            with utils.copy_context_in_greenlet_stack(reqctx):
+                next_rt_passages = self._get_next_realtime_passages_for_route_points(rt_proxy, batch, request)
+                return rt_proxy, batch, next_rt_passages
 
-        return next_rt_passages
+        result = {}
+        time_budget = app.config.get(str('REALTIME_PROXY_TIME_BUDGET')) or None
+        try:
+            # the budget covers the wait for a free greenlet in the pool as well as the calls
+            with gevent.Timeout(time_budget, False):
+                # the route points sharing the same stop (or the same external codes) are requested with one call
+                futures = [
+                    pool.spawn(worker, rt_proxy, batch)
+                    for rt_proxy, proxy_route_points in route_points_by_proxy.values()
+                    for batch in rt_proxy.batch_route_points(proxy_route_points)
+                ]
+                for future in gevent.iwait(futures):
+                    rt_proxy, batch, next_rt_passages = future.get()
+                    for route_point in batch:
+                        result[route_point] = (rt_proxy, next_rt_passages.get(route_point))
+        finally:
+            pool.kill()
+
+        for rt_proxy, proxy_route_points in route_points_by_proxy.values():
+            timed_out = [rp for rp in proxy_route_points if rp not in result]
+            if not timed_out:
+                continue
+            logging.getLogger(__name__).warning(
+                'realtime time budget of {}s reached for {}, base schedule used for: {}'.format(
+                    time_budget, rt_proxy.rt_system_id, ', '.join(str(rp) for rp in timed_out)
+                )
+            )
+            new_relic.record_custom_event(
+                'realtime_proxy_timeout',
+                {'rt_system_id': unicode(rt_proxy.rt_system_id), 'nb_route_points': len(timed_out)},
+            )
+            result.update((rp, (rt_proxy, None)) for rp in timed_out)
+        return result
 
     def __stop_times(self, request, api, departure_filter="", arrival_filter=""):
         req = request_pb2.Request()
@@ -271,32 +330,11 @@ class MixedSchedule(object):
             for rp in resp.route_points
         )
 
-        rt_proxy = None
-        futures = []
-        pool = gevent.pool.Pool(self.instance.realtime_pool_size)
-
-        # Copy the current request context to be used in greenlet
-        reqctx = utils.copy_flask_request_context()
-
-        def worker(rt_proxy, route_point, template, request, resp):
-            # Use the copied request context in greenlet
-            with utils.copy_context_in_greenlet_stack(reqctx):
-                return (
-                    resp,
-                    rt_proxy,
-                    route_point,
-                    template,
-                    self._get_next_realtime_passages(rt_proxy, route_point, request),
-                )
-
-        for route_point, template in route_points.items():
-            rt_proxy = self._get_realtime_proxy(route_point)
-            if rt_proxy:
-                futures.append(pool.spawn(worker, rt_proxy, route_point, template, request, resp))
-
-        for future in gevent.iwait(futures):
-            resp, rt_proxy, route_point, template, next_rt_passages = future.get()
-            rt_proxy._update_passages(resp.next_departures, route_point, template, next_rt_passages)
+        rt_passages = self._get_realtime_passages(list(route_points.keys()), request)
+        for route_point, (rt_proxy, next_rt_passages) in rt_passages.items():
+            rt_proxy._update_passages(
+                resp.next_departures, route_point, route_points[route_point], next_rt_passages
+            )
 
         # sort
         def comparator(p1, p2):
@@ -309,7 +347,7 @@ class MixedSchedule(object):
 
         # handle pagination :
         # If real time information exist, we have to change pagination score.
-        if rt_proxy:
+        if rt_passages:
             resp.pagination.totalResult = len(resp.next_departures)
             resp.pagination.itemsOnPage = len(resp.next_departures)
 
@@ -321,10 +359,13 @@ class MixedSchedule(object):
         if request['data_freshness'] != RT_PROXY_DATA_FRESHNESS:
             return resp
 
+        stop_schedules_by_route_point = OrderedDict()
         for stop_schedule in resp.stop_schedules:
             route_point = _get_route_point_from_stop_schedule(stop_schedule)
-            rt_proxy = self._get_realtime_proxy(route_point)
-            if rt_proxy:
-                next_rt_passages = self._get_next_realtime_passages(rt_proxy, route_point, request)
+            stop_schedules_by_route_point.setdefault(route_point, []).append(stop_schedule)
+
+        rt_passages = self._get_realtime_passages(list(stop_schedules_by_route_point.keys()), request)
+        for route_point, (rt_proxy, next_rt_passages) in rt_passages.items():
+            for stop_schedule in stop_schedules_by_route_point[route_point]:
                 rt_proxy._update_stop_schedule(stop_schedule, next_rt_passages)
         return resp
@@ -39,8 +39,11 @@ from jormungandr.authentication import get_user, get_token, get_app_name, get_us
 from jormungandr import utils
 import re
 from threading import Lock
+from jormungandr.stat_queue import StatQueue, FileSink
 
+import atexit
 import pytz
+import random
 import time
 import sys
 import kombu
@@ -98,16 +101,57 @@ def find_admin(point):
     return visitor.get_admin_id(), visitor.get_admin_insee(), visitor.get_admin_name()
 
 
-def find_origin_admin(journey):
+def _get_direct_admin(point):
+    """
+    the admin of level 8 of a place is usually in its object (or in the stop_area of a stop_point)
+    """
+    obj = point.get(point.get('embedded_type'))
+    if not isinstance(obj, dict):
+        return None
+    if point.get('embedded_type') == 'administrative_region' and obj.get('level') == 8:
+        return obj
+    for o in (obj, obj.get('stop_area') or {}):
+        for admin in o.get('administrative_regions') or []:
+            if admin.get('level') == 8:
+                return admin
+    return None
+
+
+class AdminIndex(object):
+    """
+    uri -> admin of the places of a response
+
+    the same places are in many sections and journeys, their admin is looked for only once
+    and without walking through the whole place when it is at its usual position
+    """
+
+    def __init__(self):
+        self._admins = {}
+
+    def find_admin(self, point):
+        uri = point.get('id')
+        admin = self._admins.get(uri)
+        if admin is None:
+            direct = _get_direct_admin(point)
+            if direct is not None:
+                admin = direct.get('id'), direct.get('insee'), direct.get('name')
+            else:
+                admin = find_admin(point)
+            if uri is not None:
+                self._admins[uri] = admin
+        return admin
+
+
+def find_origin_admin(journey, admins=None):
     if 'sections' not in journey:
         return None, None, None
-    return find_admin(journey['sections'][0]['from'])
+    return (admins or AdminIndex()).find_admin(journey['sections'][0]['from'])
 
 
-def find_destination_admin(journey):
+def find_destination_admin(journey, admins=None):
     if 'sections' not in journey:
         return None, None, None
-    return find_admin(journey['sections'][-1]['to'])
+    return (admins or AdminIndex()).find_admin(journey['sections'][-1]['to'])
 
 
 def tz_str_to_utc_timestamp(dt_str, timezone):
@@ -125,7 +169,11 @@ class StatManager(object):
         self.exchange_name = app.config.get('EXCHANGE_NAME', None)
         self.connection_timeout = app.config.get('STAT_CONNECTION_TIMEOUT', 1)
 
-        if self.save_stat:
+        # the stats can be written in a file instead of being sent to rabbitmq (for the tests)
+        file_sink = app.config.get(str('STAT_FILE_SINK'))
+        self.file_sink = FileSink(file_sink) if file_sink else None
+
+        if self.save_stat and self.file_sink is None:
             try:
                 self._init_rabbitmq(auto_delete)
             except Exception:
@@ -137,6 +185,21 @@ class StatManager(object):
 
         self.breaker = pybreaker.CircuitBreaker(fail_max=fail_max, reset_timeout=reset_timeout)
 
+        self.journeys_sampling = app.config.get(str('STAT_JOURNEYS_SAMPLING'), {})
+        self.journeys_default_sampling = app.config.get(str('STAT_JOURNEYS_DEFAULT_SAMPLING'), 1)
+
+        # with the queue the stats are published in background, not during the requests
+        self.queue = None
+        queue_config = app.config.get(str('STAT_QUEUE'), {})
+        if self.save_stat and queue_config.get('enabled', False):
+            self.queue = StatQueue(
+                self.publish_batch,
+                max_size=queue_config.get('max_size', 10000),
+                batch_size=queue_config.get('batch_size', 100),
+                flush_interval=queue_config.get('flush_interval', 0.5),
+            )
+            atexit.register(self.queue.flush)
+
     def _init_rabbitmq(self, auto_delete=False):
         """
         connection to rabbitmq and initialize queues
@@ -159,19 +222,45 @@ class StatManager(object):
             logging.getLogger(__name__).exception('Error during stat management')
 
     def _manage_stat(self, start_time, call_result):
+        from jormungandr.interfaces.v1.serializer.streaming import later
+
         end_time = time.time()
         stat_request = stat_pb2.StatRequest()
         stat_request.request_duration = int((end_time - start_time) * 1000)  # In milliseconds
         self.fill_request(stat_request, start_time, call_result)
         self.fill_coverages(stat_request)
         self.fill_parameters(stat_request)
-        self.fill_result(stat_request, call_result)
+        errors = []
+        self.fill_result(stat_request, call_result, errors)
 
-        retry = retrying.Retrying(
+        # on a streamed response the journeys are filled while they are written,
+        # the stat is published once they all have been
+        later(call_result[0], lambda _: self._publish_stat(stat_request, errors), keys=())
+
+    def _publish_stat(self, stat_request, errors):
+        if errors:
+            # a stat partially filled isn't published
+            return
+        try:
+            self._publish(stat_request)
+        except Exception:
+            logging.getLogger(__name__).exception('Error during stat management')
+
+    def _publish(self, stat_request):
+        if self.queue is not None:
+            self.queue.put(stat_request.api, stat_request.SerializeToString())
+            return
+
+        self._retry().call(
+            self.breaker.call, self.publish_request, stat_request.api, stat_request.SerializeToString()
+        )
+
+    @staticmethod
+    def _retry():
+        return retrying.Retrying(
             stop_max_attempt_number=2,
             retry_on_exception=lambda e: not isinstance(e, pybreaker.CircuitBreakerError),
         )
-        retry.call(self.breaker.call, self.publish_request, stat_request.api, stat_request.SerializeToString())
 
     def fill_info_response(self, stat_info_response, call_result):
         """
@@ -184,14 +273,26 @@ class StatManager(object):
         ):
             stat_info_response.object_count = call_result[0]['pagination']['items_on_page']
 
-    def fill_result(self, stat_request, call_result):
+    def fill_result(self, stat_request, call_result, errors):
         if 'error' in call_result[0] and call_result[0]['error']:
             self.fill_error(stat_request, call_result[0]['error'])
 
         # We do not save informations of journeys and sections for a request
         # Isochron (parameter "&to" is absent for API Journeys )
-        if 'journeys' in request.endpoint and 'to' in request.args:
-            self.fill_journeys(stat_request, call_result)
+        if (
+            'journeys' in request.endpoint
+            and 'to' in request.args
+            and self.is_journeys_sampled(request.endpoint)
+        ):
+            self.fill_journeys(stat_request, call_result, errors)
+
+    def is_journeys_sampled(self, endpoint):
+        """
+        the journeys and sections are stored only for a part of the requests,
+        for the others there is only the request, the coverages, the parameters and the error
+        """
+        rate = self.journeys_sampling.get(endpoint, self.journeys_default_sampling)
+        return rate >= 1 or random.random() < rate
 
     def fill_request(self, stat_request, start_time, call_result):
         """
@@ -292,7 +393,7 @@ class StatManager(object):
         if 'message' in error:
             stat_error.message = error['message']
 
-    def fill_journey(self, stat_journey, resp_journey):
+    def fill_journey(self, stat_journey, resp_journey, admins):
         """"
         Fill journey and all sections from resp_journey.
         resp_journey is a OrderedDict and contains information
@@ -334,7 +435,7 @@ class StatManager(object):
                 stat_journey.first_pt_coord,
                 first_pt_section['from'][first_pt_section['from']['embedded_type']]['coord'],
             )
-            admin = find_admin(first_pt_section['from'])
+            admin = admins.find_admin(first_pt_section['from'])
             if admin[0]:
                 stat_journey.first_pt_admin_id = admin[0]
             if admin[1]:
@@ -348,7 +449,7 @@ class StatManager(object):
                 stat_journey.last_pt_coord,
                 last_pt_section['to'][last_pt_section['to']['embedded_type']]['coord'],
             )
-            admin = find_admin(last_pt_section['to'])
+            admin = admins.find_admin(last_pt_section['to'])
             if admin[0]:
                 stat_journey.last_pt_admin_id = admin[0]
             if admin[1]:
@@ -356,10 +457,15 @@ class StatManager(object):
             if admin[2]:
                 stat_journey.last_pt_admin_name = admin[2]
 
-    def fill_journeys(self, stat_request, call_result):
+    def fill_journeys(self, stat_request, call_result, errors):
         """
         Fill journeys and sections for each journey (datetimes are all UTC)
+
+        the journeys are filled one by one with for_each so a streamed response isn't built as a dict,
+        an error is added to errors instead of being raised as it would break the response being written
         """
+        from jormungandr.interfaces.v1.serializer.streaming import for_each
+
         journey_request = stat_request.journey_request
         if hasattr(g, 'stat_interpreted_parameters') and g.stat_interpreted_parameters['original_datetime']:
             tz = utils.get_timezone()
@@ -368,26 +474,39 @@ class StatManager(object):
                 dt = tz.normalize(tz.localize(dt))
             journey_request.requested_date_time = utils.date_to_timestamp(dt.astimezone(pytz.utc))
             journey_request.clockwise = g.stat_interpreted_parameters['clockwise']
-        if 'journeys' in call_result[0] and call_result[0]['journeys']:
-            first_journey = call_result[0]['journeys'][0]
-            origin = find_origin_admin(first_journey)
-            if origin[0]:
-                journey_request.departure_admin = origin[0]
-            if origin[1]:
-                journey_request.departure_insee = origin[1]
-            if origin[2]:
-                journey_request.departure_admin_name = origin[2]
-            destination = find_destination_admin(first_journey)
-            if destination[0]:
-                journey_request.arrival_admin = destination[0]
-            if destination[1]:
-                journey_request.arrival_insee = destination[1]
-            if destination[2]:
-                journey_request.arrival_admin_name = destination[2]
-            for resp_journey in call_result[0]['journeys']:
+
+        admins = AdminIndex()
+
+        def fill(_, resp_journey):
+            if errors:
+                return
+            try:
+                if not stat_request.journeys:
+                    self.fill_journey_request_admins(journey_request, resp_journey, admins)
                 stat_journey = stat_request.journeys.add()
-                self.fill_journey(stat_journey, resp_journey)
-                self.fill_sections(stat_journey, resp_journey)
+                self.fill_journey(stat_journey, resp_journey, admins)
+                self.fill_sections(stat_journey, resp_journey, admins)
+            except Exception as e:
+                logging.getLogger(__name__).exception('Error during stat management')
+                errors.append(e)
+
+        for_each(call_result[0], fill, keys=('journeys',))
+
+    def fill_journey_request_admins(self, journey_request, first_journey, admins):
+        origin = find_origin_admin(first_journey, admins)
+        if origin[0]:
+            journey_request.departure_admin = origin[0]
+        if origin[1]:
+            journey_request.departure_insee = origin[1]
+        if origin[2]:
+            journey_request.departure_admin_name = origin[2]
+        destination = find_destination_admin(first_journey, admins)
+        if destination[0]:
+            journey_request.arrival_admin = destination[0]
+        if destination[1]:
+            journey_request.arrival_insee = destination[1]
+        if destination[2]:
+            journey_request.arrival_admin_name = destination[2]
 
     def get_section_link(self, resp_section, link_type):
         result = ''
@@ -399,7 +518,7 @@ class StatManager(object):
 
         return result
 
-    def fill_section(self, stat_section, resp_section, previous_section):
+    def fill_section(self, stat_section, resp_section, previous_section, admins):
         tz = utils.get_timezone()
         if 'departure_date_time' in resp_section:
             stat_section.departure_date_time = tz_str_to_utc_timestamp(resp_section['departure_date_time'], tz)
@@ -418,11 +537,11 @@ class StatManager(object):
 
         if 'from' in resp_section:
             section_from = resp_section['from']
-            self.fill_section_from(stat_section, section_from)
+            self.fill_section_from(stat_section, section_from, admins)
 
         if 'to' in resp_section:
             section_to = resp_section['to']
-            self.fill_section_to(stat_section, section_to)
+            self.fill_section_to(stat_section, section_to, admins)
 
         stat_section.vehicle_journey_id = self.get_section_link(resp_section, 'vehicle_journey')
         stat_section.line_id = self.get_section_link(resp_section, 'line')
@@ -433,13 +552,13 @@ class StatManager(object):
 
         self.fill_section_display_informations(stat_section, resp_section)
 
-    def fill_section_from(self, stat_section, section_point):
+    def fill_section_from(self, stat_section, section_point, admins):
         """
         If EmbeddedType is stop_point then fill information of Stop_area
         instead of stop_point
         """
         stat_section.from_embedded_type = section_point['embedded_type']
-        self.fill_admin_from(stat_section, find_admin(section_point))
+        self.fill_admin_from(stat_section, admins.find_admin(section_point))
 
         if stat_section.from_embedded_type == 'stop_point' and 'stop_area' in section_point['stop_point']:
             section_point = section_point['stop_point']['stop_area']
@@ -453,14 +572,14 @@ class StatManager(object):
         if 'coord' in section_point:
             self.fill_coord(stat_section.from_coord, section_point['coord'])
 
-    def fill_section_to(self, stat_section, section_point):
+    def fill_section_to(self, stat_section, section_point, admins):
         """
         If EmbeddedType is stop_point then fill information of Stop_area
         instead of stop_point
         """
         stat_section.to_embedded_type = section_point['embedded_type']
 
-        self.fill_admin_to(stat_section, find_admin(section_point))
+        self.fill_admin_to(stat_section, admins.find_admin(section_point))
 
         if stat_section.to_embedded_type == 'stop_point' and 'stop_area' in section_point['stop_point']:
             section_point = section_point['stop_point']['stop_area']
@@ -484,21 +603,38 @@ class StatManager(object):
         except ValueError as e:
             logging.getLogger(__name__).warn('Unable to parse coordinates: %s', six.text_type(e))
 
-    def fill_sections(self, stat_journey, resp_journey):
+    def fill_sections(self, stat_journey, resp_journey, admins):
         previous_section = None
         if 'sections' in resp_journey:
             for resp_section in resp_journey['sections']:
                 stat_section = stat_journey.sections.add()
-                self.fill_section(stat_section, resp_section, previous_section)
+                self.fill_section(stat_section, resp_section, previous_section, admins)
                 previous_section = stat_section
 
     def publish_request(self, api, pbf):
+        self.publish_requests([(api, pbf)])
+
+    def publish_batch(self, batch):
+        """
+        publish the (api, pbf) of the queue, the published ones are removed from the batch
+        """
+        self._retry().call(self.breaker.call, self.publish_requests, batch)
+
+    def publish_requests(self, messages):
         with self.lock:
+            if self.file_sink is not None:
+                self.file_sink.write(messages)
+                del messages[:]
+                return
             try:
                 if self.producer is None:
                     # if the initialization failed we have to retry the creation of the objects
                     self._init_rabbitmq()
-                self.producer.publish(pbf, routing_key=api)
+                # all the messages are sent on the same channel, one after the other
+                while messages:
+                    api, pbf = messages[0]
+                    self.producer.publish(pbf, routing_key=api)
+                    messages.pop(0)
             except self.connection.connection_errors + self.connection.channel_errors:
                 logging.getLogger(__name__).exception('Server went away, will be reconnected..')
                 # Relese and close the previous connection
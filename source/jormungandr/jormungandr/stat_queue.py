@@ -0,0 +1,186 @@
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import base64
+from six.moves import queue
+import gevent
+import gevent.queue
+import logging
+import threading
+import time
+
+# put in the queue to stop the publishing thread
+_stop = object()
+
+
+class StatQueue(object):
+    """
+    Bounded queue of the serialized stats, published in background
+
+    The requests only put their stat in the queue, a greenlet takes them and calls publish with batches
+    of at most 'batch_size' (api, pbf), waiting at most 'flush_interval' seconds for a batch to be full.
+    Without gevent's socket patch the publication would block all the greenlets, so it's done in a thread.
+    When the queue is full (the broker is too slow or unreachable) the new stats are dropped and counted.
+
+    'publish' has to consume the published stats from the start of the batch, so what remains in the
+    batch after an error has not been published.
+    """
+
+    def __init__(self, publish, max_size=10000, batch_size=100, flush_interval=0.5):
+        self.publish = publish
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = gevent.queue.Queue(maxsize=max_size)
+        self._worker = None
+        self._batch = None
+        self.nb_published = 0
+        self.nb_dropped = 0
+        self.nb_failed = 0
+        self.nb_batches = 0
+
+    def put(self, api, pbf):
+        if self._worker is None:
+            # started lazily to be in the worker and not in the master process
+            self.start()
+        try:
+            self._queue.put_nowait((api, pbf))
+        except gevent.queue.Full:
+            self.nb_dropped += 1
+
+    def start(self):
+        if self._worker is not None:
+            return
+        from gevent import monkey
+
+        if monkey.is_module_patched('socket'):
+            self._worker = gevent.spawn(self._run)
+        else:
+            # nothing has been put yet, the queue is replaced by one that can be shared with a thread
+            self._queue = queue.Queue(maxsize=self.max_size)
+            self._worker = threading.Thread(target=self._run, name='stat_queue')
+            self._worker.daemon = True
+            self._worker.start()
+
+    def _fill_batch(self, batch):
+        """
+        return True if the queue has been stopped
+        """
+        end = time.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = end - time.time()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except gevent.queue.Empty:
+                return False
+            if item is _stop:
+                return True
+            batch.append(item)
+        return False
+
+    def _publish(self, batch):
+        size = len(batch)
+        try:
+            self.publish(batch)
+        except Exception:
+            logging.getLogger(__name__).exception('impossible to publish {} stats'.format(len(batch)))
+            self.nb_failed += len(batch)
+        self.nb_published += size - len(batch)
+        self.nb_batches += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _stop:
+                return
+            # the batch being built is kept so it isn't lost if the greenlet is killed
+            self._batch = [item]
+            stopped = self._fill_batch(self._batch)
+            self._publish(self._batch)
+            self._batch = None
+            if stopped:
+                return
+
+    def flush(self):
+        """
+        stop the greenlet and publish what is still in the queue, called at the shutdown
+        """
+        worker, self._worker = self._worker, None
+        if isinstance(worker, threading.Thread):
+            # a thread can't be killed, it publishes its batch and stops
+            self._queue.put(_stop)
+            worker.join()
+        elif worker is not None:
+            worker.kill()
+        batch, self._batch = self._batch or [], None
+        while batch or not self._queue.empty():
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self._publish(batch)
+            batch = []
+
+    def status(self):
+        return {
+            'size': self._queue.qsize(),
+            'max_size': self.max_size,
+            'nb_published': self.nb_published,
+            'nb_dropped': self.nb_dropped,
+            'nb_failed': self.nb_failed,
+            'nb_batches': self.nb_batches,
+        }
+
+
+class FileSink(object):
+    """
+    write the stats in a file instead of sending them to the broker (for the tests)
+
+    one line per stat: the api and the base64 of the StatRequest
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, messages):
+        with open(self.path, 'a') as f:
+            for api, pbf in messages:
+                f.write('{} {}\n'.format(api, base64.b64encode(pbf).decode('ascii')))
+
+
+def read_file_sink(path):
+    """
+    list of the (api, pbf) written by a FileSink
+    """
+    messages = []
+    with open(path) as f:
+        for line in f:
+            api, pbf = line.split()
+            messages.append((api, base64.b64decode(pbf)))
+    return messages
@@ -36,7 +36,7 @@ import ujson
 import itertools
 import sys
 from navitiacommon import response_pb2
-from jormungandr import app
+from jormungandr import app, http_pool
 from jormungandr.exceptions import TechnicalError, InvalidArguments, UnableToParse
 from jormungandr.street_network.street_network import AbstractStreetNetworkService, StreetNetworkPathKey
 from jormungandr.utils import get_pt_object_coord, is_url, decode_polyline, mps_to_kmph
@@ -64,6 +64,7 @@ class Geovelo(AbstractStreetNetworkService):
     ):
         self.instance = instance
         self.sn_system_id = id
+        self.session = http_pool.get_session('street_network:{}'.format(id))
         if not is_url(service_url):
             raise ValueError('service_url {} is not a valid url'.format(service_url))
         self.service_url = service_url
@@ -126,11 +127,11 @@ class Geovelo(AbstractStreetNetworkService):
             'bikeDetails': cls._make_request_arguments_bike_details(bike_speed_mps),
         }
 
-    def _call_geovelo(self, url, method=requests.post, data=None):
+    def _call_geovelo(self, url, method=None, data=None):
         logging.getLogger(__name__).debug('Geovelo routing service , call url : {}'.format(url))
         try:
             return self.breaker.call(
-                method,
+                method or self.session.post,
                 url,
                 timeout=self.timeout,
                 data=data,
@@ -203,7 +204,7 @@ class Geovelo(AbstractStreetNetworkService):
 
         data = self._make_request_arguments_isochrone(origins, destinations, request['bike_speed'])
         r = self._call_geovelo(
-            '{}/{}'.format(self.service_url, 'api/v2/routes_m2m'), requests.post, ujson.dumps(data)
+            '{}/{}'.format(self.service_url, 'api/v2/routes_m2m'), self.session.post, ujson.dumps(data)
         )
         self._check_response(r)
         resp_json = ujson.loads(r.text)
@@ -324,7 +325,7 @@ class Geovelo(AbstractStreetNetworkService):
                 'bike_stations=false&'
                 'objects_as_ids=true&',
             ),
-            requests.post,
+            self.session.post,
             ujson.dumps(data),
         )
         self._check_response(r)
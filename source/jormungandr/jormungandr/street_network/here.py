@@ -34,7 +34,7 @@ from navitiacommon import response_pb2
 import logging
 import pybreaker
 import requests as requests
-from jormungandr import app
+from jormungandr import app, http_pool
 from jormungandr.exceptions import TechnicalError
 from jormungandr.utils import get_pt_object_coord
 from jormungandr.street_network.street_network import AbstractStreetNetworkService, StreetNetworkPathKey
@@ -84,6 +84,7 @@ class Here(AbstractStreetNetworkService):
     ):
         self.instance = instance
         self.sn_system_id = id
+        self.session = http_pool.get_session('street_network:{}'.format(id))
         if not service_base_url:
             raise ValueError('service_url {} is not a valid HERE url'.format(service_base_url))
         service_base_url = service_base_url.rstrip('/')
@@ -121,7 +122,7 @@ class Here(AbstractStreetNetworkService):
     def _call_here(self, url, params):
         self.log.debug('Here routing service, url: {}'.format(url))
         try:
-            r = self.breaker.call(requests.get, url, timeout=self.timeout, params=params)
+            r = self.breaker.call(self.session.get, url, timeout=self.timeout, params=params)
             self.record_call('ok')
             return r
         except pybreaker.CircuitBreakerError as e:
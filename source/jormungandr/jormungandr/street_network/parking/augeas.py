@@ -31,6 +31,7 @@ import requests
 import pybreaker
 import logging
 from datetime import timedelta
+from jormungandr import http_pool
 from jormungandr.street_network.parking.abstract_parking_module import AbstractParkingModule
 
 DEFAULT_MAX_PARKING_DURATION = int(timedelta(seconds=1200).total_seconds())
@@ -44,6 +45,7 @@ class Augeas(AbstractParkingModule):
         one_minute = timedelta(seconds=60).total_seconds()
         self.breaker = pybreaker.CircuitBreaker(fail_max=10, reset_timeout=one_minute)
         self.request_timeout = timedelta(seconds=0.1).total_seconds()
+        self.session = http_pool.get_session('parking:augeas')
 
         self.logger = logging.getLogger(__name__)
 
@@ -62,7 +64,7 @@ class Augeas(AbstractParkingModule):
             "coords": [[c.lon, c.lat] for c in coords],
         }
         url = requests.compat.urljoin(self.service_url, '/v0/park_duration')
-        r = requests.post(url=url, json=data, timeout=self.request_timeout)
+        r = self.session.post(url=url, json=data, timeout=self.request_timeout)
         return r.json().get('durations')
 
     def _request(self, coord):
@@ -74,7 +76,7 @@ class Augeas(AbstractParkingModule):
             'max_park_duration': self.max_park_duration,
         }
         url = requests.compat.urljoin(self.service_url, '/v0/park_duration')
-        r = requests.get(url=url, params=params, timeout=self.request_timeout)
+        r = self.session.get(url=url, params=params, timeout=self.request_timeout)
         durations = r.json().get('durations')
         if not durations:
             return self.max_park_duration
@@ -32,7 +32,7 @@ from navitiacommon import response_pb2
 import logging
 import pybreaker
 import requests as requests
-from jormungandr import app
+from jormungandr import app, http_pool
 import json
 from jormungandr.exceptions import TechnicalError, InvalidArguments, ApiNotFound
 from jormungandr.utils import is_url, kilometers_to_meters, get_pt_object_coord, decode_polyline
@@ -58,6 +58,7 @@ class Valhalla(AbstractStreetNetworkService):
     def __init__(self, instance, service_url, modes=[], id='valhalla', timeout=10, api_key=None, **kwargs):
         self.instance = instance
         self.sn_system_id = id
+        self.session = http_pool.get_session('street_network:{}'.format(id))
         if not is_url(service_url):
             raise ValueError('service_url {} is not a valid url'.format(service_url))
         self.service_url = service_url
@@ -89,14 +90,16 @@ class Valhalla(AbstractStreetNetworkService):
             },
         }
 
-    def _call_valhalla(self, url, method=requests.post, data=None):
+    def _call_valhalla(self, url, method=None, data=None):
         logging.getLogger(__name__).debug('Valhalla routing service , call url : {}'.format(url))
         logging.getLogger(__name__).debug('data : {}'.format(data))
         headers = {}
         if self.api_key:
             headers['api_key'] = self.api_key
         try:
-            return self.breaker.call(method, url, timeout=self.timeout, data=data, headers=headers)
+            return self.breaker.call(
+                method or self.session.post, url, timeout=self.timeout, data=data, headers=headers
+            )
         except pybreaker.CircuitBreakerError as e:
             logging.getLogger(__name__).error('Valhalla routing service dead (error: {})'.format(e))
             self.record_external_failure('circuit breaker open')
@@ -283,7 +286,7 @@ class Valhalla(AbstractStreetNetworkService):
         data = self._make_request_arguments(
             mode, [pt_object_origin], [pt_object_destination], request, api='route'
         )
-        r = self._call_valhalla('{}/{}'.format(self.service_url, 'route'), requests.post, data)
+        r = self._call_valhalla('{}/{}'.format(self.service_url, 'route'), self.session.post, data)
         if r is not None and r.status_code == 400 and r.json()['error_code'] == 442:
             # error_code == 442 => No path could be found for input
             resp = response_pb2.Response()
@@ -329,7 +332,7 @@ class Valhalla(AbstractStreetNetworkService):
                 raise TechnicalError('routing matrix error, no unique center point')
 
         data = self._make_request_arguments(mode, origins, destinations, request, api='sources_to_targets')
-        r = self._call_valhalla('{}/{}'.format(self.service_url, 'sources_to_targets'), requests.post, data)
+        r = self._call_valhalla('{}/{}'.format(self.service_url, 'sources_to_targets'), self.session.post, data)
         self._check_response(r)
         resp_json = r.json()
         return self._get_matrix(resp_json, mode_park_cost=self.mode_park_cost.get(mode))
@@ -0,0 +1,184 @@
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import namedtuple
+from jormungandr.authentication_snapshot import Snapshot, AuthenticationSnapshot
+import datetime
+import gevent
+import threading
+
+FakeKey = namedtuple('FakeKey', ['token', 'user_id', 'app_name', 'valid_until'])
+
+
+class FakeUser(object):
+    def __init__(self, id, type='with_free_instances'):
+        self.id = id
+        self.type = type
+
+    @property
+    def is_super_user(self):
+        return self.type == 'super_user'
+
+
+class FakeInstance(object):
+    def __init__(self, id, name, is_free=False):
+        self.id = id
+        self.name = name
+        self.is_free = is_free
+
+
+def make_snapshot(version=1):
+    today = datetime.date(2020, 3, 10)
+    keys = [
+        FakeKey('key_bob', 1, 'app_bob', None),
+        FakeKey('key_old', 1, 'old_app', today),
+        FakeKey('key_admin', 2, 'admin', today + datetime.timedelta(days=1)),
+        FakeKey('key_lost', 42, 'lost', None),
+    ]
+    users = [FakeUser(1), FakeUser(2, 'super_user'), FakeUser(3, 'without_free_instances')]
+    instances = [FakeInstance(10, 'fr-idf'), FakeInstance(11, 'fr-bre', is_free=True), FakeInstance(12, 'fr-nw')]
+    authorizations = [(1, 10, 'ALL'), (3, 12, 'journeys'), (3, 99, 'ALL')]
+    return Snapshot(version, keys, users, authorizations, instances)
+
+
+def snapshot_get_user_test():
+    snapshot = make_snapshot()
+    now = datetime.datetime(2020, 3, 10, 12, 30)
+    assert snapshot.get_user('key_bob', now).id == 1
+    # like in the database the key isn't valid anymore on the day of its 'valid_until'
+    assert snapshot.get_user('key_old', now) is None
+    assert snapshot.get_user('key_admin', now).id == 2
+    assert snapshot.get_user('key_lost', now) is None
+    assert snapshot.get_user('unknown', now) is None
+    assert snapshot.get_key('key_old').app_name == 'old_app'
+
+
+def snapshot_has_access_test():
+    snapshot = make_snapshot()
+    bob, admin, alice = FakeUser(1), FakeUser(2, 'super_user'), FakeUser(3, 'without_free_instances')
+    assert snapshot.has_access(bob, 10, 'ALL')
+    assert not snapshot.has_access(bob, 12, 'ALL')
+    assert snapshot.has_access(admin, 12, 'ALL')
+    assert snapshot.has_access(alice, 12, 'journeys')
+    assert not snapshot.has_access(alice, 12, 'ALL')
+    assert snapshot.get_instance('fr-bre').is_free
+    assert snapshot.get_instance('fr-sw') is None
+
+
+def snapshot_available_instances_test():
+    snapshot = make_snapshot()
+    names = lambda user: sorted(i.name for i in snapshot.get_all_available_instances(user))
+    # the authorized instances and the free ones
+    assert names(FakeUser(1)) == ['fr-bre', 'fr-idf']
+    assert names(FakeUser(2, 'super_user')) == ['fr-bre', 'fr-idf', 'fr-nw']
+    # the authorization on a discarded instance is ignored
+    assert names(FakeUser(3, 'without_free_instances')) == ['fr-nw']
+
+
+def refresh_test(mocker):
+    # the background loop is a greenlet, it doesn't run during the test
+    mocker.patch('gevent.monkey.is_module_patched', return_value=True)
+    versions = []
+
+    def load(version):
+        versions.append(version)
+        if len(versions) == 2:
+            raise Exception('database down')
+        return make_snapshot(version)
+
+    manager = AuthenticationSnapshot(load=load, refresh_interval=60, max_staleness=600)
+    assert manager.refresh()
+    assert manager.get().version == 1
+    # the previous snapshot is kept when the refresh fails
+    assert not manager.refresh()
+    assert manager.get().version == 1
+    assert manager.refresh()
+    assert manager.get().version == 2
+    status = manager.status()
+    assert status['nb_refreshes'] == 2
+    assert status['nb_errors'] == 1
+    manager.stop()
+
+
+def stale_snapshot_test(mocker):
+    mocker.patch('gevent.monkey.is_module_patched', return_value=True)
+    manager = AuthenticationSnapshot(load=make_snapshot, refresh_interval=60, max_staleness=600)
+    manager.refresh()
+    manager._snapshot.created_at -= 601
+    # too old, the authentication goes back to the database
+    assert manager.get() is None
+    manager.stop()
+
+
+def request_refresh_test(mocker):
+    mocker.patch('gevent.monkey.is_module_patched', return_value=True)
+    loaded = []
+
+    def load(version):
+        loaded.append(version)
+        return make_snapshot(version)
+
+    manager = AuthenticationSnapshot(load=load, refresh_interval=60)
+    # the first snapshot is loaded in background
+    assert manager.get() is None
+    gevent.sleep(0.01)
+    assert manager.get().version == 1
+    manager.request_refresh()
+    gevent.sleep(0.01)
+    assert manager.get().version == 2
+    assert loaded == [1, 2]
+    manager.stop()
+
+
+def load_in_a_thread_test(mocker):
+    """
+    without gevent's socket patch the snapshot is loaded by a thread
+    """
+    mocker.patch('gevent.monkey.is_module_patched', return_value=False)
+    loaded = []
+    refreshed = threading.Event()
+
+    def load(version):
+        loaded.append(version)
+        refreshed.set()
+        return make_snapshot(version)
+
+    manager = AuthenticationSnapshot(load=load, refresh_interval=60)
+    manager.start()
+    worker = manager._worker
+    assert isinstance(worker, threading.Thread)
+    assert refreshed.wait(1)
+    refreshed.clear()
+    manager.request_refresh()
+    assert refreshed.wait(1)
+    manager.stop()
+    worker.join(1)
+    assert not worker.is_alive()
+    assert loaded == [1, 2]
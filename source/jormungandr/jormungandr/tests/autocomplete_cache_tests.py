@@ -0,0 +1,140 @@
+# coding=utf-8
+
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr.autocomplete.result_cache import AutocompleteCache, matches
+from collections import namedtuple
+
+FakeInstance = namedtuple('FakeInstance', ['name', 'publication_date'])
+
+
+def make_request(**kwargs):
+    request = {'q': 'gare', 'count': 10, 'type[]': ['stop_area', 'address'], 'depth': 1, 'from': None}
+    request.update(kwargs)
+    return request
+
+
+def make_response(*names):
+    return {'places': [{'id': n, 'name': n} for n in names], 'feed_publishers': []}
+
+
+def make_key(cache, instance=FakeInstance('fr', 1), **kwargs):
+    return cache.make_key('Kraken', make_request(**kwargs), [instance])
+
+
+def key_test():
+    cache = AutocompleteCache(grid_size=0.01)
+    assert make_key(cache, **{'type[]': ['address', 'stop_area']}) == make_key(cache)
+    assert make_key(cache, **{'from': '2.371;48.841'}) == make_key(cache, **{'from': '2.369;48.839'})
+    assert make_key(cache, **{'from': '2.38;48.84'}) != make_key(cache, **{'from': '2.36;48.84'})
+    assert make_key(cache, count=5) != make_key(cache)
+    # the entries of an instance are not used anymore when its data are reloaded
+    assert make_key(cache, instance=FakeInstance('fr', 2)) != make_key(cache)
+
+
+def normalized_query_test():
+    cache = AutocompleteCache()
+    key = make_key(cache)
+    cache.set(key, 'Gare  de Lyon', 10, make_response('Gare de Lyon'))
+    assert cache.get(key, ' gare de lyon')['places'][0]['name'] == 'Gare de Lyon'
+    assert cache.status()['nb_hits'] == 1
+
+
+def copy_test():
+    cache = AutocompleteCache()
+    key = make_key(cache)
+    cache.set(key, 'gare', 10, make_response('Gare de Lyon'))
+    cache.get(key, 'gare')['places'].append({'name': 'bob'})
+    assert len(cache.get(key, 'gare')['places']) == 1
+
+
+def prefix_reuse_test():
+    cache = AutocompleteCache()
+    key = make_key(cache)
+    cache.set(key, 'gar', 10, make_response('Gare de Lyon', 'Gare du Nord', 'Garches'))
+
+    response = cache.get(key, 'gare d')
+    assert [p['name'] for p in response['places']] == ['Gare de Lyon', 'Gare du Nord']
+    response = cache.get(key, 'gare de')
+    assert [p['name'] for p in response['places']] == ['Gare de Lyon']
+    assert response['feed_publishers'] == []
+    # nothing in the prefix, the service may find something with a typo
+    assert cache.get(key, 'garz') is None
+
+    status = cache.status()
+    assert status['nb_prefix_hits'] == 2
+    assert status['nb_misses'] == 1
+    assert status['hit_ratio'] == 2.0 / 3
+
+
+def no_prefix_reuse_if_incomplete_test():
+    cache = AutocompleteCache()
+    key = make_key(cache, count=2)
+    cache.set(key, 'gar', 2, make_response('Gare de Lyon', 'Garches'))
+    # there may be other places for 'gare' that weren't returned for 'gar'
+    assert cache.get(key, 'gare') is None
+
+
+def prefix_min_length_test():
+    cache = AutocompleteCache(min_prefix_length=3)
+    key = make_key(cache)
+    cache.set(key, 'ga', 10, make_response('Gare de Lyon'))
+    assert cache.get(key, 'gare') is None
+
+
+def lru_and_ttl_test():
+    cache = AutocompleteCache(max_size=2)
+    key = make_key(cache)
+    cache.set(key, 'a', 10, make_response('a'))
+    cache.set(key, 'b', 10, make_response('b'))
+    assert cache.get(key, 'a') is not None
+    cache.set(key, 'c', 10, make_response('c'))
+    assert cache.get(key, 'b') is None
+    assert cache.get(key, 'a') is not None
+
+    cache = AutocompleteCache(ttl=-1)
+    cache.set(key, 'a', 10, make_response('a'))
+    assert cache.get(key, 'a') is None
+
+
+def errors_not_cached_test():
+    cache = AutocompleteCache()
+    key = make_key(cache)
+    cache.set(key, 'gare', 10, {'error': {'id': 'unknown_object'}, 'places': []})
+    assert cache.get(key, 'gare') is None
+
+
+def matches_test():
+    assert matches('gare de l', 'Gare de Lyon (Paris)')
+    assert matches('lyon gare', 'Gare de Lyon (Paris)')
+    assert matches('Gäre', 'Gare de Lyon (Paris)')
+    assert not matches('gare de n', 'Gare de Lyon (Paris)')
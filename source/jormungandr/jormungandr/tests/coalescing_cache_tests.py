@@ -0,0 +1,174 @@
+#  Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr import coalescing_cache
+from jormungandr.coalescing_cache import CoalescingCache
+from flask import Flask
+import gevent
+
+
+def make_cache(**config):
+    config.setdefault('CACHE_TYPE', 'simple')
+    config.setdefault('CACHE_SINGLE_FLIGHT', True)
+    return CoalescingCache(Flask(__name__), with_jinja2_ext=False, config=config)
+
+
+class Service(object):
+    def __init__(self, duration=0.05):
+        self.duration = duration
+        self.nb_calls = 0
+        self.error = None
+
+    def call(self, key):
+        self.nb_calls += 1
+        value = '{}-{}'.format(key, self.nb_calls)
+        gevent.sleep(self.duration)
+        if self.error:
+            raise self.error
+        return value
+
+
+def concurrent_calls_are_coalesced_test():
+    cache = make_cache()
+    service = Service()
+
+    @cache.memoize(60)
+    def get(key):
+        return service.call(key)
+
+    greenlets = [gevent.spawn(get, 'a') for _ in range(5)] + [gevent.spawn(get, 'b')]
+    gevent.joinall(greenlets, raise_error=True)
+
+    assert service.nb_calls == 2
+    assert [g.value for g in greenlets] == ['a-1'] * 5 + ['b-2']
+    assert get('a') == 'a-1'
+    assert service.nb_calls == 2
+
+
+def error_is_given_to_the_waiters_test():
+    cache = make_cache()
+    service = Service()
+    service.error = ValueError('service down')
+
+    @cache.memoize(60)
+    def get(key):
+        return service.call(key)
+
+    greenlets = [gevent.spawn(get, 'a') for _ in range(3)]
+    gevent.joinall(greenlets)
+
+    assert service.nb_calls == 1
+    assert all(isinstance(g.exception, ValueError) for g in greenlets)
+
+
+def no_coalescing_with_null_cache_test():
+    cache = make_cache(CACHE_TYPE='null')
+    service = Service()
+
+    @cache.memoize(60)
+    def get(key):
+        return service.call(key)
+
+    gevent.joinall([gevent.spawn(get, 'a') for _ in range(3)], raise_error=True)
+
+    assert service.nb_calls == 3
+
+
+def stale_while_revalidate_test(monkeypatch):
+    cache = make_cache(CACHE_STALE_WHILE_REVALIDATE=60)
+    service = Service(duration=0)
+
+    @cache.memoize(10)
+    def get(key):
+        return service.call(key)
+
+    assert get('a') == 'a-1'
+
+    now = coalescing_cache.time.time()
+    with monkeypatch.context() as m:
+        m.setattr(coalescing_cache.time, 'time', lambda: now + 20)
+        # the value is expired: the stale one is returned while it's refreshed in background
+        assert get('a') == 'a-1'
+        gevent.sleep(0.01)
+    assert service.nb_calls == 2
+    assert get('a') == 'a-2'
+
+
+def disabled_single_flight_test():
+    cache = make_cache(CACHE_SINGLE_FLIGHT=False)
+    service = Service()
+
+    @cache.memoize(60)
+    def get(key):
+        return service.call(key)
+
+    gevent.joinall([gevent.spawn(get, 'a') for _ in range(3)], raise_error=True)
+
+    assert service.nb_calls == 3
+
+
+def single_flight_disabled_by_default_test():
+    cache = CoalescingCache(Flask(__name__), with_jinja2_ext=False, config={'CACHE_TYPE': 'simple'})
+    assert not cache.single_flight
+    assert not cache.redis_lock
+
+
+def none_is_given_to_the_waiters_test():
+    """
+    a service returning None on failure isn't called again by each waiter
+    """
+    cache = make_cache()
+    service = Service()
+
+    @cache.memoize(60)
+    def get(key):
+        service.call(key)
+        return None
+
+    greenlets = [gevent.spawn(get, 'a') for _ in range(5)]
+    gevent.joinall(greenlets, raise_error=True)
+
+    assert service.nb_calls == 1
+    assert [g.value for g in greenlets] == [None] * 5
+
+
+def waiters_get_a_copy_test():
+    cache = make_cache()
+    service = Service()
+
+    @cache.memoize(60)
+    def get(key):
+        return [service.call(key)]
+
+    greenlets = [gevent.spawn(get, 'a') for _ in range(2)]
+    gevent.joinall(greenlets, raise_error=True)
+
+    assert greenlets[0].value == greenlets[1].value == ['a-1']
+    assert greenlets[0].value is not greenlets[1].value
@@ -0,0 +1,119 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import gevent
+import pytest
+
+from jormungandr.concurrency_limiter import AdaptiveLimiter, ConcurrencyLimitExceeded
+
+
+def additive_increase_test():
+    limiter = AdaptiveLimiter('kraken:test', initial_limit=2, max_limit=3)
+    for _ in range(20):
+        with limiter.slot():
+            pass
+    assert limiter.limit == 3
+    assert limiter.in_flight == 0
+    assert limiter.status()['nb_calls'] == 20
+
+
+def multiplicative_decrease_test():
+    limiter = AdaptiveLimiter('kraken:test', initial_limit=8)
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError()
+    assert limiter.limit == 4
+
+    with limiter.slot() as call:
+        call.failed = True
+    # the limit has just been decreased, we don't decrease it again for the same burst of errors
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def slow_call_decreases_limit_test():
+    limiter = AdaptiveLimiter('kraken:test', initial_limit=8, latency_tolerance=2)
+    for _ in range(5):
+        limiter.acquire(1)
+        limiter.release(0.01, success=True)
+    limit = limiter.limit
+    limiter.acquire(1)
+    limiter.release(0.5, success=True)
+    assert limiter.limit == limit / 2
+
+
+def wait_for_slot_test():
+    limiter = AdaptiveLimiter('kraken:test', initial_limit=1, max_wait=0.01)
+    assert limiter.acquire(1)
+
+    # no slot released before the timeout
+    with pytest.raises(ConcurrencyLimitExceeded):
+        with limiter.slot():
+            pass
+    assert limiter.status()['nb_rejected'] == 1
+
+    gevent.spawn_later(0.01, limiter.release, 0.01, True)
+    with limiter.slot(timeout=1):
+        assert limiter.in_flight == 1
+    assert limiter.in_flight == 0
+    assert limiter.status()['waiting'] == 0
+
+
+def latency_by_api_test():
+    """
+    a slow api of the service doesn't look like a slowdown of its fast apis
+    """
+    limiter = AdaptiveLimiter('kraken:test', initial_limit=8, max_limit=64, latency_tolerance=2)
+    for _ in range(20):
+        for api, latency in (('place_uri', 0.002), ('pt_planner', 0.3)):
+            limiter.acquire(1)
+            limiter.release(latency, success=True, api=api)
+    assert limiter.nb_decreases == 0
+    assert limiter.limit > 8
+
+    latencies = {l['api']: l for l in limiter.status()['latencies']}
+    assert latencies['place_uri']['base_latency_ms'] == 2
+    assert latencies['pt_planner']['base_latency_ms'] == 300
+
+    limiter.acquire(1)
+    limiter.release(0.01, success=True, api='place_uri')
+    assert limiter.nb_decreases == 1
+
+
+def available_test():
+    limiter = AdaptiveLimiter('kraken:test', initial_limit=3)
+    assert limiter.available() == 3
+    limiter.acquire(1)
+    assert limiter.available() == 2
+    limiter.acquire(1)
+    limiter.acquire(1)
+    assert limiter.available() == 0
@@ -0,0 +1,129 @@
+#  Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from six.moves import BaseHTTPServer, socketserver
+from jormungandr import app, http_pool
+import contextlib
+import requests
+import threading
+
+
+@contextlib.contextmanager
+def pools_config(**config):
+    previous = app.config.get(str('HTTP_POOLS'))
+    app.config[str('HTTP_POOLS')] = config
+    http_pool._sessions.clear()
+    try:
+        yield
+    finally:
+        app.config[str('HTTP_POOLS')] = previous
+        http_pool._sessions.clear()
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = str('HTTP/1.1')  # keep alive
+
+    def do_GET(self):
+        body = b'{}'
+        self.send_response(200)
+        self.send_header(str('Content-Type'), str('application/json'))
+        self.send_header(str('Set-Cookie'), str('session=bob'))
+        self.send_header(str('Content-Length'), str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    # the kept alive connections must not block the shutdown
+    daemon_threads = True
+
+
+@contextlib.contextmanager
+def http_server():
+    server = Server((str('127.0.0.1'), 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield 'http://127.0.0.1:{}'.format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def same_session_by_name_test():
+    with pools_config(enabled=True):
+        session = http_pool.get_session('realtime:bob')
+        assert isinstance(session, requests.Session)
+        assert http_pool.get_session('realtime:bob') is session
+        assert http_pool.get_session('realtime:bobette') is not session
+
+
+def disabled_pools_test():
+    with pools_config(enabled=False):
+        assert http_pool.get_session('realtime:bob') is requests
+    with pools_config(enabled=True):
+        assert http_pool.get_session('realtime:bob', disable_keepalive=True) is requests
+
+
+def pool_parameters_test():
+    with pools_config(
+        enabled=True,
+        pool_maxsize=5,
+        connectors={'street_network:valhalla': {'pool_maxsize': 20}},
+        hosts={'http://big_host': {'pool_maxsize': 50}},
+    ):
+        session = http_pool.get_session('realtime:bob')
+        assert session.get_adapter('http://host/stops')._pool_maxsize == 5
+        assert session.get_adapter('http://big_host/stops')._pool_maxsize == 50
+
+        session = http_pool.get_session('street_network:valhalla')
+        assert session.get_adapter('https://host/route')._pool_maxsize == 20
+        assert session.get_adapter('http://big_host/route')._pool_maxsize == 50
+
+
+def connections_are_reused_test():
+    with pools_config(enabled=True), http_server() as url:
+        session = http_pool.get_session('realtime:bob')
+        for _ in range(3):
+            assert session.get(url, timeout=1).status_code == 200
+        # the cookies of a call are not sent to the next ones
+        assert not session.cookies
+
+        status = http_pool.status()
+        assert len(status) == 1
+        assert status[0]['name'] == 'realtime:bob'
+        assert status[0]['nb_hosts'] == 1
+        assert status[0]['nb_requests'] == 3
+        assert status[0]['nb_connections'] == 1
+        assert status[0]['idle_connections'] == 1
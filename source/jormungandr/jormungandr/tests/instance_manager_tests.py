@@ -35,6 +35,7 @@ from pytest_mock import mocker
 
 from jormungandr import app
 from jormungandr.instance_manager import choose_best_instance
+from navitiacommon import response_pb2
 
 
 class FakeInstance:
@@ -99,3 +100,41 @@ def choose_best_instance_test():
 
     instances_list.append(FakeInstance('fr-bre', is_free=True, priority=1000))
     assert choose_best_instance(instances_list).name == 'fr-bre'
+
+
+class FakeKrakenInstance(FakeInstance):
+    def __init__(self, name, ids):
+        FakeInstance.__init__(self, name)
+        self.ids = ids
+        self.publication_date = 1
+        self.nb_calls = 0
+
+    def get_id(self, id_):
+        self.nb_calls += 1
+        resp = response_pb2.Response()
+        if id_ in self.ids:
+            resp.places.add(uri=id_)
+        return resp
+
+
+def all_keys_of_id_test():
+    instance_manager = InstanceManager()
+    instance_manager.instances['paris'] = FakeKrakenInstance('paris', ids={'sa:1', 'sa:2'})
+    instance_manager.instances['pdl'] = FakeKrakenInstance('pdl', ids={'sa:2'})
+
+    with app.test_request_context('/'):
+        assert instance_manager._all_keys_of_id('sa:1') == ['paris']
+        assert sorted(instance_manager._all_keys_of_id('sa:2')) == ['paris', 'pdl']
+        assert instance_manager.instances['pdl'].nb_calls == 2
+
+        # the krakens are not called again for known ids
+        assert instance_manager._all_keys_of_id('sa:1') == ['paris']
+        assert instance_manager.instances['paris'].nb_calls == 2
+        assert instance_manager.instances['pdl'].nb_calls == 2
+
+        # pdl has been reloaded, only pdl is called
+        instance_manager.instances['pdl'].publication_date = 2
+        instance_manager.instances['pdl'].ids.add('sa:1')
+        assert sorted(instance_manager._all_keys_of_id('sa:1')) == ['paris', 'pdl']
+        assert instance_manager.instances['paris'].nb_calls == 2
+        assert instance_manager.instances['pdl'].nb_calls == 3
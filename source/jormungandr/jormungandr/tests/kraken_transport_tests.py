@@ -0,0 +1,163 @@
+# Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+
+from jormungandr.kraken_transport import KrakenTransport
+import gevent
+
+
+class FakeSocket(object):
+    def __init__(self, response=None):
+        self.response = response
+        self.closed = False
+        self.sent = []
+
+    def connect(self, path):
+        pass
+
+    def send_multipart(self, frames):
+        self.sent.append(frames)
+
+    def poll(self, timeout):
+        return 1 if self.response is not None else 0
+
+    def recv_multipart(self):
+        return [b'', self.response]
+
+    def setsockopt(self, *args):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeContext(object):
+    def __init__(self, response=None):
+        self.response = response
+        self.sockets = []
+
+    def socket(self, socket_type):
+        s = FakeSocket(self.response)
+        self.sockets.append(s)
+        return s
+
+
+class FakeRequest(object):
+    request_id = 'fake_request'
+
+    def SerializeToString(self):
+        return b'request'
+
+
+def call_reuses_connection_test():
+    context = FakeContext(response=b'response')
+    transport = KrakenTransport(context, 'ipc:///tmp/fake', 'fake')
+    assert transport.call(FakeRequest(), timeout=100) == b'response'
+    assert transport.call(FakeRequest(), timeout=100) == b'response'
+
+    assert len(context.sockets) == 1
+    # the REQ envelope is built by hand
+    assert context.sockets[0].sent[0] == [b'', b'request']
+    status = transport.status()
+    assert status['connections'] == 1
+    assert status['idle_connections'] == 1
+    assert status['nb_calls'] == 2
+    assert status['in_flight'] == 0
+
+
+def call_timeout_closes_connection_test():
+    context = FakeContext(response=None)
+    transport = KrakenTransport(context, 'ipc:///tmp/fake', 'fake')
+    assert transport.call(FakeRequest(), timeout=100) is None
+
+    assert context.sockets[0].closed
+    status = transport.status()
+    assert status['connections'] == 0
+    assert status['idle_connections'] == 0
+    assert status['nb_timeouts'] == 1
+
+
+def killed_call_closes_connection_test():
+    """
+    a call interrupted while waiting for the response must not give back its connection
+    """
+
+    class SlowSocket(FakeSocket):
+        def poll(self, timeout):
+            gevent.sleep(1)
+            return 1
+
+    class SlowContext(FakeContext):
+        def socket(self, socket_type):
+            s = SlowSocket(self.response)
+            self.sockets.append(s)
+            return s
+
+    context = SlowContext(response=b'response')
+    transport = KrakenTransport(context, 'ipc:///tmp/fake', 'fake')
+    call = gevent.spawn(transport.call, FakeRequest(), 1000)
+    gevent.sleep(0.01)
+    call.kill()
+
+    assert context.sockets[0].closed
+    status = transport.status()
+    assert status['connections'] == 0
+    assert status['idle_connections'] == 0
+    assert status['in_flight'] == 0
+
+
+def max_connections_test():
+    """
+    with only one connection allowed, a call waits for the connection to be released
+    """
+    context = FakeContext(response=b'response')
+    transport = KrakenTransport(context, 'ipc:///tmp/fake', 'fake', max_connections=1)
+    transport._acquire_slot(100)
+
+    # no slot available before the timeout
+    assert transport.call(FakeRequest(), timeout=10) is None
+    assert transport.status()['nb_timeouts'] == 1
+
+    gevent.spawn_later(0.01, transport._release_slot)
+    assert transport.call(FakeRequest(), timeout=1000) == b'response'
+    assert transport.status()['queue_depth'] == 0
+
+
+def reap_test():
+    context = FakeContext(response=b'response')
+    transport = KrakenTransport(context, 'ipc:///tmp/fake', 'fake')
+    transport.call(FakeRequest(), timeout=100)
+
+    transport.reap(ttl=10)
+    assert transport.status()['connections'] == 1
+
+    transport.reap(ttl=-1)
+    assert transport.status()['connections'] == 0
+    assert context.sockets[0].closed
@@ -0,0 +1,87 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+import time
+
+from jormungandr.object_id_index import ObjectIdIndex
+
+
+class FakeInstance(object):
+    def __init__(self, name, publication_date=1):
+        self.name = name
+        self.publication_date = publication_date
+
+
+def object_id_index_test():
+    paris = FakeInstance('paris')
+    pdl = FakeInstance('pdl')
+    index = ObjectIdIndex()
+
+    assert index.get(paris, 'sa:1') is None
+    index.set(paris, 'sa:1', True)
+    index.set(pdl, 'sa:1', False)
+    assert index.get(paris, 'sa:1') is True
+    assert index.get(pdl, 'sa:1') is False
+    assert index.get(paris, 'sa:2') is None
+
+
+def object_id_index_publication_date_test():
+    """
+    when a coverage is reloaded, only its ids are forgotten
+    """
+    paris = FakeInstance('paris')
+    pdl = FakeInstance('pdl')
+    index = ObjectIdIndex()
+    index.set(paris, 'sa:1', True)
+    index.set(pdl, 'sa:1', False)
+
+    pdl.publication_date = 2
+    assert index.get(pdl, 'sa:1') is None
+    assert index.get(paris, 'sa:1') is True
+
+
+def object_id_index_size_and_ttl_test():
+    paris = FakeInstance('paris')
+    index = ObjectIdIndex(max_size_per_coverage=2, ttl=0)
+    index.set(paris, 'sa:1', True)
+    index.set(paris, 'sa:2', True)
+    index.get(paris, 'sa:1')
+    index.set(paris, 'sa:3', False)
+    # 'sa:2' is the oldest one
+    assert index.get(paris, 'sa:2') is None
+    assert index.get(paris, 'sa:1') is True
+    assert index.get(paris, 'sa:3') is False
+
+    index = ObjectIdIndex(ttl=10)
+    index.set(paris, 'sa:1', True)
+    index._coverages['paris'].ids['sa:1'] = (True, time.time() - 11)
+    assert index.get(paris, 'sa:1') is None
@@ -0,0 +1,177 @@
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr.rate_limit import RateLimiter
+import threading
+import time
+
+
+class FakeRedis(object):
+    """
+    the redis commands used by the synchronization, all the workers share the same values
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.fail = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline(object):
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def incrby(self, key, value):
+        self.commands.append(('incrby', key, value))
+
+    def expire(self, key, seconds):
+        self.commands.append(('expire', key, seconds))
+
+    def get(self, key):
+        self.commands.append(('get', key, None))
+
+    def execute(self):
+        if self.redis.fail:
+            raise Exception('redis down')
+        results = []
+        for command, key, value in self.commands:
+            if command == 'incrby':
+                self.redis.values[key] = self.redis.values.get(key, 0) + value
+                results.append(self.redis.values[key])
+            elif command == 'expire':
+                results.append(True)
+            else:
+                results.append(self.redis.values.get(key))
+        return results
+
+
+class FakeBillingPlan(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeUser(object):
+    def __init__(self, billing_plan):
+        self.billing_plan = FakeBillingPlan(billing_plan)
+
+
+def sliding_window_test():
+    limiter = RateLimiter()
+    # 3 requests in the window starting at 600
+    for _ in range(3):
+        assert limiter.check('bob', 3, 60, now=630) == 0
+    assert limiter.check('bob', 3, 60, now=631) == 30
+    # at 675 the previous window still counts for 3 * 45 / 60 = 2.25 requests
+    assert limiter.check('bob', 3, 60, now=675) == 0
+    assert limiter.check('bob', 3, 60, now=675) > 0
+    # the other keys have their own counters
+    assert limiter.check('alice', 3, 60, now=675) == 0
+    assert limiter.status()['nb_rejected'] == 2
+
+
+def limits_test():
+    limiter = RateLimiter(
+        limits={'key_vip': {'requests': 3, 'seconds': 1}},
+        billing_plans={'dev': {'requests': 1, 'seconds': 60}},
+        default={'requests': 2, 'seconds': 60},
+    )
+    assert limiter.get_limit('key_vip', FakeUser('dev')) == {'requests': 3, 'seconds': 1}
+    assert limiter.get_limit('key_bob', FakeUser('dev')) == {'requests': 1, 'seconds': 60}
+    assert limiter.get_limit('key_alice', FakeUser('pro')) == {'requests': 2, 'seconds': 60}
+
+    assert limiter.check_request('key_bob', FakeUser('dev')) == 0
+    assert limiter.check_request('key_bob', FakeUser('dev')) > 0
+    # no token or no user, the authentication rejects the request
+    assert limiter.check_request(None, FakeUser('dev')) == 0
+    assert limiter.check_request('key_unknown', None) == 0
+
+
+def sync_test():
+    redis = FakeRedis()
+    worker_1, worker_2 = RateLimiter(), RateLimiter()
+    assert worker_1.check('bob', 4, 60, now=600) == 0
+    assert worker_1.check('bob', 4, 60, now=601) == 0
+    assert worker_2.check('bob', 4, 60, now=602) == 0
+    worker_1.sync(redis, now=603)
+    worker_2.sync(redis, now=603)
+    assert redis.values == {'navitia.rate_limit:bob:60:10': 3}
+    # worker_2 knows the 2 requests of worker_1
+    assert worker_2.check('bob', 4, 60, now=604) == 0
+    assert worker_2.check('bob', 4, 60, now=604) > 0
+
+    # the requests that couldn't be sent are sent with the next synchronization
+    redis.fail = True
+    try:
+        worker_2.sync(redis, now=605)
+    except Exception:
+        pass
+    redis.fail = False
+    worker_2.sync(redis, now=606)
+    assert redis.values == {'navitia.rate_limit:bob:60:10': 4}
+    worker_1.sync(redis, now=606)
+    assert worker_1.check('bob', 4, 60, now=607) > 0
+
+
+def sync_new_window_test():
+    redis = FakeRedis()
+    limiter = RateLimiter()
+    limiter.check('bob', 4, 60, now=650)
+    limiter.check('bob', 4, 60, now=650)
+    # the requests of the previous window are sent to its own counter
+    limiter.check('bob', 4, 60, now=661)
+    limiter.sync(redis, now=662)
+    assert redis.values == {'navitia.rate_limit:bob:60:10': 2, 'navitia.rate_limit:bob:60:11': 1}
+    # the unused counters are forgotten
+    limiter.sync(redis, now=800)
+    assert limiter.status()['nb_keys'] == 0
+
+
+def sync_in_a_thread_test(mocker):
+    """
+    without gevent's socket patch the counters are synchronized by a thread
+    """
+    mocker.patch('gevent.monkey.is_module_patched', return_value=False)
+    redis = FakeRedis()
+    limiter = RateLimiter(redis_config={'enabled': True}, sync_interval=0.01)
+    limiter._redis = lambda: redis
+    assert limiter.check('bob', 4, 60) == 0
+    worker = limiter._worker
+    assert isinstance(worker, threading.Thread)
+    for _ in range(100):
+        if redis.values:
+            break
+        time.sleep(0.01)
+    assert list(redis.values.values()) == [1]
+    limiter.stop()
+    worker.join(1)
+    assert not worker.is_alive()
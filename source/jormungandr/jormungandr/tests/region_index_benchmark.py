@@ -0,0 +1,128 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Benchmark of the lookup of the coverages containing a coord (see InstanceManager._all_keys_of_coord)
+
+The coverages are synthetic shapes looking like real ones: irregular polygons with thousands of
+vertices, some of them overlapping, spread on a country sized area.
+The coords are drawn around a few hot spots, like the requests of a city.
+
+Usage: python -m jormungandr.tests.region_index_benchmark [--nb-coverages 150] [--nb-vertices 3000]
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+import argparse
+import math
+import random
+import timeit
+from shapely import geometry
+
+from jormungandr.region_index import RegionIndex
+
+
+class BenchInstance(object):
+    def __init__(self, name, geom):
+        self.name = name
+        self.geom = geom
+
+    def has_point(self, p):
+        return self.geom and self.geom.contains(p)
+
+
+def build_shape(rand, center_lon, center_lat, radius, nb_vertices):
+    points = []
+    for i in range(nb_vertices):
+        angle = 2 * math.pi * i / nb_vertices
+        r = radius * rand.uniform(0.7, 1.0)
+        points.append((center_lon + r * math.cos(angle), center_lat + r * math.sin(angle)))
+    return geometry.Polygon(points)
+
+
+def build_instances(nb_coverages, nb_vertices, seed):
+    rand = random.Random(seed)
+    instances = {}
+    for i in range(nb_coverages):
+        name = 'coverage_{}'.format(i)
+        shape = build_shape(rand, rand.uniform(-5, 8), rand.uniform(42, 51), rand.uniform(0.2, 1.5), nb_vertices)
+        instances[name] = BenchInstance(name, shape)
+    return instances
+
+
+def build_coords(nb_coords, seed):
+    rand = random.Random(seed)
+    hot_spots = [(rand.uniform(-5, 8), rand.uniform(42, 51)) for _ in range(10)]
+    coords = []
+    for _ in range(nb_coords):
+        lon, lat = rand.choice(hot_spots)
+        coords.append((lon + rand.gauss(0, 0.1), lat + rand.gauss(0, 0.1)))
+    return coords
+
+
+def run(nb_coverages, nb_vertices, nb_coords, cell_size, nb_repeat):
+    instances = build_instances(nb_coverages, nb_vertices, seed=nb_coverages)
+    coords = build_coords(nb_coords, seed=nb_coords)
+    index = RegionIndex(cell_size=cell_size)
+    index.refresh(instances)
+
+    def linear_scan():
+        return [
+            [i.name for i in instances.values() if i.has_point(geometry.Point(lon, lat))] for lon, lat in coords
+        ]
+
+    def indexed():
+        return [index.find(lon, lat) for lon, lat in coords]
+
+    assert [sorted(r) for r in linear_scan()] == [sorted(r) for r in indexed()], 'the lookups disagree'
+
+    linear = min(timeit.repeat(linear_scan, number=1, repeat=nb_repeat)) * 1000
+
+    def rebuilt_and_indexed():
+        index.refresh({})
+        index.refresh(instances)
+        return indexed()
+
+    cold = min(timeit.repeat(rebuilt_and_indexed, number=1, repeat=nb_repeat)) * 1000
+    warm = min(timeit.repeat(indexed, number=1, repeat=nb_repeat)) * 1000
+    print('{} coverages of {} vertices, {} coords'.format(nb_coverages, nb_vertices, nb_coords))
+    print('{:>20} {:>10.1f} ms'.format('linear scan', linear))
+    print('{:>20} {:>10.1f} ms'.format('index (cold)', cold))
+    print('{:>20} {:>10.1f} ms'.format('index (warm)', warm))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='benchmark of the coord to coverages lookup')
+    parser.add_argument('--nb-coverages', type=int, default=150)
+    parser.add_argument('--nb-vertices', type=int, default=3000)
+    parser.add_argument('--nb-coords', type=int, default=2000)
+    parser.add_argument('--cell-size', type=float, default=0.01)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.nb_coverages, args.nb_vertices, args.nb_coords, args.cell_size, args.repeat)
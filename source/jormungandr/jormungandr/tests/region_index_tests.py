@@ -0,0 +1,99 @@
+# coding=utf-8
+
+#  Copyright (c) 2001-2014, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from shapely import wkt, geometry
+
+from jormungandr.region_index import RegionIndex
+
+
+class FakeInstance(object):
+    def __init__(self, name, shape=None):
+        self.name = name
+        self.geom = wkt.loads(shape) if shape else None
+
+    def has_point(self, p):
+        return self.geom and self.geom.contains(p)
+
+
+def build_instances():
+    instances = {
+        'square': FakeInstance('square', 'POLYGON((0 0, 10 0, 10 10, 0 10, 0 0))'),
+        # a triangle overlapping the square
+        'triangle': FakeInstance('triangle', 'POLYGON((5 5, 15 5, 15 15, 5 5))'),
+        'far': FakeInstance('far', 'POLYGON((100 100, 101 100, 101 101, 100 101, 100 100))'),
+        'no_geom': FakeInstance('no_geom'),
+    }
+    return instances
+
+
+def region_index_find_test():
+    instances = build_instances()
+    index = RegionIndex(cell_size=1)
+    index.refresh(instances)
+
+    assert index.find(1.5, 1.5) == ['square']
+    assert sorted(index.find(9.5, 6)) == ['square', 'triangle']
+    # in a cell crossed by the border of the triangle
+    assert index.find(11.5, 11.2) == ['triangle']
+    assert index.find(11.2, 11.5) == []
+    assert index.find(100.5, 100.5) == ['far']
+    assert index.find(-50, 3) == []
+
+
+def region_index_same_as_linear_scan_test():
+    instances = build_instances()
+    index = RegionIndex(cell_size=0.7, cache_size=5)
+    index.refresh(instances)
+    for i in range(-10, 170):
+        for j in range(-10, 170):
+            lon, lat = i / 10.0, j / 10.0
+            p = geometry.Point(lon, lat)
+            expected = sorted(name for name, inst in instances.items() if inst.has_point(p))
+            assert sorted(index.find(lon, lat)) == expected, (lon, lat)
+
+
+def region_index_refresh_test():
+    instances = build_instances()
+    index = RegionIndex(cell_size=1)
+    assert index.refresh(instances)
+    assert not index.refresh(instances)
+    assert index.find(50.5, 50.5) == []
+
+    # kraken has loaded new data, the shape of the instance has changed
+    instances['far'].geom = wkt.loads('POLYGON((50 50, 51 50, 51 51, 50 51, 50 50))')
+    assert index.refresh(instances)
+    assert index.find(50.5, 50.5) == ['far']
+    assert index.find(100.5, 100.5) == []
+
+    del instances['far']
+    assert index.refresh(instances)
+    assert index.find(50.5, 50.5) == []
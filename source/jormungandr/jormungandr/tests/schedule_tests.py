@@ -0,0 +1,125 @@
+#  Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr import app
+from jormungandr.schedule import MixedSchedule, RoutePoint, RealTimePassage, RT_PROXY_PROPERTY_NAME
+from jormungandr.realtime_schedule.realtime_proxy import RealtimeProxy
+from navitiacommon import type_pb2
+import datetime
+import gevent
+import pytz
+
+
+class FakeProxy(RealtimeProxy):
+    def __init__(self, rt_system_id, sleep_by_stop=None):
+        self.rt_system_id = rt_system_id
+        self.sleep_by_stop = sleep_by_stop or {}
+        self.calls = []
+
+    def status(self):
+        return None
+
+    def _get_batch_key(self, route_point):
+        return route_point.pb_stop_point.uri
+
+    def _get_next_passage_for_route_point(self, route_point, count, from_dt, current_dt, duration):
+        self.calls.append(route_point.pb_stop_point.uri)
+        gevent.sleep(self.sleep_by_stop.get(route_point.pb_stop_point.uri, 0))
+        return [RealTimePassage(datetime.datetime(2016, 1, 2, 10, 0, tzinfo=pytz.UTC))]
+
+
+class FakeProxyManager(object):
+    def __init__(self, proxies):
+        self.proxies = proxies
+
+    def get(self, rt_system_id):
+        return self.proxies.get(rt_system_id)
+
+
+class FakeInstance(object):
+    def __init__(self, proxies):
+        self.realtime_proxy_manager = FakeProxyManager(proxies)
+        self.realtime_pool_size = 3
+
+
+def make_route_point(stop_uri, route_uri, rt_system_id=None):
+    route = type_pb2.Route(uri=route_uri)
+    if rt_system_id:
+        route.line.properties.add(name=RT_PROXY_PROPERTY_NAME, value=rt_system_id)
+    return RoutePoint(route, type_pb2.StopPoint(uri=stop_uri))
+
+
+REQUEST = {
+    'items_per_schedule': None,
+    'from_datetime': None,
+    '_current_datetime': None,
+    'duration': 86400,
+    'timezone': None,
+}
+
+
+def get_realtime_passages_test():
+    """
+    the route points of a proxy are requested by batch, the route points without proxy are ignored
+    """
+    proxy = FakeProxy('bob')
+    schedule = MixedSchedule(FakeInstance({'bob': proxy}))
+    rp1 = make_route_point('sp1', 'route1', 'bob')
+    rp2 = make_route_point('sp1', 'route2', 'bob')
+    rp3 = make_route_point('sp2', 'route1', 'bob')
+    no_rt = make_route_point('sp3', 'route1')
+
+    with app.test_request_context():
+        result = schedule._get_realtime_passages([rp1, rp2, rp3, no_rt], REQUEST)
+
+    assert set(result.keys()) == {rp1, rp2, rp3}
+    assert all(p is proxy and len(passages) == 1 for p, passages in result.values())
+    assert sorted(proxy.calls) == ['sp1', 'sp1', 'sp2']
+
+
+def get_realtime_passages_time_budget_test():
+    """
+    the route points not answered within the time budget keep the base schedule
+    """
+    proxy = FakeProxy('bob', sleep_by_stop={'slow': 10})
+    schedule = MixedSchedule(FakeInstance({'bob': proxy}))
+    fast = make_route_point('fast', 'route1', 'bob')
+    slow = make_route_point('slow', 'route1', 'bob')
+
+    budget = app.config.get(str('REALTIME_PROXY_TIME_BUDGET'))
+    app.config[str('REALTIME_PROXY_TIME_BUDGET')] = 0.2
+    try:
+        with app.test_request_context():
+            result = schedule._get_realtime_passages([fast, slow], REQUEST)
+    finally:
+        app.config[str('REALTIME_PROXY_TIME_BUDGET')] = budget
+
+    assert len(result[fast][1]) == 1
+    assert result[slow] == (proxy, None)
@@ -0,0 +1,124 @@
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr.stat_queue import StatQueue, FileSink, read_file_sink
+import gevent
+import threading
+
+
+class FakePublisher(object):
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, batch):
+        if self.fail:
+            raise Exception('broker down')
+        self.batches.append(list(batch))
+        del batch[:]
+
+
+def batches_test():
+    publisher = FakePublisher()
+    queue = StatQueue(publisher, batch_size=2, flush_interval=0.01)
+    for i in range(5):
+        queue.put('v1.journeys', 'stat{}'.format(i))
+    # nothing is published during the 'requests'
+    assert publisher.batches == []
+    gevent.sleep(0.1)
+    assert [len(b) for b in publisher.batches] == [2, 2, 1]
+    assert publisher.batches[0] == [('v1.journeys', 'stat0'), ('v1.journeys', 'stat1')]
+    status = queue.status()
+    assert status['nb_published'] == 5
+    assert status['nb_batches'] == 3
+    assert status['size'] == 0
+
+
+def drop_when_full_test():
+    publisher = FakePublisher()
+    queue = StatQueue(publisher, max_size=2)
+    for i in range(5):
+        queue.put('v1.journeys', 'stat{}'.format(i))
+    status = queue.status()
+    assert status['size'] == 2
+    assert status['nb_dropped'] == 3
+
+
+def publish_error_test():
+    queue = StatQueue(FakePublisher(fail=True), flush_interval=0.01)
+    queue.put('v1.journeys', 'stat')
+    gevent.sleep(0.1)
+    assert queue.status()['nb_failed'] == 1
+    assert queue.status()['nb_published'] == 0
+
+
+def flush_test():
+    publisher = FakePublisher()
+    queue = StatQueue(publisher, batch_size=2, flush_interval=10)
+    for i in range(3):
+        queue.put('v1.journeys', 'stat{}'.format(i))
+    # the greenlet is waiting for the end of its batch
+    gevent.sleep(0.01)
+    queue.flush()
+    assert sum(len(b) for b in publisher.batches) == 3
+    assert queue.status()['nb_published'] == 3
+
+
+def worker_test(mocker):
+    """
+    without gevent's socket patch the stats are published by a thread
+    """
+    patched = mocker.patch('gevent.monkey.is_module_patched', return_value=True)
+    queue = StatQueue(FakePublisher())
+    queue.put('v1.journeys', 'stat')
+    assert isinstance(queue._worker, gevent.Greenlet)
+    queue.flush()
+
+    patched.return_value = False
+    publisher = FakePublisher()
+    queue = StatQueue(publisher, batch_size=2, flush_interval=10)
+    for i in range(3):
+        queue.put('v1.journeys', 'stat{}'.format(i))
+    worker = queue._worker
+    assert isinstance(worker, threading.Thread)
+    queue.flush()
+    assert not worker.is_alive()
+    assert sum(len(b) for b in publisher.batches) == 3
+    assert queue.status()['nb_published'] == 3
+
+
+def file_sink_test(tmpdir):
+    path = str(tmpdir.join('stats'))
+    sink = FileSink(path)
+    stats = [('v1.journeys', b'\x08\x01'), ('v1.places', b'\x08\x02'), ('v1.journeys', b'\x08\x03')]
+    sink.write(stats[:2])
+    sink.write(stats[2:])
+    assert read_file_sink(path) == stats
@@ -0,0 +1,181 @@
+#  Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from jormungandr.coalescing_cache import CoalescingCache
+from jormungandr.two_tier_cache import LocalLRU, TwoTierCache
+from flask import Flask
+import json
+
+
+def make_cache(local_type='simple', **local_config):
+    shared = CoalescingCache(Flask(__name__), with_jinja2_ext=False, config={'CACHE_TYPE': 'simple'})
+    local_config['CACHE_TYPE'] = local_type
+    return TwoTierCache(shared, local_config)
+
+
+def local_lru_eviction_test():
+    lru = LocalLRU(max_size=2)
+    lru.set('a', 1, 60, 'ns')
+    lru.set('b', 2, 60, 'ns')
+    assert lru.get('a') == 1
+    lru.set('c', 3, 60, 'ns')
+    # 'b' is the least recently used
+    assert lru.get('b') is None
+    assert lru.get('a') == 1
+    assert lru.get('c') == 3
+    assert len(lru) == 2
+
+
+def local_lru_expiration_test():
+    lru = LocalLRU()
+    lru.set('a', 1, -1, 'ns')
+    assert lru.get('a') is None
+    lru.set('b', 2, 0, 'ns')
+    assert lru.get('b') == 2
+
+
+def local_lru_invalidate_test():
+    lru = LocalLRU()
+    lru.set('a', 1, 60, 'auth')
+    lru.set('b', 2, 60, 'instances')
+    lru.invalidate('auth')
+    assert lru.get('a') is None
+    assert lru.get('b') == 2
+
+
+def local_values_are_copies_test():
+    lru = LocalLRU()
+    value = {'a': [1]}
+    lru.set('a', value, 60, 'ns')
+    lru.get('a')['a'].append(2)
+    assert lru.get('a') == {'a': [1]}
+
+
+def two_tier_memoize_test():
+    cache = make_cache()
+    calls = []
+
+    @cache.memoize(60, 300, namespace='ns')
+    def get(key):
+        calls.append(key)
+        return {'key': key}
+
+    assert get('a') == {'key': 'a'}
+    assert get('a') == {'key': 'a'}
+    assert get('b') == {'key': 'b'}
+    assert calls == ['a', 'b']
+    assert cache.local.nb_hits == 1
+
+
+def two_tier_local_disabled_test():
+    cache = make_cache(local_type='null')
+    calls = []
+
+    @cache.memoize(60, 300, namespace='ns')
+    def get(key):
+        calls.append(key)
+        return key
+
+    assert get('a') == 'a'
+    assert get('a') == 'a'
+    # the shared cache is still used
+    assert calls == ['a']
+    assert len(cache.local) == 0
+
+
+def two_tier_invalidate_test():
+    cache = make_cache()
+    calls = []
+
+    @cache.memoize(60, 300, namespace='auth')
+    def get_user(key):
+        calls.append(key)
+        return key
+
+    @cache.memoize(60, 300, namespace='instances')
+    def get_instance(key):
+        calls.append(key)
+        return key
+
+    get_user('a')
+    get_instance('b')
+    cache.invalidate('auth')
+    get_user('a')
+    get_instance('b')
+    assert calls == ['a', 'b', 'a']
+
+
+def two_tier_invalidation_message_test():
+    cache = make_cache()
+    calls = []
+
+    @cache.memoize(60, 300, namespace='auth')
+    def get_user(key):
+        calls.append(key)
+        return key
+
+    get_user('a')
+    # only the local value is forgotten, the shared one is still there
+    cache._on_message(json.dumps({'namespace': 'auth', 'reset_shared': False}))
+    get_user('a')
+    assert calls == ['a']
+    assert cache.local.nb_misses == 2
+
+    cache._on_message(json.dumps({'namespace': 'auth', 'reset_shared': True}))
+    get_user('a')
+    assert calls == ['a', 'a']
+
+    # invalid messages are ignored
+    cache._on_message('not json')
+    cache._on_message(json.dumps({'foo': 'bar'}))
+    assert not cache._pending_invalidations
+
+
+def two_tier_subscriber_without_local_cache_test():
+    shared = CoalescingCache(Flask(__name__), with_jinja2_ext=False, config={'CACHE_TYPE': 'simple'})
+    cache = TwoTierCache(shared, {'CACHE_TYPE': 'null'}, {'enabled': True})
+    # no redis here, the listener only records that it has been started
+    started = []
+    cache._listen = lambda sleep: started.append(sleep)
+
+    # nobody needs the invalidations yet
+    cache.apply_pending_invalidations()
+    assert cache._listener is False
+
+    refreshes = []
+    cache.subscribe('auth', lambda: refreshes.append('auth'))
+    cache.apply_pending_invalidations()
+    cache._listener.join()
+    assert len(started) == 1
+
+    cache._on_message(json.dumps({'namespace': 'auth'}))
+    cache._on_message(json.dumps({'namespace': 'instances'}))
+    cache.apply_pending_invalidations()
+    assert refreshes == ['auth']
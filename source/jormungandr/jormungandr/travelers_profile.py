@@ -28,7 +28,8 @@
 # www.navitia.io
 
 from __future__ import absolute_import, print_function, unicode_literals, division
-from jormungandr import app, cache, memory_cache
+from jormungandr import app, two_tier_cache
+from jormungandr.two_tier_cache import INSTANCES
 from navitiacommon import models
 from navitiacommon.default_traveler_profile_params import (
     default_traveler_profile_params,
@@ -108,8 +109,11 @@ class TravelerProfile(object):
         list(map(override, arg_2_profile_attr))
 
     @classmethod
-    @memory_cache.memoize(app.config.get(str('MEMORY_CACHE_CONFIGURATION'), {}).get(str('TIMEOUT_PARAMS'), 30))
-    @cache.memoize(app.config.get(str('CACHE_CONFIGURATION'), {}).get(str('TIMEOUT_PARAMS'), 300))
+    @two_tier_cache.memoize(
+        app.config.get(str('MEMORY_CACHE_CONFIGURATION'), {}).get(str('TIMEOUT_PARAMS'), 30),
+        app.config.get(str('CACHE_CONFIGURATION'), {}).get(str('TIMEOUT_PARAMS'), 300),
+        namespace=INSTANCES,
+    )
     def make_traveler_profile(cls, coverage, traveler_type):
         """
         travelers_profile factory method,
@@ -141,8 +145,11 @@ class TravelerProfile(object):
         )
 
     @classmethod
-    @memory_cache.memoize(app.config.get(str('MEMORY_CACHE_CONFIGURATION'), {}).get(str('TIMEOUT_PARAMS'), 30))
-    @cache.memoize(app.config.get(str('CACHE_CONFIGURATION'), {}).get(str('TIMEOUT_PARAMS'), 300))
+    @two_tier_cache.memoize(
+        app.config.get(str('MEMORY_CACHE_CONFIGURATION'), {}).get(str('TIMEOUT_PARAMS'), 30),
+        app.config.get(str('CACHE_CONFIGURATION'), {}).get(str('TIMEOUT_PARAMS'), 300),
+        namespace=INSTANCES,
+    )
     def get_profiles_by_coverage(cls, coverage):
         traveler_profiles = []
         for traveler_type in acceptable_traveler_types:
@@ -0,0 +1,259 @@
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+from __future__ import absolute_import, print_function, unicode_literals, division
+from collections import OrderedDict, defaultdict, deque
+from six.moves import cPickle as pickle
+import functools
+import gevent
+import json
+import logging
+import threading
+import time
+
+# namespaces of the memoized values, they are invalidated as a whole
+AUTHENTICATION = 'authentication'
+INSTANCES = 'instances'
+
+
+class LocalLRU(object):
+    """
+    in-process LRU of pickled values (so each caller gets its own copy, like with the simple cache)
+    """
+
+    def __init__(self, max_size=500):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # key -> (expiration, namespace, pickled value)
+        self.nb_hits = 0
+        self.nb_misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None or (entry[0] and entry[0] < time.time()):
+            self.nb_misses += 1
+            return None
+        self._entries[key] = entry
+        self.nb_hits += 1
+        return pickle.loads(entry[2])
+
+    def set(self, key, value, timeout, namespace):
+        self._entries.pop(key, None)
+        expiration = time.time() + timeout if timeout else None
+        self._entries[key] = (expiration, namespace, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, namespace):
+        for key in [k for k, e in self._entries.items() if e[1] == namespace]:
+            del self._entries[key]
+
+
+class TwoTierCache(object):
+    """
+    Memoization in an in-process LRU in front of the shared cache (redis)
+
+    The local values are short-lived copies of the shared ones. To be able to keep them longer, the
+    memoized functions are grouped by namespace and a namespace can be invalidated on all the workers:
+    the invalidations are published on a redis channel (by tyr when a user, a key or an instance changes)
+    and each worker listens to it.
+
+    A message of the channel is a json: {"namespace": "authentication", "reset_shared": true}
+    with reset_shared the values of the namespace are also forgotten in the shared cache.
+    """
+
+    def __init__(self, shared_cache, local_config=None, invalidation_config=None):
+        local_config = local_config or {}
+        self.shared_cache = shared_cache
+        self.local_enabled = local_config.get(str('CACHE_TYPE'), 'null') != 'null'
+        self.local = LocalLRU(local_config.get(str('CACHE_THRESHOLD'), 500))
+        self.invalidation_config = invalidation_config or {}
+        self._functions = defaultdict(list)
+        self._pending_invalidations = deque()
+        self._listener = None
+        self._subscribers = defaultdict(list)
+
+    def memoize(self, local_timeout, shared_timeout, namespace):
+        def decorator(f):
+            shared = self.shared_cache.memoize(shared_timeout)(f)
+            self._functions[namespace].append(shared)
+
+            @functools.wraps(f)
+            def decorated_function(*args, **kwargs):
+                if not self.local_enabled:
+                    return shared(*args, **kwargs)
+                if self._listener is None:
+                    # started lazily to be in the worker and not in the master process
+                    self.start_listening()
+                self._apply_pending_invalidations()
+
+                key = self._make_key(f, namespace, args, kwargs)
+                rv = self.local.get(key)
+                if rv is None:
+                    rv = shared(*args, **kwargs)
+                    if rv is not None:
+                        self.local.set(key, rv, local_timeout, namespace)
+                return rv
+
+            decorated_function.uncached = f
+            decorated_function.shared = shared
+            return decorated_function
+
+        return decorator
+
+    def _make_key(self, f, namespace, args, kwargs):
+        # same representation of the arguments as flask-caching
+        key_args, key_kwargs = self.shared_cache._memoize_kwargs_to_args(f, *args, **kwargs)
+        return '{}|{}.{}|{}{}'.format(namespace, f.__module__, f.__name__, key_args, key_kwargs)
+
+    def subscribe(self, namespace, callback):
+        """
+        callback is called when the namespace is invalidated, for the data kept outside of the cache
+        """
+        self._subscribers[namespace].append(callback)
+        if self._listener is False:
+            # the invalidations weren't needed so far, they are now
+            self._listener = None
+
+    def apply_pending_invalidations(self):
+        if self._listener is None:
+            self.start_listening()
+        self._apply_pending_invalidations()
+
+    def invalidate(self, namespace, reset_shared=True, publish=True):
+        """
+        forget the values of a namespace, in this worker and in all the others if publish is True
+        """
+        self.local.invalidate(namespace)
+        for callback in self._subscribers.get(namespace, []):
+            callback()
+        if reset_shared:
+            self._reset_shared(namespace)
+        if publish:
+            self._publish(namespace)
+
+    def _reset_shared(self, namespace):
+        for shared in self._functions.get(namespace, []):
+            try:
+                shared.delete_memoized()
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    'impossible to reset the shared cache of {}'.format(namespace)
+                )
+
+    def _apply_pending_invalidations(self):
+        while self._pending_invalidations:
+            message = self._pending_invalidations.popleft()
+            logging.getLogger(__name__).info('cache invalidation received: {}'.format(message))
+            # the other workers only clear their local cache
+            self.invalidate(message['namespace'], reset_shared=message.get('reset_shared', False), publish=False)
+
+    def _redis(self, socket_timeout=2):
+        import redis
+
+        return redis.StrictRedis(
+            host=self.invalidation_config.get('redis_host', 'localhost'),
+            port=self.invalidation_config.get('redis_port', 6379),
+            db=self.invalidation_config.get('redis_db', 0),
+            password=self.invalidation_config.get('redis_password'),
+            socket_timeout=socket_timeout,
+        )
+
+    @property
+    def _channel(self):
+        return self.invalidation_config.get('channel', 'navitia.cache_invalidation')
+
+    def _publish(self, namespace):
+        if not self.invalidation_config.get('enabled'):
+            return
+        try:
+            # the shared cache has already been reset here, the other workers only clear their local values
+            self._redis().publish(self._channel, json.dumps({'namespace': namespace, 'reset_shared': False}))
+        except Exception as e:
+            logging.getLogger(__name__).warning('impossible to publish a cache invalidation: {}'.format(e))
+
+    def _on_message(self, data):
+        try:
+            message = json.loads(data)
+        except (ValueError, TypeError):
+            message = None
+        if not isinstance(message, dict) or 'namespace' not in message:
+            logging.getLogger(__name__).warning('invalid cache invalidation message: {}'.format(data))
+            return
+        self._pending_invalidations.append(message)
+
+    def _listen(self, sleep):
+        while True:
+            try:
+                # no socket timeout, the channel can stay silent for hours
+                pubsub = self._redis(socket_timeout=None).pubsub()
+                pubsub.subscribe(self._channel)
+                for item in pubsub.listen():
+                    if item.get('type') == 'message':
+                        self._on_message(item['data'])
+            except Exception as e:
+                logging.getLogger(__name__).warning('cache invalidation channel lost: {}'.format(e))
+            # whatever happens, the local values may have missed an invalidation
+            self._pending_invalidations.extend({'namespace': ns} for ns in list(self._functions.keys()))
+            sleep(self.invalidation_config.get('retry_delay', 5))
+
+    def start_listening(self):
+        """
+        listen to the invalidations of the other workers and of tyr
+
+        redis-py's pubsub is blocking, so without gevent's socket patch it runs in a real thread.
+        The listener only queues the messages, they are applied by the greenlets using the cache
+
+        the invalidations are needed by the local values and by the subscribers, even if the local tier is off
+        """
+        if self._listener:
+            return
+        if not self.invalidation_config.get('enabled') or not (self.local_enabled or self._subscribers):
+            self._listener = False
+            return
+        from gevent import monkey
+
+        if monkey.is_module_patched('socket'):
+            self._listener = gevent.spawn(self._listen, gevent.sleep)
+        else:
+            self._listener = threading.Thread(target=self._listen, args=(time.sleep,), name='cache_invalidation')
+            self._listener.daemon = True
+            self._listener.start()
+
+    def status(self):
+        return {
+            'local_enabled': self.local_enabled,
+            'local_size': len(self.local),
+            'local_max_size': self.local.max_size,
+            'local_hits': self.local.nb_hits,
+            'local_misses': self.local.nb_misses,
+            'invalidation_enabled': bool(self.invalidation_config.get('enabled')),
+        }
@@ -584,8 +584,11 @@ def copy_context_in_greenlet_stack(request_context):
     :param request_context: a copy of the 'main' flask request context
     """
     flask.globals._request_ctx_stack.push(request_context)
-    yield
-    flask.globals._request_ctx_stack.pop()
+    try:
+        yield
+    finally:
+        # the greenlet may have been killed, the context must be popped anyway
+        flask.globals._request_ctx_stack.pop()
 
 
 def compose(*funs):
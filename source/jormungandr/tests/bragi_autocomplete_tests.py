@@ -1355,6 +1355,43 @@ class TestBragiShape(AbstractTestFixture):
             assert r[0]['address']['name'] == 'Rue Bob'
             assert r[0]['address']['label'] == '20 Rue Bob (Bobtown)'
 
+    def test_global_places_batch(self):
+        """
+        the identical searches are sent only once to bragi and the results are in the order of the queries
+        """
+        with requests_mock.Mocker() as m:
+            m.get('https://host_of_bragi/autocomplete', json=BRAGI_MOCK_RESPONSE)
+            response = self.query('v1/places_batch?q[]=bob&q[]=toto&q[]=bob')
+            assert m.call_count == 2
+            assert sorted(r.qs['q'][0] for r in m.request_history) == ['bob', 'toto']
+
+            results = response.get('results')
+            assert [r['query'] for r in results] == ['bob', 'toto', 'bob']
+            for r in results:
+                is_valid_global_autocomplete(r, depth=1)
+                assert r['places'][0]['name'] == '20 Rue Bob (Bobtown)'
+
+    def test_global_places_batch_by_uri(self):
+        params = {'timeout': 200, 'pt_dataset[]': 'main_routing_test'}
+        url = 'https://host_of_bragi/features/{}?' + urlencode(params, doseq=True)
+
+        with requests_mock.Mocker() as m:
+            m.get(url.format('bob'), json=BRAGI_MOCK_RESPONSE)
+            m.get(url.format('unknown'), status_code=404)
+            response = self.query('v1/places_batch?uri[]=bob&uri[]=unknown')
+
+            results = response.get('results')
+            assert [r['uri'] for r in results] == ['bob', 'unknown']
+            assert results[0]['places'][0]['name'] == '20 Rue Bob (Bobtown)'
+            # an error is given for the uri instead of failing the whole batch
+            assert results[1]['error']['id'] == 'unknown_object'
+
+    def test_global_places_batch_invalid(self):
+        _, s = self.query_no_assert('v1/places_batch')
+        assert s == 400
+        _, s = self.query_no_assert('v1/places_batch?q[]=bob&uri[]=bob')
+        assert s == 400
+
     def test_global_coords_uri(self):
         url = 'https://host_of_bragi'
         params = {'pt_dataset[]': 'main_routing_test', 'lon': 3.282103, 'lat': 49.84758, 'timeout': 200}
@@ -115,7 +115,7 @@ class TestSyntheseSchedules(AbstractTestFixture):
                 )
             }
         )
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('requests.Session.get', mock_requests.get):
             query = self.query_template.format(sp='SP_1')
             response = self.query_region(query)
             scs = get_not_null(response, 'stop_schedules')
@@ -158,7 +158,7 @@ class TestSyntheseSchedules(AbstractTestFixture):
                 )
             }
         )
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('requests.Session.get', mock_requests.get):
             query = self.query_template.format(sp='SP_11')
             response = self.query_region(query)
             scs = get_not_null(response, 'stop_schedules')
@@ -192,7 +192,7 @@ class TestSyntheseSchedules(AbstractTestFixture):
                 )
             }
         )
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('requests.Session.get', mock_requests.get):
             query = self.query_template.format(sp='SP_11')
             response = self.query_region(query)
             scs = get_not_null(response, 'stop_schedules')
@@ -239,7 +239,7 @@ class TestSyntheseSchedules(AbstractTestFixture):
                 )
             }
         )
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('requests.Session.get', mock_requests.get):
             query = self.query_template.format(sp='SP_11')
             response = self.query_region(query)
             scs = get_not_null(response, 'stop_schedules')
@@ -270,7 +270,7 @@ class TestSyntheseSchedules(AbstractTestFixture):
                 )
             }
         )
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('requests.Session.get', mock_requests.get):
             query = self.query_template.format(sp='SP_21')
             response = self.query_region(query)
             scs = get_not_null(response, 'stop_schedules')
@@ -91,7 +91,7 @@ class TestSytralSchedules(AbstractTestFixture):
                 )
             }
         )
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('requests.Session.get', mock_requests.get):
             query = self.query_template_scs.format(sp='SP_1')
             response = self.query_region(query)
             scs = get_not_null(response, 'stop_schedules')
@@ -139,7 +139,7 @@ class TestSytralSchedules(AbstractTestFixture):
                 )
             }
         )
-        with mock.patch('requests.get', mock_requests.get):
+        with mock.patch('requests.Session.get', mock_requests.get):
             query = self.query_template_scs.format(sp='SP_1')
             response = self.query_region(query)
             scs = get_not_null(response, 'stop_schedules')
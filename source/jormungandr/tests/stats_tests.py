@@ -31,7 +31,7 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 from .tests_mechanism import AbstractTestFixture, dataset
 from .check_utils import *
 from jormungandr import stat_manager
-from jormungandr.stat_manager import StatManager
+from jormungandr.stat_manager import StatManager, AdminIndex, find_admin
 
 # from mock import patch
 from jormungandr.utils import str_to_time_stamp
@@ -243,6 +243,26 @@ class TestStatJourneys(MockStatManager):
 
         assert mock.called
 
+    def test_journey_query_not_sampled(self):
+        """
+        without sampling only the request is stored, not its journeys
+        """
+        stats = []
+
+        def publish(api, pbf):
+            stat = stat_pb2.StatRequest()
+            stat.ParseFromString(pbf)
+            stats.append(stat)
+
+        StatManager.publish_request = staticmethod(publish)
+        with mock.patch.object(stat_manager, 'journeys_sampling', {'v1.journeys': 0}):
+            self.query_region(journey_basic_query, display=False)
+
+        assert len(stats) == 1
+        assert stats[0].api == 'v1.journeys'
+        assert len(stats[0].journeys) == 0
+        assert len(stats[0].parameters) > 0
+
     def test_simple_test_coverage_with_stats(self):
         """
         here  we test stat objects for api coverage filled by stat manager
@@ -300,3 +320,24 @@ class TestError(object):
         with app.test_request_context('/v1/places'):
             stat_manager._manage_stat(time.time(), response)
         assert mock.called
+
+
+class TestAdminIndex(object):
+    def test_admin_of_stop_point(self):
+        admin = {'id': 'admin:1', 'insee': '75056', 'name': 'Paris', 'level': 8}
+        point = {
+            'id': 'stop_point:1',
+            'embedded_type': 'stop_point',
+            'stop_point': {'id': 'stop_point:1', 'administrative_regions': [dict(admin, level=6), admin]},
+        }
+        admins = AdminIndex()
+        assert admins.find_admin(point) == ('admin:1', '75056', 'Paris')
+        # the admin of a uri is looked for only once
+        point['stop_point']['administrative_regions'] = []
+        assert admins.find_admin(point) == ('admin:1', '75056', 'Paris')
+
+    def test_admin_elsewhere(self):
+        admin = {'id': 'admin:1', 'insee': '75056', 'name': 'Paris', 'level': 8}
+        point = {'id': 'poi:1', 'embedded_type': 'poi', 'poi': {'address': {'administrative_regions': [admin]}}}
+        assert AdminIndex().find_admin(point) == find_admin(point)
+        assert AdminIndex().find_admin({'id': 'coord', 'embedded_type': 'address'}) == (None, None, None)
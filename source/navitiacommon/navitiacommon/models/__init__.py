@@ -726,7 +726,18 @@ class Metric(db.Model):  # type: ignore
 
     type = db.Column(
         db.Enum(
-            'ed2nav', 'fusio2ed', 'gtfs2ed', 'osm2ed', 'geopal2ed', 'synonym2ed', 'poi2ed', name='metric_type'
+            'ed2nav',
+            'fusio2ed',
+            'gtfs2ed',
+            'osm2ed',
+            'geopal2ed',
+            'synonym2ed',
+            'poi2ed',
+            'fare2ed',
+            'shape2ed',
+            'ntfs2mimir',
+            'stops2mimir',
+            name='metric_type',
         ),
         nullable=False,
     )
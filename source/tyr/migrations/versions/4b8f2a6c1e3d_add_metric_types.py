@@ -0,0 +1,34 @@
+"""add the metrics of fare2ed, shape2ed and of the mimir imports
+
+Revision ID: 4b8f2a6c1e3d
+Revises: 38cf24479595
+Create Date: 2026-10-18 10:12:31.502214
+
+"""
+
+revision = '4b8f2a6c1e3d'
+down_revision = '38cf24479595'
+
+from alembic import op
+import sqlalchemy as sa
+
+old_types = ('ed2nav', 'fusio2ed', 'gtfs2ed', 'osm2ed', 'geopal2ed', 'synonym2ed', 'poi2ed')
+new_types = old_types + ('fare2ed', 'shape2ed', 'ntfs2mimir', 'stops2mimir')
+
+
+def change_metric_type(types):
+    # 'ALTER TYPE ... ADD VALUE' can't be run in a transaction, so the enum is replaced
+    op.execute('ALTER TYPE metric_type RENAME TO metric_type_old')
+    sa.Enum(*types, name='metric_type').create(op.get_bind())
+    op.execute('ALTER TABLE metric ALTER COLUMN type TYPE metric_type USING type::text::metric_type')
+    op.execute('DROP TYPE metric_type_old')
+
+
+def upgrade():
+    change_metric_type(new_types)
+
+
+def downgrade():
+    old_values = ', '.join("'{}'".format(t) for t in old_types)
+    op.execute('DELETE FROM metric WHERE type::text NOT IN ({})'.format(old_values))
+    change_metric_type(old_types)
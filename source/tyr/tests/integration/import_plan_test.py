@@ -0,0 +1,167 @@
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+from __future__ import absolute_import, print_function, unicode_literals
+import mock
+import pytest
+
+from tyr import tasks
+from tyr.import_plan import ImportPlan
+
+
+class FakeResult(object):
+    def __init__(self, error=None):
+        self.error = error
+
+    def get(self):
+        if self.error:
+            raise self.error
+
+
+class FakeSignature(object):
+    def __init__(self, name, runs, error=None):
+        self.name = name
+        self.runs = runs
+        self.error = error
+        self.links = []
+
+    def apply(self):
+        self.runs.append(self.name)
+        return FakeResult(self.error)
+
+    def apply_async(self, link=None):
+        self.runs.append(self.name)
+        self.links.append(link)
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.sets = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def sadd(self, key, value):
+        values = self.sets.setdefault(key, set())
+        if value in values:
+            return 0
+        values.add(value)
+        return 1
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def expire(self, key, seconds):
+        return True
+
+
+class FakePipeline(object):
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.commands]
+
+
+def make_plan(runs, error_on=None):
+    plan = ImportPlan(42)
+
+    def sig(name):
+        return FakeSignature(name, runs, ValueError(name) if name == error_on else None)
+
+    plan.add('fusio2ed', sig('fusio2ed'))
+    plan.add('osm2ed', sig('osm2ed'))
+    plan.add('poi2ed', sig('poi2ed'), ['osm2ed'])
+    plan.add('ed2nav', sig('ed2nav'), ['fusio2ed', 'poi2ed'])
+    plan.add('mimir', sig('mimir'), ['fusio2ed'])
+    plan.add('finish_job', sig('finish_job'), ['ed2nav', 'mimir'])
+    return plan
+
+
+def import_plan_dependencies_test():
+    plan = make_plan([])
+    assert plan.ready(set()) == ['fusio2ed', 'osm2ed']
+    assert plan.ready({'fusio2ed'}) == ['osm2ed', 'mimir']
+    assert plan.ready({'fusio2ed', 'osm2ed', 'mimir'}) == ['poi2ed']
+    assert plan.ready({'fusio2ed', 'osm2ed', 'poi2ed'}) == ['ed2nav', 'mimir']
+    assert plan.last() == 'finish_job'
+
+    with pytest.raises(ValueError):
+        plan.add('reload_data', None, ['ed2nav', 'unknown'])
+    with pytest.raises(ValueError):
+        plan.add('ed2nav', None)
+
+
+def import_plan_finish_after_mimir_test():
+    """
+    the job is finished only once the autocomplete is indexed too, even if the binarisation ends first
+    """
+    plan = make_plan([])
+    assert 'finish_job' not in plan.ready({'fusio2ed', 'osm2ed', 'poi2ed', 'ed2nav'})
+    assert plan.ready({'fusio2ed', 'osm2ed', 'poi2ed', 'ed2nav'}) == ['mimir']
+    assert plan.ready({'fusio2ed', 'osm2ed', 'poi2ed', 'ed2nav', 'mimir'}) == ['finish_job']
+
+
+def import_plan_apply_test():
+    runs = []
+    make_plan(runs).apply()
+    assert runs == ['fusio2ed', 'osm2ed', 'poi2ed', 'ed2nav', 'mimir', 'finish_job']
+
+    runs = []
+    with pytest.raises(ValueError):
+        make_plan(runs, error_on='poi2ed').apply()
+    assert runs == ['fusio2ed', 'osm2ed', 'poi2ed']
+
+
+def run_import_stages_test():
+    runs = []
+    plan = make_plan(runs)
+    with mock.patch.object(tasks, 'redis', FakeRedis()):
+        tasks.run_import_stages(plan)
+        assert runs == ['fusio2ed', 'osm2ed']
+        # each stage is linked to the launch of the next ones
+        assert plan.signature('fusio2ed').links[0].args == (plan, 'fusio2ed')
+
+        tasks.run_import_stages(plan, 'osm2ed')
+        assert runs == ['fusio2ed', 'osm2ed', 'poi2ed']
+        tasks.run_import_stages(plan, 'fusio2ed')
+        assert runs == ['fusio2ed', 'osm2ed', 'poi2ed', 'mimir']
+        tasks.run_import_stages(plan, 'poi2ed')
+        # a stage is launched only once
+        tasks.run_import_stages(plan, 'poi2ed')
+        assert runs == ['fusio2ed', 'osm2ed', 'poi2ed', 'mimir', 'ed2nav']
@@ -111,9 +111,23 @@ def lock_release(lock, logger):
         raise
 
 
+# independent parts of the ed database, the imports of different parts can run at the same time
+ED_PT = 'pt'  # pt data, fares and synonyms
+ED_GEOREF = 'georef'  # street network, pois and bounding shape
+ED_ALL = (ED_PT, ED_GEOREF)
+
+
 class Lock(object):
-    def __init__(self, timeout):
+    """
+    Lock the ed database of the instance during the task, if it's already locked the task is retried later
+
+    The lock is taken only on the parts of the database ('resources') written by the task,
+    a task reading the whole database (ed2nav) locks all of them
+    """
+
+    def __init__(self, timeout, resources=ED_ALL):
         self.timeout = timeout
+        self.resources = sorted(resources)
 
     def __call__(self, func):
         @wraps(func)
@@ -123,13 +137,20 @@ class Lock(object):
             job = models.Job.query.get(job_id)
             logger = get_instance_logger(job.instance, task_id=job_id)
             task = args[func.func_code.co_varnames.index('self')]
+            locks = []
             try:
-                lock = redis.lock('tyr.lock|' + job.instance.name, timeout=self.timeout)
-                locked = lock.acquire(blocking=False)
+                # always in the same order so two tasks can't wait for each other
+                for resource in self.resources:
+                    lock = redis.lock('tyr.lock|{}|{}'.format(job.instance.name, resource), timeout=self.timeout)
+                    if not lock.acquire(blocking=False):
+                        break
+                    locks.append(lock)
             except ConnectionError:
+                release_locks(locks, logger)
                 logging.exception('Exception with redis while locking. Retrying in 10sec')
                 task.retry(countdown=10, max_retries=10)
-            if not locked:
+            if len(locks) != len(self.resources):
+                release_locks(locks, logger)
                 countdown = 300
                 logger.info('lock on %s retry %s in %s sec', job.instance.name, func.__name__, countdown)
                 task.retry(countdown=countdown, max_retries=10)
@@ -139,22 +160,27 @@ class Lock(object):
                     return func(*args, **kwargs)
                 finally:
                     logger.debug('release lock on %s for %s', job.instance.name, func.__name__)
-                    # sometimes we are disconnected from redis when we want to release the lock,
-                    # so we retry only the release
-                    try:
-                        retrying.Retrying(stop_max_attempt_number=5, wait_fixed=1000).call(
-                            lock_release, lock, logger
-                        )
-                    except ValueError:  # LockError(ValueError) since redis 3.0
-                        logger.exception(
-                            "impossible to release lock: continue but following task may be locked :("
-                        )
+                    release_locks(locks, logger)
 
         return wrapper
 
 
+def release_locks(locks, logger):
+    for lock in locks:
+        # sometimes we are disconnected from redis when we want to release the lock,
+        # so we retry only the release
+        try:
+            retrying.Retrying(stop_max_attempt_number=5, wait_fixed=1000).call(lock_release, lock, logger)
+        except ValueError:  # LockError(ValueError) since redis 3.0
+            logger.exception("impossible to release lock: continue but following task may be locked :(")
+
+
 @contextmanager
 def collect_metric(task_type, job, dataset_uid):
+    if job is None:
+        # the task isn't part of a job, there is nowhere to store the metric
+        yield
+        return
     begin = datetime.datetime.utcnow()
     yield
     end = datetime.datetime.utcnow()
@@ -174,7 +200,7 @@ def collect_metric(task_type, job, dataset_uid):
 
 
 @celery.task(bind=True)
-@Lock(timeout=30 * 60)
+@Lock(timeout=30 * 60, resources=[ED_PT])
 def fusio2ed(self, instance_config, filename, job_id, dataset_uid):
     """ Unzip fusio file and launch fusio2ed """
 
@@ -213,7 +239,7 @@ def fusio2ed(self, instance_config, filename, job_id, dataset_uid):
 
 
 @celery.task(bind=True)
-@Lock(30 * 60)
+@Lock(timeout=30 * 60, resources=[ED_PT])
 def gtfs2ed(self, instance_config, gtfs_filename, job_id, dataset_uid):
     """ Unzip gtfs file launch gtfs2ed """
 
@@ -252,7 +278,7 @@ def gtfs2ed(self, instance_config, gtfs_filename, job_id, dataset_uid):
 
 
 @celery.task(bind=True)
-@Lock(timeout=30 * 60)
+@Lock(timeout=30 * 60, resources=[ED_GEOREF])
 def osm2ed(self, instance_config, osm_filename, job_id, dataset_uid):
     """ launch osm2ed """
 
@@ -298,7 +324,7 @@ def osm2ed(self, instance_config, osm_filename, job_id, dataset_uid):
 
 
 @celery.task(bind=True)
-@Lock(timeout=30 * 60)
+@Lock(timeout=30 * 60, resources=[ED_GEOREF])
 def geopal2ed(self, instance_config, filename, job_id, dataset_uid):
     """ launch geopal2ed """
 
@@ -329,7 +355,7 @@ def geopal2ed(self, instance_config, filename, job_id, dataset_uid):
 
 
 @celery.task(bind=True)
-@Lock(timeout=10 * 60)
+@Lock(timeout=10 * 60, resources=[ED_GEOREF])
 def poi2ed(self, instance_config, filename, job_id, dataset_uid):
     """ launch poi2ed """
 
@@ -360,7 +386,7 @@ def poi2ed(self, instance_config, filename, job_id, dataset_uid):
 
 
 @celery.task(bind=True)
-@Lock(timeout=10 * 60)
+@Lock(timeout=10 * 60, resources=[ED_PT])
 def synonym2ed(self, instance_config, filename, job_id, dataset_uid):
     """ launch synonym2ed """
 
@@ -480,13 +506,14 @@ def load_bounding_shape(instance_name, instance_conf, shape_path):
 
 
 @celery.task(bind=True)
-@Lock(timeout=10 * 60)
+@Lock(timeout=10 * 60, resources=[ED_GEOREF])
 def shape2ed(self, instance_config, filename, job_id, dataset_uid):
     """load a street network shape into ed"""
     job = models.Job.query.get(job_id)
     instance = job.instance
     logging.info("loading bounding shape for {} from = {}".format(instance.name, filename))
-    load_bounding_shape(instance.name, instance_config, filename)
+    with collect_metric('shape2ed', job, dataset_uid):
+        load_bounding_shape(instance.name, instance_config, filename)
 
 
 @celery.task(bind=True)
@@ -555,7 +582,7 @@ def ed2nav(self, instance_config, job_id, custom_output_dir):
 
 
 @celery.task(bind=True)
-@Lock(timeout=10 * 60)
+@Lock(timeout=10 * 60, resources=[ED_PT])
 def fare2ed(self, instance_config, filename, job_id, dataset_uid):
     """ launch fare2ed """
 
@@ -573,7 +600,9 @@ def fare2ed(self, instance_config, filename, job_id, dataset_uid):
         params.append("--local_syslog")
         params.append("--log_comment")
         params.append(instance_config.name)
-        res = launch_exec("fare2ed", params, logger)
+        res = None
+        with collect_metric('fare2ed', job, dataset_uid):
+            res = launch_exec("fare2ed", params, logger)
         if res != 0:
             # @TODO: exception
             raise ValueError('fare2ed failed')
@@ -672,6 +701,7 @@ def stops2mimir(self, instance_config, input, job_id=None, dataset_uid=None):
     Note: this is temporary, this will be done by tartare when tartare will be available
     """
     # We don't have job_id while doing a reimport of all instances with import_stops_in_mimir = true
+    job = None
     if job_id:
         job = models.Job.query.get(job_id)
         instance = job.instance
@@ -688,7 +718,8 @@ def stops2mimir(self, instance_config, input, job_id=None, dataset_uid=None):
     argv = ['--input', stops_file, '--connection-string', cnx_string, '--dataset', instance_config.name]
 
     try:
-        res = launch_exec('stops2mimir', argv, logger)
+        with collect_metric('stops2mimir', job, dataset_uid):
+            res = launch_exec('stops2mimir', argv, logger)
         if res != 0:
             # Do not raise error because that it breaks celery tasks chain.
             # stops2mimir have to be non-blocking.
@@ -712,6 +743,7 @@ def ntfs2mimir(self, instance_config, input, job_id=None, dataset_uid=None):
     launch ntfs2mimir
     """
     # We don't have job_id while doing a reimport of all instances with import_stops_in_mimir = true
+    job = None
     if job_id:
         job = models.Job.query.get(job_id)
         instance = job.instance
@@ -724,7 +756,8 @@ def ntfs2mimir(self, instance_config, input, job_id=None, dataset_uid=None):
 
     argv = ['--input', working_directory, '--connection-string', cnx_string, '--dataset', instance_config.name]
     try:
-        res = launch_exec('ntfs2mimir', argv, logger)
+        with collect_metric('ntfs2mimir', job, dataset_uid):
+            res = launch_exec('ntfs2mimir', argv, logger)
         if res != 0:
             # Do not raise error because it breaks celery tasks chain.
             # ntfs2mimir have to be non-blocking.
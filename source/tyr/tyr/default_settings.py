@@ -74,6 +74,9 @@ REDIS_DB = 0
 
 REDIS_PASSWORD = None
 
+# channel on which the jormungandr workers listen to the invalidations of their cache
+CACHE_INVALIDATION_CHANNEL = 'navitia.cache_invalidation'
+
 # Validate the presence of a mx record on the domain
 EMAIL_CHECK_MX = True
 
@@ -248,3 +248,19 @@ def save_in_tmp(file_storage):
     tmp_file = os.path.join(tempfile.gettempdir(), file_storage.filename)
     file_storage.save(tmp_file)
     return tmp_file
+
+
+def publish_cache_invalidation(namespace):
+    """
+    ask the jormungandr workers to forget their cached values of a namespace
+    ('authentication' or 'instances'), see jormungandr's TwoTierCache
+    """
+    from tyr import redis
+    import json
+
+    channel = current_app.config.get('CACHE_INVALIDATION_CHANNEL', 'navitia.cache_invalidation')
+    message = json.dumps({'namespace': namespace, 'reset_shared': True})
+    try:
+        redis.publish(channel, message)
+    except Exception as e:
+        logging.getLogger(__name__).warning('impossible to publish the cache invalidation: {}'.format(e))
@@ -0,0 +1,95 @@
+# Copyright (c) 2001-2020, Canal TP and/or its affiliates. All rights reserved.
+#
+# This file is part of Navitia,
+#     the software to build cool stuff with public transport.
+#
+# Hope you'll enjoy and contribute to this project,
+#     powered by Canal TP (www.canaltp.fr).
+# Help us simplify mobility and open public transport:
+#     a non ending quest to the responsive locomotion way of traveling!
+#
+# LICENCE: This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Stay tuned using
+# twitter @navitia
+# IRC #navitia on freenode
+# https://groups.google.com/d/forum/navitia
+# www.navitia.io
+
+"""
+Import plan: the tasks of a data import and their dependencies
+"""
+from __future__ import absolute_import, print_function, division
+from collections import OrderedDict
+
+
+class ImportPlan(object):
+    """
+    DAG of the tasks (celery signatures) of an import
+
+    A stage can only depend on stages already added, so the order of insertion is a valid order
+    to run them one after another and there can't be any cycle.
+    The stages are run in background by tasks.run_import_stages: each stage is launched as soon as all
+    its dependencies are done, so the independent ones run at the same time.
+    """
+
+    def __init__(self, id):
+        self.id = id
+        self.stages = OrderedDict()  # name -> (signature, names of the dependencies)
+
+    def add(self, name, signature, depends_on=()):
+        if name in self.stages:
+            raise ValueError('stage {} already in the import plan'.format(name))
+        unknown = [d for d in depends_on if d not in self.stages]
+        if unknown:
+            raise ValueError('stage {} depends on unknown stages: {}'.format(name, unknown))
+        self.stages[name] = (signature, tuple(depends_on))
+        return name
+
+    def signature(self, name):
+        return self.stages[name][0]
+
+    def dependencies(self, name):
+        return self.stages[name][1]
+
+    def ready(self, done):
+        """
+        the stages not done whose dependencies are all done
+        """
+        return [
+            name
+            for name, (_, depends_on) in self.stages.items()
+            if name not in done and all(d in done for d in depends_on)
+        ]
+
+    def last(self):
+        return next(reversed(self.stages)) if self.stages else None
+
+    def apply(self):
+        """
+        run all the stages one after another in this process, stop at the first failure (the error is raised)
+        """
+        result = None
+        for signature, _ in self.stages.values():
+            result = signature.apply()
+            result.get()
+        return result
+
+    def __len__(self):
+        return len(self.stages)
+
+    def __repr__(self):
+        return '<ImportPlan {}: {}>'.format(
+            self.id, ', '.join('{} <- {}'.format(n, list(d)) for n, (_, d) in self.stages.items())
+        )
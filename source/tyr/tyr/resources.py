@@ -63,7 +63,7 @@ from tyr.tasks import (
     COSMOGONY_REGEXP,
 )
 from tyr import api
-from tyr.helper import get_instance_logger, save_in_tmp
+from tyr.helper import get_instance_logger, save_in_tmp, publish_cache_invalidation
 from tyr.fields import *
 from werkzeug.exceptions import BadRequest
 import werkzeug
@@ -281,6 +281,7 @@ class Instance(flask_restful.Resource):
         try:
             instance.discarded = True
             db.session.commit()
+            publish_cache_invalidation('instances')
         except Exception:
             logging.exception("fail")
             raise
@@ -687,6 +688,7 @@ class Instance(flask_restful.Resource):
                     instance.equipment_details_providers.append(equipment_provider)
 
             db.session.commit()
+            publish_cache_invalidation('instances')
         except Exception:
             logging.exception("fail")
             raise
@@ -920,6 +922,7 @@ class User(flask_restful.Resource):
             user.shape = ujson.dumps(args['shape'])
             user.default_coord = args['default_coord']
             db.session.commit()
+            publish_cache_invalidation('authentication')
 
             tyr_user_event = TyrUserEvent()
             tyr_user_event.request(user, "update_user", last_login)
@@ -936,6 +939,7 @@ class User(flask_restful.Resource):
         try:
             db.session.delete(user)
             db.session.commit()
+            publish_cache_invalidation('authentication')
 
             tyr_user_event = TyrUserEvent()
             tyr_user_event.request(user, "delete_user")
@@ -980,6 +984,7 @@ class Key(flask_restful.Resource):
         try:
             user.add_key(args['app_name'], valid_until=args['valid_until'])
             db.session.commit()
+            publish_cache_invalidation('authentication')
         except Exception:
             logging.exception("fail")
             raise
@@ -994,6 +999,7 @@ class Key(flask_restful.Resource):
                 abort(404)
             db.session.delete(key)
             db.session.commit()
+            publish_cache_invalidation('authentication')
         except Exception:
             logging.exception("fail")
             raise
@@ -1026,6 +1032,7 @@ class Key(flask_restful.Resource):
                 key.valid_until = args['valid_until']
             key.app_name = args['app_name']
             db.session.commit()
+            publish_cache_invalidation('authentication')
         except Exception:
             logging.exception("fail")
             raise
@@ -1058,6 +1065,7 @@ class Authorization(flask_restful.Resource):
             for authorization in authorizations:
                 db.session.delete(authorization)
             db.session.commit()
+            publish_cache_invalidation('authentication')
         except Exception:
             logging.exception("fail")
             raise
@@ -1085,6 +1093,7 @@ class Authorization(flask_restful.Resource):
             user.authorizations.append(authorization)
             db.session.add(authorization)
             db.session.commit()
+            publish_cache_invalidation('authentication')
         except (sqlalchemy.exc.IntegrityError, sqlalchemy.orm.exc.FlushError):
             return ({'error': 'duplicate entry'}, 409)
         except Exception:
@@ -1293,6 +1302,7 @@ class TravelerProfile(flask_restful.Resource):
                 setattr(profile, attr, value)
             db.session.add(profile)
             db.session.commit()
+            publish_cache_invalidation('instances')
             return profile
         except (sqlalchemy.exc.IntegrityError, sqlalchemy.orm.exc.FlushError) as e:
             return {'error': str(e)}, 409
@@ -1312,6 +1322,7 @@ class TravelerProfile(flask_restful.Resource):
                 if args_value is not None:
                     setattr(profile, attr, args_value)
             db.session.commit()
+            publish_cache_invalidation('instances')
             return profile
         except (sqlalchemy.exc.IntegrityError, sqlalchemy.orm.exc.FlushError) as e:
             return {'error': str(e)}, 409
@@ -1330,6 +1341,7 @@ class TravelerProfile(flask_restful.Resource):
         try:
             db.session.delete(profile)
             db.session.commit()
+            publish_cache_invalidation('instances')
             return '', 204
         except sqlalchemy.orm.exc.FlushError as e:
             return {'error': str(e)}, 409
@@ -56,12 +56,14 @@ from tyr.binarisation import (
     ntfs2mimir,
     cosmogony2mimir,
 )
-from tyr.binarisation import reload_data, move_to_backupdirectory
-from tyr import celery
+from tyr.binarisation import reload_data, move_to_backupdirectory, ED_PT, ED_GEOREF
+from tyr.import_plan import ImportPlan
+from tyr import celery, redis
 from navitiacommon import models, task_pb2, utils
 from tyr.helper import load_instance_config, get_instance_logger
 from navitiacommon.launch_exec import launch_exec
 from datetime import datetime, timedelta
+import uuid
 
 
 @celery.task()
@@ -108,6 +110,18 @@ def import_data(files, instance, backup_file, async=True, reload=True, custom_ou
         'synonym': synonym2ed,
         'shape': shape2ed,
     }
+    # part of the ed database written by each task, the tasks writing the same part are run in the order
+    # of the files, the others at the same time
+    ed_resource = {
+        'gtfs': ED_PT,
+        'fusio': ED_PT,
+        'osm': ED_GEOREF,
+        'geopal': ED_GEOREF,
+        'fare': ED_PT,
+        'poi': ED_GEOREF,
+        'synonym': ED_PT,
+        'shape': ED_GEOREF,
+    }
 
     for _file in files:
         filename = None
@@ -131,7 +145,7 @@ def import_data(files, instance, backup_file, async=True, reload=True, custom_ou
                 filename = move_to_backupdirectory(_file, instance_config.backup_directory)
             else:
                 filename = _file
-            actions.append(task[dataset.type].si(instance_config, filename, dataset_uid=dataset.uid))
+            actions.append((dataset, task[dataset.type].si(instance_config, filename, dataset_uid=dataset.uid)))
         else:
             # unknown type, we skip it
             current_app.logger.debug("unknown file type: {} for file {}".format(dataset.type, _file))
@@ -145,26 +159,68 @@ def import_data(files, instance, backup_file, async=True, reload=True, custom_ou
     if actions:
         models.db.session.add(job)
         models.db.session.commit()
-        # We pass the job id to each tasks, but job need to be commited for having an id
-        for action in actions:
+        plan = ImportPlan(job.id)
+        last_stages = {}  # ed resource -> last stage writing it
+        stages_of_dataset = {}
+        for dataset, action in actions:
+            # We pass the job id to each tasks, but job need to be commited for having an id
             action.kwargs['job_id'] = job.id
+            resource = ed_resource[dataset.type]
+            previous = [last_stages[resource]] if resource in last_stages else []
+            stage = plan.add('{}2ed|{}'.format(dataset.type, dataset.uid), action, depends_on=previous)
+            last_stages[resource] = stages_of_dataset[dataset.uid] = stage
+        data_stages = list(last_stages.values())
         # Create binary file (New .nav.lz4)
-        binarisation = [ed2nav.si(instance_config, job.id, custom_output_dir)]
-        actions.append(chain(*binarisation))
+        job_stages = [plan.add('ed2nav', ed2nav.si(instance_config, job.id, custom_output_dir), data_stages)]
         # Reload kraken with new data after binarisation (New .nav.lz4)
         if reload:
-            actions.append(reload_data.si(instance_config, job.id))
+            job_stages.append(plan.add('reload_data', reload_data.si(instance_config, job.id), ['ed2nav']))
 
+        # the autocomplete only needs the files, it's indexed at the same time as the binarisation
+        # but the job is finished only once it's done too
         for dataset in job.data_sets:
             if dataset.family_type == 'pt':
-                actions.extend(send_to_mimir(instance, dataset.name))
-
-        actions.append(finish_job.si(job.id))
+                mimir_actions = send_to_mimir(instance, dataset.name)
+                if mimir_actions:
+                    mimir_stage = plan.add(
+                        'mimir|{}'.format(dataset.uid), chain(*mimir_actions), [stages_of_dataset[dataset.uid]]
+                    )
+                    job_stages.append(mimir_stage)
+
+        plan.add('finish_job', finish_job.si(job.id).set(task_id=str(uuid.uuid4())), job_stages)
         if async:
-            return chain(*actions).delay()
+            run_import_stages.delay(plan)
+            # the result of the last stage, like with a chain
+            return finish_job.AsyncResult(plan.signature('finish_job').options['task_id'])
         else:
             # all job are run in sequence and import_data will only return when all the jobs are finish
-            return chain(*actions).apply()
+            return plan.apply()
+
+
+@celery.task()
+def run_import_stages(plan, done_stage=None):
+    """
+    launch the stages of an import plan that can be run, at the start of the import and after each stage
+
+    the done stages are stored in redis, a stage is launched only once even if its dependencies end
+    at the same time
+    """
+    key = 'tyr.import_plan|{}'.format(plan.id)
+    with redis.pipeline() as pipe:
+        if done_stage:
+            pipe.sadd(key + '|done', done_stage)
+        pipe.smembers(key + '|done')
+        pipe.expire(key + '|done', 7 * 24 * 3600)
+        done = pipe.execute()[-2]
+    done = {d.decode('utf-8') if isinstance(d, bytes) else d for d in done}
+    logging.getLogger(__name__).debug('%s: %s done', plan, list(done))
+
+    for stage in plan.ready(done):
+        # if two stages end at the same time, both callbacks can find the same stage ready
+        if not redis.sadd(key + '|started', stage):
+            continue
+        redis.expire(key + '|started', 7 * 24 * 3600)
+        plan.signature(stage).apply_async(link=run_import_stages.si(plan, stage))
 
 
 def send_to_mimir(instance, filename):